@@ -0,0 +1,578 @@
+"""
+SNPTracker - Banded Alignment
+
+Aligns a sample to the reference so that an indel is reported where it
+occurs, instead of shifting every downstream base into a false SNP.
+
+Identical stretches are skipped with block string comparisons (as in
+scanner.py); only at a divergence is a banded Needleman-Wunsch alignment
+run, over a window of WINDOW_FACTOR * band bases of each sequence. The
+window's alignment is accepted up to the first run of RESYNC_LENGTH
+matching bases (the sequences are back in step) and scanning resumes
+there, with the offset between the two sequences updated. The band starts
+narrow and is doubled, up to the requested band, only while no such run is
+found. For similar sequences the cost is therefore near-linear: a block
+comparison per identical stretch plus O(window * band) per divergent site.
+
+Scoring is unit edit distance (mismatch, insertion and deletion all cost
+1). Among equally good alignments, gaps are placed leftmost, which is the
+VCF normalisation convention.
+
+For long sequences with structural differences, iter_seeded_edits() first
+chains exact-match anchors: the reference's non-overlapping k-mers are
+indexed (unique ones only), the sample is scanned for them, every hit is
+extended to a maximal match, and the heaviest collinear chain of matches is
+kept. Only the gaps between anchors are aligned, independently, so the
+gaps can be handed to a process pool.
+
+Assumptions:
+    - Sequences are plain strings already normalised to the same case.
+    - Indels longer than the band are not recovered in one piece: they may
+      be split, or surface as a shorter indel plus mismatches. Raise the
+      band for them.
+
+Public API:
+    DEFAULT_BAND
+    DEFAULT_SEED_LENGTH
+    Edit(position, reference, alternate)
+        — one substitution, deletion or insertion
+    iter_edits(reference, sample, band=DEFAULT_BAND) -> Iterator[Edit]
+        — edits turning reference into sample, in reference order
+    Anchor(reference_start, sample_start, length)
+    find_anchors(reference, sample, seed_length=DEFAULT_SEED_LENGTH)
+        -> list[Anchor]                — collinear exact-match chain
+    iter_seeded_edits(reference, sample, seed_length=DEFAULT_SEED_LENGTH,
+                      band=DEFAULT_BAND, mapper=map) -> Iterator[Edit]
+        — iter_edits() restricted to the gaps between anchors
+"""
+
+from itertools import repeat as _repeat
+from typing import Callable, Iterable, Iterator, NamedTuple
+
+DEFAULT_BAND = 32
+DEFAULT_SEED_LENGTH = 16
+
+# Gap bases handed to one mapper call by iter_seeded_edits
+_GAP_BATCH_BASES = 1 << 18
+
+# Matching bases after a divergence that mark the sequences as back in step
+RESYNC_LENGTH = 8
+
+# Window length, in bases of each sequence, per unit of band
+WINDOW_FACTOR = 4
+
+# First band tried at a divergence; doubled up to the requested band
+_INITIAL_BAND = 8
+
+# First block compared by _match_length; doubled after each equal block
+_INITIAL_STEP = 64
+
+# Traceback moves
+_DIAGONAL = 0
+_DELETION = 1
+_INSERTION = 2
+
+
+class Edit(NamedTuple):
+    """One difference between the reference and the sample.
+
+    Attributes:
+        position: 1-indexed reference position of the first affected base.
+            For insertions, the reference base following the inserted
+            bases (len(reference) + 1 past the end).
+        reference: Substituted or deleted reference bases ('' for
+            insertions). Substitutions always hold a single base.
+        alternate: Sample base of a substitution, or the inserted bases
+            ('' for deletions).
+    """
+
+    position: int
+    reference: str
+    alternate: str
+
+
+def _match_length(reference: str, i: int, sample: str, j: int) -> int:
+    """Returns the length of the common prefix of reference[i:] and sample[j:].
+
+    Blocks of doubling size are compared as strings; the first differing
+    block is bisected.
+    """
+    limit = min(len(reference) - i, len(sample) - j)
+    length = 0
+    step = _INITIAL_STEP
+    while length < limit:
+        size = min(step, limit - length)
+        ref_start, smp_start = i + length, j + length
+        if reference[ref_start:ref_start + size] == sample[smp_start:smp_start + size]:
+            length += size
+            step <<= 1
+            continue
+        while size > 1:
+            half = size >> 1
+            ref_start, smp_start = i + length, j + length
+            if reference[ref_start:ref_start + half] == sample[smp_start:smp_start + half]:
+                length += half
+                size -= half
+            else:
+                size = half
+        break
+    return length
+
+
+def _align_window(
+    reference: str,
+    sample: str,
+    low: int,
+    high: int,
+    final: bool,
+) -> str:
+    """Aligns two windows within the diagonals [low, high].
+
+    Diagonal d holds the cells (r, s) with s - r == d. A final alignment
+    is global (both windows end together, so high >= len(sample) -
+    len(reference) >= low); otherwise it may end anywhere on the last row
+    or column, since the sequences continue past the windows.
+
+    Returns:
+        str: Alignment columns, one character each: 'M' (match), 'X'
+            (mismatch), 'D' (reference base deleted in the sample) or 'I'
+            (sample base inserted).
+    """
+    n, m = len(reference), len(sample)
+    infinity = n + m + 1
+    starts: list[int] = []
+    costs: list[list[int]] = []
+    moves: list[bytearray] = []
+
+    previous: list[int] = []
+    previous_start = 0
+    for r in range(n + 1):
+        start = max(0, r + low)
+        stop = min(m, r + high)
+        if start > stop:
+            break
+        row = [infinity] * (stop - start + 1)
+        move = bytearray(stop - start + 1)
+        ref_base = reference[r - 1] if r else ""
+        for s in range(start, stop + 1):
+            k = s - start
+            if r == 0:
+                row[k] = s
+                move[k] = _INSERTION
+                continue
+            best = infinity
+            choice = _DIAGONAL
+            p = s - 1 - previous_start
+            if s and 0 <= p < len(previous):
+                best = previous[p] + (ref_base != sample[s - 1])
+            p += 1
+            if 0 <= p < len(previous) and previous[p] + 1 < best:
+                best = previous[p] + 1
+                choice = _DELETION
+            if k and row[k - 1] + 1 < best:
+                best = row[k - 1] + 1
+                choice = _INSERTION
+            row[k] = best
+            move[k] = choice
+        starts.append(start)
+        costs.append(row)
+        moves.append(move)
+        previous = row
+        previous_start = start
+
+    if final:
+        r, s = n, m
+    else:
+        # Best cell that exhausts either window; ties go to the longest path
+        candidates = []
+        if len(costs) == n + 1:
+            candidates.extend(
+                (cost, -(n + starts[n] + k), n, starts[n] + k)
+                for k, cost in enumerate(costs[n])
+            )
+        for r, (start, row) in enumerate(zip(starts, costs)):
+            if start <= m <= start + len(row) - 1:
+                candidates.append((row[m - start], -(r + m), r, m))
+        _, _, r, s = min(candidates)
+
+    ops = []
+    while r or s:
+        choice = moves[r][s - starts[r]] if r else _INSERTION
+        if choice == _DIAGONAL:
+            r -= 1
+            s -= 1
+            ops.append("M" if reference[r] == sample[s] else "X")
+        elif choice == _DELETION:
+            r -= 1
+            ops.append("D")
+        else:
+            s -= 1
+            ops.append("I")
+    ops.reverse()
+    return "".join(ops)
+
+
+def _resync_point(ops: str) -> int | None:
+    """Returns where the first run of RESYNC_LENGTH matches starts, if any."""
+    index = ops.find("M" * RESYNC_LENGTH)
+    return None if index == -1 else index
+
+
+def _iter_raw_edits(
+    reference: str,
+    sample: str,
+    band: int,
+) -> Iterator[Edit]:
+    """Yields edits as the windows produce them (adjacent gaps unmerged)."""
+    n, m = len(reference), len(sample)
+    i = j = 0
+    while True:
+        step = _match_length(reference, i, sample, j)
+        i += step
+        j += step
+        if i == n or j == m:
+            break
+
+        # Isolated substitution: the sequences agree again right after it
+        if (
+            reference[i + 1:i + 1 + RESYNC_LENGTH]
+            == sample[j + 1:j + 1 + RESYNC_LENGTH]
+        ):
+            yield Edit(i + 1, reference[i], sample[j])
+            i += 1
+            j += 1
+            continue
+
+        width = min(_INITIAL_BAND, band)
+        while True:
+            window = WINDOW_FACTOR * width
+            ref_window = reference[i:i + window]
+            smp_window = sample[j:j + window]
+            final = i + len(ref_window) == n and j + len(smp_window) == m
+            low, high = -width, width
+            if final:
+                shift = len(smp_window) - len(ref_window)
+                low, high = min(low, shift), max(high, shift)
+            ops = _align_window(ref_window, smp_window, low, high, final)
+            cut = _resync_point(ops)
+            if cut is not None or final or width >= band:
+                break
+            width = min(width * 2, band)
+        if cut is None:
+            # No resynchronisation in sight: keep the first half and
+            # realign from there (the last window keeps everything)
+            cut = len(ops) if final else max(len(ops) // 2, 1)
+
+        for op in ops[:cut]:
+            if op == "M":
+                pass
+            elif op == "X":
+                yield Edit(i + 1, reference[i], sample[j])
+            elif op == "D":
+                yield Edit(i + 1, reference[i], "")
+                i += 1
+                continue
+            else:
+                yield Edit(i + 1, "", sample[j])
+                j += 1
+                continue
+            i += 1
+            j += 1
+
+    if i < n:
+        yield Edit(i + 1, reference[i:], "")
+    elif j < m:
+        yield Edit(i + 1, "", sample[j:])
+
+
+def _merge_indels(edits: Iterator[Edit]) -> Iterator[Edit]:
+    """Merges runs of adjacent deletions, and of insertions at one point."""
+    pending = None
+    for edit in edits:
+        if pending is not None:
+            if (
+                not edit.alternate and not pending.alternate
+                and pending.position + len(pending.reference) == edit.position
+            ):
+                pending = Edit(
+                    pending.position, pending.reference + edit.reference, ""
+                )
+                continue
+            if (
+                not edit.reference and not pending.reference
+                and pending.position == edit.position
+            ):
+                pending = Edit(
+                    pending.position, "", pending.alternate + edit.alternate
+                )
+                continue
+            yield pending
+        pending = edit
+    if pending is not None:
+        yield pending
+
+
+def _left_align(edit: Edit, reference: str, floor: int) -> Edit:
+    """Shifts an indel left while it stays equivalent, down to floor.
+
+    The windows only start at a divergence, so an indel in a repeat is
+    first placed after the bases matched before it; moving it left gives
+    the leftmost, normalised placement. floor is the 1-indexed position
+    the indel may not move before (the end of the previous edit).
+    """
+    position, ref_bases, alt_bases = edit
+    if ref_bases and alt_bases:
+        return edit
+    bases = ref_bases or alt_bases
+    while position > floor and reference[position - 2] == bases[-1]:
+        bases = reference[position - 2] + bases[:-1]
+        position -= 1
+    if ref_bases:
+        return Edit(position, bases, "")
+    return Edit(position, "", bases)
+
+
+def iter_edits(
+    reference: str,
+    sample: str,
+    band: int = DEFAULT_BAND,
+) -> Iterator[Edit]:
+    """Yields the edits that turn reference into sample.
+
+    Consecutive deleted (or inserted) bases are merged into one Edit, so
+    every indel is reported once with all its bases, at its leftmost
+    equivalent position.
+
+    Args:
+        reference: Reference sequence.
+        sample: Sample sequence (same case as the reference).
+        band: Largest indel, in bases, the alignment can place in one
+            piece. Default DEFAULT_BAND.
+
+    Yields:
+        Edit: Substitutions, deletions and insertions, in reference order.
+
+    Raises:
+        ValueError: If band < 1.
+    """
+    if band < 1:
+        raise ValueError(f"band must be >= 1, got {band}.")
+
+    floor = 1
+    for edit in _merge_indels(_iter_raw_edits(reference, sample, band)):
+        edit = _left_align(edit, reference, floor)
+        floor = edit.position + len(edit.reference)
+        yield edit
+
+
+class Anchor(NamedTuple):
+    """An exact match shared by the reference and the sample.
+
+    Attributes:
+        reference_start: 0-indexed start in the reference.
+        sample_start: 0-indexed start in the sample.
+        length: Number of matching bases.
+    """
+
+    reference_start: int
+    sample_start: int
+    length: int
+
+
+def _chain(anchors: list[Anchor]) -> list[Anchor]:
+    """Returns the heaviest chain of anchors increasing in both sequences.
+
+    anchors must be sorted by (non-overlapping) sample start. The chain
+    maximises the matched bases (a weighted longest increasing subsequence
+    over reference starts, with a Fenwick tree of prefix maxima); overlaps
+    left in the reference are then trimmed off the later anchor.
+    """
+    ranks = {start: rank for rank, start in enumerate(
+        sorted({anchor.reference_start for anchor in anchors}), start=1
+    )}
+    size = len(ranks)
+    tree_score = [0] * (size + 1)
+    tree_index = [-1] * (size + 1)
+    previous = [-1] * len(anchors)
+    scores = [0] * len(anchors)
+
+    for index, anchor in enumerate(anchors):
+        rank = ranks[anchor.reference_start]
+        best, best_index = 0, -1
+        node = rank - 1
+        while node:
+            if tree_score[node] > best:
+                best, best_index = tree_score[node], tree_index[node]
+            node -= node & -node
+        scores[index] = best + anchor.length
+        previous[index] = best_index
+        node = rank
+        while node <= size:
+            if scores[index] > tree_score[node]:
+                tree_score[node] = scores[index]
+                tree_index[node] = index
+            node += node & -node
+
+    chain = []
+    index = max(range(len(anchors)), key=scores.__getitem__, default=-1)
+    while index != -1:
+        chain.append(anchors[index])
+        index = previous[index]
+    chain.reverse()
+
+    trimmed = []
+    reference_end = 0
+    for ref_start, smp_start, length in chain:
+        overlap = reference_end - ref_start
+        if overlap > 0:
+            ref_start += overlap
+            smp_start += overlap
+            length -= overlap
+            if length <= 0:
+                continue
+        trimmed.append(Anchor(ref_start, smp_start, length))
+        reference_end = ref_start + length
+    return trimmed
+
+
+def find_anchors(
+    reference: str,
+    sample: str,
+    seed_length: int = DEFAULT_SEED_LENGTH,
+) -> list[Anchor]:
+    """Chains exact matches between reference and sample.
+
+    Non-overlapping reference k-mers that occur once are indexed; the
+    sample is scanned base by base for them, except that every hit is
+    extended in both directions to a maximal match and the scan resumes
+    after it, so identical stretches cost one block comparison. Any match
+    of at least 2 * seed_length - 1 bases is found.
+
+    Args:
+        reference: Reference sequence.
+        sample: Sample sequence (same case as the reference).
+        seed_length: k-mer length. Default DEFAULT_SEED_LENGTH.
+
+    Returns:
+        list[Anchor]: Non-overlapping anchors, increasing in both
+            sequences.
+
+    Raises:
+        ValueError: If seed_length < 1.
+    """
+    if seed_length < 1:
+        raise ValueError(f"seed_length must be >= 1, got {seed_length}.")
+
+    index: dict[str, int | None] = {}
+    for start in range(0, len(reference) - seed_length + 1, seed_length):
+        kmer = reference[start:start + seed_length]
+        index[kmer] = None if kmer in index else start
+
+    anchors = []
+    lookup = index.get
+    sample_end = 0
+    s = 0
+    last = len(sample) - seed_length
+    while s <= last:
+        r = lookup(sample[s:s + seed_length])
+        if r is None:
+            s += 1
+            continue
+        back = 0
+        while (
+            back < min(r, s - sample_end)
+            and reference[r - back - 1] == sample[s - back - 1]
+        ):
+            back += 1
+        length = seed_length + _match_length(
+            reference, r + seed_length, sample, s + seed_length
+        )
+        anchors.append(Anchor(r - back, s - back, length + back))
+        s += length
+        sample_end = s
+    return _chain(anchors)
+
+
+def _align_gaps(
+    gaps: list[tuple[str, str, int]],
+    band: int,
+) -> list[Edit]:
+    """Aligns a batch of (reference gap, sample gap, reference offset)."""
+    edits = []
+    for ref_gap, smp_gap, offset in gaps:
+        edits.extend(
+            Edit(position + offset, ref_bases, alt_bases)
+            for position, ref_bases, alt_bases in iter_edits(ref_gap, smp_gap, band)
+        )
+    return edits
+
+
+def _gap_batches(
+    reference: str,
+    sample: str,
+    anchors: list[Anchor],
+) -> Iterator[list[tuple[str, str, int]]]:
+    """Groups the gaps around anchors into batches of ~_GAP_BATCH_BASES."""
+    batch = []
+    size = 0
+    ref_cursor = smp_cursor = 0
+    bounds = [(a.reference_start, a.sample_start, a.length) for a in anchors]
+    bounds.append((len(reference), len(sample), 0))
+    for ref_start, smp_start, length in bounds:
+        if ref_start > ref_cursor or smp_start > smp_cursor:
+            batch.append((
+                reference[ref_cursor:ref_start],
+                sample[smp_cursor:smp_start],
+                ref_cursor,
+            ))
+            size += ref_start - ref_cursor + smp_start - smp_cursor
+            if size >= _GAP_BATCH_BASES:
+                yield batch
+                batch = []
+                size = 0
+        ref_cursor = ref_start + length
+        smp_cursor = smp_start + length
+    if batch:
+        yield batch
+
+
+def iter_seeded_edits(
+    reference: str,
+    sample: str,
+    seed_length: int = DEFAULT_SEED_LENGTH,
+    band: int = DEFAULT_BAND,
+    mapper: Callable[..., Iterable[list[Edit]]] = map,
+) -> Iterator[Edit]:
+    """Yields the edits that turn reference into sample, seed-and-extend.
+
+    Anchors from find_anchors() are taken as matched; only the gaps
+    between them are aligned with iter_edits(). Gaps are independent, so
+    they are aligned in batches through mapper, which may be a process
+    pool's map (e.g. ProcessPoolExecutor(...).map) for parallel runs.
+
+    Args:
+        reference: Reference sequence.
+        sample: Sample sequence (same case as the reference).
+        seed_length: k-mer length of the anchors.
+        band: Alignment band within gaps (see iter_edits).
+        mapper: map()-like callable applied to the gap batches; results
+            must come back in order. Default: the builtin map.
+
+    Yields:
+        Edit: Substitutions, deletions and insertions, in reference order,
+            left-aligned.
+
+    Raises:
+        ValueError: If seed_length < 1 or band < 1.
+    """
+    if band < 1:
+        raise ValueError(f"band must be >= 1, got {band}.")
+    anchors = find_anchors(reference, sample, seed_length)
+    batches = _gap_batches(reference, sample, anchors)
+    floor = 1
+    for edits in mapper(_align_gaps, batches, _repeat(band)):
+        for edit in edits:
+            # A gap's indel may still slide left into the preceding anchor
+            edit = _left_align(edit, reference, floor)
+            floor = edit.position + len(edit.reference)
+            yield edit
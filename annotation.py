@@ -23,17 +23,37 @@ Public API:
     CODON_TABLE              — dict mapping 3-mer → amino acid or "STOP"
     reverse_complement(seq)  — returns the reverse complement of a sequence
     get_codon(seq, pos, frame=1)
-        — returns the triplet containing 1-indexed pos under the given frame
+        — returns the triplet containing 1-indexed pos under the given frame;
+          reverse frames complement only the three codon bases (O(1))
+    ReverseStrand(seq)       — reverse complement computed once per sequence,
+                               with .position() and .codon() helpers
     translate_codon(codon)   — returns amino acid abbreviation or "STOP"
-    annotate_snp(pos, ref, alt, frame=1)
-        — annotates a SNP under the given reading frame
+    annotate_snp(pos, ref, alt, frame=1, window_start=0, ref_length=None,
+                 alt_length=None)
+        — annotates a SNP under the given reading frame; also accepts
+          windows of longer sequences (streaming detection)
+    SUBSTITUTION_TABLE       — 64 × 3 × 4 precomputed SubstitutionEffect
+                               entries (annotation, ref_aa, alt_aa,
+                               alt_codon), built at import
+    substitution_key(seq, pos, alt, frame=1, window_start=0, length=None)
+        -> int | None
+        — SUBSTITUTION_TABLE index of a single-base substitution
+    annotate_substitution(seq, pos, alt, frame=1)
+        — annotation from the reference and alternate base alone
+    CdsIndex(cds_regions)
+        — sorted, merged interval index; `pos in index` bisects and
+          index.mask(sorted_positions) sweeps in linear time
     is_in_cds(pos, cds_regions)
-        — returns True if position is within any (start, end) CDS region
+        — returns True if position is within any (start, end) CDS region;
+          accepts a region list or a CdsIndex
     annotate_snp_with_regions(pos, ref, alt, cds_regions=None, frame=1)
         — like annotate_snp but returns NON_CODING for positions outside CDS;
           cds_regions=None falls back to annotate_snp (backwards-compatible)
 """
 
+from bisect import bisect_right
+from typing import NamedTuple
+
 _VALID_BASES = frozenset("ACGT")
 _COMPLEMENT = str.maketrans("ACGT", "TGCA")
 
@@ -106,12 +126,207 @@ CODON_TABLE: dict[str, str] = {
 }
 
 
+_VALID_FRAMES = {1, 2, 3, -1, -2, -3}
+
+
+def _classify(ref_aa: str, alt_aa: str) -> str:
+    """Annotation class of a reference → alternate amino acid change."""
+    if alt_aa == "STOP":
+        return "NONSENSE"
+    if ref_aa == alt_aa:
+        return "SYNONYMOUS"
+    return "NON_SYNONYMOUS"
+
+
+class SubstitutionEffect(NamedTuple):
+    """Precomputed outcome of one single-base codon substitution.
+
+    Attributes:
+        annotation: "SYNONYMOUS" | "NON_SYNONYMOUS" | "NONSENSE".
+        ref_aa: Amino acid (or "STOP") of the reference codon.
+        alt_aa: Amino acid (or "STOP") of the substituted codon.
+        alt_codon: Codon index of the substituted codon.
+    """
+
+    annotation: str
+    ref_aa: str
+    alt_aa: str
+    alt_codon: int
+
+
+# Codon index = 16*b0 + 4*b1 + b2 with bases ordered A=0, C=1, G=2, T=3.
+_BASES = "ACGT"
+_CODONS = tuple(a + b + c for a in _BASES for b in _BASES for c in _BASES)
+_CODON_AMINO_ACIDS = tuple(CODON_TABLE[codon] for codon in _CODONS)
+
+# Lookups keyed by the triplet/base as read on the forward strand. Reverse
+# frames map a forward triplet straight to the index of its reverse
+# complement, and a forward base to the index of its complement.
+_FORWARD_CODON_INDEX = {codon: i for i, codon in enumerate(_CODONS)}
+_REVERSE_CODON_INDEX = {
+    codon.translate(_COMPLEMENT)[::-1]: i for i, codon in enumerate(_CODONS)
+}
+_FORWARD_BASE_INDEX = {base: i for i, base in enumerate(_BASES)}
+_REVERSE_BASE_INDEX = {
+    base.translate(_COMPLEMENT): i for i, base in enumerate(_BASES)
+}
+
+
+def _substitution_effect(codon: int, offset: int, base: int) -> SubstitutionEffect:
+    """Computes one SUBSTITUTION_TABLE entry by translating both codons."""
+    weight = 4 ** (2 - offset)
+    alt_codon = codon + (base - codon // weight % 4) * weight
+    ref_aa = _CODON_AMINO_ACIDS[codon]
+    alt_aa = _CODON_AMINO_ACIDS[alt_codon]
+    return SubstitutionEffect(_classify(ref_aa, alt_aa), ref_aa, alt_aa, alt_codon)
+
+
+# SUBSTITUTION_TABLE[(codon * 3 + offset) * 4 + base] is the effect of
+# replacing the base at `offset` (0-2, on the codon's own strand) of codon
+# index `codon` with base index `base`: 64 × 3 × 4 = 768 entries.
+SUBSTITUTION_TABLE: tuple[SubstitutionEffect, ...] = tuple(
+    _substitution_effect(codon, offset, base)
+    for codon in range(64)
+    for offset in range(3)
+    for base in range(4)
+)
+
+
+def substitution_key(
+    sequence: str,
+    position: int,
+    alt_base: str,
+    frame: int = 1,
+    window_start: int = 0,
+    length: int | None = None,
+) -> int | None:
+    """Returns the SUBSTITUTION_TABLE index of a single-base substitution.
+
+    Only the three reference bases of the codon are read (case-insensitive,
+    so soft-masked references work); reverse frames are resolved through
+    precomputed complement lookups.
+
+    Args:
+        sequence: Full reference DNA sequence (uppercase), or a window of
+            it covering the codon (see annotate_snp()).
+        position: 1-indexed SNP position (forward strand).
+        alt_base: Alternate base on the forward strand.
+        frame: Reading frame. One of {1, 2, 3, -1, -2, -3}. Default 1.
+        window_start: 0-indexed coordinate of the window's first base.
+        length: Full sequence length. Defaults to len(sequence).
+
+    Returns:
+        int: Index into SUBSTITUTION_TABLE.
+        None: If the position is out of range or NON_CODING in this frame,
+            or if the codon or alt_base holds a non-ACGT character.
+
+    Raises:
+        ValueError: If frame is not one of {1, 2, 3, -1, -2, -3}.
+    """
+    if frame not in _VALID_FRAMES:
+        raise ValueError(
+            f"Invalid frame '{frame}'. Must be one of {_VALID_FRAMES}."
+        )
+    if length is None:
+        length = len(sequence)
+    if position <= 0 or position > length:
+        return None
+    span = _codon_span(length, position, frame)
+    if span is None:
+        return None
+    start, offset = span
+    start -= window_start
+
+    triplet = sequence[start:start + 3].upper()
+    if frame > 0:
+        codon = _FORWARD_CODON_INDEX.get(triplet)
+        base = _FORWARD_BASE_INDEX.get(alt_base.upper())
+    else:
+        codon = _REVERSE_CODON_INDEX.get(triplet)
+        base = _REVERSE_BASE_INDEX.get(alt_base.upper())
+    if codon is None or base is None:
+        return None
+    return (codon * 3 + offset) * 4 + base
+
+
+def annotate_substitution(
+    sequence: str,
+    position: int,
+    alt_base: str,
+    frame: int = 1,
+) -> str:
+    """Annotates a single-base substitution given only the reference.
+
+    Equivalent to annotate_snp() on a sample that differs from the
+    reference at this position alone, without needing the sample.
+
+    Args:
+        sequence: Full reference DNA sequence (uppercase).
+        position: 1-indexed SNP position (forward strand).
+        alt_base: Alternate base on the forward strand.
+        frame: Reading frame. One of {1, 2, 3, -1, -2, -3}. Default 1.
+
+    Returns:
+        str: "SYNONYMOUS" | "NON_SYNONYMOUS" | "NONSENSE" | "NON_CODING"
+
+    Raises:
+        ValueError: If frame is not one of {1, 2, 3, -1, -2, -3}.
+    """
+    key = substitution_key(sequence, position, alt_base, frame)
+    if key is None:
+        return "NON_CODING"
+    return SUBSTITUTION_TABLE[key].annotation
+
+
+def _codon_span(length: int, position: int, frame: int) -> tuple[int, int] | None:
+    """Locates the codon holding a position without touching the sequence.
+
+    Reverse-frame coordinates are mirrored arithmetically onto the forward
+    strand, so no reverse complement of the sequence is ever built.
+
+    Args:
+        length: Length of the sequence.
+        position: 1-indexed position (forward strand), within range.
+        frame: Reading frame. One of {1, 2, 3, -1, -2, -3}.
+
+    Returns:
+        tuple[int, int]: (start, index) where start is the 0-indexed forward
+            coordinate of the codon's first base on the forward strand and
+            index is the position's offset (0-2) within the codon as read
+            on its own strand.
+        None: If the position is NON_CODING in this frame.
+    """
+    if length < 3:
+        return None
+
+    if frame > 0:
+        strand_pos = position
+        offset = frame - 1
+    else:
+        strand_pos = length - position + 1
+        offset = -frame - 1
+
+    adjusted = strand_pos - 1 - offset
+    if adjusted < 0:
+        return None
+    codon_start = adjusted - adjusted % 3 + offset
+    if codon_start + 3 > length:
+        return None
+
+    index = strand_pos - 1 - codon_start
+    if frame > 0:
+        return codon_start, index
+    return length - codon_start - 3, index
+
+
 def get_codon(sequence: str, position: int, frame: int = 1) -> str:
     """Returns the codon (triplet) that contains the given 1-indexed position.
 
     For forward frames (+1, +2, +3), the reading frame starts at the given
     offset within the forward strand. For reverse frames (-1, -2, -3), the
-    codon is looked up on the reverse complement strand.
+    codon is looked up on the reverse complement strand: the position is
+    mirrored onto the forward strand and only the three bases of the codon
+    are reverse-complemented, so the lookup is O(1) in sequence length.
 
     Args:
         sequence: Full DNA sequence string (uppercase).
@@ -123,9 +338,9 @@ def get_codon(sequence: str, position: int, frame: int = 1) -> str:
              frame (incomplete codon or before frame start).
 
     Raises:
-        ValueError: If position is out of range or frame is invalid.
+        ValueError: If position is out of range, frame is invalid, or a
+            reverse-frame codon contains non-ACGT characters.
     """
-    _VALID_FRAMES = {1, 2, 3, -1, -2, -3}
     if frame not in _VALID_FRAMES:
         raise ValueError(
             f"Invalid frame '{frame}'. Must be one of {_VALID_FRAMES}."
@@ -137,32 +352,80 @@ def get_codon(sequence: str, position: int, frame: int = 1) -> str:
             f"length {len(sequence)}."
         )
 
-    if len(sequence) < 3:
+    span = _codon_span(len(sequence), position, frame)
+    if span is None:
         return ""
 
-    if frame > 0:
-        offset = frame - 1
-        adjusted = position - 1 - offset
-        if adjusted < 0:
-            return ""
-        codon_index = adjusted // 3
-        codon_start = codon_index * 3 + offset
-        codon = sequence[codon_start:codon_start + 3]
-    else:
-        rev_seq = reverse_complement(sequence)
-        rev_pos = len(sequence) - position + 1
-        offset = abs(frame) - 1
-        adjusted = rev_pos - 1 - offset
-        if adjusted < 0:
-            return ""
-        codon_index = adjusted // 3
-        codon_start = codon_index * 3 + offset
-        codon = rev_seq[codon_start:codon_start + 3]
+    start = span[0]
+    codon = sequence[start:start + 3]
+    if frame < 0:
+        codon = reverse_complement(codon)
+    return codon
 
-    if len(codon) < 3:
-        return ""
 
-    return codon
+class ReverseStrand:
+    """Reverse complement of a sequence, computed once and reused.
+
+    get_codon() no longer needs the full reverse strand, but callers that
+    do (e.g. whole-strand translation) can build this context once per
+    sequence instead of reverse-complementing it for every lookup.
+
+    Attributes:
+        forward: The original forward-strand sequence.
+        sequence: Its reverse complement.
+    """
+
+    def __init__(self, forward: str):
+        """Precomputes the reverse complement of forward.
+
+        Args:
+            forward: Uppercase DNA string (A/C/G/T only).
+
+        Raises:
+            ValueError: If forward contains non-ACGT characters.
+        """
+        self.forward = forward
+        self.sequence = reverse_complement(forward)
+
+    def __len__(self) -> int:
+        return len(self.sequence)
+
+    def position(self, forward_position: int) -> int:
+        """Maps a 1-indexed forward position onto the reverse strand."""
+        return len(self.sequence) - forward_position + 1
+
+    def codon(self, forward_position: int, frame: int = -1) -> str:
+        """Returns the reverse-frame codon holding a forward position.
+
+        Equivalent to get_codon(forward, forward_position, frame) but sliced
+        directly from the precomputed reverse strand.
+
+        Args:
+            forward_position: 1-indexed position on the forward strand.
+            frame: Reverse reading frame. One of {-1, -2, -3}. Default -1.
+
+        Returns:
+            str: 3-character codon, or "" if NON_CODING in this frame.
+
+        Raises:
+            ValueError: If frame is not a reverse frame or the position is
+                out of range.
+        """
+        if frame not in (-1, -2, -3):
+            raise ValueError(
+                f"Invalid reverse frame '{frame}'. Must be one of "
+                f"{{-1, -2, -3}}."
+            )
+        if forward_position <= 0 or forward_position > len(self.sequence):
+            raise ValueError(
+                f"Position {forward_position} is out of range for sequence "
+                f"of length {len(self.sequence)}."
+            )
+        span = _codon_span(len(self.sequence), forward_position, frame)
+        if span is None:
+            return ""
+        start = len(self.sequence) - span[0] - 3
+        return self.sequence[start:start + 3]
 
 
 def translate_codon(codon: str) -> str:
@@ -184,16 +447,80 @@ def translate_codon(codon: str) -> str:
     return CODON_TABLE[codon]
 
 
-def is_in_cds(position: int, cds_regions: list[tuple[int, int]]) -> bool:
+class CdsIndex:
+    """Sorted, merged CDS intervals built once and shared across lookups.
+
+    Overlapping and adjacent regions are merged at construction, so each
+    membership test is a single bisect (O(log R)) and a sorted batch of
+    positions can be swept against the regions in O(S + R).
+
+    Attributes:
+        starts: Sorted 1-indexed start coordinates of the merged regions.
+        ends: Matching 1-indexed inclusive end coordinates.
+    """
+
+    def __init__(self, cds_regions: list[tuple[int, int]]):
+        """Sorts and merges the given regions.
+
+        Args:
+            cds_regions: (start, end) tuples, 1-indexed inclusive, in any
+                order (e.g. the output of main.parse_cds_regions()).
+        """
+        self.starts: list[int] = []
+        self.ends: list[int] = []
+        for start, end in sorted(cds_regions):
+            if self.ends and start <= self.ends[-1] + 1:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self):
+        return iter(zip(self.starts, self.ends))
+
+    def __contains__(self, position: int) -> bool:
+        i = bisect_right(self.starts, position) - 1
+        return i >= 0 and position <= self.ends[i]
+
+    def mask(self, positions: list[int]) -> list[bool]:
+        """Sweeps sorted positions against the regions in linear time.
+
+        Args:
+            positions: 1-indexed positions in non-decreasing order.
+
+        Returns:
+            list[bool]: For each position, True if it lies in a region.
+        """
+        result = []
+        starts, ends = self.starts, self.ends
+        count = len(starts)
+        i = 0
+        for position in positions:
+            while i < count and ends[i] < position:
+                i += 1
+            result.append(i < count and starts[i] <= position)
+        return result
+
+
+def is_in_cds(
+    position: int,
+    cds_regions: list[tuple[int, int]] | CdsIndex,
+) -> bool:
     """Returns True if position falls within any CDS region.
 
     Args:
         position: 1-indexed SNP position.
-        cds_regions: List of (start, end) tuples, both 1-indexed inclusive.
+        cds_regions: List of (start, end) tuples, both 1-indexed inclusive,
+            or a prebuilt CdsIndex (bisect lookup instead of a linear scan).
 
     Returns:
         bool: True if position is within at least one region.
     """
+    if isinstance(cds_regions, CdsIndex):
+        return position in cds_regions
     return any(start <= position <= end for start, end in cds_regions)
 
 
@@ -201,7 +528,7 @@ def annotate_snp_with_regions(
     position: int,
     ref_sequence: str,
     alt_sequence: str,
-    cds_regions: list[tuple[int, int]] | None = None,
+    cds_regions: list[tuple[int, int]] | CdsIndex | None = None,
     frame: int = 1,
 ) -> str:
     """Annotates a SNP respecting CDS boundaries and reading frame.
@@ -216,7 +543,7 @@ def annotate_snp_with_regions(
         position: 1-indexed SNP position (forward strand).
         ref_sequence: Full reference DNA sequence (uppercase).
         alt_sequence: Full alternate DNA sequence (uppercase).
-        cds_regions: List of (start, end) tuples, or None.
+        cds_regions: List of (start, end) tuples, a CdsIndex, or None.
         frame: Reading frame. One of {1, 2, 3, -1, -2, -3}. Default 1.
 
     Returns:
@@ -237,18 +564,32 @@ def annotate_snp(
     ref_sequence: str,
     alt_sequence: str,
     frame: int = 1,
+    window_start: int = 0,
+    ref_length: int | None = None,
+    alt_length: int | None = None,
 ) -> str:
     """Annotates the functional effect of a SNP on the encoded amino acid.
 
     Identifies the codon containing the SNP in both reference and alternate
-    sequences under the given reading frame, translates both, and classifies
-    the change.
+    sequences under the given reading frame and classifies the change
+    through SUBSTITUTION_TABLE.
+
+    The sequences may also be windows of longer sequences (streaming
+    detection): window_start gives the 0-indexed coordinate of their first
+    base and ref_length/alt_length the full lengths, which reverse frames
+    need to place codons. The window must extend at least two bases past
+    the position on each side (or reach the sequence ends).
 
     Args:
         position: 1-indexed position of the SNP (forward strand).
-        ref_sequence: Full reference DNA sequence (uppercase).
-        alt_sequence: Full alternate (sample) DNA sequence (uppercase).
+        ref_sequence: Full reference DNA sequence (uppercase), or a window.
+        alt_sequence: Full alternate (sample) DNA sequence (uppercase), or
+            a window with the same window_start.
         frame: Reading frame. One of {1, 2, 3, -1, -2, -3}. Default 1.
+        window_start: 0-indexed coordinate of the windows' first base.
+            Default 0 (whole sequences).
+        ref_length: Full reference length. Defaults to len(ref_sequence).
+        alt_length: Full alternate length. Defaults to len(alt_sequence).
 
     Returns:
         str: One of "SYNONYMOUS", "NON_SYNONYMOUS", "NONSENSE", "NON_CODING".
@@ -262,44 +603,46 @@ def annotate_snp(
         Invalid frame values always raise ValueError — they represent a
         programming error, not a data quality issue.
     """
-    _VALID_FRAMES = {1, 2, 3, -1, -2, -3}
     if frame not in _VALID_FRAMES:
         raise ValueError(
             f"Invalid frame '{frame}'. Must be one of {_VALID_FRAMES}."
         )
 
-    try:
-        ref_codon = get_codon(ref_sequence, position, frame)
-        alt_codon = get_codon(alt_sequence, position, frame)
-    except ValueError:
-        return "NON_CODING"
-
-    if not ref_codon or not alt_codon:
-        return "NON_CODING"
-
-    try:
-        ref_aa = translate_codon(ref_codon)
-        alt_aa = translate_codon(alt_codon)
-    except (ValueError, KeyError):
+    if ref_length is None:
+        ref_length = len(ref_sequence)
+    if alt_length is None:
+        alt_length = len(alt_sequence)
+    if position <= 0 or position > ref_length or position > alt_length:
         return "NON_CODING"
 
-    if alt_aa == "STOP":
-        return "NONSENSE"
-    if ref_aa == alt_aa:
-        return "SYNONYMOUS"
-    return "NON_SYNONYMOUS"
-
-    if not ref_codon or not alt_codon:
+    ref_span = _codon_span(ref_length, position, frame)
+    if ref_span is None:
         return "NON_CODING"
+    alt_span = ref_span
+    if alt_length != ref_length:
+        # Reverse-frame codons are placed from each sequence's own end
+        alt_span = _codon_span(alt_length, position, frame)
+        if alt_span is None:
+            return "NON_CODING"
 
-    try:
-        ref_aa = translate_codon(ref_codon)
-        alt_aa = translate_codon(alt_codon)
-    except (ValueError, KeyError):
+    if frame > 0:
+        codon_index, base_index = _FORWARD_CODON_INDEX, _FORWARD_BASE_INDEX
+    else:
+        codon_index, base_index = _REVERSE_CODON_INDEX, _REVERSE_BASE_INDEX
+    ref_start = ref_span[0] - window_start
+    alt_start = alt_span[0] - window_start
+    ref_codon = codon_index.get(ref_sequence[ref_start:ref_start + 3])
+    alt_codon = codon_index.get(alt_sequence[alt_start:alt_start + 3])
+    if ref_codon is None or alt_codon is None:
         return "NON_CODING"
 
-    if alt_aa == "STOP":
-        return "NONSENSE"
-    if ref_aa == alt_aa:
-        return "SYNONYMOUS"
-    return "NON_SYNONYMOUS"
+    if alt_span == ref_span:
+        alt_base = alt_sequence[position - 1 - window_start]
+        effect = SUBSTITUTION_TABLE[
+            (ref_codon * 3 + ref_span[1]) * 4 + base_index[alt_base]
+        ]
+        if effect.alt_codon == alt_codon:
+            return effect.annotation
+    # Further substitutions in the same codon, or codons at different
+    # places: classify the codon pair
+    return _classify(_CODON_AMINO_ACIDS[ref_codon], _CODON_AMINO_ACIDS[alt_codon])
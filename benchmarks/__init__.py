@@ -0,0 +1 @@
+"""SNPTracker performance benchmarks (run with: python -m benchmarks.run)."""
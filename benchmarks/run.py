@@ -0,0 +1,369 @@
+"""
+SNPTracker - Benchmark Suite
+
+Measures the hot paths of the detector on synthetic, seeded sequence pairs
+so that speed regressions show up run to run:
+
+    detect   — detect_snps() on every size × frame (±1..3) × CDS on/off,
+               with and without --predict (_apply_predictions), plus a
+               position-only scan (fields=["position"]) per size
+    micro    — annotate_snp, get_codon and predict_functional_impact,
+               called on random positions of a 1 Mb pair
+
+Each case reports the best wall time of --repeat runs, throughput (bases/s
+and variants/s, or calls/s for micro cases) and the peak memory traced by
+tracemalloc in one extra run. Results are written as JSON (--save) and can
+be compared against a stored baseline (--compare), which exits with status
+1 when a case is slower than --threshold × its baseline time.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.run
+    python -m benchmarks.run --sizes 1k,1m,100m --repeat 5
+    python -m benchmarks.run --save benchmarks/baselines/local.json
+    python -m benchmarks.run --compare benchmarks/baselines/local.json
+
+Public API:
+    SIZES                                   — size label → bases
+    make_pair(length, divergence, seed) -> (reference, sample)
+    run_suite(sizes, divergence=DEFAULT_DIVERGENCE, repeat=3, seed=0,
+              memory=True) -> dict
+    compare(results, baseline, threshold=DEFAULT_THRESHOLD)
+        -> list[tuple[str, float, float, float]]
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable
+
+from annotation import annotate_snp, get_codon
+from main import _apply_predictions, detect_snps
+from prediction import predict_functional_impact
+
+SIZES = {"1k": 1_000, "1m": 1_000_000, "100m": 100_000_000}
+DEFAULT_SIZES = "1k,1m"
+DEFAULT_DIVERGENCE = 0.001
+DEFAULT_THRESHOLD = 1.2
+
+FRAMES = (1, 2, 3, -1, -2, -3)
+
+# Calls per micro benchmark
+_MICRO_CALLS = 20_000
+
+# Random byte → base
+_BASES = bytes(b"ACGT"[byte & 3] for byte in range(256))
+
+
+def make_pair(length: int, divergence: float, seed: int = 0) -> tuple[str, str]:
+    """Returns a random reference and a sample differing by SNPs only.
+
+    Args:
+        length: Number of bases.
+        divergence: Fraction of positions substituted in the sample.
+        seed: Random seed; equal arguments always give the same pair.
+    """
+    rng = random.Random(seed)
+    reference = rng.randbytes(length).translate(_BASES)
+    sample = bytearray(reference)
+    for position in rng.sample(range(length), int(length * divergence)):
+        sample[position] = b"ACGT"[
+            (b"ACGT".index(sample[position]) + rng.randrange(1, 4)) % 4
+        ]
+    return reference.decode("ascii"), sample.decode("ascii")
+
+
+def _cds_regions(length: int) -> list[tuple[int, int]]:
+    """Alternating 3 kb coding / 2 kb non-coding regions (1-indexed)."""
+    return [
+        (start + 1, min(start + 3_000, length))
+        for start in range(0, length, 5_000)
+    ]
+
+
+def _measure(
+    function: Callable[[], int], repeat: int, memory: bool
+) -> tuple[float, int, float | None]:
+    """Returns (best seconds, function result, peak MB or None)."""
+    best = float("inf")
+    result = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            function()
+            peak = tracemalloc.get_traced_memory()[1] / (1 << 20)
+        finally:
+            tracemalloc.stop()
+    return best, result, peak
+
+
+def _detect_case(
+    reference: str,
+    sample: str,
+    frame: int,
+    cds: list | None,
+    predict: bool,
+    fields: list[str] | None = None,
+) -> Callable[[], int]:
+    def run() -> int:
+        snps = detect_snps(reference, sample, cds, frame, fields=fields)
+        if predict:
+            _apply_predictions(snps, reference, frame)
+        return len(snps)
+    return run
+
+
+def _micro_cases(reference: str, sample: str, seed: int) -> dict:
+    rng = random.Random(seed)
+    positions = [rng.randrange(1, len(reference) + 1) for _ in range(_MICRO_CALLS)]
+    snps = [
+        {
+            "position": position,
+            "alternate": sample[position - 1],
+            "annotation": "NON_SYNONYMOUS",
+        }
+        for position in positions
+    ]
+
+    def annotate() -> int:
+        for position in positions:
+            annotate_snp(position, reference, sample)
+        return len(positions)
+
+    def codon() -> int:
+        for position in positions:
+            get_codon(reference, position)
+        return len(positions)
+
+    def predict() -> int:
+        for snp in snps:
+            predict_functional_impact(snp, reference)
+        return len(snps)
+
+    return {
+        "micro/annotate_snp": annotate,
+        "micro/get_codon": codon,
+        "micro/predict_functional_impact": predict,
+    }
+
+
+def run_suite(
+    sizes: list[str],
+    divergence: float = DEFAULT_DIVERGENCE,
+    repeat: int = 3,
+    seed: int = 0,
+    memory: bool = True,
+    progress: Callable[[str, dict], None] | None = None,
+) -> dict:
+    """Runs every case and returns the results document.
+
+    Args:
+        sizes: Labels from SIZES.
+        divergence: Fraction of substituted positions in each sample.
+        repeat: Timed runs per case; the best one is kept.
+        seed: Seed of the synthetic pairs.
+        memory: Also measure peak memory (one extra traced run per case).
+        progress: Called with (case name, result) as each case finishes.
+
+    Returns:
+        dict: {"meta": {...}, "results": {case: {...}}}, JSON-serialisable.
+    """
+    results = {}
+
+    def record(name: str, function: Callable[[], int], bases: int | None) -> None:
+        seconds, count, peak = _measure(function, repeat, memory)
+        result = {"seconds": round(seconds, 6)}
+        if bases is None:
+            result["calls"] = count
+            result["calls_per_s"] = round(count / seconds)
+        else:
+            result["bases"] = bases
+            result["variants"] = count
+            result["bases_per_s"] = round(bases / seconds)
+            result["variants_per_s"] = round(count / seconds)
+        if peak is not None:
+            result["peak_mb"] = round(peak, 3)
+        results[name] = result
+        if progress is not None:
+            progress(name, result)
+
+    for size in sizes:
+        length = SIZES[size]
+        reference, sample = make_pair(length, divergence, seed)
+        cds = _cds_regions(length)
+        for frame in FRAMES:
+            for regions in (None, cds):
+                for predict in (False, True):
+                    name = "/".join((
+                        "detect", size, f"frame{frame:+d}",
+                        "cds" if regions else "all",
+                        "predict" if predict else "plain",
+                    ))
+                    record(
+                        name,
+                        _detect_case(reference, sample, frame, regions, predict),
+                        length,
+                    )
+        record(
+            f"detect/{size}/positions",
+            _detect_case(reference, sample, 1, None, False, ["position"]),
+            length,
+        )
+        del reference, sample
+
+    reference, sample = make_pair(SIZES["1m"], divergence, seed)
+    for name, function in _micro_cases(reference, sample, seed).items():
+        record(name, function, None)
+
+    return {
+        "meta": {
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "divergence": divergence,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def compare(
+    results: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD
+) -> list[tuple[str, float, float, float]]:
+    """Returns the cases slower than threshold × their baseline time.
+
+    Only cases present in both documents are compared.
+
+    Returns:
+        list[tuple[str, float, float, float]]: (case, baseline seconds,
+            current seconds, ratio), in case order.
+    """
+    regressions = []
+    for name, result in results["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None or not previous["seconds"]:
+            continue
+        ratio = result["seconds"] / previous["seconds"]
+        if ratio > threshold:
+            regressions.append((name, previous["seconds"], result["seconds"], ratio))
+    return regressions
+
+
+def _print_result(name: str, result: dict) -> None:
+    if "calls_per_s" in result:
+        rate = f"{result['calls_per_s']:>14,} chamadas/s"
+    else:
+        rate = (
+            f"{result['bases_per_s']:>14,} bases/s "
+            f"{result['variants_per_s']:>11,} variantes/s"
+        )
+    peak = f" {result['peak_mb']:>9.1f} MB" if "peak_mb" in result else ""
+    print(f"{name:<42} {result['seconds']:>10.4f} s {rate}{peak}")
+
+
+def parse_args(args: list[str] | None = None) -> argparse.Namespace:
+    """Parses the benchmark command line."""
+    parser = argparse.ArgumentParser(description="SNPTracker - Benchmarks")
+    parser.add_argument(
+        "--sizes",
+        default=DEFAULT_SIZES,
+        help=(
+            f"Tamanhos dos pares sintéticos, entre {', '.join(SIZES)}, "
+            f"separados por vírgula. Padrão: {DEFAULT_SIZES}."
+        ),
+    )
+    parser.add_argument(
+        "--divergence",
+        type=float,
+        default=DEFAULT_DIVERGENCE,
+        help=(
+            "Fração das posições substituídas em cada amostra. "
+            f"Padrão: {DEFAULT_DIVERGENCE}."
+        ),
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Execuções cronometradas por caso (vale a melhor). Padrão: 3.",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Semente dos pares sintéticos."
+    )
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        default=False,
+        help="Não mede o pico de memória (tracemalloc).",
+    )
+    parser.add_argument(
+        "--save", default=None, help="Grava os resultados neste arquivo JSON."
+    )
+    parser.add_argument(
+        "--compare",
+        default=None,
+        help=(
+            "Compara com um baseline JSON; sai com status 1 se algum caso "
+            "ficar mais lento que --threshold vezes o baseline."
+        ),
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Razão tempo atual / baseline tolerada. Padrão: {DEFAULT_THRESHOLD}.",
+    )
+    namespace = parser.parse_args(args)
+    namespace.sizes = [size.strip() for size in namespace.sizes.split(",")]
+    unknown = [size for size in namespace.sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"Tamanho desconhecido: {', '.join(unknown)}.")
+    if namespace.repeat < 1:
+        parser.error("--repeat deve ser um inteiro maior ou igual a 1.")
+    if not 0 <= namespace.divergence <= 1:
+        parser.error("--divergence deve estar entre 0 e 1.")
+    return namespace
+
+
+def main(args: list[str] | None = None) -> int:
+    """Runs the suite; returns the process exit status."""
+    options = parse_args(args)
+    results = run_suite(
+        options.sizes,
+        options.divergence,
+        options.repeat,
+        options.seed,
+        memory=not options.no_memory,
+        progress=_print_result,
+    )
+    if options.save:
+        with open(options.save, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"\nResultados salvos em: {options.save}")
+    if options.compare:
+        with open(options.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, options.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regressão(ões) acima de {options.threshold}x:")
+            for name, before, after, ratio in regressions:
+                print(f"  {name}: {before:.4f} s -> {after:.4f} s ({ratio:.2f}x)")
+            return 1
+        print(f"\nSem regressões acima de {options.threshold}x.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
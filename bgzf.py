@@ -0,0 +1,337 @@
+"""
+SNPTracker - BGZF Compression and Tabix Indexing
+
+Standard-library implementation of the two formats that make a VCF file
+compressed *and* region-queryable, compatible with htslib (bgzip/tabix):
+
+    - BGZF: a series of gzip members of at most 64 KiB each, so any
+      position in the uncompressed stream is addressed by a "virtual
+      offset" (compressed block address << 16 | offset within the block).
+      A BGZF file is also a valid multi-member gzip file (gzip.open reads
+      it).
+    - Tabix (.tbi): a BGZF-compressed index mapping genomic bins (the UCSC
+      binning scheme) and 16 kb linear windows to virtual offsets.
+
+Only the VCF preset is written (1-based POS in column 2, end derived from
+the REF length), since that is the only format SNPTracker compresses.
+
+Public API:
+    BgzfWriter(fileobj, level=6)
+        .write(data) / .tell() -> virtual offset / .close()
+    TabixIndexBuilder()
+        .add(contig, start, end, virtual_start, virtual_end) / .write(path)
+    tabix_query(path, contig, start=None, end=None) -> Iterator[str]
+        — VCF lines overlapping a 1-indexed inclusive region, read through
+          '<path>.tbi' without decompressing the rest of the file
+"""
+
+import gzip
+import struct
+import zlib
+from typing import BinaryIO, Iterator
+
+# Uncompressed bytes per block (same as htslib), so that even incompressible
+# data fits the 64 KiB block limit after deflate
+BLOCK_DATA_SIZE = 0xFF00
+
+# Empty block that terminates every BGZF file
+EOF_BLOCK = bytes.fromhex(
+    "1f8b08040000000000ff0600424302001b0003000000000000000000"
+)
+
+_BLOCK_HEADER = struct.Struct("<4BI2BH2BHH")
+_BLOCK_TRAILER = struct.Struct("<II")
+
+# Tabix binning: 16 kb minimum bins, 5 levels, 2^29 maximum coordinate
+_MIN_SHIFT = 14
+_LEVELS = ((26, 1), (23, 9), (20, 73), (17, 585), (14, 4681))
+_META_BIN = 37450
+_TBX_VCF = 2
+
+
+def _compress_block(data: bytes, level: int) -> bytes:
+    """Returns one BGZF block holding data (at most BLOCK_DATA_SIZE bytes)."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    deflated = compressor.compress(data) + compressor.flush()
+    size = _BLOCK_HEADER.size + len(deflated) + _BLOCK_TRAILER.size
+    header = _BLOCK_HEADER.pack(
+        31, 139, 8, 4, 0, 0, 255, 6, ord("B"), ord("C"), 2, size - 1
+    )
+    trailer = _BLOCK_TRAILER.pack(zlib.crc32(data), len(data))
+    return header + deflated + trailer
+
+
+class BgzfWriter:
+    """Writes a BGZF stream and reports virtual offsets of what it wrote.
+
+    Attributes:
+        level: zlib compression level.
+    """
+
+    def __init__(self, fileobj: BinaryIO, level: int = 6):
+        """
+        Args:
+            fileobj: Binary file opened for writing, positioned at 0.
+            level: zlib compression level (0-9). Default 6.
+        """
+        self.level = level
+        self._file = fileobj
+        self._buffer = bytearray()
+        self._address = 0
+
+    def write(self, data: bytes) -> None:
+        """Appends data, compressing every full block."""
+        self._buffer += data
+        while len(self._buffer) >= BLOCK_DATA_SIZE:
+            self._flush_block(BLOCK_DATA_SIZE)
+
+    def tell(self) -> int:
+        """Returns the virtual offset of the next byte to be written."""
+        return self._address << 16 | len(self._buffer)
+
+    def _flush_block(self, size: int) -> None:
+        block = _compress_block(bytes(self._buffer[:size]), self.level)
+        self._file.write(block)
+        self._address += len(block)
+        del self._buffer[:size]
+
+    def close(self) -> None:
+        """Compresses the last partial block and writes the EOF block.
+
+        The underlying file is closed as well.
+        """
+        if self._file.closed:
+            return
+        if self._buffer:
+            self._flush_block(len(self._buffer))
+        self._file.write(EOF_BLOCK)
+        self._file.close()
+
+
+def _region_to_bin(start: int, end: int) -> int:
+    """Returns the smallest bin containing [start, end) (0-based)."""
+    end -= 1
+    for shift, offset in reversed(_LEVELS):
+        if start >> shift == end >> shift:
+            return offset + (start >> shift)
+    return 0
+
+
+def _region_to_bins(start: int, end: int) -> list[int]:
+    """Returns every bin that may hold records overlapping [start, end)."""
+    end -= 1
+    bins = [0]
+    for shift, offset in _LEVELS:
+        bins.extend(range(offset + (start >> shift), offset + (end >> shift) + 1))
+    return bins
+
+
+class _ContigIndex:
+    """Bins, linear index and statistics of one contig."""
+
+    def __init__(self):
+        self.bins: dict[int, list[list[int]]] = {}
+        self.linear: list[int] = []
+        self.first = None
+        self.last = 0
+        self.count = 0
+
+
+class TabixIndexBuilder:
+    """Accumulates the tabix index of a VCF file as its records are written.
+
+    Records must be added in file order (sorted by contig, then position).
+    """
+
+    def __init__(self):
+        self._contigs: dict[str, _ContigIndex] = {}
+
+    def add(
+        self,
+        contig: str,
+        start: int,
+        end: int,
+        virtual_start: int,
+        virtual_end: int,
+    ) -> None:
+        """Indexes one record.
+
+        Args:
+            contig: CHROM of the record.
+            start: 0-based first reference base covered (POS - 1).
+            end: 0-based exclusive end (POS - 1 + len(REF)).
+            virtual_start: BgzfWriter.tell() before the line was written.
+            virtual_end: BgzfWriter.tell() after the line was written.
+        """
+        index = self._contigs.get(contig)
+        if index is None:
+            index = self._contigs[contig] = _ContigIndex()
+
+        chunks = index.bins.setdefault(_region_to_bin(start, end), [])
+        if chunks and chunks[-1][1] == virtual_start:
+            chunks[-1][1] = virtual_end
+        else:
+            chunks.append([virtual_start, virtual_end])
+
+        linear = index.linear
+        last_window = (end - 1) >> _MIN_SHIFT
+        if len(linear) <= last_window:
+            linear.extend([0] * (last_window + 1 - len(linear)))
+        for window in range(start >> _MIN_SHIFT, last_window + 1):
+            if not linear[window]:
+                linear[window] = virtual_start
+
+        if index.first is None:
+            index.first = virtual_start
+        index.last = virtual_end
+        index.count += 1
+
+    def write(self, path: str) -> None:
+        """Writes the BGZF-compressed .tbi file.
+
+        Args:
+            path: Destination, conventionally '<file>.vcf.gz.tbi'.
+        """
+        names = b"".join(name.encode() + b"\0" for name in self._contigs)
+        parts = [
+            b"TBI\1",
+            struct.pack(
+                "<8i", len(self._contigs), _TBX_VCF, 1, 2, 0, ord("#"), 0,
+                len(names),
+            ),
+            names,
+        ]
+        for index in self._contigs.values():
+            parts.append(struct.pack("<i", len(index.bins) + 1))
+            for bin_, chunks in sorted(index.bins.items()):
+                parts.append(struct.pack("<Ii", bin_, len(chunks)))
+                for chunk in chunks:
+                    parts.append(struct.pack("<QQ", *chunk))
+            # Pseudo-bin with the contig's offset range and record counts
+            parts.append(struct.pack(
+                "<IiQQQQ", _META_BIN, 2, index.first, index.last,
+                index.count, 0,
+            ))
+            linear = index.linear
+            for window in range(1, len(linear)):
+                if not linear[window]:
+                    linear[window] = linear[window - 1]
+            parts.append(struct.pack(f"<i{len(linear)}Q", len(linear), *linear))
+        parts.append(struct.pack("<Q", 0))
+
+        with open(path, "wb") as f:
+            writer = BgzfWriter(f)
+            writer.write(b"".join(parts))
+            writer.close()
+
+
+def _read_block(f: BinaryIO, address: int) -> tuple[bytes, int]:
+    """Returns (uncompressed data, address of the next block) at address."""
+    f.seek(address)
+    header = f.read(_BLOCK_HEADER.size)
+    if len(header) < _BLOCK_HEADER.size:
+        return b"", address
+    fields = _BLOCK_HEADER.unpack(header)
+    if fields[:2] != (31, 139) or fields[8:10] != (ord("B"), ord("C")):
+        raise ValueError(f"Not a BGZF block at offset {address}.")
+    size = fields[11] + 1
+    deflated = f.read(size - _BLOCK_HEADER.size - _BLOCK_TRAILER.size)
+    return zlib.decompress(deflated, -15), address + size
+
+
+def _read_index(path: str) -> dict[str, tuple[dict, list[int]]]:
+    """Reads a .tbi file into {contig: (bins, linear index)}."""
+    with gzip.open(path, "rb") as f:
+        data = f.read()
+    if data[:4] != b"TBI\1":
+        raise ValueError(f"'{path}' is not a tabix index.")
+    n_ref, *_, names_length = struct.unpack_from("<8i", data, 4)
+    cursor = 36
+    names = data[cursor:cursor + names_length].split(b"\0")[:n_ref]
+    cursor += names_length
+
+    contigs = {}
+    for name in names:
+        (n_bin,) = struct.unpack_from("<i", data, cursor)
+        cursor += 4
+        bins = {}
+        for _ in range(n_bin):
+            bin_, n_chunk = struct.unpack_from("<Ii", data, cursor)
+            cursor += 8
+            chunks = struct.unpack_from(f"<{2 * n_chunk}Q", data, cursor)
+            cursor += 16 * n_chunk
+            if bin_ != _META_BIN:
+                bins[bin_] = list(zip(chunks[::2], chunks[1::2]))
+        (n_intv,) = struct.unpack_from("<i", data, cursor)
+        cursor += 4
+        linear = list(struct.unpack_from(f"<{n_intv}Q", data, cursor))
+        cursor += 8 * n_intv
+        contigs[name.decode()] = (bins, linear)
+    return contigs
+
+
+def tabix_query(
+    path: str,
+    contig: str,
+    start: int | None = None,
+    end: int | None = None,
+) -> Iterator[str]:
+    """Yields the VCF lines of a BGZF file that overlap a region.
+
+    Uses '<path>.tbi' to read only the blocks that can hold such records.
+
+    Args:
+        path: BGZF-compressed VCF file.
+        contig: CHROM to query.
+        start: 1-indexed first position (inclusive). Default: 1.
+        end: 1-indexed last position (inclusive). Default: contig end.
+
+    Yields:
+        str: Matching lines, without the trailing newline, in file order.
+
+    Raises:
+        FileNotFoundError: If the file or its index does not exist.
+        ValueError: If the index is not a tabix index.
+    """
+    contigs = _read_index(path + ".tbi")
+    if contig not in contigs:
+        return
+    bins, linear = contigs[contig]
+    begin = 0 if start is None else max(start - 1, 0)
+    stop = 1 << 29 if end is None else end
+    if begin >= stop:
+        return
+
+    window = begin >> _MIN_SHIFT
+    min_offset = linear[window] if window < len(linear) else 0
+    chunks = sorted(
+        chunk
+        for bin_ in _region_to_bins(begin, stop)
+        for chunk in bins.get(bin_, ())
+        if chunk[1] > min_offset
+    )
+
+    with open(path, "rb") as f:
+        for chunk_start, chunk_end in chunks:
+            # Records never straddle chunks (each is in exactly one bin),
+            # so every line between the two virtual offsets is complete
+            address, end_address = chunk_start >> 16, chunk_end >> 16
+            data = bytearray()
+            while True:
+                block, next_address = _read_block(f, address)
+                if address == end_address:
+                    data += block[:chunk_end & 0xFFFF]
+                    break
+                data += block
+                if next_address == address:
+                    break
+                address = next_address
+            for line in bytes(data[chunk_start & 0xFFFF:]).split(b"\n"):
+                if not line or line.startswith(b"#"):
+                    continue
+                fields = line.split(b"\t", 4)
+                if fields[0].decode() != contig:
+                    continue
+                pos = int(fields[1])
+                if pos - 1 < stop and pos - 1 + len(fields[3]) > begin:
+                    yield line.decode()
@@ -0,0 +1,258 @@
+"""
+SNPTracker - Result and Annotation Caches
+
+On-disk cache of detection results for multi-sample mode. Each entry holds
+the VariantTable of one sample and is keyed by a SHA-256 over everything
+that determines it: the reference and sample sequences, the CDS regions,
+the reading frame, the --predict flag and CACHE_VERSION. Re-running the
+same cohort therefore only recomputes new or modified samples.
+
+Entries are pickled VariantTables, written atomically (temporary file +
+os.replace). Every hit refreshes the entry's mtime; when the directory
+grows beyond its size cap the least recently used entries are deleted.
+
+Assumptions:
+    - The cache directory is trusted: entries are unpickled on load.
+    - Several processes may share a directory; a concurrently evicted or
+      half-written entry is simply treated as a miss.
+
+AnnotationCache is the in-memory counterpart for a single run: samples of
+a cohort share most of their variants, so each distinct variant is
+annotated (and scored) once and then looked up.
+
+Public API:
+    CACHE_VERSION                    — bump when detection output changes
+    sequence_digest(sequence) -> str — SHA-256 hex digest of a sequence
+    cache_key(reference_digest, sample, cds_regions=None, frame=1,
+              predict=False, band=None, seed_length=None,
+              fields=None) -> str
+    ResultCache(directory, max_bytes=None)
+        .get(key) -> VariantTable | None
+        .put(key, table)
+        .evict()
+    AnnotationCache()
+        .scope(*parts) -> int / .get(key, default=None) / .put(key, value)
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from typing import Iterable
+
+from variants import VariantTable
+
+# Part of every key. Bump it whenever detection, annotation, prediction or
+# the VariantTable layout changes so stale entries stop matching.
+CACHE_VERSION = "1"
+
+_SUFFIX = ".snpcache"
+
+
+def sequence_digest(sequence: str) -> str:
+    """Returns the SHA-256 hex digest of a sequence.
+
+    Args:
+        sequence: DNA sequence.
+
+    Returns:
+        str: 64-character hex digest.
+    """
+    return hashlib.sha256(sequence.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def cache_key(
+    reference_digest: str,
+    sample: str,
+    cds_regions: list[tuple[int, int]] | None = None,
+    frame: int = 1,
+    predict: bool = False,
+    band: int | None = None,
+    seed_length: int | None = None,
+    fields: Iterable[str] | None = None,
+) -> str:
+    """Builds the cache key of one sample analysis.
+
+    The reference is passed as a digest so it is hashed once per run rather
+    than once per sample.
+
+    Args:
+        reference_digest: sequence_digest() of the reference.
+        sample: Sample DNA sequence.
+        cds_regions: CDS regions used for annotation, or None.
+        frame: Reading frame used for annotation.
+        predict: Whether Grantham predictions are applied.
+        band: Alignment band of aligned detection (--align), or None for
+            positional detection.
+        seed_length: Anchor k-mer length of aligned detection, or None.
+        fields: Fields computed for each SNP (--fields), or None for all.
+
+    Returns:
+        str: 64-character hex key.
+    """
+    regions = "" if cds_regions is None else ",".join(
+        f"{start}-{end}" for start, end in cds_regions
+    )
+    parts = (
+        CACHE_VERSION,
+        reference_digest,
+        sequence_digest(sample),
+        regions,
+        str(frame),
+        "1" if predict else "0",
+    )
+    if band is not None:
+        parts += (f"align={band}",)
+    if seed_length is not None:
+        parts += (f"seed={seed_length}",)
+    if fields is not None:
+        parts += ("fields=" + ",".join(sorted(fields)),)
+    return hashlib.sha256("\0".join(parts).encode("ascii")).hexdigest()
+
+
+class ResultCache:
+    """Directory of cached VariantTables with a size cap and LRU eviction.
+
+    Attributes:
+        directory: Cache directory (created on first use).
+        max_bytes: Size cap of all entries together, or None for no cap.
+        hits: Number of get() calls served from the cache.
+        misses: Number of get() calls that found no usable entry.
+    """
+
+    def __init__(self, directory: str, max_bytes: int | None = None):
+        """Prepares the cache; the directory is created if missing.
+
+        Args:
+            directory: Path of the cache directory.
+            max_bytes: Size cap in bytes, or None for an unbounded cache.
+
+        Raises:
+            ValueError: If max_bytes is negative.
+        """
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError(f"max_bytes must be >= 0, got {max_bytes}.")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def get(self, key: str) -> VariantTable | None:
+        """Returns the cached table for key, or None on a miss.
+
+        A hit refreshes the entry's mtime so it is evicted last.
+
+        Args:
+            key: Key built by cache_key().
+
+        Returns:
+            VariantTable | None: The cached table, or None.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                table = pickle.load(f)
+            os.utime(path)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return None
+        if not isinstance(table, VariantTable):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return table
+
+    def put(self, key: str, table: VariantTable) -> None:
+        """Stores a table under key, then enforces the size cap.
+
+        Args:
+            key: Key built by cache_key().
+            table: Detection result to cache.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(table, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        if self.max_bytes is not None:
+            self.evict()
+
+    def evict(self) -> None:
+        """Deletes least recently used entries until under max_bytes."""
+        if self.max_bytes is None:
+            return
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, entry.path, stat.st_size))
+                total += stat.st_size
+
+        entries.sort()
+        for _mtime, path, size in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+
+class AnnotationCache:
+    """In-memory memo of per-variant annotations, shared within one run.
+
+    Callers build keys from the variant itself plus a scope id returned by
+    scope() for the run-wide settings (kind of value, reading frame, CDS
+    set), so differently configured analyses never share entries. Values
+    also depend on the reference, so a cache must serve one reference only.
+
+    Attributes:
+        hits: Number of get() calls answered from the cache.
+        misses: Number of get() calls that found no entry.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict = {}
+        self._scopes: dict = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def scope(self, *parts) -> int:
+        """Returns a small int standing for a hashable settings tuple.
+
+        Using it in keys instead of the settings themselves keeps per-variant
+        keys cheap to hash (a CDS set may hold many regions).
+        """
+        return self._scopes.setdefault(parts, len(self._scopes))
+
+    def get(self, key, default=None):
+        """Returns the value stored under key, or default on a miss."""
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def put(self, key, value) -> None:
+        """Stores value (which may be None) under key."""
+        self._entries[key] = value
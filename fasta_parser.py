@@ -10,17 +10,110 @@ FASTA format expected:
     ...
 
 Public API:
+    iter_sequences(file_path)     — lazily yields (header, sequence) tuples,
+                                    one record in memory at a time
+    count_sequences(file_path)    — number of records, without parsing them
     read_fasta(file_path)         — returns the first sequence as a plain str
+                                    (stops after the first record)
+    iter_packed_sequences(file_path)
+                                  — iter_sequences() yielding 2-bit
+                                    PackedSequences, packed line by line
+    read_fasta_packed(file_path)  — returns the first sequence as a 2-bit
+                                    PackedSequence
     read_all_sequences(file_path) — returns list[tuple[header, sequence]]
 
-Both functions raise FileNotFoundError if the file does not exist.
+Indexed random access (samtools-compatible .fai):
+    build_fasta_index(file_path)  — scans the file once, returns FaiEntry list
+    write_fasta_index(entries, index_path) / read_fasta_index(index_path)
+    load_fasta_index(file_path)   — reuses '<file>.fai' when it is up to
+                                    date, otherwise builds and saves it
+    fetch_sequence(file_path, name=None, start=None, end=None)
+        — returns one record or a 1-indexed inclusive window of it, read
+          through mmap in O(window) instead of O(file)
+    record_length(file_path, name=None) -> int
+        — length of a record, from the index
+    iter_windows(file_path, windows, name=None)
+        — yields several windows of one record through a single mmap
+    IndexedRecord(file_path, name=None)
+        — str-like view of a record (len() and slicing) that reads
+          only the bases it is asked for, through one mapping kept
+          until .close()
+
+Indexing requires every sequence line of a record, except the last, to
+have the same length (the same constraint as samtools faidx); a
+ValueError is raised otherwise.
+
+All functions raise FileNotFoundError if the file does not exist.
 """
 
+import mmap
+import os
+from typing import Iterable, Iterator, NamedTuple
+
+from packed_sequence import PackedSequence
+
+
+def iter_sequences(file_path: str) -> Iterator[tuple[str, str]]:
+    """
+    Lazily yields the DNA sequences of a FASTA file, one record at a time.
+
+    Only the record being assembled is held in memory, so peak memory is
+    bounded by the largest single record rather than by the file size.
+
+    Args:
+        file_path: Path to the FASTA file.
+
+    Yields:
+        tuple[str, str]: (header, sequence) for each entry, in file order.
+
+    Raises:
+        FileNotFoundError: If the file does not exist (raised on the first
+            iteration, as for any generator).
+    """
+    current_header = None
+    current_sequence = []
+
+    with open(file_path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith(">"):
+                if current_header is not None:
+                    yield current_header, "".join(current_sequence)
+                current_header = line[1:]
+                current_sequence = []
+            else:
+                current_sequence.append(line)
+
+    if current_header is not None:
+        yield current_header, "".join(current_sequence)
+
+
+def count_sequences(file_path: str) -> int:
+    """
+    Counts the records of a FASTA file without assembling any sequence.
+
+    Args:
+        file_path: Path to the FASTA file.
+
+    Returns:
+        int: Number of header lines ('>') in the file.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    with open(file_path, 'r') as f:
+        return sum(1 for line in f if line.lstrip().startswith(">"))
+
 
 def read_fasta(file_path: str) -> str:
     """
     Reads the first DNA sequence from a FASTA file.
 
+    Stops reading as soon as the first record is complete; the rest of the
+    file is never parsed.
+
     Args:
         file_path: Path to the FASTA file.
 
@@ -30,16 +123,91 @@ def read_fasta(file_path: str) -> str:
     Raises:
         FileNotFoundError: If the file does not exist.
     """
-    sequences = read_all_sequences(file_path)
-    if not sequences:
+    records = iter_sequences(file_path)
+    try:
+        first = next(records, None)
+    finally:
+        records.close()
+    if first is None:
         return ""
-    return sequences[0][1]
+    return first[1]
+
+
+def iter_packed_sequences(file_path: str) -> Iterator[tuple[str, PackedSequence]]:
+    """
+    Lazily yields the records of a FASTA file as 2-bit PackedSequences.
+
+    Lines are packed as they are read, so no sequence is ever held as a
+    str: peak memory is ~1/4 byte per base of the record being packed.
+
+    Args:
+        file_path: Path to the FASTA file.
+
+    Yields:
+        tuple[str, PackedSequence]: (header, sequence) for each entry, in
+            file order; sequences are uppercased.
+
+    Raises:
+        FileNotFoundError: If the file does not exist (raised on the first
+            iteration, as for any generator).
+    """
+    with open(file_path, 'r') as f:
+        header = None
+        for line in f:
+            line = line.strip()
+            if line.startswith(">"):
+                header = line[1:]
+                break
+
+        while header is not None:
+            next_header = None
+
+            def lines() -> Iterator[str]:
+                nonlocal next_header
+                for line in f:
+                    line = line.strip()
+                    if line.startswith(">"):
+                        next_header = line[1:]
+                        return
+                    if line:
+                        yield line
+
+            yield header, PackedSequence.from_chunks(lines())
+            header = next_header
+
+
+def read_fasta_packed(file_path: str) -> PackedSequence:
+    """
+    Reads the first DNA sequence from a FASTA file into a PackedSequence.
+
+    Like read_fasta(), stops after the first record; see
+    iter_packed_sequences().
+
+    Args:
+        file_path: Path to the FASTA file.
+
+    Returns:
+        PackedSequence: The DNA sequence, uppercased.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    records = iter_packed_sequences(file_path)
+    try:
+        first = next(records, None)
+    finally:
+        records.close()
+    if first is None:
+        return PackedSequence.from_str("")
+    return first[1]
 
 
 def read_all_sequences(file_path: str) -> list[tuple[str, str]]:
     """
     Reads all DNA sequences from a FASTA file.
 
+    Materialises every record; prefer iter_sequences() for large files.
+
     Args:
         file_path: Path to the FASTA file.
 
@@ -50,24 +218,386 @@ def read_all_sequences(file_path: str) -> list[tuple[str, str]]:
     Raises:
         FileNotFoundError: If the file does not exist.
     """
-    results = []
-    current_header = None
-    current_sequence = []
+    return list(iter_sequences(file_path))
 
-    with open(file_path, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
+
+class FaiEntry(NamedTuple):
+    """One line of a samtools-style .fai index.
+
+    Attributes:
+        name: Record name (first word of the header line).
+        length: Number of bases in the record.
+        offset: Byte offset of the record's first base in the file.
+        line_bases: Bases per sequence line.
+        line_width: Bytes per sequence line, including the line terminator.
+    """
+
+    name: str
+    length: int
+    offset: int
+    line_bases: int
+    line_width: int
+
+
+def build_fasta_index(file_path: str) -> list[FaiEntry]:
+    """
+    Builds a .fai index for a FASTA file in a single streaming pass.
+
+    Args:
+        file_path: Path to the FASTA file.
+
+    Returns:
+        list[FaiEntry]: One entry per record, in file order.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If a record has inconsistent line lengths or blank
+            lines inside its sequence.
+    """
+    entries = []
+    name = None
+    length = offset = line_bases = line_width = 0
+    short_line_seen = False
+    position = 0
+
+    with open(file_path, 'rb') as f:
+        for raw in f:
+            position += len(raw)
+            stripped = raw.rstrip(b"\r\n")
+            if stripped.startswith(b">"):
+                if name is not None:
+                    entries.append(
+                        FaiEntry(name, length, offset, line_bases, line_width)
+                    )
+                fields = stripped[1:].decode().split()
+                name = fields[0] if fields else ""
+                length = line_bases = line_width = 0
+                offset = position
+                short_line_seen = False
                 continue
-            if line.startswith(">"):
-                if current_header is not None:
-                    results.append((current_header, "".join(current_sequence)))
-                current_header = line[1:]
-                current_sequence = []
-            else:
-                current_sequence.append(line)
+            if name is None:
+                continue
+            bases = len(stripped)
+            if short_line_seen and bases:
+                raise ValueError(
+                    f"Cannot index '{file_path}': record '{name}' has "
+                    f"inconsistent line lengths."
+                )
+            if line_bases == 0:
+                if not bases:
+                    offset = position
+                    continue
+                line_bases, line_width = bases, len(raw)
+            elif bases != line_bases or len(raw) != line_width:
+                if bases > line_bases:
+                    raise ValueError(
+                        f"Cannot index '{file_path}': record '{name}' has "
+                        f"inconsistent line lengths."
+                    )
+                short_line_seen = True
+            length += bases
+
+    if name is not None:
+        entries.append(FaiEntry(name, length, offset, line_bases, line_width))
+    return entries
+
+
+def write_fasta_index(entries: list[FaiEntry], index_path: str) -> None:
+    """
+    Writes index entries in samtools .fai format (tab-separated).
+
+    Args:
+        entries: Entries as returned by build_fasta_index().
+        index_path: Destination path (conventionally '<fasta>.fai').
+    """
+    with open(index_path, 'w') as f:
+        for entry in entries:
+            f.write("\t".join(str(field) for field in entry) + "\n")
+
+
+def read_fasta_index(index_path: str) -> list[FaiEntry]:
+    """
+    Reads a samtools .fai index.
+
+    Args:
+        index_path: Path to the .fai file.
+
+    Returns:
+        list[FaiEntry]: Entries in file order.
+
+    Raises:
+        FileNotFoundError: If the index does not exist.
+        ValueError: If a line does not have the five .fai columns.
+    """
+    entries = []
+    with open(index_path, 'r') as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 5:
+                raise ValueError(f"Malformed .fai line: '{line.rstrip()}'.")
+            name = fields[0]
+            length, offset, line_bases, line_width = map(int, fields[1:5])
+            entries.append(
+                FaiEntry(name, length, offset, line_bases, line_width)
+            )
+    return entries
+
+
+def load_fasta_index(file_path: str) -> list[FaiEntry]:
+    """
+    Returns the .fai index of a FASTA file, building it only when needed.
+
+    An existing '<file_path>.fai' is reused when it is at least as recent
+    as the FASTA file. Otherwise the index is rebuilt and saved next to the
+    file (silently skipped if the directory is not writable).
+
+    Args:
+        file_path: Path to the FASTA file.
+
+    Returns:
+        list[FaiEntry]: Index entries, in file order.
+
+    Raises:
+        FileNotFoundError: If the FASTA file does not exist.
+        ValueError: If the file cannot be indexed (see build_fasta_index).
+    """
+    index_path = file_path + ".fai"
+    fasta_mtime = os.path.getmtime(file_path)
+    if (
+        os.path.isfile(index_path)
+        and os.path.getmtime(index_path) >= fasta_mtime
+    ):
+        return read_fasta_index(index_path)
+
+    entries = build_fasta_index(file_path)
+    try:
+        write_fasta_index(entries, index_path)
+    except OSError:
+        pass
+    return entries
+
+
+def fetch_sequence(
+    file_path: str,
+    name: str | None = None,
+    start: int | None = None,
+    end: int | None = None,
+) -> str:
+    """
+    Reads a record, or a window of it, through the .fai index and mmap.
+
+    Only the bytes spanning the requested window are touched, so fetching
+    a few kilobases from a multi-gigabyte file is O(window).
+
+    Args:
+        file_path: Path to the FASTA file.
+        name: Record name (first word of the header). Defaults to the
+            first record.
+        start: 1-indexed first base (inclusive). Defaults to 1.
+        end: 1-indexed last base (inclusive). Defaults to the record end;
+            values past the end are clamped.
+
+    Returns:
+        str: The requested bases ("" for an empty file or window).
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        KeyError: If no record has the given name.
+        ValueError: If start is less than 1 or greater than end, or the
+            file cannot be indexed.
+    """
+    entries = load_fasta_index(file_path)
+    if not entries:
+        return ""
+    entry = _find_entry(entries, name, file_path)
+
+    with open(file_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return _read_window(mapped, entry, start, end)
+
+
+def record_length(file_path: str, name: str | None = None) -> int:
+    """
+    Returns the length of a record, read from its .fai index.
+
+    Args:
+        file_path: Path to the FASTA file.
+        name: Record name. Defaults to the first record.
+
+    Returns:
+        int: Number of bases (0 for an empty file).
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        KeyError: If no record has the given name.
+    """
+    entries = load_fasta_index(file_path)
+    if not entries:
+        return 0
+    return _find_entry(entries, name, file_path).length
+
+
+def iter_windows(
+    file_path: str,
+    windows: Iterable[tuple[int, int]],
+    name: str | None = None,
+) -> Iterator[str]:
+    """
+    Yields windows of one record, keeping the file mapped between them.
+
+    Equivalent to calling fetch_sequence() once per window, but the index
+    is loaded and the file mapped only once, which is what streaming
+    detection needs to walk a large record chunk by chunk.
+
+    Args:
+        file_path: Path to the FASTA file.
+        windows: (start, end) pairs, 1-indexed inclusive (see
+            fetch_sequence() for clamping rules).
+        name: Record name. Defaults to the first record.
+
+    Yields:
+        str: The bases of each window, in order.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        KeyError: If no record has the given name.
+        ValueError: Under the same conditions as fetch_sequence().
+    """
+    entries = load_fasta_index(file_path)
+    if not entries:
+        for _ in windows:
+            yield ""
+        return
+    entry = _find_entry(entries, name, file_path)
+
+    with open(file_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for start, end in windows:
+                yield _read_window(mapped, entry, start, end)
+
+
+class IndexedRecord:
+    """
+    Read-only, str-like view of one FASTA record backed by its index.
+
+    Supports len() and indexing/slicing (step 1 only); each access reads
+    just the requested bases, so a caller that expects a sequence string
+    can look up a few bases of a huge record without loading it. The index
+    entry is looked up once and the file is mapped on first access and
+    kept mapped, as in iter_windows(), until close() (also a context
+    manager).
+
+    Attributes:
+        file_path: Path to the FASTA file.
+        name: Record name ("" for an empty file).
+    """
+
+    def __init__(self, file_path: str, name: str | None = None):
+        """
+        Args:
+            file_path: Path to the FASTA file.
+            name: Record name. Defaults to the first record.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            KeyError: If no record has the given name.
+        """
+        entries = load_fasta_index(file_path)
+        self.file_path = file_path
+        self.name = ""
+        self._entry: FaiEntry | None = None
+        self._file = None
+        self._mapped: mmap.mmap | None = None
+        if entries:
+            self._entry = _find_entry(entries, name, file_path)
+            self.name = self._entry.name
+
+    def __len__(self) -> int:
+        return 0 if self._entry is None else self._entry.length
+
+    def __getitem__(self, key: int | slice) -> str:
+        length = len(self)
+        if isinstance(key, slice):
+            start, stop, step = key.indices(length)
+            if step != 1:
+                raise ValueError("IndexedRecord slices must have step 1.")
+            if start >= stop:
+                return ""
+            return self._read(start + 1, stop)
+        if key < 0:
+            key += length
+        if not 0 <= key < length:
+            raise IndexError("IndexedRecord index out of range.")
+        return self._read(key + 1, key + 1)
+
+    def _read(self, start: int, end: int) -> str:
+        """Reads a 1-indexed inclusive window, mapping the file if needed."""
+        if self._mapped is None:
+            self._file = open(self.file_path, 'rb')
+            self._mapped = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        return _read_window(self._mapped, self._entry, start, end)
+
+    def close(self) -> None:
+        """Unmaps and closes the file (a later access maps it again)."""
+        if self._mapped is not None:
+            self._mapped.close()
+            self._file.close()
+            self._mapped = None
+            self._file = None
+
+    def __enter__(self) -> "IndexedRecord":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return (
+            f"IndexedRecord({self.file_path!r}, {self.name!r}, "
+            f"length={len(self)})"
+        )
+
+
+def _find_entry(
+    entries: list[FaiEntry],
+    name: str | None,
+    file_path: str,
+) -> FaiEntry:
+    """Returns the entry called name (the first one if name is None)."""
+    if name is None:
+        return entries[0]
+    for entry in entries:
+        if entry.name == name:
+            return entry
+    raise KeyError(f"Record '{name}' not found in '{file_path}'.")
+
+
+def _read_window(
+    mapped: mmap.mmap,
+    entry: FaiEntry,
+    start: int | None,
+    end: int | None,
+) -> str:
+    """Reads a 1-indexed inclusive window of a record from a mapped file."""
+    start = 1 if start is None else start
+    end = entry.length if end is None else min(end, entry.length)
+    if start < 1 or start > end + 1:
+        raise ValueError(
+            f"Invalid window {start}-{end} for record '{entry.name}' "
+            f"of length {entry.length}."
+        )
+    if start > end:
+        return ""
+
+    byte_start = _base_offset(entry, start - 1)
+    byte_end = _base_offset(entry, end - 1) + 1
+    chunk = mapped[byte_start:byte_end]
+    return chunk.replace(b"\n", b"").replace(b"\r", b"").decode()
 
-    if current_header is not None:
-        results.append((current_header, "".join(current_sequence)))
 
-    return results
+def _base_offset(entry: FaiEntry, base: int) -> int:
+    """Returns the byte offset of a 0-indexed base within its record."""
+    line, column = divmod(base, entry.line_bases)
+    return entry.offset + line * entry.line_width + column
@@ -7,25 +7,39 @@ Este script gera 50+ conjuntos de dados com SNPs conhecidos.
 
 Os dados de teste são COMMITADOS no GitHub.
 Para dados reais, use a pasta data/ (gitignored)
+
+Modo bulk (--bulk DIR): gera pares referência/amostra (ou coortes de N
+amostras) de qualquer tamanho, em blocos, sem manter as sequências em
+memória, junto com o VCF verdade (truth set) das variantes introduzidas:
+
+    python generate_test_data.py --bulk data/load --length 3g --samples 10 --seed 42
+
+Saída: reference.fasta, sample_001.fasta, ... e truth.vcf (uma coluna GT
+por amostra). Com a mesma semente, comprimento e tamanho de bloco o
+resultado é sempre o mesmo. Os indels são gravados na forma normalizada à
+esquerda, a mesma reportada por main.py --align.
 """
 
-import random
+import argparse
 import os
+import random
+import shutil
 from datetime import datetime
 
 TEST_DATA_DIR = "test_data"
 NUM_DATASETS = 55
 
+BULK_BLOCK_SIZE = 1 << 20
+BULK_LINE_WIDTH = 60
+BULK_CONTIG = "chr1"
+
+_BASES = "ACGT"
+
 
 def generate_sequence(length, gc_content=0.5):
     """Gera uma sequência de DNA aleatória."""
-    seq = []
-    for _ in range(length):
-        if random.random() < gc_content:
-            seq.append(random.choice(["G", "C"]))
-        else:
-            seq.append(random.choice(["A", "T"]))
-    return "".join(seq)
+    weights = (gc_content / 2, gc_content / 2, (1 - gc_content) / 2, (1 - gc_content) / 2)
+    return "".join(random.choices("GCAT", weights=weights, k=length))
 
 
 def introduce_snps(reference, num_snps=5):
@@ -330,12 +344,347 @@ def save_datasets(datasets):
     print(f"[OK] Total: {len(datasets)} arquivos gerados")
 
 
-def main():
+def _base_table(gc_content):
+    """Tabela bytes.translate() que converte bytes aleatórios em bases.
+
+    Valores abaixo do limiar GC viram G/C, os demais A/T (a paridade do
+    byte escolhe entre os dois).
+    """
+    threshold = round(gc_content * 256)
+    return bytes(
+        ord("GC"[byte & 1] if byte < threshold else "AT"[byte & 1])
+        for byte in range(256)
+    )
+
+
+class _FastaWriter:
+    """Grava um registro FASTA recebido em blocos, quebrando as linhas."""
+
+    def __init__(self, path, header, line_width=BULK_LINE_WIDTH):
+        self._file = open(path, "w")
+        self._file.write(f">{header}\n")
+        self._line_width = line_width
+        self._pending = ""
+
+    def write(self, sequence):
+        text = self._pending + sequence
+        width = self._line_width
+        full = len(text) - len(text) % width
+        if full:
+            self._file.write(
+                "\n".join(text[i:i + width] for i in range(0, full, width)) + "\n"
+            )
+        self._pending = text[full:]
+
+    def close(self):
+        if self._pending:
+            self._file.write(self._pending + "\n")
+        self._file.close()
+
+
+def mutate_block(rng, reference, snp_rate, indel_rate, max_indel=10):
+    """
+    Introduz SNPs e indels em um bloco da referência.
+
+    O número de variantes é o esperado pelas taxas (arredondado
+    aleatoriamente). As variantes não se sobrepõem e cada indel tem a base
+    anterior (âncora do VCF) intacta dentro do bloco. Indels são escolhidos
+    já normalizados à esquerda: uma deleção cuja primeira base removida
+    poderia ser deslocada para trás vira SNP, e a última base inserida
+    sempre difere da âncora.
+
+    Args:
+        rng: random.Random da amostra.
+        reference: Bloco da referência (maiúsculas).
+        snp_rate: Fração esperada de posições com SNP.
+        indel_rate: Fração esperada de posições com indel.
+        max_indel: Maior indel, em bases.
+
+    Returns:
+        tuple: (bloco_da_amostra, variantes)
+        variantes: [(posição_0_indexada, ref, alt), ...] no formato VCF
+        (indels incluem a base âncora), em ordem de posição.
+    """
+    length = len(reference)
+    expected = length * (snp_rate + indel_rate)
+    count = min(int(expected) + (rng.random() < expected % 1), length)
+    indel_share = indel_rate / (snp_rate + indel_rate) if count else 0
+
+    parts = []
+    variants = []
+    copied = 0
+    last_end = -1  # última posição da referência já usada por uma variante
+    for position in sorted(rng.sample(range(length), count)):
+        if position <= last_end:
+            continue
+        ref_base = reference[position]
+        kind = "SNP"
+        if (
+            rng.random() < indel_share
+            and position - 1 > last_end
+            and position + max_indel < length
+        ):
+            kind = rng.choice(("INS", "DEL"))
+            size = rng.randint(1, max_indel)
+            anchor = reference[position - 1]
+            if kind == "DEL" and reference[position + size - 1] == anchor:
+                kind = "SNP"
+
+        parts.append(reference[copied:position])
+        if kind == "SNP":
+            alt = rng.choice([b for b in _BASES if b != ref_base])
+            parts.append(alt)
+            variants.append((position, ref_base, alt))
+            copied = position + 1
+            last_end = position
+        elif kind == "DEL":
+            variants.append(
+                (position - 1, reference[position - 1:position + size], anchor)
+            )
+            copied = position + size
+            last_end = copied  # a base seguinte também fica intacta
+        else:
+            inserted = "".join(rng.choices(_BASES, k=size - 1))
+            inserted += rng.choice([b for b in _BASES if b != anchor])
+            parts.append(inserted)
+            variants.append((position - 1, anchor, anchor + inserted))
+            copied = position
+            last_end = position
+    parts.append(reference[copied:])
+    return "".join(parts), variants
+
+
+def generate_bulk(
+    output_dir,
+    length,
+    samples=1,
+    snp_rate=0.001,
+    indel_rate=0.0001,
+    max_indel=10,
+    seed=0,
+    gc_content=0.5,
+    block_size=BULK_BLOCK_SIZE,
+    combined=False,
+):
+    """
+    Gera referência, amostras e VCF verdade em blocos (modo --bulk).
+
+    Cada bloco da referência é sorteado de uma vez (random.randbytes) e
+    mutado independentemente para cada amostra; apenas um bloco por
+    sequência fica em memória, então o tamanho é limitado pelo disco.
+
+    Args:
+        output_dir: Diretório de saída (criado se necessário).
+        length: Comprimento da referência, em bases.
+        samples: Número de amostras.
+        snp_rate: Fração esperada de posições com SNP, por amostra.
+        indel_rate: Fração esperada de posições com indel, por amostra.
+        max_indel: Maior indel, em bases.
+        seed: Semente; cada sequência usa um gerador próprio derivado dela.
+        gc_content: Fração de G/C da referência.
+        block_size: Bases por bloco.
+        combined: Também grava combined.fasta (referência seguida das
+            amostras), a entrada do modo multi-amostra (--input).
+
+    Returns:
+        dict: Caminhos gravados ('reference', 'samples', 'truth' e, com
+            combined, 'combined') e 'variants' (registros do VCF verdade).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    names = [f"sample_{k:03d}" for k in range(1, samples + 1)]
+    reference_path = os.path.join(output_dir, "reference.fasta")
+    sample_paths = [os.path.join(output_dir, f"{name}.fasta") for name in names]
+    truth_path = os.path.join(output_dir, "truth.vcf")
+
+    reference_rng = random.Random(f"{seed}:reference")
+    sample_rngs = [random.Random(f"{seed}:{name}") for name in names]
+    table = _base_table(gc_content)
+
+    reference_out = _FastaWriter(reference_path, BULK_CONTIG)
+    sample_outs = [
+        _FastaWriter(path, name) for path, name in zip(sample_paths, names)
+    ]
+    records = 0
+    with open(truth_path, "w") as truth:
+        truth.write(
+            "##fileformat=VCFv4.2\n"
+            "##source=generate_test_data.py\n"
+            f"##contig=<ID={BULK_CONTIG},length={length}>\n"
+            '##INFO=<ID=TYPE,Number=1,Type=String,Description="SNP, INS or DEL">\n'
+            '##FORMAT=<ID=GT,Number=1,Type=String,Description="Genotype">\n'
+            "#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\tFORMAT\t"
+            + "\t".join(names) + "\n"
+        )
+        for block_start in range(0, length, block_size):
+            size = min(block_size, length - block_start)
+            block = reference_rng.randbytes(size).translate(table).decode("ascii")
+            reference_out.write(block)
+
+            carriers = {}
+            for k, (rng, out) in enumerate(zip(sample_rngs, sample_outs)):
+                sample, variants = mutate_block(
+                    rng, block, snp_rate, indel_rate, max_indel
+                )
+                out.write(sample)
+                for variant in variants:
+                    carriers.setdefault(variant, set()).add(k)
+
+            lines = []
+            for (position, ref, alt), owners in sorted(carriers.items()):
+                kind = "SNP" if len(ref) == len(alt) else (
+                    "INS" if len(alt) > len(ref) else "DEL"
+                )
+                genotypes = "\t".join(
+                    "1" if k in owners else "0" for k in range(samples)
+                )
+                lines.append(
+                    f"{BULK_CONTIG}\t{block_start + position + 1}\t.\t{ref}\t"
+                    f"{alt}\t.\tPASS\tTYPE={kind}\tGT\t{genotypes}\n"
+                )
+            truth.writelines(lines)
+            records += len(lines)
+
+    reference_out.close()
+    for out in sample_outs:
+        out.close()
+
+    written = {
+        "reference": reference_path,
+        "samples": sample_paths,
+        "truth": truth_path,
+        "variants": records,
+    }
+    if combined:
+        combined_path = os.path.join(output_dir, "combined.fasta")
+        with open(combined_path, "wb") as target:
+            for path in [reference_path] + sample_paths:
+                with open(path, "rb") as source:
+                    shutil.copyfileobj(source, target, 1 << 20)
+        written["combined"] = combined_path
+    return written
+
+
+def _parse_length(text):
+    """Converte '1000', '500k', '3m' ou '3g' em número de bases."""
+    multipliers = {"k": 10 ** 3, "m": 10 ** 6, "g": 10 ** 9}
+    text = text.strip().lower()
+    try:
+        if text and text[-1] in multipliers:
+            value = int(float(text[:-1]) * multipliers[text[-1]])
+        else:
+            value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Comprimento inválido: '{text}'.")
+    if value < 1:
+        raise argparse.ArgumentTypeError("O comprimento deve ser positivo.")
+    return value
+
+
+def parse_args(args=None):
+    """Lê os argumentos de linha de comando (sem argumentos: test_data/)."""
+    parser = argparse.ArgumentParser(
+        description="SNPTracker - Gerador de Dados de Teste"
+    )
+    parser.add_argument(
+        "--bulk",
+        metavar="DIR",
+        default=None,
+        help=(
+            "Gera um par (ou coorte) em escala de produção neste diretório, "
+            "com VCF verdade, em vez dos datasets de test_data/."
+        ),
+    )
+    parser.add_argument(
+        "--length",
+        type=_parse_length,
+        default=1_000_000,
+        help="Comprimento da referência (aceita sufixos k/m/g). Padrão: 1m.",
+    )
+    parser.add_argument(
+        "--samples", type=int, default=1, help="Número de amostras. Padrão: 1."
+    )
+    parser.add_argument(
+        "--snp-rate",
+        type=float,
+        default=0.001,
+        help="Fração de posições com SNP por amostra. Padrão: 0.001.",
+    )
+    parser.add_argument(
+        "--indel-rate",
+        type=float,
+        default=0.0001,
+        help="Fração de posições com indel por amostra. Padrão: 0.0001.",
+    )
+    parser.add_argument(
+        "--max-indel",
+        type=int,
+        default=10,
+        help="Maior indel, em bases. Padrão: 10.",
+    )
+    parser.add_argument(
+        "--gc-content",
+        type=float,
+        default=0.5,
+        help="Fração de G/C da referência. Padrão: 0.5.",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Semente do gerador. Padrão: 0."
+    )
+    parser.add_argument(
+        "--block-size",
+        type=int,
+        default=BULK_BLOCK_SIZE,
+        help=f"Bases geradas por bloco. Padrão: {BULK_BLOCK_SIZE}.",
+    )
+    parser.add_argument(
+        "--combined",
+        action="store_true",
+        default=False,
+        help=(
+            "Também grava combined.fasta (referência + amostras), para o "
+            "modo multi-amostra (main.py --input)."
+        ),
+    )
+    namespace = parser.parse_args(args)
+    if namespace.samples < 1:
+        parser.error("--samples deve ser um inteiro maior ou igual a 1.")
+    if namespace.max_indel < 1 or namespace.block_size <= namespace.max_indel + 1:
+        parser.error("--max-indel deve ser positivo e menor que --block-size.")
+    if not (0 <= namespace.snp_rate and 0 <= namespace.indel_rate
+            and namespace.snp_rate + namespace.indel_rate <= 1):
+        parser.error("--snp-rate e --indel-rate devem somar entre 0 e 1.")
+    if not 0 <= namespace.gc_content <= 1:
+        parser.error("--gc-content deve estar entre 0 e 1.")
+    return namespace
+
+
+def main(args=None):
+    options = parse_args(args)
     print("=" * 70)
     print("SNPTracker - Gerador de Dados de Teste")
     print("=" * 70)
     print()
 
+    if options.bulk:
+        written = generate_bulk(
+            options.bulk,
+            options.length,
+            samples=options.samples,
+            snp_rate=options.snp_rate,
+            indel_rate=options.indel_rate,
+            max_indel=options.max_indel,
+            seed=options.seed,
+            gc_content=options.gc_content,
+            block_size=options.block_size,
+            combined=options.combined,
+        )
+        print(f"[OK] Referência: {written['reference']} ({options.length} bp)")
+        print(f"[OK] Amostras: {len(written['samples'])} arquivo(s)")
+        print(f"[OK] VCF verdade: {written['truth']} ({written['variants']} variantes)")
+        if "combined" in written:
+            print(f"[OK] Multi-amostra: {written['combined']}")
+        return
+
     datasets = generate_test_datasets()
     save_datasets(datasets)
 
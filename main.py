@@ -8,8 +8,21 @@ Polymorphisms) e indels (inserções e deleções).
 Módulos relacionados:
     fasta_parser.py  — leitura de arquivos FASTA
     annotation.py    — anotação funcional baseada no código genético padrão
-
-Formato do dict de SNP retornado por detect_snps():
+    scanner.py       — localização em bloco das posições divergentes
+    packed_sequence.py — sequências em 2 bits por base (--packed)
+    twobit.py        — referência pré-empacotada .2bit (--pack-reference)
+    profiling.py     — tempos por etapa e perfil (--timings, --profile)
+    summary.py       — resumo de divergência por amostra (--summary)
+    alignment.py     — alinhamento em banda para indels (--align)
+    variants.py      — armazenamento colunar das variantes (VariantTable)
+    report.py        — escrita do relatório em streaming (ReportWriter)
+    variant_file.py  — formato binário .snpb com índice de blocos
+    vcf.py           — saída VCF 4.2 (VcfWriter)
+    bgzf.py          — compressão BGZF e índice tabix (.tbi)
+
+Formato de cada linha da VariantTable retornada por detect_snps()
+(cada linha é uma view somente-leitura com as mesmas chaves do antigo dict;
+use VariantTable.to_dicts() para obter dicts mutáveis):
     {
         "position":  int   — posição 1-indexed na sequência
         "reference": str   — base da referência (A/C/G/T ou '-' para inserções)
@@ -18,6 +31,8 @@ Formato do dict de SNP retornado por detect_snps():
         "annotation":str   — "SYNONYMOUS" | "NON_SYNONYMOUS" | "NONSENSE" | "NON_CODING"
         "context":   str   — contexto COSMIC ex: "T[A>G]C"  (ausente em INDELs)
     }
+Com detect_snps(fields=...) (--fields), type, annotation e context só estão
+presentes nos SNPs quando selecionados.
 
 Reading frames:
     Annotation is performed under a configurable reading frame. Supported
@@ -27,8 +42,8 @@ Reading frames:
     Positions before the frame start (e.g., position 1 in frame +2) are
     always annotated as NON_CODING.
 
-    For reverse frames, the sequence is reverse-complemented and the SNP
-    position is mirrored before codon lookup.
+    For reverse frames, the SNP position is mirrored onto the forward strand
+    and only the three bases of the codon are reverse-complemented.
 
 File path handling (load_sequence):
     --reference and --sample accept either a raw DNA string ("ACTG") or a
@@ -46,20 +61,121 @@ Uso via CLI:
     python main.py --reference ref.fasta --sample sample.fasta --cds "1-90"
     python main.py --reference ref.fasta --sample sample.fasta --cds "1-90,100-150"
 
+    # Sequências maiores que a RAM: comparação em chunks de 4 Mb
+    python main.py --reference ref.fasta --sample sample.fasta --stream --chunk-size 4000000
+
+    # Referência convertida uma única vez em .2bit (ref.2bit), depois mapeada
+    python main.py --pack-reference ref.fasta
+    python main.py --reference ref.2bit --sample sample.fasta
+
+    # Genomas grandes em 2 bits por base (~1/4 da memória), comparação por XOR
+    python main.py --reference ref.fasta --sample sample.fasta --packed
+
+    # Indels no meio da sequência: alinhamento em banda em vez de posição a posição
+    python main.py --reference ref.fasta --sample sample.fasta --align --band 32
+
+    # Genomas inteiros: alinhamento ancorado em k-mers, trechos em paralelo
+    python main.py --reference ref.fasta --sample sample.fasta --align --seed-length 16 --jobs 8
+
+    # Tempo, CPU e memória por etapa (out.txt.timings.json) e perfil cProfile
+    python main.py --reference ref.fasta --sample sample.fasta --output out.txt --timings
+    python main.py --input data/sequences.txt --profile run.prof
+
+    # Triagem de divergência: só posições e tipos, sem anotação nem contexto
+    python main.py --reference ref.fasta --sample sample.fasta --fields position,type
+
+    # QC: uma linha por amostra com Ti/Tv, classes de anotação e espectro
+    # COSMIC de 96 canais, sem guardar variantes (snps_summary.tsv)
+    python main.py --input data/sequences.txt --summary --jobs 8
+    python main.py --reference ref.fasta --sample sample.fasta --summary --stream
+
+    # Apenas o resumo no terminal (relatório em arquivo mantido)
+    python main.py --reference ref.fasta --sample sample.fasta --quiet
+
+    # Saída binária .snpb (compacta, com consulta por intervalo de posições)
+    python main.py --reference ref.fasta --sample sample.fasta --format binary --output out.snpb
+
+    # Saída VCF, comprimida em BGZF com índice tabix (out.vcf.gz + .tbi)
+    python main.py --reference ref.fasta --sample sample.fasta --format vcf --bgzip
+
+    # Apenas uma janela (FASTA lido via índice .fai + mmap)
+    python main.py --reference ref.fasta --sample sample.fasta --region "1001-6000"
+
     # Com reading frame explícito (padrão: 1)
     python main.py --reference ref.fasta --sample sample.fasta --frame 2
     python main.py --reference ref.fasta --sample sample.fasta --frame -1
 
     # Multi-amostra (primeira sequência do FASTA = referência)
     python main.py --input data/sequences.txt
+
+    # Multi-amostra com cache de resultados (só amostras novas são recalculadas)
+    python main.py --input data/sequences.txt --cache-dir .snpcache --cache-max-mb 500
+
+    # Multi-amostra em paralelo (8 processos, saída em ordem determinística)
+    python main.py --input data/sequences.txt --jobs 8
+
+    # Coorte: uma única matriz VCF (uma coluna GT por amostra)
+    python main.py --input data/sequences.txt --cohort --format vcf --bgzip
 """
 
 
 import argparse
+import cProfile
+import heapq
+import sys
 import os
-from fasta_parser import read_fasta
-from annotation import annotate_snp, annotate_snp_with_regions
-from prediction import predict_functional_impact
+from array import array
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from itertools import groupby, repeat
+from operator import itemgetter
+from typing import Iterable, Iterator, NamedTuple, Sequence
+from fasta_parser import (
+    count_sequences,
+    IndexedRecord,
+    fetch_sequence,
+    iter_sequences,
+    iter_windows,
+    load_fasta_index,
+    record_length,
+    read_fasta,
+    read_fasta_packed,
+)
+from scanner import find_mismatches
+from packed_sequence import PackedSequence
+from twobit import TwoBitFile, fasta_to_twobit, is_twobit
+from alignment import (
+    DEFAULT_BAND, DEFAULT_SEED_LENGTH, iter_edits, iter_seeded_edits,
+)
+from annotation import CdsIndex, annotate_snp, annotate_substitution
+from prediction import (
+    grantham_prediction,
+    grantham_scores,
+    predict_functional_impacts,
+)
+from variants import VariantTable, snp_type_codes
+from cache import AnnotationCache, ResultCache, cache_key, sequence_digest
+from summary import DivergenceSummary, write_summaries
+from report import ReportWriter, format_row, summarize_sequence
+from variant_file import VariantFileWriter
+from vcf import DEFAULT_CONTIG, VcfWriter
+import profiling
+
+# Bases decodificadas por janela na comparação de sequências empacotadas
+_PACKED_WINDOW = 1 << 16
+
+# Campos selecionáveis das variantes (--fields); position, reference e
+# alternate são sempre preenchidos
+FIELDS = (
+    "position", "reference", "alternate", "type", "annotation", "context",
+    "grantham",
+)
+OPTIONAL_FIELDS = frozenset(FIELDS[3:])
+
+# Extensão dos arquivos de saída de cada --format (+ ".gz" com --bgzip)
+OUTPUT_EXTENSIONS = {"text": ".txt", "binary": ".snpb", "vcf": ".vcf"}
 
 
 def parse_cds_regions(cds_str: str) -> list[tuple[int, int]]:
@@ -118,17 +234,49 @@ def get_trinucleotide_context(
     return f"{prev}[{ref_base}>{alt_base}]{next_}"
 
 
+def select_fields(fields: Iterable[str] | None) -> frozenset[str]:
+    """
+    Normaliza uma seleção de campos das variantes (--fields).
+
+    Args:
+        fields: Nomes de FIELDS, ou None para todos. "grantham" implica
+            "annotation", da qual a predição depende.
+
+    Returns:
+        frozenset[str]: Campos opcionais (OPTIONAL_FIELDS) a calcular.
+
+    Raises:
+        ValueError: Se algum nome não estiver em FIELDS.
+    """
+    if fields is None:
+        return OPTIONAL_FIELDS
+    selected = set(fields)
+    unknown = selected.difference(FIELDS)
+    if unknown:
+        raise ValueError(
+            f"Unknown field(s): {', '.join(sorted(unknown))}. "
+            f"Valid fields: {', '.join(FIELDS)}."
+        )
+    if "grantham" in selected:
+        selected.add("annotation")
+    return frozenset(selected & OPTIONAL_FIELDS)
+
+
 def detect_snps(
     reference: str,
     sample: str,
-    cds_regions: list[tuple[int, int]] | None = None,
+    cds_regions: list[tuple[int, int]] | CdsIndex | None = None,
     frame: int = 1,
-) -> list[dict]:
+    annotation_cache: AnnotationCache | None = None,
+    fields: Iterable[str] | None = None,
+) -> VariantTable:
     """
     Compara duas sequências e identifica SNPs e indels.
 
     Realiza comparação posição a posição até o comprimento mínimo das
-    sequências (SNPs e substituições). Diferenças de comprimento são
+    sequências (SNPs e substituições). Trechos idênticos são descartados
+    em bloco por scanner.find_mismatches(); apenas as posições divergentes
+    geram dicts. Diferenças de comprimento são
     reportadas como INSERTION ou DELETION ao final da lista.
 
     INDELs recebem annotation='NON_CODING' e não possuem a chave 'context'.
@@ -138,15 +286,36 @@ def detect_snps(
         reference: Sequência de referência (string ou uppercase).
         sample: Sequência da amostra (string ou uppercase).
         cds_regions: Lista opcional de regiões codificantes como tuplas
-            (start, end) 1-indexed inclusive. Se None, toda a sequência
+            (start, end) 1-indexed inclusive, ou um CdsIndex já construído
+            (reutilizável entre amostras). Se None, toda a sequência
             é tratada como codificante (comportamento padrão). Se lista
             vazia, todos os SNPs recebem annotation='NON_CODING'.
         frame: Reading frame. One of {1, 2, 3, -1, -2, -3}. Default 1.
+        annotation_cache: AnnotationCache compartilhado entre amostras da
+            mesma referência; cada variante distinta é anotada uma só vez.
+            Se None, toda variante é anotada. Só é usado quando type,
+            annotation e context são todos selecionados.
+        fields: Campos a preencher nos SNPs (ver select_fields). Campos
+            não selecionados ficam ausentes e não são calculados; sem
+            annotation nem context, as posições divergentes viram colunas
+            em bloco, na velocidade da varredura. INDELs são sempre
+            completos. Padrão: todos.
 
     Returns:
-        list[dict]: Lista de SNPs. Ver formato no topo deste módulo.
+        VariantTable: Tabela colunar de variantes; cada linha é uma view
+            compatível com o dict descrito no topo deste módulo.
+
+    Raises:
+        ValueError: Se fields contiver um nome desconhecido.
     """
-    snps = []
+    snps = VariantTable()
+    fields = select_fields(fields)
+    if cds_regions is not None and not isinstance(cds_regions, CdsIndex):
+        cds_regions = CdsIndex(cds_regions)
+    if isinstance(reference, PackedSequence) or isinstance(sample, PackedSequence):
+        return _detect_packed(
+            snps, reference, sample, cds_regions, frame, annotation_cache, fields
+        )
 
     # Normaliza para maiúsculas
     ref = str(reference).upper()
@@ -155,54 +324,607 @@ def detect_snps(
     # Determina o comprimento mínimo
     min_length = min(len(ref), len(smp))
 
-    # Compara base a base
-    for i in range(min_length):
-        ref_base = ref[i]
-        smp_base = smp[i]
-
-        if ref_base != smp_base:
-            snp_info = {
-                "position": i + 1,  # Posição 1-indexed
-                "reference": ref_base,
-                "alternate": smp_base,
-                "type": classify_mutation(ref_base, smp_base),
-                "annotation": annotate_snp_with_regions(
-                    i + 1, ref, smp, cds_regions, frame
-                ),
-                "context": get_trinucleotide_context(
-                    ref, i + 1, ref_base, smp_base
-                ),
-            }
-            snps.append(snp_info)
+    _detect_window(
+        snps, ref, smp, 0, 0, min_length, len(ref), len(smp), cds_regions, frame,
+        annotation_cache, fields=fields,
+    )
 
     # Detecta diferenças de tamanho — reportadas como INDELs sem 'context'
-    if len(ref) != len(smp):
-        if len(ref) > len(smp):
-            for i in range(min_length, len(ref)):
-                snps.append(
-                    {
-                        "position": i + 1,
-                        "reference": ref[i],
-                        "alternate": "-",
-                        "type": "DELETION",
-                        "annotation": "NON_CODING",
-                    }
-                )
+    if len(ref) > len(smp):
+        for i in range(min_length, len(ref)):
+            snps.append(i + 1, ref[i], "-", "DELETION", "NON_CODING")
+    elif len(smp) > len(ref):
+        for i in range(min_length, len(smp)):
+            snps.append(i + 1, "-", smp[i], "INSERTION", "NON_CODING")
+
+    return snps
+
+
+def _detect_packed(
+    snps: VariantTable,
+    reference: str | PackedSequence,
+    sample: str | PackedSequence,
+    cds_index: CdsIndex | None,
+    frame: int,
+    cache: AnnotationCache | None,
+    fields: frozenset[str] = OPTIONAL_FIELDS,
+) -> VariantTable:
+    """detect_snps() for 2-bit packed sequences.
+
+    Mismatches are found by XOR on the packed bytes; only the windows that
+    hold some are decoded (with two bases of margin for codons and
+    contexts), so the sequences are never unpacked in full.
+    """
+    if not isinstance(reference, PackedSequence):
+        reference = PackedSequence.from_str(reference)
+    if not isinstance(sample, PackedSequence):
+        sample = PackedSequence.from_str(sample)
+    ref_length, smp_length = len(reference), len(sample)
+    min_length = min(ref_length, smp_length)
+
+    with profiling.stage("scan"):
+        positions = reference.mismatches(sample, 0, min_length)
+    first = 0
+    while first < len(positions):
+        chunk_start = positions[first] - positions[first] % _PACKED_WINDOW
+        chunk_end = min(chunk_start + _PACKED_WINDOW, min_length)
+        last = bisect_left(positions, chunk_end, first)
+        window_start = max(chunk_start - 2, 0)
+        _detect_window(
+            snps,
+            reference[window_start:chunk_end + 2],
+            sample[window_start:chunk_end + 2],
+            window_start,
+            chunk_start - window_start,
+            chunk_end - window_start,
+            ref_length,
+            smp_length,
+            cds_index,
+            frame,
+            cache,
+            [p - window_start for p in positions[first:last]],
+            fields,
+        )
+        first = last
+
+    # Diferenças de tamanho, como em detect_snps()
+    if ref_length > smp_length:
+        for i, base in enumerate(reference[min_length:], min_length):
+            snps.append(i + 1, base, "-", "DELETION", "NON_CODING")
+    elif smp_length > ref_length:
+        for i, base in enumerate(sample[min_length:], min_length):
+            snps.append(i + 1, "-", base, "INSERTION", "NON_CODING")
+    return snps
+
+
+def _detect_window(
+    snps: VariantTable,
+    ref: str,
+    smp: str,
+    window_start: int,
+    scan_start: int,
+    scan_end: int,
+    ref_length: int,
+    smp_length: int,
+    cds_index: CdsIndex | None,
+    frame: int,
+    cache: AnnotationCache | None = None,
+    mismatches: list[int] | None = None,
+    fields: frozenset[str] = OPTIONAL_FIELDS,
+) -> None:
+    """Appends the SNPs of [scan_start, scan_end) to snps.
+
+    ref and smp are uppercase windows starting at the 0-indexed coordinate
+    window_start (0 for whole sequences); scan_start and scan_end are
+    coordinates within the windows. Outside the sequence ends the windows
+    must extend two bases past the scanned range, for codons and contexts.
+
+    With a cache, (type, annotation, context) is looked up before being
+    computed. Annotation reads the sample's own codon, so the key holds the
+    five sample bases around the position (and, for reverse frames, whose
+    codons are placed from the sequence end, the sample length) rather than
+    just the alternate base.
+
+    mismatches, when given, are the already known divergent positions of
+    [scan_start, scan_end), as window coordinates.
+
+    Only the fields selected (see select_fields) are computed; the cache,
+    whose entries hold all three, is used only when they all are.
+    """
+    # Localiza as divergências em bloco; só as posições divergentes
+    # são visitadas individualmente
+    if mismatches is None:
+        with profiling.stage("scan"):
+            mismatches = find_mismatches(ref, smp, scan_start, scan_end)
+
+    want_type = "type" in fields
+    want_annotation = "annotation" in fields
+    want_context = "context" in fields
+    if not (want_annotation or want_context):
+        _append_mismatches(snps, ref, smp, window_start, mismatches, want_type)
+        return
+    if not (want_type and want_annotation and want_context):
+        cache = None
+
+    with profiling.stage("annotate"):
+        # Posições já vêm ordenadas: uma varredura linear contra o índice de
+        # CDS decide quais recebem anotação funcional
+        if cds_index is None or not want_annotation:
+            coding = repeat(True)
         else:
-            for i in range(min_length, len(smp)):
-                snps.append(
-                    {
-                        "position": i + 1,
-                        "reference": "-",
-                        "alternate": smp[i],
-                        "type": "INSERTION",
-                        "annotation": "NON_CODING",
-                    }
+            coding = cds_index.mask([window_start + i + 1 for i in mismatches])
+
+        if cache is not None:
+            regions = None
+            if cds_index is not None:
+                regions = (tuple(cds_index.starts), tuple(cds_index.ends))
+            scope = cache.scope("snp", frame, regions)
+            length_key = smp_length if frame < 0 else None
+
+        for i, in_cds in zip(mismatches, coding):
+            ref_base = ref[i]
+            smp_base = smp[i]
+            position = window_start + i + 1  # Posição 1-indexed
+            if cache is not None:
+                key = (scope, position, smp[max(i - 2, 0):i + 3], length_key)
+                cached = cache.get(key)
+                if cached is not None:
+                    snps.append(position, ref_base, smp_base, *cached)
+                    continue
+            annotation = context = None
+            if want_annotation and in_cds:
+                annotation = annotate_snp(
+                    position, ref, smp, frame, window_start,
+                    ref_length, smp_length,
                 )
+            elif want_annotation:
+                annotation = "NON_CODING"
+            if want_context:
+                context = get_trinucleotide_context(ref, i + 1, ref_base, smp_base)
+            values = (
+                classify_mutation(ref_base, smp_base) if want_type else None,
+                annotation,
+                context,
+            )
+            if cache is not None:
+                cache.put(key, values)
+            snps.append(position, ref_base, smp_base, *values)
+
+
+def _append_mismatches(
+    snps: VariantTable,
+    ref: str,
+    smp: str,
+    window_start: int,
+    mismatches: list[int],
+    with_type: bool,
+) -> None:
+    """Appends SNPs with only position, bases and, optionally, type.
+
+    The columns are built in bulk from the mismatch positions (no per-SNP
+    Python code), so position-only detection runs at mismatch-scan speed.
+    """
+    if not mismatches:
+        return
+    ref_bases = bytearray("".join(map(ref.__getitem__, mismatches)), "latin-1")
+    alt_bases = bytearray("".join(map(smp.__getitem__, mismatches)), "latin-1")
+    count = len(mismatches)
+    if with_type:
+        types = snp_type_codes(ref_bases, alt_bases)
+    else:
+        types = bytearray(count)
+    snps.extend(VariantTable.from_columns(
+        array("q", map((window_start + 1).__add__, mismatches)),
+        ref_bases,
+        alt_bases,
+        types,
+        bytearray(count),
+        array("H", bytes(2 * count)),
+        [None],
+    ))
+
+
+def detect_snps_aligned(
+    reference: str,
+    sample: str,
+    cds_regions: list[tuple[int, int]] | CdsIndex | None = None,
+    frame: int = 1,
+    band: int = DEFAULT_BAND,
+    seed_length: int | None = None,
+    mapper=map,
+    fields: Iterable[str] | None = None,
+) -> VariantTable:
+    """
+    Alinha a amostra à referência e identifica SNPs e indels (modo --align).
+
+    Ao contrário de detect_snps(), que compara posição a posição, um indel
+    no meio da sequência não desloca as bases seguintes: o alinhamento em
+    banda de alignment.iter_edits() o reporta na posição em que ocorre e as
+    bases seguintes voltam a ser comparadas em fase.
+
+    Todas as posições são coordenadas da referência. Cada base deletada
+    gera uma linha DELETION na sua posição; as bases inseridas geram
+    linhas INSERTION com a posição da base da referência que as segue
+    (as linhas de um mesmo indel formam um registro no VCF). SNPs são
+    anotados sobre o códon da referência com apenas a substituição
+    (annotate_substitution), já que o códon da amostra pode ter sido
+    deslocado por um indel.
+
+    Com seed_length, o alinhamento é ancorado em k-mers exatos
+    (alignment.iter_seeded_edits): apenas os trechos entre âncoras são
+    alinhados, o que mantém o custo quase linear mesmo com grandes
+    diferenças estruturais, e os trechos podem ser distribuídos por
+    mapper entre processos.
+
+    Args:
+        reference: Sequência de referência.
+        sample: Sequência da amostra.
+        cds_regions: Regiões codificantes ou CdsIndex (ver detect_snps).
+        frame: Reading frame. One of {1, 2, 3, -1, -2, -3}. Default 1.
+        band: Maior indel (em bases) alinhado de uma só vez. Padrão:
+            alignment.DEFAULT_BAND.
+        seed_length: Tamanho dos k-mers das âncoras, ou None (padrão)
+            para alinhar sem âncoras.
+        mapper: Função no estilo map() usada para alinhar os trechos
+            entre âncoras, ex.: ProcessPoolExecutor(...).map. Padrão: map.
+        fields: Campos a preencher nos SNPs (ver detect_snps). Padrão:
+            todos.
+
+    Returns:
+        VariantTable: Variantes em ordem de posição na referência.
+
+    Raises:
+        ValueError: Se band < 1, seed_length < 1 ou fields contiver um
+            nome desconhecido.
+    """
+    fields = select_fields(fields)
+    want_type = "type" in fields
+    want_annotation = "annotation" in fields
+    want_context = "context" in fields
+    ref = str(reference).upper()
+    smp = str(sample).upper()
+    if cds_regions is not None and not isinstance(cds_regions, CdsIndex):
+        cds_regions = CdsIndex(cds_regions)
 
+    with profiling.stage("align"):
+        if seed_length is None:
+            edits = list(iter_edits(ref, smp, band))
+        else:
+            edits = list(iter_seeded_edits(ref, smp, seed_length, band, mapper))
+    substitutions = [
+        edit.position for edit in edits if edit.reference and edit.alternate
+    ]
+    if cds_regions is None or not want_annotation:
+        coding = iter(repeat(True))
+    else:
+        coding = iter(cds_regions.mask(substitutions))
+
+    snps = VariantTable()
+    for position, ref_bases, alt_bases in edits:
+        if not alt_bases:
+            for offset, base in enumerate(ref_bases):
+                snps.append(position + offset, base, "-", "DELETION", "NON_CODING")
+        elif not ref_bases:
+            for base in alt_bases:
+                snps.append(position, "-", base, "INSERTION", "NON_CODING")
+        else:
+            annotation = context = None
+            if next(coding) and want_annotation:
+                annotation = annotate_substitution(ref, position, alt_bases, frame)
+            elif want_annotation:
+                annotation = "NON_CODING"
+            if want_context:
+                context = get_trinucleotide_context(
+                    ref, position, ref_bases, alt_bases
+                )
+            snps.append(
+                position,
+                ref_bases,
+                alt_bases,
+                classify_mutation(ref_bases, alt_bases) if want_type else None,
+                annotation,
+                context,
+            )
     return snps
 
 
+# Bases além de cada chunk lidas no modo streaming: uma para o contexto
+# trinucleotídico e duas para completar o códon da última posição
+_CHUNK_OVERLAP = 2
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+def _chunk_ranges(
+    start: int,
+    end: int,
+    chunk_size: int,
+) -> list[tuple[int, int]]:
+    """Splits the 0-indexed range [start, end) into chunk_size pieces."""
+    return [
+        (chunk_start, min(chunk_start + chunk_size, end))
+        for chunk_start in range(start, end, chunk_size)
+    ]
+
+
+def iter_snps_streaming(
+    reference_path: str,
+    sample_path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    cds_regions: list[tuple[int, int]] | CdsIndex | None = None,
+    frame: int = 1,
+    predict: bool = False,
+    fields: Iterable[str] | None = None,
+) -> Iterator[VariantTable]:
+    """
+    Compara dois registros FASTA em chunks, sem carregá-los inteiros.
+
+    Ambos os arquivos são lidos em janelas alinhadas através do índice .fai
+    (ver fasta_parser.iter_windows); cada janela se estende
+    _CHUNK_OVERLAP bases além do chunk para o contexto trinucleotídico e os
+    códons nas bordas. A memória é limitada por ~chunk_size bases por
+    sequência, independentemente do tamanho dos registros.
+
+    O resultado concatenado é idêntico a detect_snps() sobre as sequências
+    completas (seguido de _apply_predictions() quando predict=True).
+
+    Args:
+        reference_path: Arquivo FASTA da referência (primeiro registro).
+        sample_path: Arquivo FASTA da amostra (primeiro registro).
+        chunk_size: Bases comparadas por chunk. Padrão: 1 Mb.
+        cds_regions: Regiões codificantes ou CdsIndex (ver detect_snps).
+        frame: Reading frame. One of {1, 2, 3, -1, -2, -3}. Default 1.
+        predict: Se True, preenche os Grantham Scores de cada chunk.
+        fields: Campos a preencher nos SNPs (ver detect_snps). Padrão:
+            todos.
+
+    Yields:
+        VariantTable: Variantes de um chunk (chunks sem variantes são
+            omitidos), em ordem de posição.
+
+    Raises:
+        FileNotFoundError: Se algum dos arquivos não existir.
+        ValueError: Se chunk_size < 1, fields contiver um nome desconhecido
+            ou um arquivo não puder ser indexado.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be >= 1, got {chunk_size}.")
+    fields = select_fields(fields)
+    if predict:
+        fields |= {"annotation", "grantham"}
+    if cds_regions is not None and not isinstance(cds_regions, CdsIndex):
+        cds_regions = CdsIndex(cds_regions)
+
+    ref_length = record_length(reference_path)
+    smp_length = record_length(sample_path)
+    min_length = min(ref_length, smp_length)
+
+    chunks = _chunk_ranges(0, min_length, chunk_size)
+    # Janelas 1-indexed inclusive; o fim é limitado por iter_windows
+    windows = [
+        (max(0, start - _CHUNK_OVERLAP) + 1, end + _CHUNK_OVERLAP)
+        for start, end in chunks
+    ]
+    for (chunk_start, chunk_end), (window_start, _), ref, smp in zip(
+        chunks,
+        windows,
+        iter_windows(reference_path, windows),
+        iter_windows(sample_path, windows),
+    ):
+        window_start -= 1
+        ref = ref.upper()
+        smp = smp.upper()
+        snps = VariantTable()
+        _detect_window(
+            snps, ref, smp, window_start,
+            chunk_start - window_start, chunk_end - window_start,
+            ref_length, smp_length, cds_regions, frame, fields=fields,
+        )
+        if predict:
+            snps.set_grantham(grantham_scores(
+                snps.positions,
+                snps.column("alternate"),
+                snps.column("annotation"),
+                ref,
+                frame,
+                window_start,
+                ref_length,
+            ))
+        if snps:
+            yield snps
+
+    # Cauda do registro mais longo — INDELs sem 'context'
+    deletion = ref_length > smp_length
+    tail_path = reference_path if deletion else sample_path
+    tail_chunks = _chunk_ranges(min_length, max(ref_length, smp_length), chunk_size)
+    for (start, _), bases in zip(
+        tail_chunks,
+        iter_windows(tail_path, [(start + 1, end) for start, end in tail_chunks]),
+    ):
+        snps = VariantTable()
+        for position, base in enumerate(bases.upper(), start=start + 1):
+            if deletion:
+                snps.append(position, base, "-", "DELETION", "NON_CODING")
+            else:
+                snps.append(position, "-", base, "INSERTION", "NON_CODING")
+        yield snps
+
+
+# Bases comparadas por janela no modo --summary
+_SUMMARY_WINDOW = 1 << 20
+
+
+def summarize_pair(
+    reference: str | PackedSequence,
+    sample: str | PackedSequence,
+    cds_regions: list[tuple[int, int]] | CdsIndex | None = None,
+    frame: int = 1,
+    fields: Iterable[str] | None = None,
+    name: str = "",
+) -> DivergenceSummary:
+    """
+    Resume a divergência entre duas sequências sem materializar variantes.
+
+    As posições divergentes são localizadas e contadas janela a janela
+    (1 Mb) por DivergenceSummary.add_window(); nenhuma VariantTable é
+    construída, e a memória além das sequências é limitada por uma janela.
+    Sequências empacotadas (PackedSequence) são comparadas por XOR e só as
+    janelas com divergências são decodificadas.
+
+    Os contadores batem com os de detect_snps() sobre o mesmo par.
+
+    Args:
+        reference: Sequência de referência (str ou PackedSequence).
+        sample: Sequência da amostra (str ou PackedSequence).
+        cds_regions: Regiões codificantes ou CdsIndex (ver detect_snps).
+        frame: Reading frame. One of {1, 2, 3, -1, -2, -3}. Default 1.
+        fields: Campos selecionados (ver select_fields): sem annotation, as
+            classes de anotação não são contadas; sem context, o espectro
+            de 96 canais também não. Padrão: todos.
+        name: Nome da amostra no resumo.
+
+    Returns:
+        DivergenceSummary: Contadores da amostra.
+    """
+    fields = select_fields(fields)
+    summary = DivergenceSummary(
+        name, "annotation" in fields, "context" in fields
+    )
+    if cds_regions is not None and not isinstance(cds_regions, CdsIndex):
+        cds_regions = CdsIndex(cds_regions)
+    packed = isinstance(reference, PackedSequence) or isinstance(
+        sample, PackedSequence
+    )
+    if packed:
+        if not isinstance(reference, PackedSequence):
+            reference = PackedSequence.from_str(reference)
+        if not isinstance(sample, PackedSequence):
+            sample = PackedSequence.from_str(sample)
+    else:
+        reference = str(reference).upper()
+        sample = str(sample).upper()
+    ref_length, smp_length = len(reference), len(sample)
+    min_length = min(ref_length, smp_length)
+
+    for start, end in _chunk_ranges(0, min_length, _SUMMARY_WINDOW):
+        if packed:
+            with profiling.stage("scan"):
+                positions = reference.mismatches(sample, start, end)
+            if not positions:
+                continue
+            window_start = max(start - _CHUNK_OVERLAP, 0)
+            _summarize_window(
+                summary,
+                reference[window_start:end + _CHUNK_OVERLAP],
+                sample[window_start:end + _CHUNK_OVERLAP],
+                window_start, start - window_start, end - window_start,
+                ref_length, smp_length, cds_regions, frame,
+                [p - window_start for p in positions],
+            )
+        else:
+            _summarize_window(
+                summary, reference, sample, 0, start, end,
+                ref_length, smp_length, cds_regions, frame,
+            )
+    summary.compared = min_length
+    summary.deletions = max(ref_length - smp_length, 0)
+    summary.insertions = max(smp_length - ref_length, 0)
+    return summary
+
+
+def _summarize_window(
+    summary: DivergenceSummary,
+    ref: str,
+    smp: str,
+    window_start: int,
+    scan_start: int,
+    scan_end: int,
+    ref_length: int,
+    smp_length: int,
+    cds_index: CdsIndex | None,
+    frame: int,
+    mismatches: list[int] | None = None,
+) -> None:
+    """Counts the SNPs of [scan_start, scan_end) into summary.
+
+    Same window conventions as _detect_window(); annotations are computed
+    only if the summary counts them.
+    """
+    if mismatches is None:
+        with profiling.stage("scan"):
+            mismatches = find_mismatches(ref, smp, scan_start, scan_end)
+    if not mismatches:
+        return
+    with profiling.stage("annotate"):
+        annotations = None
+        if summary.annotations is not None:
+            if cds_index is None:
+                coding = repeat(True)
+            else:
+                coding = cds_index.mask([window_start + i + 1 for i in mismatches])
+            annotations = [
+                annotate_snp(
+                    window_start + i + 1, ref, smp, frame, window_start,
+                    ref_length, smp_length,
+                ) if in_cds else "NON_CODING"
+                for i, in_cds in zip(mismatches, coding)
+            ]
+        summary.add_window(ref, smp, mismatches, annotations)
+
+
+def summarize_streaming(
+    reference_path: str,
+    sample_path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    cds_regions: list[tuple[int, int]] | CdsIndex | None = None,
+    frame: int = 1,
+    fields: Iterable[str] | None = None,
+    name: str = "",
+) -> DivergenceSummary:
+    """
+    summarize_pair() sobre dois registros FASTA lidos em chunks.
+
+    Usa as mesmas janelas de iter_snps_streaming(): a memória é limitada
+    por ~chunk_size bases por sequência.
+
+    Raises:
+        FileNotFoundError: Se algum dos arquivos não existir.
+        ValueError: Se chunk_size < 1 ou um arquivo não puder ser indexado.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be >= 1, got {chunk_size}.")
+    fields = select_fields(fields)
+    summary = DivergenceSummary(
+        name, "annotation" in fields, "context" in fields
+    )
+    if cds_regions is not None and not isinstance(cds_regions, CdsIndex):
+        cds_regions = CdsIndex(cds_regions)
+
+    ref_length = record_length(reference_path)
+    smp_length = record_length(sample_path)
+    min_length = min(ref_length, smp_length)
+    chunks = _chunk_ranges(0, min_length, chunk_size)
+    windows = [
+        (max(0, start - _CHUNK_OVERLAP) + 1, end + _CHUNK_OVERLAP)
+        for start, end in chunks
+    ]
+    for (chunk_start, chunk_end), (window_start, _), ref, smp in zip(
+        chunks,
+        windows,
+        iter_windows(reference_path, windows),
+        iter_windows(sample_path, windows),
+    ):
+        window_start -= 1
+        _summarize_window(
+            summary, ref.upper(), smp.upper(), window_start,
+            chunk_start - window_start, chunk_end - window_start,
+            ref_length, smp_length, cds_regions, frame,
+        )
+    summary.compared = min_length
+    summary.deletions = max(ref_length - smp_length, 0)
+    summary.insertions = max(smp_length - ref_length, 0)
+    return summary
+
+
 def classify_mutation(ref_base: str, alt_base: str) -> str:
     """
     Classifica o tipo de mutação.
@@ -226,20 +948,41 @@ def classify_mutation(ref_base: str, alt_base: str) -> str:
 
 
 def print_snp_report(
-    snps: list[dict],
+    snps: VariantTable | list[dict],
     reference: str,
     sample: str,
     frame: int = 1,
+    quiet: bool = False,
 ) -> None:
     """
     Imprime relatório de SNPs formatado.
 
+    Sequências longas são resumidas (ver report.summarize_sequence), de
+    modo que a saída é O(variantes) e nunca O(tamanho da sequência).
+
     Args:
-        snps: Lista de SNPs detectados
-        reference: Sequência de referência
-        sample: Sequência da amostra
+        snps: Variantes detectadas (VariantTable ou lista de dicts)
+        reference: Sequência de referência (ou rótulo, ex: caminho)
+        sample: Sequência da amostra (ou rótulo)
         frame: Reading frame used during annotation (default 1).
+        quiet: Se True, omite a tabela de variantes (apenas o resumo).
     """
+    table = VariantTable.from_records(snps)
+    _print_report_header(
+        summarize_sequence(reference), summarize_sequence(sample), frame
+    )
+    print(f"\nTotal de variações encontradas: {len(table)}")
+
+    if table:
+        if not quiet:
+            _print_table_header(table.has_grantham)
+            _print_rows(table)
+    else:
+        print("\nNenhuma variação detectada (sequências idênticas)")
+
+
+def _print_report_header(reference: str, sample: str, frame: int) -> None:
+    """Prints the title, input labels and frame of a report."""
     frame_label = f"+{frame}" if frame > 0 else str(frame)
     print("=" * 60)
     print("SNPTracker - Relatório de Mutações")
@@ -247,98 +990,348 @@ def print_snp_report(
     print(f"\nReferência: {reference}")
     print(f"Amostra:    {sample}")
     print(f"Frame:      {frame_label}")
-    print(f"\nTotal de variações encontradas: {len(snps)}")
 
-    if snps:
-        has_predict = any("grantham_score" in s for s in snps)
-        separator_width = 90 if has_predict else 70
-        print("\n" + "-" * separator_width)
-        header = (
-            f"{'Posição':<10} {'Ref':<5} {'Alt':<5} {'Tipo':<15} "
-            f"{'Anotação':<20} {'Contexto'}"
-        )
-        if has_predict:
-            header += f"{'':5} {'Grantham'}"
-        print(header)
-        print("-" * separator_width)
-
-        for snp in snps:
-            line = (
-                f"{snp['position']:<10} {snp['reference']:<5} "
-                f"{snp['alternate']:<5} {snp['type']:<15} "
-                f"{snp.get('annotation', ''):<20} "
-                f"{snp.get('context', 'N/A')}"
-            )
-            if has_predict and "grantham_score" in snp:
-                score = snp["grantham_score"]
-                pred = snp["grantham_prediction"]
-                line += f"{'':5} {score} ({pred})"
-            print(line)
-    else:
-        print("\nNenhuma variação detectada (sequências idênticas)")
 
+def _print_table_header(has_predict: bool) -> None:
+    """Prints the column header of the terminal variant table."""
+    separator_width = 90 if has_predict else 70
+    print("\n" + "-" * separator_width)
+    header = (
+        f"{'Posição':<10} {'Ref':<5} {'Alt':<5} {'Tipo':<15} "
+        f"{'Anotação':<20} {'Contexto'}"
+    )
+    if has_predict:
+        header += f"{'':5} {'Grantham'}"
+    print(header)
+    print("-" * separator_width)
+
+
+def _print_rows(table: VariantTable) -> None:
+    """Prints the terminal rows of a batch of variants."""
+    lines = []
+    for row in table.iter_tuples():
+        line = format_row(row)
+        score = row[6]
+        if score is not None:
+            line += f"{'':5} {score} ({grantham_prediction(score)})"
+        lines.append(line)
+    if lines:
+        print("\n".join(lines))
+
+
+def open_output(
+    output_file: str, output_format: str = "text", **vcf_options
+) -> ReportWriter | VariantFileWriter | VcfWriter:
+    """
+    Abre o escritor de variantes do formato pedido.
+
+    Todos os escritores têm a mesma interface: write(snps), count,
+    close() e discard(), e funcionam como context manager.
+
+    Args:
+        output_file: Nome do arquivo de saída
+        output_format: "text" (relatório de largura fixa), "binary"
+            (arquivo .snpb, ver variant_file.py) ou "vcf" (ver vcf.py)
+        **vcf_options: Argumentos do VcfWriter (reference, contig, samples,
+            bgzip); ignorados pelos demais formatos.
 
-def generate_snp_file(snps: list[dict], output_file: str = "snps_report.txt") -> None:
+    Raises:
+        ValueError: Se o formato não for suportado.
+    """
+    if output_format == "text":
+        return ReportWriter(output_file)
+    if output_format == "binary":
+        return VariantFileWriter(output_file)
+    if output_format == "vcf":
+        return VcfWriter(output_file, **vcf_options)
+    raise ValueError(f"Unsupported output format: '{output_format}'.")
+
+
+def generate_snp_file(
+    snps: VariantTable | list[dict],
+    output_file: str = "snps_report.txt",
+    verbose: bool = True,
+    output_format: str = "text",
+    **vcf_options,
+) -> None:
     """
     Salva relatório em arquivo.
 
     Args:
-        snps: Lista de SNPs
+        snps: Variantes (VariantTable ou lista de dicts)
         output_file: Nome do arquivo de saída
+        verbose: Se True (padrão), anuncia o arquivo salvo no stdout.
+            Workers paralelos usam False e o processo principal anuncia
+            na ordem das amostras.
+        output_format: "text" (padrão), "binary" ou "vcf"; ver open_output().
+        **vcf_options: Argumentos do VcfWriter; ver open_output().
     """
-    with open(output_file, "w") as f:
-        f.write("SNPTRACKER - RELATÓRIO DE SNPs\n")
-        f.write("=" * 60 + "\n\n")
-        f.write(f"Total de SNPs: {len(snps)}\n\n")
-        f.write(f"{'Posição':<10} {'Ref':<5} {'Alt':<5} {'Tipo':<15} {'Anotação':<20} {'Contexto'}\n")
-        f.write("-" * 70 + "\n")
-
-        for snp in snps:
-            line = (
-                f"{snp['position']:<10} {snp['reference']:<5} "
-                f"{snp['alternate']:<5} {snp['type']:<15} "
-                f"{snp.get('annotation', ''):<20} "
-                f"{snp.get('context', 'N/A')}\n"
-            )
-            if "grantham_score" in snp:
-                score = snp["grantham_score"]
-                pred = snp["grantham_prediction"]
-                line = line.rstrip("\n") + f"  {score} ({pred})\n"
-            f.write(line)
+    with open_output(output_file, output_format, **vcf_options) as writer:
+        writer.write(snps)
+
+    if verbose:
+        print(f"\nRelatório salvo em: {output_file}")
 
-    print(f"\nRelatório salvo em: {output_file}")
+
+def iter_multi_sample(
+    reference: str,
+    samples: Iterable[tuple[str, str]],
+    cds_regions: list[tuple[int, int]] | None = None,
+    frame: int = 1,
+    annotation_cache: AnnotationCache | None = None,
+) -> Iterator[tuple[str, VariantTable]]:
+    """
+    Lazily runs SNP detection for each sample against a reference sequence.
+
+    Samples are consumed one at a time, so when fed from
+    fasta_parser.iter_sequences() only the current sample and its SNP list
+    are alive alongside the reference. Annotations are memoized across
+    samples: each distinct variant is annotated once per run.
+
+    Args:
+        reference: Reference DNA sequence.
+        samples: Iterable of (name, sequence) tuples (may be a generator).
+        cds_regions: Optional CDS regions (see detect_snps). The interval
+            index is built once and shared by every sample.
+        frame: Reading frame. One of {1, 2, 3, -1, -2, -3}. Default 1.
+        annotation_cache: AnnotationCache to use (e.g. to read its hit and
+            miss counters afterwards). Default: a new one for this run.
+
+    Yields:
+        tuple[str, VariantTable]: (sample name, variants), in input order.
+    """
+    cds_index = None if cds_regions is None else CdsIndex(cds_regions)
+    if annotation_cache is None:
+        annotation_cache = AnnotationCache()
+    for name, sequence in samples:
+        yield name, detect_snps(
+            reference, sequence, cds_index, frame, annotation_cache
+        )
 
 
 def run_multi_sample(
     reference: str,
-    samples: list[tuple[str, str]],
-) -> dict[str, list[dict]]:
+    samples: Iterable[tuple[str, str]],
+    cds_regions: list[tuple[int, int]] | None = None,
+    frame: int = 1,
+    annotation_cache: AnnotationCache | None = None,
+) -> dict[str, VariantTable]:
     """
     Runs SNP detection for each sample against a reference sequence.
 
     Args:
         reference: Reference DNA sequence.
         samples: List of (name, sequence) tuples.
+        cds_regions: Optional CDS regions (see detect_snps). The interval
+            index is built once and shared by every sample.
+        frame: Reading frame. One of {1, 2, 3, -1, -2, -3}. Default 1.
+        annotation_cache: Shared annotation memo (see iter_multi_sample).
+
+    Returns:
+        dict[str, VariantTable]: Mapping of sample name to its variants.
+    """
+    return dict(iter_multi_sample(
+        reference, samples, cds_regions, frame, annotation_cache
+    ))
+
+
+class SampleCalls(NamedTuple):
+    """Raw differences of one sample against the reference (cohort mode).
+
+    Attributes:
+        length: Sample length.
+        positions: array('q') of 1-indexed mismatch positions, sorted.
+        alternates: Sample base at each mismatch position (ASCII bytes).
+        insertion: Sample bases past the reference end ("" if none).
+    """
+
+    length: int
+    positions: array
+    alternates: bytes
+    insertion: str
+
+
+def collect_sample_calls(reference: str, sample: str) -> SampleCalls:
+    """
+    Locates the differences of one sample, without annotating them.
+
+    Args:
+        reference: Reference DNA sequence (uppercase).
+        sample: Sample DNA sequence.
 
     Returns:
-        dict[str, list[dict]]: Mapping of sample name to its SNP list.
+        SampleCalls: Mismatch positions and bases, plus the tail.
+    """
+    smp = sample.upper()
+    mismatches = find_mismatches(reference, smp)
+    return SampleCalls(
+        len(smp),
+        array("q", [i + 1 for i in mismatches]),
+        "".join([smp[i] for i in mismatches]).encode(),
+        smp[len(reference):],
+    )
+
+
+def iter_cohort_variants(
+    reference: str,
+    calls: Sequence[SampleCalls],
+    cds_regions: list[tuple[int, int]] | None = None,
+    frame: int = 1,
+    predict: bool = False,
+) -> Iterator[tuple[tuple, list[str]]]:
     """
-    return {name: detect_snps(reference, sequence) for name, sequence in samples}
+    Merges the calls of a cohort into one row per distinct allele.
 
+    The per-sample mismatch lists are merged in a single position-ordered
+    pass (heapq.merge); every distinct (position, alternate) is classified,
+    annotated and scored once, however many samples carry it. SNP alleles
+    are annotated in the reference background (as annotate_substitution()),
+    so two SNPs sharing a codon are annotated independently. Each distinct
+    tail deletion (by start) and insertion (by bases) is one INDEL row.
 
-def load_sequence(input_data: str) -> str:
+    Genotypes are '1' for carriers, '0' for samples covering the row's
+    reference span without carrying it, and '.' for samples too short to
+    cover it (their own deletion overlaps the row).
+
+    Args:
+        reference: Reference DNA sequence.
+        calls: collect_sample_calls() result of each sample, in column order.
+        cds_regions: Optional CDS regions (see detect_snps).
+        frame: Reading frame. One of {1, 2, 3, -1, -2, -3}. Default 1.
+        predict: Se True, inclui o Grantham Score das linhas
+            NON_SYNONYMOUS.
+
+    Yields:
+        tuple[tuple, list[str]]: (row, genotypes). row has the shape of
+            VariantTable.iter_tuples(); INDEL rows carry the whole run
+            (see vcf.VcfWriter.write_row()). Rows are ordered so that
+            their anchored VCF positions are sorted.
+    """
+    ref = reference.upper()
+    cds_index = None if cds_regions is None else CdsIndex(cds_regions)
+    lengths = [sample.length for sample in calls]
+
+    def genotypes(carriers: list[int], end: int) -> list[str]:
+        values = ["0" if length >= end else "." for length in lengths]
+        for index in carriers:
+            values[index] = "1"
+        return values
+
+    # INDEL rows, by start; a deletion at p is anchored at p - 1, so it
+    # precedes any SNP at p
+    deletions: dict[int, list[int]] = {}
+    insertions: dict[str, list[int]] = {}
+    for index, sample in enumerate(calls):
+        if sample.length < len(ref):
+            deletions.setdefault(sample.length + 1, []).append(index)
+        elif sample.insertion:
+            insertions.setdefault(sample.insertion, []).append(index)
+    indels = deque(
+        ((start, ref[start - 1:], "-", "DELETION", "NON_CODING", None, None),
+         carriers)
+        for start, carriers in sorted(deletions.items())
+    )
+    indels.extend(
+        ((len(ref) + 1, "-", bases, "INSERTION", "NON_CODING", None, None),
+         carriers)
+        for bases, carriers in sorted(insertions.items())
+    )
+
+    merged = heapq.merge(*(
+        zip(sample.positions, sample.alternates, repeat(index))
+        for index, sample in enumerate(calls)
+    ))
+    for position, group in groupby(merged, key=itemgetter(0)):
+        while indels and indels[0][0][0] <= position:
+            row, carriers = indels.popleft()
+            yield row, genotypes(carriers, len(ref))
+
+        by_alternate: dict[str, list[int]] = {}
+        for _, code, index in group:
+            by_alternate.setdefault(chr(code), []).append(index)
+        alternates = list(by_alternate)
+        ref_base = ref[position - 1]
+        if cds_index is None or position in cds_index:
+            annotations = [
+                annotate_substitution(ref, position, alt, frame)
+                for alt in alternates
+            ]
+        else:
+            annotations = ["NON_CODING"] * len(alternates)
+        if predict:
+            scores = grantham_scores(
+                repeat(position), alternates, annotations, ref, frame
+            )
+        else:
+            scores = [None] * len(alternates)
+
+        for alt, annotation, score in zip(alternates, annotations, scores):
+            row = (
+                position,
+                ref_base,
+                alt,
+                classify_mutation(ref_base, alt),
+                annotation,
+                get_trinucleotide_context(ref, position, ref_base, alt),
+                score,
+            )
+            yield row, genotypes(by_alternate[alt], position)
+
+    for row, carriers in indels:
+        yield row, genotypes(carriers, len(ref))
+
+
+def parse_region(region_str: str) -> tuple[int, int]:
+    """Parses a single window string like '1001-6000' into a tuple.
+
+    Args:
+        region_str: One range in 'start-end' format (1-indexed, inclusive).
+
+    Returns:
+        tuple[int, int]: (start, end).
+
+    Raises:
+        ValueError: If the format is invalid, start > end, or more than
+            one range is given.
+    """
+    regions = parse_cds_regions(region_str)
+    if len(regions) != 1:
+        raise ValueError(
+            f"Invalid region '{region_str}'. Expected a single 'start-end' "
+            f"range (e.g. '1001-6000')."
+        )
+    return regions[0]
+
+
+def load_sequence(
+    input_data: str,
+    region: tuple[int, int] | None = None,
+    packed: bool = False,
+) -> str | PackedSequence:
     """Loads sequence from a file if it exists, otherwise returns the string.
 
     Distinguishes between a raw DNA sequence (e.g. "ACTG") and a file path
     (e.g. "ref.fasta" or "data/ref.fasta") by checking for a file extension
     or a directory separator in the input string.
 
+    When a region is given, only that window of the first record is
+    loaded; for files this goes through the .fai index and mmap
+    (fasta_parser.fetch_sequence), so the cost is O(window), not O(file).
+
+    .2bit files (see --pack-reference) are recognised by their signature
+    and memory-mapped: the first record is returned as a PackedSequence
+    over the map, without parsing or copying the bases.
+
     Args:
         input_data: File path (with extension or path separator) or raw DNA
             sequence string.
+        region: Optional (start, end) window, 1-indexed inclusive.
+        packed: Returns a 2-bit PackedSequence (~1/4 byte per base) instead
+            of a str; whole FASTA records are packed as they are read.
 
     Returns:
-        str: DNA sequence string.
+        str | PackedSequence: DNA sequence (always packed for .2bit files
+            loaded without a region).
 
     Raises:
         FileNotFoundError: If the input looks like a file path (contains a
@@ -348,14 +1341,27 @@ def load_sequence(input_data: str) -> str:
             which would produce incorrect annotation results.
     """
     if os.path.isfile(input_data):
-        return read_fasta(input_data)
+        if is_twobit(input_data):
+            sequence = TwoBitFile(input_data).sequence()
+            if region is None:
+                return sequence
+            sequence = sequence[region[0] - 1:region[1]]
+        elif region is not None:
+            sequence = fetch_sequence(input_data, start=region[0], end=region[1])
+        elif packed:
+            return read_fasta_packed(input_data)
+        else:
+            return read_fasta(input_data)
+        return PackedSequence.from_str(sequence) if packed else sequence
     _, ext = os.path.splitext(input_data)
     if ext or os.sep in input_data:
         raise FileNotFoundError(
             f"File not found: '{input_data}'. "
             f"Provide a valid file path or a raw DNA sequence string."
         )
-    return input_data
+    if region is not None:
+        input_data = input_data[region[0] - 1:region[1]]
+    return PackedSequence.from_str(input_data) if packed else input_data
 
 
 def parse_args(args: list[str] | None = None) -> argparse.Namespace:
@@ -375,19 +1381,53 @@ def parse_args(args: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="SNPTracker - Detector de SNPs")
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument(
-        "--reference", help="Sequência de referência (DNA ou arquivo FASTA)"
+        "--reference",
+        help="Sequência de referência (DNA, arquivo FASTA ou .2bit)",
     )
     group.add_argument(
         "--input",
         help="Arquivo FASTA com múltiplas sequências (primeira = referência)",
     )
+    group.add_argument(
+        "--pack-reference",
+        metavar="FASTA",
+        help=(
+            "Converte uma única vez o FASTA de referência em um arquivo "
+            ".2bit (2 bits por base, índice de registros e blocos de N) ao "
+            "lado dele e encerra. Passado em --reference, o .2bit é mapeado "
+            "em memória sem parsing: a carga leva milissegundos."
+        ),
+    )
     parser.add_argument(
         "--sample",
         default=None,
         help="Sequência da amostra (DNA ou arquivo FASTA). Obrigatório com --reference.",
     )
     parser.add_argument(
-        "--output", default="snps_report.txt", help="Nome do arquivo de saída"
+        "--output", default=None,
+        help="Nome do arquivo de saída (padrão: snps_report.txt)",
+    )
+    parser.add_argument(
+        "--format",
+        dest="output_format",
+        choices=sorted(OUTPUT_EXTENSIONS),
+        default="text",
+        help=(
+            "Formato do arquivo de saída: 'text' (relatório de largura "
+            "fixa, padrão), 'binary' (arquivo .snpb colunar e compacto, "
+            "com índice de blocos para consultas por intervalo de posições; "
+            "ver variant_file.py) ou 'vcf' (VCF 4.2). Sem --output, o "
+            "arquivo é snps_report com a extensão do formato."
+        ),
+    )
+    parser.add_argument(
+        "--bgzip",
+        action="store_true",
+        default=False,
+        help=(
+            "Com --format vcf: comprime o VCF em BGZF (.vcf.gz) e gera o "
+            "índice tabix (.vcf.gz.tbi), permitindo consultas por região."
+        ),
     )
     parser.add_argument(
         "--cds",
@@ -410,6 +1450,170 @@ def parse_args(args: list[str] | None = None) -> argparse.Namespace:
             "Default: 1. Only applicable with --reference."
         ),
     )
+    parser.add_argument(
+        "--region",
+        default=None,
+        help=(
+            "Janela 'start-end' (1-indexed, inclusive) a carregar de "
+            "--reference e --sample. Arquivos FASTA são lidos via índice "
+            ".fai + mmap (apenas a janela é lida). A janela é analisada "
+            "como uma sequência independente: posições, --cds e --frame "
+            "são relativos ao início da janela."
+        ),
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        default=False,
+        help=(
+            "Compara --reference e --sample (arquivos FASTA) em chunks "
+            "lidos via índice .fai + mmap, sem carregar as sequências "
+            "inteiras na memória."
+        ),
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=(
+            "Bases por chunk no modo --stream; limita a memória usada "
+            f"pelas sequências (~4 bytes por base). Padrão: {DEFAULT_CHUNK_SIZE}."
+        ),
+    )
+    parser.add_argument(
+        "--packed",
+        action="store_true",
+        default=False,
+        help=(
+            "Com --reference: carrega as sequências codificadas em 2 bits "
+            "por base (~4x menos memória que texto) e localiza as "
+            "divergências por XOR sobre os bytes empacotados. Bases fora "
+            "de ACGT (N, IUPAC) são preservadas. Não aplicável com "
+            "--stream ou --input."
+        ),
+    )
+    parser.add_argument(
+        "--align",
+        action="store_true",
+        default=False,
+        help=(
+            "Alinha cada amostra à referência (alinhamento em banda) em vez "
+            "de compará-las posição a posição: um indel no meio da "
+            "sequência é reportado onde ocorre, sem transformar as bases "
+            "seguintes em falsos SNPs. Não aplicável com --stream ou "
+            "--cohort."
+        ),
+    )
+    parser.add_argument(
+        "--band",
+        type=int,
+        default=None,
+        help=(
+            "Com --align: maior indel (em bases) alinhado de uma só vez; "
+            f"bandas maiores custam mais tempo. Padrão: {DEFAULT_BAND}."
+        ),
+    )
+    parser.add_argument(
+        "--seed-length",
+        type=int,
+        default=None,
+        help=(
+            "Com --align: ancora o alinhamento em k-mers exatos deste "
+            "tamanho e alinha apenas os trechos entre as âncoras (custo "
+            "quase linear para genomas inteiros, mesmo com grandes "
+            "diferenças estruturais). Com --reference, --jobs distribui os "
+            f"trechos entre processos. Sugerido: {DEFAULT_SEED_LENGTH}."
+        ),
+    )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        default=False,
+        help=(
+            "Modo resumo: não imprime a tabela de variantes no terminal "
+            "(o relatório em arquivo continua sendo gerado)."
+        ),
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help=(
+            "Número de processos para o modo multi-amostra (--input). "
+            "Cada processo recebe a referência uma única vez e executa "
+            "detecção, predição e escrita do relatório por amostra; a "
+            "saída mantém a ordem do arquivo. Com --reference, --align e "
+            "--seed-length, alinha em paralelo os trechos entre âncoras. "
+            "Padrão: 1 (serial)."
+        ),
+    )
+    parser.add_argument(
+        "--cohort",
+        action="store_true",
+        default=False,
+        help=(
+            "Com --input e --format vcf: grava uma única matriz VCF da "
+            "coorte (uma coluna GT por amostra) em vez de um arquivo por "
+            "amostra. As amostras são comparadas à referência e mescladas "
+            "em uma única passagem ordenada por posição; cada variante "
+            "distinta é anotada uma única vez."
+        ),
+    )
+    parser.add_argument(
+        "--summary",
+        action="store_true",
+        default=False,
+        help=(
+            "Em vez das variantes, grava um resumo de divergência por "
+            "amostra (TSV, padrão: snps_summary.tsv): SNPs, divergência, "
+            "transições/transversões e Ti/Tv, INDELs, classes de anotação e "
+            "o espectro COSMIC de 96 canais. Os contadores são acumulados "
+            "direto da varredura, sem guardar variantes; --fields sem "
+            "annotation ou context omite as colunas correspondentes."
+        ),
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help=(
+            "Diretório do cache de resultados do modo multi-amostra "
+            "(--input). Amostras já analisadas com a mesma referência e "
+            "as mesmas opções são lidas do cache; apenas amostras novas ou "
+            "modificadas são recalculadas."
+        ),
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=None,
+        help=(
+            "Tamanho máximo do cache em MB; as entradas usadas há mais "
+            "tempo são removidas primeiro (LRU). Padrão: sem limite."
+        ),
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        default=False,
+        help=(
+            "Mede cada etapa (load, scan, annotate, detect, predict, "
+            "report, write): tempo de parede, tempo de CPU, número de "
+            "execuções e pico de memória (RSS). Imprime a tabela ao final "
+            "e grava '<output>.timings.json' ao lado do relatório."
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="ARQUIVO",
+        help=(
+            "Como --timings, e também executa sob cProfile: grava as "
+            "estatísticas (pstats) em ARQUIVO (padrão: '<output>.prof') e "
+            "inclui as funções mais custosas no JSON."
+        ),
+    )
     parser.add_argument(
         "--predict",
         action="store_true",
@@ -420,97 +1624,857 @@ def parse_args(args: list[str] | None = None) -> argparse.Namespace:
             "'grantham_prediction' to each qualifying SNP."
         ),
     )
+    parser.add_argument(
+        "--fields",
+        default=None,
+        help=(
+            "Campos calculados para cada SNP, separados por vírgula, entre "
+            f"{', '.join(FIELDS)} (padrão: todos). position, reference e "
+            "alternate são sempre incluídos; campos omitidos não são "
+            "calculados, ex.: '--fields position' compara na velocidade da "
+            "varredura. grantham equivale a --predict e requer annotation."
+        ),
+    )
     namespace = parser.parse_args(args)
+    if namespace.pack_reference is not None and namespace.sample is not None:
+        parser.error("--sample não se aplica a --pack-reference.")
     if namespace.reference is not None and namespace.sample is None:
         parser.error("--sample é obrigatório quando --reference é utilizado.")
+    if namespace.jobs < 1:
+        parser.error("--jobs deve ser um inteiro maior ou igual a 1.")
+    if namespace.chunk_size < 1:
+        parser.error("--chunk-size deve ser um inteiro maior ou igual a 1.")
+    if namespace.stream and namespace.input:
+        parser.error("--stream só é aplicável com --reference e --sample.")
+    if namespace.stream and namespace.region:
+        parser.error("--stream e --region não podem ser usados juntos.")
+    if namespace.cache_max_mb is not None and namespace.cache_max_mb < 0:
+        parser.error("--cache-max-mb não pode ser negativo.")
+    if namespace.bgzip and namespace.output_format != "vcf":
+        parser.error("--bgzip só é aplicável com --format vcf.")
+    if namespace.cohort and not namespace.input:
+        parser.error("--cohort só é aplicável com --input.")
+    if namespace.cohort and namespace.output_format != "vcf":
+        parser.error("--cohort requer --format vcf.")
+    if namespace.cohort and namespace.cache_dir:
+        parser.error("--cache-dir não se aplica a --cohort.")
+    if namespace.packed and (namespace.stream or namespace.input):
+        parser.error("--packed só é aplicável com --reference e --sample, sem --stream.")
+    if namespace.align and (namespace.stream or namespace.cohort):
+        parser.error("--align não é aplicável com --stream ou --cohort.")
+    if namespace.band is not None and not namespace.align:
+        parser.error("--band só é aplicável com --align.")
+    if namespace.band is not None and namespace.band < 1:
+        parser.error("--band deve ser um inteiro maior ou igual a 1.")
+    if namespace.seed_length is not None and not namespace.align:
+        parser.error("--seed-length só é aplicável com --align.")
+    if namespace.seed_length is not None and namespace.seed_length < 1:
+        parser.error("--seed-length deve ser um inteiro maior ou igual a 1.")
+    if namespace.fields is not None:
+        if namespace.cohort:
+            parser.error("--fields não se aplica a --cohort.")
+        namespace.fields = tuple(
+            name.strip() for name in namespace.fields.split(",") if name.strip()
+        )
+        unknown = [name for name in namespace.fields if name not in FIELDS]
+        if unknown:
+            parser.error(f"Campo desconhecido: {', '.join(unknown)}.")
+        if namespace.predict and "grantham" not in namespace.fields:
+            namespace.fields += ("grantham",)
+        namespace.predict = "grantham" in namespace.fields
+    if namespace.summary:
+        if namespace.cohort or namespace.align or namespace.cache_dir:
+            parser.error("--summary não se aplica a --cohort, --align nem --cache-dir.")
+        if namespace.output_format != "text" or namespace.bgzip:
+            parser.error("--summary grava um TSV; não use --format nem --bgzip.")
+        if namespace.predict:
+            parser.error("--summary não inclui Grantham Scores (--predict).")
+        if namespace.output is None:
+            namespace.output = "snps_summary.tsv"
+    if namespace.align and namespace.band is None:
+        namespace.band = DEFAULT_BAND
+    if namespace.output is None:
+        namespace.output = "snps_report" + _output_extension(
+            namespace.output_format, namespace.bgzip
+        )
     return namespace
 
 
-def main():
-    """Função principal do programa."""
-    args = parse_args()
+def _output_extension(output_format: str, bgzip: bool = False) -> str:
+    """Returns the file extension of an output format (e.g. '.vcf.gz')."""
+    return OUTPUT_EXTENSIONS[output_format] + (".gz" if bgzip else "")
+
+
+def _record_name(
+    input_data: str, region: tuple[int, int] | None = None
+) -> str:
+    """Returns the VCF contig name of a --reference argument.
 
+    The first word of the FASTA header for files (only the header line is
+    read), the first record name for .2bit files, DEFAULT_CONTIG for raw sequences. With a region, the samtools
+    'name:start-end' form is used, since positions are window-relative.
+    """
+    name = DEFAULT_CONTIG
+    if os.path.isfile(input_data) and is_twobit(input_data):
+        names = TwoBitFile(input_data).names
+        if names:
+            name = names[0]
+    elif os.path.isfile(input_data):
+        with open(input_data) as f:
+            header = f.readline()
+        if header.startswith(">") and header[1:].split():
+            name = header[1:].split()[0]
+    if region is not None:
+        name = f"{name}:{region[0]}-{region[1]}"
+    return name
+
+
+def _run_pack_reference(args: argparse.Namespace) -> None:
+    """Converts --pack-reference FASTA into '<name>.2bit' next to it."""
+    output = os.path.splitext(args.pack_reference)[0] + ".2bit"
+    count = fasta_to_twobit(args.pack_reference, output)
+    print(f"Referência empacotada: {output} ({count} registro(s))")
+
+
+def _mode(args: argparse.Namespace) -> str:
+    """Returns the name of the flow selected by the arguments."""
+    if args.pack_reference:
+        return "pack_reference"
+    if args.summary:
+        return "summary"
+    if args.cohort:
+        return "cohort"
     if args.input:
-        _run_multi_sample_mode(args)
-    else:
-        _run_single_sample_mode(args)
+        return "multi_sample"
+    if args.stream:
+        return "stream"
+    return "single_sample"
 
-    print("\nAnálise concluída!")
+
+def _report_timings(
+    args: argparse.Namespace,
+    recorder: profiling.StageRecorder,
+    profile: cProfile.Profile | None,
+) -> None:
+    """Prints the stage table and writes the --timings JSON sidecar."""
+    stages = recorder.to_dict()
+    document = {
+        "command": sys.argv[1:],
+        "mode": _mode(args),
+        "stages": stages,
+        "max_rss_mb": profiling.max_rss_mb(),
+    }
+    if profile is not None:
+        profile_path = args.profile or args.output + ".prof"
+        profile.dump_stats(profile_path)
+        document["profile"] = profile_path
+        document["top_functions"] = profiling.top_functions(profile)
+    timings_path = args.output + ".timings.json"
+    profiling.write_timings(timings_path, document)
+
+    print("\n" + profiling.format_timings(stages))
+    print(f"\nTempos salvos em: {timings_path}")
+    if profile is not None:
+        print(f"Perfil (pstats) salvo em: {document['profile']}")
+
+
+def main():
+    """Função principal do programa."""
+    args = parse_args()
+    runners = {
+        "pack_reference": _run_pack_reference,
+        "summary": _run_summary_mode,
+        "cohort": _run_cohort_mode,
+        "multi_sample": _run_multi_sample_mode,
+        "stream": _run_streaming_mode,
+        "single_sample": _run_single_sample_mode,
+    }
+    mode = _mode(args)
+
+    recorder = None
+    profile = None
+    if args.timings or args.profile is not None:
+        recorder = profiling.enable()
+    if args.profile is not None:
+        profile = cProfile.Profile()
+    try:
+        if profile is not None:
+            profile.enable()
+        with profiling.stage("total"):
+            runners[mode](args)
+    finally:
+        if profile is not None:
+            profile.disable()
+        if recorder is not None:
+            profiling.disable()
+            _report_timings(args, recorder, profile)
+
+    if mode != "pack_reference":
+        print("\nAnálise concluída!")
+
+
+# Marks a cache miss in _apply_predictions (None is a valid cached score)
+_UNSCORED = object()
 
 
 def _apply_predictions(
-    snps: list[dict],
+    snps: VariantTable | list[dict],
     reference: str,
     frame: int = 1,
+    annotation_cache: AnnotationCache | None = None,
 ) -> None:
     """Applies Grantham Score prediction in-place to NON_SYNONYMOUS SNPs.
 
+    Scores of a VariantTable are computed straight from the table columns
+    and stored in its Grantham column; SNP dicts are updated one by one.
+
     Args:
-        snps: List of SNP dicts (modified in-place).
+        snps: VariantTable or list of SNP dicts (modified in-place).
         reference: Reference DNA sequence.
         frame: Reading frame used during detection.
+        annotation_cache: Optional AnnotationCache for this reference; a
+            score depends only on (frame, position, alternate base), so
+            each one is computed once per cache. Only used for tables.
     """
-    for snp in snps:
-        prediction = predict_functional_impact(snp, reference, frame)
-        snp.update(prediction)
+    if not isinstance(snps, VariantTable):
+        for snp, prediction in zip(
+            snps, predict_functional_impacts(snps, reference, frame)
+        ):
+            snp.update(prediction)
+        return
+
+    positions = snps.positions
+    alternates = snps.column("alternate")
+    annotations = snps.column("annotation")
+    if annotation_cache is None:
+        snps.set_grantham(grantham_scores(
+            positions, alternates, annotations, reference, frame,
+        ))
+        return
+
+    scope = annotation_cache.scope("grantham", frame)
+    scores = []
+    for position, alt_base, annotation in zip(
+        positions, alternates, annotations
+    ):
+        if annotation != "NON_SYNONYMOUS":
+            scores.append(None)
+            continue
+        key = (scope, position, alt_base)
+        score = annotation_cache.get(key, _UNSCORED)
+        if score is _UNSCORED:
+            (score,) = grantham_scores(
+                (position,), (alt_base,), (annotation,), reference, frame
+            )
+            annotation_cache.put(key, score)
+        scores.append(score)
+    snps.set_grantham(scores)
 
 
 def _run_single_sample_mode(args: argparse.Namespace) -> None:
     """Executes the original single reference vs single sample flow."""
-    reference = load_sequence(args.reference)
-    sample = load_sequence(args.sample)
+    region = parse_region(args.region) if args.region else None
+    with profiling.stage("load"):
+        reference = load_sequence(args.reference, region, packed=args.packed)
+        sample = load_sequence(args.sample, region, packed=args.packed)
 
     cds_regions = None
     if args.cds:
         cds_regions = parse_cds_regions(args.cds)
 
     frame = args.frame
-    snps = detect_snps(reference, sample, cds_regions=cds_regions, frame=frame)
+    with profiling.stage("detect"):
+        if args.align and args.seed_length is not None and args.jobs > 1:
+            with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+                snps = detect_snps_aligned(
+                    reference, sample, cds_regions=cds_regions, frame=frame,
+                    band=args.band, seed_length=args.seed_length,
+                    mapper=executor.map, fields=args.fields,
+                )
+        elif args.align:
+            snps = detect_snps_aligned(
+                reference, sample, cds_regions=cds_regions, frame=frame,
+                band=args.band, seed_length=args.seed_length,
+                fields=args.fields,
+            )
+        else:
+            snps = detect_snps(
+                reference, sample, cds_regions=cds_regions, frame=frame,
+                fields=args.fields,
+            )
 
     if args.predict:
-        _apply_predictions(snps, reference, frame)
+        with profiling.stage("predict"):
+            _apply_predictions(snps, reference, frame)
 
-    print_snp_report(snps, reference, sample, frame=frame)
+    with profiling.stage("report"):
+        print_snp_report(snps, reference, sample, frame=frame, quiet=args.quiet)
 
     if snps:
-        generate_snp_file(snps, output_file=args.output)
+        with profiling.stage("write"):
+            generate_snp_file(
+                snps,
+                output_file=args.output,
+                output_format=args.output_format,
+                reference=reference,
+                contig=_record_name(args.reference, region),
+                bgzip=args.bgzip,
+            )
+
+
+def _check_stream_inputs(args: argparse.Namespace) -> None:
+    """Raises unless --reference and --sample are FASTA files (--stream)."""
+    for path in (args.reference, args.sample):
+        if not os.path.isfile(path):
+            raise FileNotFoundError(
+                f"File not found: '{path}'. --stream requires FASTA files."
+            )
+        if is_twobit(path):
+            raise ValueError(
+                f"'{path}' is a .2bit file. --stream requires FASTA files."
+            )
+
+
+def _run_streaming_mode(args: argparse.Namespace) -> None:
+    """Executes the single-pair flow chunk by chunk (--stream).
+
+    Variants are printed and written to the report as each chunk is
+    produced; neither the sequences nor the variants are accumulated, so
+    the report header shows the file paths and the total comes last.
+    """
+    _check_stream_inputs(args)
+
+    cds_regions = None
+    if args.cds:
+        cds_regions = parse_cds_regions(args.cds)
+
+    # Relatório escrito à medida que os chunks chegam: apenas a contagem
+    # fica em memória
+    _print_report_header(args.reference, args.sample, args.frame)
+    # Um único mapeamento da referência serve todas as âncoras de INDEL
+    # lidas pelo writer; é fechado junto com ele
+    with IndexedRecord(args.reference) as reference:
+        writer = open_output(
+            args.output,
+            args.output_format,
+            reference=reference,
+            contig=reference.name or DEFAULT_CONTIG,
+            bgzip=args.bgzip,
+        )
+        printed_header = False
+        chunks = iter_snps_streaming(
+            args.reference,
+            args.sample,
+            chunk_size=args.chunk_size,
+            cds_regions=cds_regions,
+            frame=args.frame,
+            predict=args.predict,
+            fields=args.fields,
+        )
+        try:
+            for chunk in profiling.timed("detect", chunks):
+                if not args.quiet:
+                    with profiling.stage("report"):
+                        if not printed_header:
+                            _print_table_header(args.predict)
+                            printed_header = True
+                        _print_rows(chunk)
+                with profiling.stage("write"):
+                    writer.write(chunk)
+        except BaseException:
+            writer.discard()
+            raise
+
+        print(f"\nTotal de variações encontradas: {writer.count}")
+        if writer.count:
+            writer.close()
+            print(f"\nRelatório salvo em: {args.output}")
+        else:
+            writer.discard()
+            print("\nNenhuma variação detectada (sequências idênticas)")
+
+
+# Per-process state of multi-sample workers, set once by _init_worker so
+# the reference is transferred once per worker rather than once per task.
+_WORKER_STATE: dict = {}
+
+
+def _init_worker(
+    reference: str,
+    predict: bool,
+    output_prefix: str,
+    cache: ResultCache | None = None,
+    reference_digest: str | None = None,
+    output_format: str = "text",
+    bgzip: bool = False,
+    contig: str = DEFAULT_CONTIG,
+    band: int | None = None,
+    seed_length: int | None = None,
+    fields: Sequence[str] | None = None,
+) -> None:
+    """Stores the shared multi-sample inputs in a worker process."""
+    _WORKER_STATE["reference"] = reference
+    _WORKER_STATE["predict"] = predict
+    _WORKER_STATE["output_prefix"] = output_prefix
+    _WORKER_STATE["cache"] = cache
+    _WORKER_STATE["reference_digest"] = reference_digest
+    _WORKER_STATE["output_format"] = output_format
+    _WORKER_STATE["bgzip"] = bgzip
+    _WORKER_STATE["contig"] = contig
+    _WORKER_STATE["band"] = band
+    _WORKER_STATE["seed_length"] = seed_length
+    _WORKER_STATE["fields"] = fields
+    _WORKER_STATE["annotation_cache"] = AnnotationCache()
+
+
+def _process_sample(
+    name: str,
+    sequence: str,
+    reference: str,
+    predict: bool,
+    output_prefix: str,
+    cache: ResultCache | None = None,
+    reference_digest: str | None = None,
+    output_format: str = "text",
+    bgzip: bool = False,
+    contig: str = DEFAULT_CONTIG,
+    annotation_cache: AnnotationCache | None = None,
+    band: int | None = None,
+    seed_length: int | None = None,
+    fields: Sequence[str] | None = None,
+) -> tuple[str, int, str | None, bool, int, int]:
+    """Detects, predicts and writes the report of one sample.
+
+    Args:
+        name: Sample header.
+        sequence: Sample DNA sequence.
+        reference: Reference DNA sequence.
+        predict: Whether to apply Grantham predictions.
+        output_prefix: Report path prefix; the report is written to
+            '{output_prefix}_{first word of name}' plus the extension of
+            output_format (.txt, .snpb or .vcf[.gz]).
+        cache: Result cache consulted before (and filled after) detection,
+            or None to always recompute.
+        reference_digest: sequence_digest(reference); required with cache.
+        output_format: "text", "binary" or "vcf"; see open_output().
+        bgzip: With "vcf", BGZF-compress and index each file.
+        contig: VCF CHROM (first word of the reference header).
+        annotation_cache: AnnotationCache shared by the samples processed
+            in this process, or None to annotate every variant.
+        band: Alignment band of --align (detect_snps_aligned), or None
+            for positional detection.
+        seed_length: Anchor k-mer length of --align, or None.
+        fields: Fields computed for each SNP (see detect_snps), or None
+            for all of them.
+
+    Returns:
+        tuple[str, int, str | None, bool, int, int]: (name, variant count,
+            report path or None when the sample has no variants, whether
+            the result came from the cache, annotation cache hits and
+            misses during this sample).
+    """
+    snps = None
+    if cache is not None:
+        key = cache_key(
+            reference_digest, sequence, predict=predict, band=band,
+            seed_length=seed_length,
+            fields=None if fields is None else select_fields(fields),
+        )
+        snps = cache.get(key)
+    cached = snps is not None
+    hits = misses = 0
+    if not cached:
+        if annotation_cache is not None:
+            hits, misses = annotation_cache.hits, annotation_cache.misses
+        with profiling.stage("detect"):
+            if band is not None:
+                snps = detect_snps_aligned(
+                    reference, sequence, band=band, seed_length=seed_length,
+                    fields=fields,
+                )
+            else:
+                snps = detect_snps(
+                    reference, sequence, annotation_cache=annotation_cache,
+                    fields=fields,
+                )
+        if predict:
+            with profiling.stage("predict"):
+                _apply_predictions(
+                    snps, reference, annotation_cache=annotation_cache
+                )
+        if annotation_cache is not None:
+            hits = annotation_cache.hits - hits
+            misses = annotation_cache.misses - misses
+        if cache is not None:
+            cache.put(key, snps)
+    if not snps:
+        return name, 0, None, cached, hits, misses
+    sample = name.split()[0]
+    extension = _output_extension(output_format, bgzip)
+    output_file = f"{output_prefix}_{sample}{extension}"
+    with profiling.stage("write"):
+        generate_snp_file(
+            snps, output_file=output_file, verbose=False,
+            output_format=output_format, reference=reference, contig=contig,
+            samples=[sample], bgzip=bgzip,
+        )
+    return name, len(snps), output_file, cached, hits, misses
+
+
+def _process_sample_in_worker(
+    record: tuple[str, str],
+) -> tuple[str, int, str | None, bool, int, int]:
+    """Pool entry point: runs _process_sample with the worker's state."""
+    name, sequence = record
+    return _process_sample(
+        name,
+        sequence,
+        _WORKER_STATE["reference"],
+        _WORKER_STATE["predict"],
+        _WORKER_STATE["output_prefix"],
+        _WORKER_STATE["cache"],
+        _WORKER_STATE["reference_digest"],
+        _WORKER_STATE["output_format"],
+        _WORKER_STATE["bgzip"],
+        _WORKER_STATE["contig"],
+        _WORKER_STATE["annotation_cache"],
+        _WORKER_STATE["band"],
+        _WORKER_STATE["seed_length"],
+        _WORKER_STATE["fields"],
+    )
+
+
+def _collect_calls_in_worker(
+    record: tuple[str, str],
+) -> tuple[str, SampleCalls]:
+    """Pool entry point of cohort mode: collects one sample's calls."""
+    name, sequence = record
+    return name, collect_sample_calls(_WORKER_STATE["reference"], sequence)
+
+
+def _imap_ordered(
+    executor: ProcessPoolExecutor,
+    fn,
+    items: Iterable,
+    window: int,
+) -> Iterator:
+    """Maps fn over items in a pool, yielding results in input order.
+
+    At most `window` tasks are in flight, so a streamed input is never
+    materialised in full (unlike Executor.map, which submits everything
+    up front).
+    """
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _count_samples(file_path: str) -> int:
+    """Returns the number of samples (records after the reference) of a FASTA.
+
+    The count comes from the .fai index, which is built once and reused by
+    later runs, instead of a second full text pass over a large input.
+    Files that cannot be indexed (ragged lines) fall back to counting
+    headers.
+    """
+    try:
+        records = len(load_fasta_index(file_path))
+    except ValueError:
+        records = count_sequences(file_path)
+    return max(records - 1, 0)
 
 
 def _run_multi_sample_mode(args: argparse.Namespace) -> None:
-    """Executes multi-sample analysis from a single multi-sequence FASTA file."""
-    from fasta_parser import read_all_sequences
+    """Executes multi-sample analysis from a single multi-sequence FASTA file.
 
-    sequences = read_all_sequences(args.input)
-    if not sequences:
-        print("Erro: nenhuma sequência encontrada no arquivo.")
-        return
+    Samples are streamed from the file: each one is detected, predicted and
+    written before the next is read, so peak memory is bounded by the
+    reference plus a single sample (or one sample per worker with --jobs).
+    """
+    with closing(iter_sequences(args.input)) as records:
+        with profiling.stage("load"):
+            first = next(records, None)
+        if first is None:
+            print("Erro: nenhuma sequência encontrada no arquivo.")
+            return
+
+        ref_header, ref_seq = first
+        total = _count_samples(args.input)
+
+        print("=" * 60)
+        print("SNPTracker - Análise Multi-Amostra")
+        print("=" * 60)
+        print(f"Referência: {ref_header} ({len(ref_seq)} bp)")
+        print(f"Amostras:   {total}\n")
+
+        if not total:
+            print("Aviso: apenas uma sequência encontrada. Nenhuma amostra para comparar.")
+            return
+
+        output_prefix = args.output
+        contig = ref_header.split()[0] if ref_header.split() else DEFAULT_CONTIG
+        for extension in (".gz", *OUTPUT_EXTENSIONS.values()):
+            output_prefix = output_prefix.removesuffix(extension)
+        cache = None
+        ref_digest = None
+        if args.cache_dir:
+            max_bytes = None
+            if args.cache_max_mb is not None:
+                max_bytes = int(args.cache_max_mb * 1024 * 1024)
+            cache = ResultCache(args.cache_dir, max_bytes)
+            ref_digest = sequence_digest(ref_seq)
+
+        if args.jobs > 1:
+            with ProcessPoolExecutor(
+                max_workers=args.jobs,
+                initializer=_init_worker,
+                initargs=(
+                    ref_seq, args.predict, output_prefix, cache, ref_digest,
+                    args.output_format, args.bgzip, contig, args.band,
+                    args.seed_length, args.fields,
+                ),
+            ) as executor:
+                results = _imap_ordered(
+                    executor, _process_sample_in_worker,
+                    profiling.timed("load", records), args.jobs * 2,
+                )
+                _report_multi_sample(results, total, cache is not None)
+        else:
+            annotation_cache = AnnotationCache()
+            results = (
+                _process_sample(
+                    name, sequence, ref_seq, args.predict, output_prefix,
+                    cache, ref_digest, args.output_format, args.bgzip, contig,
+                    annotation_cache, args.band, args.seed_length, args.fields,
+                )
+                for name, sequence in profiling.timed("load", records)
+            )
+            _report_multi_sample(results, total, cache is not None)
 
-    ref_header, ref_seq = sequences[0]
-    samples = sequences[1:]
 
-    print("=" * 60)
-    print("SNPTracker - Análise Multi-Amostra")
-    print("=" * 60)
-    print(f"Referência: {ref_header} ({len(ref_seq)} bp)")
-    print(f"Amostras:   {len(samples)}\n")
+def _run_cohort_mode(args: argparse.Namespace) -> None:
+    """Executes cohort analysis: one multi-sample VCF for the whole file.
+
+    Samples are streamed from the file and reduced to their raw calls
+    (positions and bases, see collect_sample_calls), so peak memory is the
+    reference plus one sample plus the calls of the cohort. The calls are
+    then merged and annotated in one position-ordered pass.
+    """
+    with closing(iter_sequences(args.input)) as records:
+        with profiling.stage("load"):
+            first = next(records, None)
+        if first is None:
+            print("Erro: nenhuma sequência encontrada no arquivo.")
+            return
+
+        ref_header, ref_seq = first
+        total = _count_samples(args.input)
+
+        print("=" * 60)
+        print("SNPTracker - Análise de Coorte")
+        print("=" * 60)
+        print(f"Referência: {ref_header} ({len(ref_seq)} bp)")
+        print(f"Amostras:   {total}\n")
+
+        if not total:
+            print("Aviso: apenas uma sequência encontrada. Nenhuma amostra para comparar.")
+            return
+
+        reference = ref_seq.upper()
+        if args.jobs > 1:
+            with ProcessPoolExecutor(
+                max_workers=args.jobs,
+                initializer=_init_worker,
+                initargs=(reference, False, ""),
+            ) as executor:
+                cohort = list(_imap_ordered(
+                    executor, _collect_calls_in_worker,
+                    profiling.timed("load", records), args.jobs * 2,
+                ))
+        else:
+            cohort = []
+            for name, sequence in profiling.timed("load", records):
+                with profiling.stage("detect"):
+                    cohort.append((name, collect_sample_calls(reference, sequence)))
+
+    contig = ref_header.split()[0] if ref_header.split() else DEFAULT_CONTIG
+    writer = VcfWriter(
+        args.output,
+        ref_seq,
+        contig,
+        samples=[name.split()[0] for name, _ in cohort],
+        bgzip=args.bgzip,
+    )
+    variants = iter_cohort_variants(
+        reference,
+        [calls for _, calls in cohort],
+        predict=args.predict,
+    )
+    try:
+        for row, genotypes in profiling.timed("annotate", variants):
+            with profiling.stage("write"):
+                writer.write_row(row, genotypes)
+    except BaseException:
+        writer.discard()
+        raise
+
+    print(f"Variantes distintas: {writer.count}")
+    if writer.count:
+        writer.close()
+        print(f"\nMatriz salva em: {args.output}")
+    else:
+        writer.discard()
+        print("\nNenhuma variação detectada (amostras idênticas à referência)")
 
-    if not samples:
-        print("Aviso: apenas uma sequência encontrada. Nenhuma amostra para comparar.")
-        return
 
-    results = run_multi_sample(ref_seq, samples)
-
-    output_prefix = args.output.replace(".txt", "")
-    for i, (name, snps) in enumerate(results.items(), start=1):
-        if args.predict:
-            _apply_predictions(snps, ref_seq)
-        count = len(snps)
-        if count > 0:
-            output_file = f"{output_prefix}_{name.split()[0]}.txt"
-            generate_snp_file(snps, output_file=output_file)
-            print(f"[{i}/{len(results)}] {name} → {count} SNP(s) → salvo em {output_file}")
+def _run_summary_mode(args: argparse.Namespace) -> None:
+    """Writes one divergence summary row per sample (--summary).
+
+    Works on a single pair (optionally --stream or --packed) or on every
+    sample of --input (in parallel with --jobs). Counters come straight
+    from the mismatch scan and each row is written as soon as its sample
+    is done, so only one sample (per worker) is held at a time.
+    """
+    cds_regions = parse_cds_regions(args.cds) if args.cds else None
+    if args.input:
+        summaries = _iter_input_summaries(args, cds_regions)
+    else:
+        name = "sample"
+        if os.path.isfile(args.sample):
+            name = _record_name(args.sample)
+        if args.stream:
+            _check_stream_inputs(args)
+            with profiling.stage("detect"):
+                summary = summarize_streaming(
+                    args.reference, args.sample, args.chunk_size,
+                    cds_regions, args.frame, args.fields, name,
+                )
         else:
-            print(f"[{i}/{len(results)}] {name} → 0 SNPs")
+            region = parse_region(args.region) if args.region else None
+            with profiling.stage("load"):
+                reference = load_sequence(args.reference, region, packed=args.packed)
+                sample = load_sequence(args.sample, region, packed=args.packed)
+            with profiling.stage("detect"):
+                summary = summarize_pair(
+                    reference, sample, cds_regions, args.frame, args.fields, name
+                )
+        summaries = [summary]
+
+    count = write_summaries(args.output, _print_summaries(summaries))
+    if count:
+        print(f"\nResumo salvo em: {args.output}")
+    else:
+        print("Erro: nenhuma amostra para resumir.")
+
+
+def _iter_input_summaries(
+    args: argparse.Namespace, cds_regions: list[tuple[int, int]] | None
+) -> Iterator[DivergenceSummary]:
+    """Summaries of every --input sample against its first record."""
+    with closing(iter_sequences(args.input)) as records:
+        with profiling.stage("load"):
+            first = next(records, None)
+        if first is None:
+            return
+        reference = first[1]
+        if args.jobs > 1:
+            with ProcessPoolExecutor(
+                max_workers=args.jobs,
+                initializer=_init_summary_worker,
+                initargs=(reference, cds_regions, args.frame, args.fields),
+            ) as executor:
+                yield from _imap_ordered(
+                    executor, _summarize_sample_in_worker,
+                    profiling.timed("load", records), args.jobs * 2,
+                )
+            return
+        for name, sequence in profiling.timed("load", records):
+            with profiling.stage("detect"):
+                yield summarize_pair(
+                    reference, sequence, cds_regions, args.frame, args.fields,
+                    name.split()[0] if name.split() else name,
+                )
+
+
+def _init_summary_worker(
+    reference: str,
+    cds_regions: list[tuple[int, int]] | None,
+    frame: int,
+    fields: Sequence[str] | None,
+) -> None:
+    """Stores the shared --summary inputs in a worker process."""
+    _WORKER_STATE["reference"] = reference
+    _WORKER_STATE["cds_regions"] = (
+        None if cds_regions is None else CdsIndex(cds_regions)
+    )
+    _WORKER_STATE["frame"] = frame
+    _WORKER_STATE["fields"] = fields
+
+
+def _summarize_sample_in_worker(record: tuple[str, str]) -> DivergenceSummary:
+    """Pool entry point of --summary --input."""
+    name, sequence = record
+    return summarize_pair(
+        _WORKER_STATE["reference"],
+        sequence,
+        _WORKER_STATE["cds_regions"],
+        _WORKER_STATE["frame"],
+        _WORKER_STATE["fields"],
+        name.split()[0] if name.split() else name,
+    )
+
+
+def _print_summaries(
+    summaries: Iterable[DivergenceSummary],
+) -> Iterator[DivergenceSummary]:
+    """Prints one terminal line per summary as it passes through."""
+    for summary in summaries:
+        ti_tv = "N/A" if summary.ti_tv is None else f"{summary.ti_tv:.2f}"
+        divergence = summary.divergence
+        print(
+            f"{summary.name}: {summary.snps} SNP(s) em {summary.compared} bp "
+            f"(divergência {0 if divergence is None else divergence:.4%}), "
+            f"Ti/Tv {ti_tv}, {summary.insertions} inserção(ões), "
+            f"{summary.deletions} deleção(ões)"
+        )
+        yield summary
+
+
+def _report_multi_sample(
+    results: Iterable[tuple[str, int, str | None, bool, int, int]],
+    total: int,
+    use_cache: bool = False,
+) -> None:
+    """Prints the per-sample progress lines of multi-sample mode, in order.
+
+    With use_cache, samples served from the cache are tagged and a hit
+    count is printed at the end. The annotation cache counters (summed over
+    workers, each of which keeps its own cache) close the summary.
+    """
+    hits = 0
+    annotation_hits = annotation_misses = 0
+    for i, (name, count, output_file, cached, reused, computed) in enumerate(
+        results, start=1
+    ):
+        hits += cached
+        annotation_hits += reused
+        annotation_misses += computed
+        tag = " (cache)" if cached else ""
+        if output_file is not None:
+            print(f"\nRelatório salvo em: {output_file}")
+            print(f"[{i}/{total}] {name} → {count} SNP(s) → salvo em {output_file}{tag}")
+        else:
+            print(f"[{i}/{total}] {name} → 0 SNPs{tag}")
+    if use_cache:
+        print(f"\nCache: {hits} amostra(s) reutilizada(s), {total - hits} calculada(s)")
+    print(
+        f"Anotação: {annotation_hits} reutilizada(s), "
+        f"{annotation_misses} calculada(s)"
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,334 @@
+"""
+SNPTracker - 2-Bit Packed Sequences
+
+Stores DNA at two bits per base (four bases per byte), so a 3.1 Gb human
+genome takes ~775 MB instead of the 3.1+ GB of a Python str, and compares
+two sequences without decoding them.
+
+Encoding (the UCSC .2bit order, so packed data can be mapped from such
+files as is):
+
+    T = 0b00    C = 0b01    A = 0b10    G = 0b11
+
+The first base of each byte sits in its two most significant bits.
+Characters other than A/C/G/T (N, IUPAC ambiguity codes) are stored as T
+in the packed data and recorded in an exception mask: runs of one repeated
+character, (start, length, char), which for N blocks costs one entry per
+block. Sequences are uppercased; soft-masking (lowercase) is not kept.
+
+Mismatch detection XORs whole blocks of packed bytes read as big integers
+(CPython operates on them a machine word at a time, i.e. 32 bases per
+64-bit word): each differing base leaves a non-zero 2-bit group, which is
+folded to one flag bit and decoded from a per-byte table. Identical blocks
+are skipped with a single bytes comparison. Positions inside exception
+runs of either sequence are then decided on the actual characters.
+
+Public API:
+    BASES                                   — "TCAG", indexed by 2-bit code
+    PackedSequence(data, length, exceptions=())
+        .from_str(sequence) / .from_chunks(chunks)  — constructors
+        len(), [index], [start:stop]       — bases read from packed bytes
+        str(packed)                         — full decoding
+        .mismatches(other, start=0, end=None) -> list[int]
+        .exceptions -> list[tuple[int, int, str]]
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from typing import Iterable
+
+from scanner import find_mismatches
+
+BASES = "TCAG"
+
+# Raw ASCII → 2-bit code; every non-ACGT byte packs as T (code 0) and is
+# restored from the exception mask
+_CODES = bytes(
+    BASES.index(chr(byte).upper()) if chr(byte).upper() in BASES else 0
+    for byte in range(256)
+)
+_LETTERS = bytes.maketrans(bytes(range(4)), BASES.encode("ascii"))
+
+# Maximal runs of one repeated non-ACGT character, in uppercased bytes
+_EXCEPTION_RUN = re.compile(rb"([^ACGT])\1*")
+
+# Bases packed per from_chunks() step (a multiple of 4)
+_PACK_CHUNK = 1 << 20
+
+# Packed bytes XOR-ed at a time by mismatches()
+_BLOCK_BYTES = 1 << 14
+
+# Maps every non-zero byte to 1, to locate flagged bytes with bytes.find()
+_NONZERO = bytes([0] + [1] * 255)
+
+# Base offsets (0-3 within the byte) flagged by each folded XOR byte, whose
+# flag bits are 6, 4, 2 and 0
+_FLAGGED = [
+    tuple(offset for offset in range(4) if byte >> (6 - 2 * offset) & 1)
+    for byte in range(256)
+]
+
+
+def _pack(raw: bytes) -> bytes:
+    """Packs uppercase ASCII bases (length a multiple of 4, or the tail)."""
+    codes = raw.translate(_CODES)
+    if len(codes) % 4:
+        codes += bytes(4 - len(codes) % 4)
+    size = len(codes) // 4
+    value = 0
+    for shift, phase in ((6, 0), (4, 1), (2, 2), (0, 3)):
+        value |= int.from_bytes(codes[phase::4], "big") << shift
+    return value.to_bytes(size, "big")
+
+
+def _unpack(packed: bytes) -> bytearray:
+    """Decodes packed bytes into ASCII bases (four per byte)."""
+    size = len(packed)
+    value = int.from_bytes(packed, "big")
+    mask = int.from_bytes(b"\x03" * size, "big")
+    bases = bytearray(4 * size)
+    for shift, phase in ((6, 0), (4, 1), (2, 2), (0, 3)):
+        bases[phase::4] = ((value >> shift) & mask).to_bytes(size, "big")
+    return bases.translate(_LETTERS)
+
+
+class PackedSequence:
+    """Immutable, str-like DNA sequence stored at two bits per base.
+
+    Supports len(), indexing and slicing (step 1), which return str and
+    decode only the bytes they cover, so codon and window reads stay cheap
+    on genome-sized sequences.
+
+    Attributes:
+        data: Packed bytes (any bytes-like object, e.g. a memoryview of a
+            memory-mapped file); padding bits after the last base are 0.
+    """
+
+    def __init__(
+        self,
+        data: bytes,
+        length: int,
+        exceptions: Iterable[tuple[int, int, str]] = (),
+    ):
+        """
+        Args:
+            data: Packed bytes, at least ceil(length / 4) of them.
+            length: Number of bases.
+            exceptions: (start, length, char) runs of non-ACGT characters,
+                0-indexed, sorted and non-overlapping.
+
+        Raises:
+            ValueError: If data is shorter than length requires.
+        """
+        if len(data) * 4 < length:
+            raise ValueError(
+                f"{len(data)} packed bytes cannot hold {length} bases."
+            )
+        self.data = data
+        self._length = length
+        self._starts: list[int] = []
+        self._ends: list[int] = []
+        self._chars: list[str] = []
+        for start, run_length, char in exceptions:
+            self._starts.append(start)
+            self._ends.append(start + run_length)
+            self._chars.append(char)
+
+    @classmethod
+    def from_str(cls, sequence: str) -> "PackedSequence":
+        """Packs a sequence held in memory."""
+        return cls.from_chunks((sequence,))
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[str]) -> "PackedSequence":
+        """Packs a sequence given as consecutive pieces (e.g. FASTA lines).
+
+        Pieces are buffered and packed ~1 Mb at a time, so the unpacked
+        sequence is never held in full.
+        """
+        data = bytearray()
+        exceptions: list[list] = []
+        pending: list[str] = []
+        pending_size = 0
+        length = 0
+
+        def pack(text: str) -> None:
+            nonlocal length
+            raw = text.encode("ascii", "replace").upper()
+            for match in _EXCEPTION_RUN.finditer(raw):
+                start = length + match.start()
+                char = chr(match.group(1)[0])
+                previous = exceptions[-1] if exceptions else None
+                if previous and previous[0] + previous[1] == start and previous[2] == char:
+                    previous[1] += match.end() - match.start()
+                else:
+                    exceptions.append([start, match.end() - match.start(), char])
+            data.extend(_pack(raw))
+            length += len(raw)
+
+        for chunk in chunks:
+            pending.append(chunk)
+            pending_size += len(chunk)
+            if pending_size >= _PACK_CHUNK:
+                text = "".join(pending)
+                usable = len(text) - len(text) % 4
+                pack(text[:usable])
+                pending = [text[usable:]]
+                pending_size = len(pending[0])
+        pack("".join(pending))
+        return cls(bytes(data), length, map(tuple, exceptions))
+
+    @property
+    def exceptions(self) -> list[tuple[int, int, str]]:
+        """(start, length, char) runs of non-ACGT characters."""
+        return [
+            (start, end - start, char)
+            for start, end, char in zip(self._starts, self._ends, self._chars)
+        ]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _decode(self, start: int, stop: int) -> str:
+        """Returns bases [start, stop), with 0 <= start < stop <= length."""
+        first = start >> 2
+        bases = _unpack(self.data[first:(stop + 3) >> 2])
+        offset = first << 2
+        del bases[:start - offset]
+        del bases[stop - start:]
+        index = bisect_right(self._ends, start)
+        while index < len(self._starts) and self._starts[index] < stop:
+            lo = max(self._starts[index], start)
+            hi = min(self._ends[index], stop)
+            bases[lo - start:hi - start] = self._chars[index].encode("ascii") * (hi - lo)
+            index += 1
+        return bases.decode("ascii")
+
+    def __getitem__(self, key: int | slice) -> str:
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._length)
+            if step != 1:
+                raise ValueError("PackedSequence slices must have step 1.")
+            if start >= stop:
+                return ""
+            return self._decode(start, stop)
+        if key < 0:
+            key += self._length
+        if not 0 <= key < self._length:
+            raise IndexError("PackedSequence index out of range.")
+        return self._decode(key, key + 1)
+
+    def __str__(self) -> str:
+        return self[:]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, str):
+            return len(other) == self._length and str(self) == other.upper()
+        if not isinstance(other, PackedSequence):
+            return NotImplemented
+        size = (self._length + 3) >> 2
+        return (
+            self._length == other._length
+            and self.exceptions == other.exceptions
+            and self.data[:size] == other.data[:size]
+        )
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return (
+            f"PackedSequence(length={self._length}, "
+            f"exceptions={len(self._starts)})"
+        )
+
+    def _exception_ranges(self, start: int, end: int) -> list[tuple[int, int]]:
+        """Exception runs overlapping [start, end), clipped to it."""
+        index = bisect_right(self._ends, start)
+        ranges = []
+        while index < len(self._starts) and self._starts[index] < end:
+            ranges.append(
+                (max(self._starts[index], start), min(self._ends[index], end))
+            )
+            index += 1
+        return ranges
+
+    def mismatches(
+        self,
+        other: "PackedSequence",
+        start: int = 0,
+        end: int | None = None,
+    ) -> list[int]:
+        """Returns the 0-indexed positions where the two sequences differ.
+
+        Equivalent to scanner.find_mismatches(str(self), str(other), start,
+        end), computed on the packed bytes.
+
+        Args:
+            other: Sequence to compare with.
+            start: First 0-indexed position to compare. Default 0.
+            end: Position after the last one to compare. Defaults to the
+                length of the shorter sequence.
+
+        Returns:
+            list[int]: Sorted mismatch positions.
+        """
+        limit = min(self._length, len(other))
+        if end is None or end > limit:
+            end = limit
+        if start >= end:
+            return []
+
+        positions = []
+        ours, theirs = self.data, other.data
+        last_byte = (end + 3) >> 2
+        low_bits = int.from_bytes(b"\x55" * _BLOCK_BYTES, "big")
+        for block in range(start >> 2, last_byte, _BLOCK_BYTES):
+            block_end = min(block + _BLOCK_BYTES, last_byte)
+            mine = ours[block:block_end]
+            yours = theirs[block:block_end]
+            if mine == yours:
+                continue
+            size = block_end - block
+            diff = int.from_bytes(mine, "big") ^ int.from_bytes(yours, "big")
+            if size != _BLOCK_BYTES:
+                low_bits = int.from_bytes(b"\x55" * size, "big")
+            # Fold each differing 2-bit group onto its low bit
+            flags = ((diff | diff >> 1) & low_bits).to_bytes(size, "big")
+            find = flags.translate(_NONZERO).find
+            index = find(1)
+            while index != -1:
+                base = (block + index) << 2
+                positions.extend(base + offset for offset in _FLAGGED[flags[index]])
+                index = find(1, index + 1)
+        if positions and (positions[0] < start or positions[-1] >= end):
+            positions = positions[
+                bisect_left(positions, start):bisect_left(positions, end)
+            ]
+
+        ranges = sorted(
+            self._exception_ranges(start, end)
+            + other._exception_ranges(start, end)
+        )
+        if not ranges:
+            return positions
+        merged: list[list[int]] = []
+        for lo, hi in ranges:
+            if merged and lo <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], hi)
+            else:
+                merged.append([lo, hi])
+
+        # Packed codes are meaningless inside exception runs: drop those
+        # positions and compare the characters there instead
+        result = []
+        cursor = 0
+        for lo, hi in merged:
+            cut = bisect_left(positions, lo, cursor)
+            result.extend(positions[cursor:cut])
+            cursor = bisect_left(positions, hi, cut)
+            result.extend(
+                lo + offset
+                for offset in find_mismatches(self[lo:hi], other[lo:hi])
+            )
+        result.extend(positions[cursor:])
+        return result
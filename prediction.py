@@ -13,6 +13,17 @@ Classification thresholds:
     MODERATE      — score 51–100  (moderately different substitution)
     RADICAL       — score  >100   (chemically dissimilar substitution)
 
+Per-SNP lookups:
+    Amino acid changes and scores come from annotation.SUBSTITUTION_TABLE
+    (64 codons × 3 offsets × 4 bases) and a parallel Grantham table built
+    here at import, so no codon is translated per SNP.
+
+Batch entry points:
+    grantham_scores() scores position / alternate / annotation columns in
+    one pass; get_amino_acid_changes() and predict_functional_impacts()
+    read those columns from a VariantTable (or a list of SNP dicts) and go
+    through the same path.
+
 Future integration intent:
     SIFT (sift.bii.a-star.edu.sg) and PolyPhen-2 external APIs are
     planned for a future milestone. Current blockers:
@@ -28,13 +39,28 @@ Public API:
     translate_dna_to_protein(sequence, frame=1) -> list[str]
     get_amino_acid_change(snp, ref_sequence, frame=1)
         -> tuple[str, int, str] | None
+    get_amino_acid_changes(snps, ref_sequence, frame=1)
+        -> list[tuple[str, int, str] | None]
+        — one pass over a VariantTable or list of SNP dicts
     grantham_score(ref_aa, alt_aa) -> int | None
     grantham_prediction(score) -> str
     predict_functional_impact(snp, ref_sequence, frame=1) -> dict
+    predict_functional_impacts(snps, ref_sequence, frame=1) -> list[dict]
+        — grantham_scores() over a VariantTable or list of SNP dicts
+    grantham_scores(positions, alternates, annotations, ref_sequence,
+                    frame=1, window_start=0, length=None)
+        -> list[int | None]
+        — columnar scoring used for VariantTable (see variants.py)
 """
 
 import math
-from annotation import get_codon, translate_codon, reverse_complement
+from typing import Iterable, Sequence
+from annotation import (
+    SUBSTITUTION_TABLE,
+    reverse_complement,
+    substitution_key,
+    translate_codon,
+)
 
 # ---------------------------------------------------------------------------
 # Grantham (1974) physicochemical properties: (composition, polarity, volume)
@@ -112,9 +138,10 @@ def get_amino_acid_change(
 ) -> tuple[str, int, str] | None:
     """Returns the amino acid change for a NON_SYNONYMOUS SNP.
 
-    Constructs the alternate sequence from the SNP dict, retrieves both
-    codons via get_codon(), and returns the amino acids together with
-    the 1-indexed amino acid position in the protein.
+    Looks the substitution up in SUBSTITUTION_TABLE through
+    substitution_key(), which reads only the three reference bases of the
+    codon (no copy of the sequence is made), and returns the amino acids
+    together with the 1-indexed amino acid position in the protein.
 
     Args:
         snp: SNP dict as produced by detect_snps(). Must contain keys
@@ -129,19 +156,22 @@ def get_amino_acid_change(
     """
     if snp.get("annotation") != "NON_SYNONYMOUS":
         return None
-
-    position = snp["position"]
-    alt_base = snp["alternate"]
-
-    alt_sequence = (
-        ref_sequence[:position - 1] + alt_base + ref_sequence[position:]
+    return _amino_acid_change(
+        snp["position"], snp["alternate"], ref_sequence, frame
     )
 
-    ref_codon = get_codon(ref_sequence, position, frame)
-    if not ref_codon:
-        return None
 
-    ref_aa = translate_codon(ref_codon)
+def _amino_acid_change(
+    position: int,
+    alt_base: str,
+    ref_sequence: str,
+    frame: int,
+) -> tuple[str, int, str] | None:
+    """Core of get_amino_acid_change() for an already-filtered substitution."""
+    key = substitution_key(ref_sequence, position, alt_base, frame)
+    if key is None:
+        return None
+    effect = SUBSTITUTION_TABLE[key]
 
     if frame > 0:
         offset = frame - 1
@@ -151,10 +181,51 @@ def get_amino_acid_change(
         offset = abs(frame) - 1
         aa_position = (rev_pos - 1 - offset) // 3 + 1
 
-    alt_codon = get_codon(alt_sequence, position, frame)
-    alt_aa = translate_codon(alt_codon)
+    return (effect.ref_aa, aa_position, effect.alt_aa)
+
 
-    return (ref_aa, aa_position, alt_aa)
+def get_amino_acid_changes(
+    snps: Iterable[dict],
+    ref_sequence: str,
+    frame: int = 1,
+) -> list[tuple[str, int, str] | None]:
+    """Batch version of get_amino_acid_change() over a whole SNP list.
+
+    Reads the position, alternate and annotation columns once (straight
+    from the arrays of a VariantTable) and looks up every NON_SYNONYMOUS
+    substitution in SUBSTITUTION_TABLE, without per-SNP dict access.
+
+    Args:
+        snps: VariantTable, or SNP dicts as produced by detect_snps().
+        ref_sequence: Full reference DNA sequence (uppercase).
+        frame: Reading frame. One of {1, 2, 3, -1, -2, -3}. Default 1.
+
+    Returns:
+        list: One entry per SNP, in order — (ref_aa, aa_position, alt_aa)
+            for NON_SYNONYMOUS SNPs, None otherwise.
+    """
+    positions, alternates, annotations = _snp_columns(snps)
+    return [
+        _amino_acid_change(position, alt_base, ref_sequence, frame)
+        if annotation == "NON_SYNONYMOUS" else None
+        for position, alt_base, annotation
+        in zip(positions, alternates, annotations)
+    ]
+
+
+def _snp_columns(snps) -> tuple[Sequence[int], list[str], list[str | None]]:
+    """Position, alternate and annotation columns of a table or SNP list."""
+    if hasattr(snps, "column"):
+        # VariantTable (variants.py imports this module, not the reverse)
+        return (
+            snps.positions, snps.column("alternate"), snps.column("annotation")
+        )
+    snps = list(snps)
+    return (
+        [snp["position"] for snp in snps],
+        [snp["alternate"] for snp in snps],
+        [snp.get("annotation") for snp in snps],
+    )
 
 
 def grantham_score(ref_aa: str, alt_aa: str) -> int | None:
@@ -201,6 +272,35 @@ def grantham_prediction(score: int) -> str:
     return "RADICAL"
 
 
+# Grantham score of every SUBSTITUTION_TABLE entry (None unless both amino
+# acids are standard residues). Synonymous entries score 0: a SNP annotated
+# NON_SYNONYMOUS because of another SNP in its codon is scored on its own
+# substitution, as get_amino_acid_change() describes it. Kept here rather
+# than in the annotation table itself because annotation.py cannot import
+# this module.
+_GRANTHAM_TABLE: tuple[int | None, ...] = tuple(
+    grantham_score(effect.ref_aa, effect.alt_aa)
+    for effect in SUBSTITUTION_TABLE
+)
+
+
+def _substitution_score(
+    position: int,
+    alt_base: str,
+    ref_sequence: str,
+    frame: int,
+    window_start: int = 0,
+    length: int | None = None,
+) -> int | None:
+    """Grantham score of a substitution via the precomputed tables."""
+    key = substitution_key(
+        ref_sequence, position, alt_base, frame, window_start, length
+    )
+    if key is None:
+        return None
+    return _GRANTHAM_TABLE[key]
+
+
 def predict_functional_impact(
     snp: dict,
     ref_sequence: str,
@@ -223,12 +323,75 @@ def predict_functional_impact(
               when the SNP is NON_SYNONYMOUS and amino acids are known.
               {} for any other variant type.
     """
-    change = get_amino_acid_change(snp, ref_sequence, frame)
-    if change is None:
+    if snp.get("annotation") != "NON_SYNONYMOUS":
         return {}
+    return _impact_from_score(
+        _substitution_score(snp["position"], snp["alternate"], ref_sequence, frame)
+    )
+
+
+def predict_functional_impacts(
+    snps: Iterable[dict],
+    ref_sequence: str,
+    frame: int = 1,
+) -> list[dict]:
+    """Batch version of predict_functional_impact() over a whole SNP list.
+
+    Scores every SNP in one grantham_scores() pass over the position,
+    alternate and annotation columns.
+
+    Args:
+        snps: VariantTable, or SNP dicts as produced by detect_snps().
+        ref_sequence: Full reference DNA sequence (uppercase).
+        frame: Reading frame. One of {1, 2, 3, -1, -2, -3}. Default 1.
 
-    ref_aa, _aa_pos, alt_aa = change
-    score = grantham_score(ref_aa, alt_aa)
+    Returns:
+        list[dict]: One prediction dict per SNP, in order (see
+            predict_functional_impact()).
+    """
+    return [
+        _impact_from_score(score)
+        for score in grantham_scores(*_snp_columns(snps), ref_sequence, frame)
+    ]
+
+
+def grantham_scores(
+    positions: Iterable[int],
+    alternates: Iterable[str],
+    annotations: Iterable[str | None],
+    ref_sequence: str,
+    frame: int = 1,
+    window_start: int = 0,
+    length: int | None = None,
+) -> list[int | None]:
+    """Columnar Grantham scoring, without building per-variant dicts.
+
+    Args:
+        positions: 1-indexed variant positions.
+        alternates: Alternate bases, aligned with positions.
+        annotations: Annotation names, aligned with positions.
+        ref_sequence: Full reference DNA sequence (uppercase), or a window
+            of it covering every variant's codon (streaming detection).
+        frame: Reading frame. One of {1, 2, 3, -1, -2, -3}. Default 1.
+        window_start: 0-indexed coordinate of the window's first base.
+        length: Full reference length. Defaults to len(ref_sequence).
+
+    Returns:
+        list[int | None]: Grantham score for each NON_SYNONYMOUS variant
+            with known amino acids; None for every other variant.
+    """
+    return [
+        _substitution_score(
+            position, alt_base, ref_sequence, frame, window_start, length
+        )
+        if annotation == "NON_SYNONYMOUS" else None
+        for position, alt_base, annotation
+        in zip(positions, alternates, annotations)
+    ]
+
+
+def _impact_from_score(score: int | None) -> dict:
+    """Builds the prediction dict for a Grantham score (or None)."""
     if score is None:
         return {}
 
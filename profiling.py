@@ -0,0 +1,183 @@
+"""
+SNPTracker - Stage Timings and Profiling
+
+Per-stage instrumentation behind --timings and --profile. Pipeline code
+marks its stages with stage(name) (or timed(name, iterable) for lazily
+read inputs); while no recorder is enabled these are shared no-ops, so the
+markers cost nothing in normal runs.
+
+For each stage the recorder accumulates wall time, CPU time (of this
+process), the number of times the stage ran and the process memory
+high-water mark (max RSS) seen when it ended. Stages may nest: "detect"
+includes its "scan" and "annotate" parts. Work done in worker processes
+(--jobs) is only seen as the parent stage that waits for it.
+
+Public API:
+    StageRecorder()
+        .stage(name) — context manager timing one run of a stage
+        .timed(name, iterable) — iterator timing each next() as the stage
+        .to_dict() -> dict[str, dict]
+    enable() -> StageRecorder / disable() / active() -> StageRecorder | None
+    stage(name) / timed(name, iterable) — record on the active recorder
+    max_rss_mb() -> float | None
+    top_functions(profile, limit=20) -> list[dict] — from a cProfile.Profile
+    write_timings(path, document) / format_timings(stages) -> str
+"""
+
+import json
+import pstats
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Iterable, Iterator
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, memory is reported as None
+    resource = None
+
+# ru_maxrss is in bytes on macOS and in KiB elsewhere
+_RSS_UNIT = 1 if sys.platform == "darwin" else 1 << 10
+
+_NULL = nullcontext()
+_active: "StageRecorder | None" = None
+
+
+def max_rss_mb() -> float | None:
+    """Returns the memory high-water mark of this process, in MB."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss * _RSS_UNIT / (1 << 20)
+
+
+class StageRecorder:
+    """Accumulates wall time, CPU time, calls and max RSS per stage."""
+
+    def __init__(self):
+        self._stages: dict[str, list] = {}
+
+    def _add(self, name: str, wall: float, cpu: float) -> None:
+        totals = self._stages.get(name)
+        if totals is None:
+            totals = self._stages[name] = [0.0, 0.0, 0, None]
+        totals[0] += wall
+        totals[1] += cpu
+        totals[2] += 1
+        rss = max_rss_mb()
+        if rss is not None and (totals[3] is None or rss > totals[3]):
+            totals[3] = rss
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Times the enclosed block as one run of the stage."""
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self._add(
+                name, time.perf_counter() - wall, time.process_time() - cpu
+            )
+
+    def timed(self, name: str, iterable: Iterable) -> Iterator:
+        """Yields from iterable, timing each item's production as the stage."""
+        iterator = iter(iterable)
+        while True:
+            wall, cpu = time.perf_counter(), time.process_time()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self._add(
+                name, time.perf_counter() - wall, time.process_time() - cpu
+            )
+            yield item
+
+    def to_dict(self) -> dict[str, dict]:
+        """Returns {stage: {wall_s, cpu_s, calls, max_rss_mb}}, in first-run order."""
+        return {
+            name: {
+                "wall_s": round(wall, 6),
+                "cpu_s": round(cpu, 6),
+                "calls": calls,
+                "max_rss_mb": None if rss is None else round(rss, 1),
+            }
+            for name, (wall, cpu, calls, rss) in self._stages.items()
+        }
+
+
+def enable() -> StageRecorder:
+    """Starts recording stages on a new recorder and returns it."""
+    global _active
+    _active = StageRecorder()
+    return _active
+
+
+def disable() -> None:
+    """Stops recording; stage() and timed() become no-ops again."""
+    global _active
+    _active = None
+
+
+def active() -> StageRecorder | None:
+    """Returns the recorder in use, or None."""
+    return _active
+
+
+def stage(name: str):
+    """Context manager timing a stage on the active recorder, if any."""
+    if _active is None:
+        return _NULL
+    return _active.stage(name)
+
+
+def timed(name: str, iterable: Iterable) -> Iterable:
+    """Times each next() of iterable on the active recorder, if any."""
+    if _active is None:
+        return iterable
+    return _active.timed(name, iterable)
+
+
+def top_functions(profile, limit: int = 20) -> list[dict]:
+    """Returns the functions with the most cumulative time in a profile.
+
+    Args:
+        profile: A cProfile.Profile that has been run.
+        limit: Number of functions to return.
+
+    Returns:
+        list[dict]: {function, calls, total_s, cumulative_s}, slowest first.
+    """
+    stats = pstats.Stats(profile).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)
+    return [
+        {
+            "function": f"{path}:{line}({function})",
+            "calls": calls,
+            "total_s": round(total, 6),
+            "cumulative_s": round(cumulative, 6),
+        }
+        for (path, line, function), (_, calls, total, cumulative, _) in rows[:limit]
+    ]
+
+
+def write_timings(path: str, document: dict) -> None:
+    """Writes a timings document as JSON."""
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+        f.write("\n")
+
+
+def format_timings(stages: dict[str, dict]) -> str:
+    """Formats StageRecorder.to_dict() as a terminal table."""
+    lines = [
+        f"{'Etapa':<12} {'Parede (s)':>11} {'CPU (s)':>10} "
+        f"{'Chamadas':>9} {'RSS máx. (MB)':>14}"
+    ]
+    for name, values in stages.items():
+        rss = values["max_rss_mb"]
+        lines.append(
+            f"{name:<12} {values['wall_s']:>11.4f} {values['cpu_s']:>10.4f} "
+            f"{values['calls']:>9} {'-' if rss is None else f'{rss:.1f}':>14}"
+        )
+    return "\n".join(lines)
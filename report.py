@@ -0,0 +1,159 @@
+"""
+SNPTracker - Report Output
+
+Formats variants for the terminal and the text report file without ever
+touching the full input sequences: reports are O(variants), never
+O(sequence length).
+
+    - summarize_sequence() caps what is shown of an input sequence.
+    - ReportWriter streams rows to the report file as variants are
+      produced (chunk by chunk in --stream mode), through a buffered spool
+      file, so the total can still be written in the header.
+
+Report file format (unchanged):
+    SNPTRACKER - RELATÓRIO DE SNPs
+    ============================================================
+
+    Total de SNPs: N
+
+    Posição    Ref   Alt   Tipo            Anotação             Contexto
+    ----------------------------------------------------------------------
+    <one fixed-width row per variant>
+
+Public API:
+    SEQUENCE_PREVIEW                      — default summary length (bases)
+    summarize_sequence(sequence, limit=SEQUENCE_PREVIEW) -> str
+    format_row(row) -> str                — fixed-width columns of one
+                                            VariantTable.iter_tuples() row
+    ReportWriter(output_file, buffer_size=DEFAULT_BUFFER_SIZE)
+        .write(snps) / .close()           — streaming report file sink
+        (also a context manager)
+"""
+
+import os
+import shutil
+import tempfile
+
+from prediction import grantham_prediction
+from variants import VariantTable
+
+# Longest sequence shown verbatim in the terminal report; longer ones are
+# shown as head...tail plus their length
+SEQUENCE_PREVIEW = 60
+
+DEFAULT_BUFFER_SIZE = 1 << 20
+
+_FILE_HEADER = (
+    f"{'Posição':<10} {'Ref':<5} {'Alt':<5} {'Tipo':<15} "
+    f"{'Anotação':<20} {'Contexto'}\n"
+)
+
+
+def summarize_sequence(sequence: str, limit: int = SEQUENCE_PREVIEW) -> str:
+    """Returns a size-capped preview of a sequence for display.
+
+    Args:
+        sequence: Sequence to display.
+        limit: Longest sequence returned unchanged. Default SEQUENCE_PREVIEW.
+
+    Returns:
+        str: The sequence itself if it has at most `limit` bases, otherwise
+            its first and last limit // 2 bases joined by '...' and followed
+            by the total length, e.g. 'ACGT...TTGA (3100000000 bp)'.
+    """
+    if len(sequence) <= limit:
+        return sequence
+    half = limit // 2
+    return f"{sequence[:half]}...{sequence[-half:]} ({len(sequence)} bp)"
+
+
+def format_row(row: tuple) -> str:
+    """Formats the fixed-width columns of one VariantTable.iter_tuples() row."""
+    position, ref, alt, type_, annotation, context, _score = row
+    return (
+        f"{position:<10} {ref:<5} "
+        f"{alt:<5} {type_ or '':<15} "
+        f"{annotation or '':<20} "
+        f"{context or 'N/A'}"
+    )
+
+
+class ReportWriter:
+    """Streaming sink for the text report file.
+
+    Rows are formatted and written as soon as write() receives them; only
+    the running count is kept in memory. Because the header states the
+    total, rows go to a buffered spool file in the output directory and are
+    copied behind the header on close().
+
+    Attributes:
+        output_file: Path of the report file.
+        count: Number of variants written so far.
+    """
+
+    def __init__(self, output_file: str, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        """Opens the spool file next to output_file.
+
+        Args:
+            output_file: Path of the report file (written on close()).
+            buffer_size: Write buffer size in bytes.
+        """
+        self.output_file = output_file
+        self.count = 0
+        self._buffer_size = buffer_size
+        self._rows = tempfile.TemporaryFile(
+            "w+",
+            buffering=buffer_size,
+            encoding="utf-8",
+            dir=os.path.dirname(os.path.abspath(output_file)),
+        )
+
+    def write(self, snps: VariantTable | list[dict]) -> None:
+        """Appends the rows of a batch of variants.
+
+        Args:
+            snps: VariantTable or list of SNP dicts.
+        """
+        table = VariantTable.from_records(snps)
+        lines = []
+        for row in table.iter_tuples():
+            line = format_row(row)
+            score = row[6]
+            if score is not None:
+                line += f"  {score} ({grantham_prediction(score)})"
+            lines.append(line)
+        if lines:
+            self._rows.write("\n".join(lines) + "\n")
+        self.count += len(lines)
+
+    def close(self) -> None:
+        """Writes the report file (header, then every row) and cleans up."""
+        if self._rows.closed:
+            return
+        try:
+            self._rows.flush()
+            self._rows.seek(0)
+            with open(
+                self.output_file, "w", buffering=self._buffer_size
+            ) as f:
+                f.write("SNPTRACKER - RELATÓRIO DE SNPs\n")
+                f.write("=" * 60 + "\n\n")
+                f.write(f"Total de SNPs: {self.count}\n\n")
+                f.write(_FILE_HEADER)
+                f.write("-" * 70 + "\n")
+                shutil.copyfileobj(self._rows, f, self._buffer_size)
+        finally:
+            self._rows.close()
+
+    def discard(self) -> None:
+        """Drops the buffered rows without writing the report file."""
+        self._rows.close()
+
+    def __enter__(self) -> "ReportWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
@@ -0,0 +1,112 @@
+"""
+SNPTracker - Mismatch Scanner
+
+Locates the positions at which two sequences differ without walking them
+one Python character at a time. Both sequences are compared block by
+block: identical blocks are skipped with a single string comparison (a
+C-level memcmp), and differing blocks are XOR-ed as big integers so that
+only the mismatching bytes are ever visited from Python.
+
+Assumptions:
+    - Sequences are plain strings already normalised to the same case.
+    - Positions are 0-indexed and only the overlapping range
+      [start, min(len(reference), len(sample))) is compared.
+
+Public API:
+    find_mismatches(reference, sample, start=0, end=None) -> list[int]
+        — sorted 0-indexed positions where the two sequences differ
+    iter_mismatches(reference, sample, start=0, end=None) -> Iterator[int]
+        — lazy variant of find_mismatches, yields positions in order
+"""
+
+from itertools import compress, count
+from operator import ne
+from typing import Iterator
+
+# Sequences are compared one block at a time; identical blocks are skipped
+# with a single string comparison.
+_BLOCK_SIZE = 1 << 16
+
+# Maps every non-zero byte to 1, so differing positions can be located with
+# bytes.find() once the XOR of two blocks has been taken.
+_NONZERO = bytes([0] + [1] * 255)
+
+
+def _block_mismatches(ref_block: str, smp_block: str) -> Iterator[int]:
+    """Yields the offsets at which two equal-length blocks differ.
+
+    Both blocks are encoded to bytes, read as big integers and XOR-ed, so
+    every equal base becomes a zero byte. Blocks holding characters outside
+    Latin-1 fall back to a C-level pairwise comparison.
+    """
+    try:
+        ref_bytes = ref_block.encode("latin-1")
+        smp_bytes = smp_block.encode("latin-1")
+    except UnicodeEncodeError:
+        yield from compress(count(), map(ne, ref_block, smp_block))
+        return
+
+    diff = (
+        int.from_bytes(ref_bytes, "big") ^ int.from_bytes(smp_bytes, "big")
+    ).to_bytes(len(ref_bytes), "big").translate(_NONZERO)
+    find = diff.find
+    offset = find(1)
+    while offset != -1:
+        yield offset
+        offset = find(1, offset + 1)
+
+
+def iter_mismatches(
+    reference: str,
+    sample: str,
+    start: int = 0,
+    end: int | None = None,
+) -> Iterator[int]:
+    """Yields the 0-indexed positions where reference and sample differ.
+
+    Args:
+        reference: Reference sequence.
+        sample: Sample sequence (same case as the reference).
+        start: First 0-indexed position to compare. Default 0.
+        end: Position after the last one to compare. Defaults to the
+            length of the shorter sequence.
+
+    Yields:
+        int: Mismatch positions in increasing order.
+    """
+    limit = min(len(reference), len(sample))
+    if end is None or end > limit:
+        end = limit
+
+    for block_start in range(start, end, _BLOCK_SIZE):
+        block_end = min(block_start + _BLOCK_SIZE, end)
+        ref_block = reference[block_start:block_end]
+        smp_block = sample[block_start:block_end]
+        if ref_block == smp_block:
+            continue
+        for offset in _block_mismatches(ref_block, smp_block):
+            yield block_start + offset
+
+
+def find_mismatches(
+    reference: str,
+    sample: str,
+    start: int = 0,
+    end: int | None = None,
+) -> list[int]:
+    """Returns the 0-indexed positions where reference and sample differ.
+
+    Equivalent to ``[i for i in range(start, end) if reference[i] !=
+    sample[i]]`` but skips identical stretches in bulk.
+
+    Args:
+        reference: Reference sequence.
+        sample: Sample sequence (same case as the reference).
+        start: First 0-indexed position to compare. Default 0.
+        end: Position after the last one to compare. Defaults to the
+            length of the shorter sequence.
+
+    Returns:
+        list[int]: Sorted mismatch positions.
+    """
+    return list(iter_mismatches(reference, sample, start, end))
@@ -0,0 +1,217 @@
+"""
+SNPTracker - Divergence Summaries
+
+Per-sample QC counters behind --summary: SNP count and divergence,
+transitions / transversions and Ti/Tv, annotation class counts, INDEL
+bases and the COSMIC 96-channel trinucleotide (SBS) spectrum.
+
+The counters are filled window by window straight from the mismatch scan
+(add_window), without building a VariantTable: types come from a bulk byte
+classification (variants.snp_type_codes) and spectrum channels from one
+counting pass over the (5', ref, alt, 3') base tuples of the window. Only
+annotation, which reads codons, is computed per SNP, and only when asked
+for. A summary holds a fixed number of counters, so memory per sample is
+O(1) whatever the sequence size.
+
+Spectrum channels follow the COSMIC convention: substitutions are named
+from the pyrimidine strand, so a G>T in A_C context counts as G[C>A]T.
+SNPs at the sequence edges or touching non-ACGT bases have no channel.
+
+Public API:
+    SPECTRUM_CHANNELS — the 96 channels, e.g. "A[C>A]A", in COSMIC order
+    COLUMNS           — TSV header of summary rows
+    DivergenceSummary(name="", annotations=True, spectrum=True)
+        .add_window(ref, smp, mismatches, annotations=None)
+        .ti_tv -> float | None / .divergence -> float | None
+        .spectrum() -> dict[str, int] / .row() -> list[str]
+    write_summaries(file_path, summaries) -> int
+"""
+
+from collections import Counter
+from typing import Iterable
+
+from variants import TYPES, snp_type_codes
+
+SUBSTITUTIONS = ("C>A", "C>G", "C>T", "T>A", "T>C", "T>G")
+SPECTRUM_CHANNELS = tuple(
+    f"{five}[{substitution}]{three}"
+    for substitution in SUBSTITUTIONS
+    for five in "ACGT"
+    for three in "ACGT"
+)
+
+_ANNOTATION_COLUMNS = ("SYNONYMOUS", "NON_SYNONYMOUS", "NONSENSE", "NON_CODING")
+
+COLUMNS = (
+    "sample", "compared", "snps", "divergence", "transitions",
+    "transversions", "ti_tv", "insertions", "deletions",
+    *(name.lower() for name in _ANNOTATION_COLUMNS),
+    *SPECTRUM_CHANNELS,
+)
+
+_TRANSITION = TYPES.index("TRANSITION")
+_COMPLEMENT = str.maketrans("ACGT", "TGCA")
+
+
+def _channel_index() -> dict[tuple[str, str, str, str], int]:
+    """(5', ref, alt, 3') on either strand → index into SPECTRUM_CHANNELS."""
+    index = {}
+    for code, channel in enumerate(SPECTRUM_CHANNELS):
+        five, ref, alt, three = channel[0], channel[2], channel[4], channel[6]
+        index[five, ref, alt, three] = code
+        reverse = (three, ref, alt, five)
+        index[tuple(base.translate(_COMPLEMENT) for base in reverse)] = code
+    return index
+
+
+_CHANNELS = _channel_index()
+
+
+class DivergenceSummary:
+    """Divergence counters of one sample against the reference.
+
+    Attributes:
+        name: Sample name (first column of the row).
+        compared: Bases compared position by position (the shorter length).
+        snps: Mismatches found.
+        transitions / transversions: SNPs of each type.
+        insertions / deletions: INDEL bases (length difference).
+        annotations: Count per annotation class, or None if not computed.
+    """
+
+    def __init__(
+        self, name: str = "", annotations: bool = True, spectrum: bool = True
+    ):
+        """
+        Args:
+            name: Sample name.
+            annotations: Whether annotation classes will be counted.
+            spectrum: Whether the 96-channel spectrum will be counted.
+        """
+        self.name = name
+        self.compared = 0
+        self.snps = 0
+        self.transitions = 0
+        self.transversions = 0
+        self.insertions = 0
+        self.deletions = 0
+        self.annotations: dict[str, int] | None = None
+        if annotations:
+            self.annotations = dict.fromkeys(_ANNOTATION_COLUMNS, 0)
+        self._spectrum: list[int] | None = [0] * 96 if spectrum else None
+
+    def add_window(
+        self,
+        ref: str,
+        smp: str,
+        mismatches: list[int],
+        annotations: Iterable[str] | None = None,
+    ) -> None:
+        """Counts the SNPs of one scanned window.
+
+        Args:
+            ref: Uppercase reference window (or whole sequence). Outside the
+                sequence ends it must extend one base past the mismatches,
+                for their trinucleotide context.
+            smp: Uppercase sample window with the same start.
+            mismatches: Sorted mismatch positions, as window coordinates.
+            annotations: Annotation class of each mismatch, when counted.
+        """
+        if not mismatches:
+            return
+        ref_bases = "".join(map(ref.__getitem__, mismatches))
+        alt_bases = "".join(map(smp.__getitem__, mismatches))
+        count = len(mismatches)
+        transitions = snp_type_codes(
+            ref_bases.encode("latin-1"), alt_bases.encode("latin-1")
+        ).count(_TRANSITION)
+        self.snps += count
+        self.transitions += transitions
+        self.transversions += count - transitions
+
+        if self.annotations is not None and annotations is not None:
+            for name, total in Counter(annotations).items():
+                self.annotations[name] += total
+
+        if self._spectrum is not None:
+            # SNPs on the sequence edges have no full trinucleotide context
+            first = 1 if mismatches[0] == 0 else 0
+            last = count - 1 if mismatches[-1] >= len(ref) - 1 else count
+            inner = mismatches[first:last]
+            tuples = Counter(zip(
+                map(ref.__getitem__, map((-1).__add__, inner)),
+                ref_bases[first:last],
+                alt_bases[first:last],
+                map(ref.__getitem__, map((1).__add__, inner)),
+            ))
+            for key, total in tuples.items():
+                channel = _CHANNELS.get(key)
+                if channel is not None:
+                    self._spectrum[channel] += total
+
+    @property
+    def ti_tv(self) -> float | None:
+        """Transitions / transversions, or None without transversions."""
+        if not self.transversions:
+            return None
+        return self.transitions / self.transversions
+
+    @property
+    def divergence(self) -> float | None:
+        """SNPs per compared base, or None if nothing was compared."""
+        if not self.compared:
+            return None
+        return self.snps / self.compared
+
+    def spectrum(self) -> dict[str, int] | None:
+        """Returns {channel: count} in COSMIC order, or None if not counted."""
+        if self._spectrum is None:
+            return None
+        return dict(zip(SPECTRUM_CHANNELS, self._spectrum))
+
+    def row(self) -> list[str]:
+        """Returns the TSV fields of this summary, matching COLUMNS.
+
+        Counters that were not computed are empty fields.
+        """
+        ti_tv, divergence = self.ti_tv, self.divergence
+        fields = [
+            self.name,
+            str(self.compared),
+            str(self.snps),
+            "" if divergence is None else f"{divergence:.6g}",
+            str(self.transitions),
+            str(self.transversions),
+            "" if ti_tv is None else f"{ti_tv:.4f}",
+            str(self.insertions),
+            str(self.deletions),
+        ]
+        if self.annotations is None:
+            fields += [""] * len(_ANNOTATION_COLUMNS)
+        else:
+            fields += [str(self.annotations[name]) for name in _ANNOTATION_COLUMNS]
+        if self._spectrum is None:
+            fields += [""] * len(SPECTRUM_CHANNELS)
+        else:
+            fields += map(str, self._spectrum)
+        return fields
+
+
+def write_summaries(
+    file_path: str, summaries: Iterable[DivergenceSummary]
+) -> int:
+    """Writes summaries as a TSV file, one row per sample.
+
+    Rows are written as the summaries are produced, so an iterator of them
+    is never held in memory.
+
+    Returns:
+        int: Number of rows written.
+    """
+    count = 0
+    with open(file_path, "w") as f:
+        f.write("\t".join(COLUMNS) + "\n")
+        for summary in summaries:
+            f.write("\t".join(summary.row()) + "\n")
+            count += 1
+    return count
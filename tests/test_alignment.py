@@ -0,0 +1,158 @@
+"""Tests for alignment.py — banded alignment of reference and sample."""
+
+import random
+import unittest
+from alignment import Anchor, Edit, find_anchors, iter_edits, iter_seeded_edits
+
+
+def _apply(reference: str, edits: list[Edit]) -> str:
+    """Rebuilds the sample by applying edits to the reference."""
+    parts = []
+    cursor = 0
+    for position, ref_bases, alt_bases in edits:
+        parts.append(reference[cursor:position - 1])
+        parts.append(alt_bases)
+        cursor = position - 1 + len(ref_bases)
+    parts.append(reference[cursor:])
+    return "".join(parts)
+
+
+def _mutate(rng: random.Random, reference: str, count: int) -> str:
+    sample = list(reference)
+    for _ in range(count):
+        if not sample:
+            break
+        k = rng.randrange(len(sample))
+        roll = rng.random()
+        if roll < 0.6:
+            sample[k] = rng.choice("ACGT")
+        elif roll < 0.8:
+            del sample[k:k + rng.randint(1, 12)]
+        else:
+            sample[k:k] = rng.choices("ACGT", k=rng.randint(1, 12))
+    return "".join(sample)
+
+
+class TestIterEdits(unittest.TestCase):
+
+    def test_identical_sequences(self):
+        self.assertEqual(list(iter_edits("ACGTACGT", "ACGTACGT")), [])
+
+    def test_substitution(self):
+        self.assertEqual(
+            list(iter_edits("ACGTACGTACGT", "ACGTTCGTACGT")),
+            [Edit(5, "A", "T")],
+        )
+
+    def test_mid_sequence_deletion_is_not_shifted_into_snps(self):
+        """Bases after an indel are compared in step again."""
+        reference = "ATGCCGTAGGCTTACGATCGGATCCA"
+        sample = reference[:10] + reference[13:]
+        self.assertEqual(
+            list(iter_edits(reference, sample)), [Edit(11, "CTT", "")]
+        )
+
+    def test_insertion_position_is_the_following_base(self):
+        reference = "ACGTACGTAGCTAGCTAGGATC"
+        sample = "ACGTACGTAGGGGCTAGCTAGGATC"
+        self.assertEqual(
+            list(iter_edits(reference, sample)), [Edit(10, "", "GGG")]
+        )
+
+    def test_indels_are_left_aligned(self):
+        """An indel in a repeat is reported at its leftmost position."""
+        self.assertEqual(
+            list(iter_edits("CAAATGCATGCATCGA", "CAATGCATGCATCGA")),
+            [Edit(2, "A", "")],
+        )
+
+    def test_tails(self):
+        self.assertEqual(list(iter_edits("ACGTT", "ACG")), [Edit(4, "TT", "")])
+        self.assertEqual(list(iter_edits("", "AC")), [Edit(1, "", "AC")])
+
+    def test_edits_rebuild_the_sample(self):
+        """Applying the edits to the reference always yields the sample."""
+        rng = random.Random(17)
+        for _ in range(200):
+            reference = "".join(rng.choices("ACGT", k=rng.randint(0, 2000)))
+            sample = _mutate(rng, reference, rng.randint(0, 25))
+            band = rng.choice((1, 4, 32))
+            edits = list(iter_edits(reference, sample, band))
+            self.assertEqual(_apply(reference, edits), sample)
+            positions = [edit.position for edit in edits]
+            self.assertEqual(positions, sorted(positions))
+
+    def test_band_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            list(iter_edits("ACGT", "ACGT", band=0))
+
+
+class TestSeededEdits(unittest.TestCase):
+
+    def test_identical_sequences_are_one_anchor(self):
+        rng = random.Random(2)
+        reference = "".join(rng.choices("ACGT", k=5000))
+        self.assertEqual(
+            find_anchors(reference, reference), [Anchor(0, 0, 5000)]
+        )
+
+    def test_anchors_are_collinear(self):
+        """A duplicated block in the sample is left out of the chain."""
+        rng = random.Random(4)
+        reference = "".join(rng.choices("ACGT", k=3000))
+        sample = reference[:2000] + reference[500:700] + reference[2000:]
+        anchors = find_anchors(reference, sample)
+        for first, second in zip(anchors, anchors[1:]):
+            self.assertLessEqual(
+                first.reference_start + first.length, second.reference_start
+            )
+            self.assertLessEqual(
+                first.sample_start + first.length, second.sample_start
+            )
+        self.assertEqual(len(anchors), 2)
+        edits = list(iter_seeded_edits(reference, sample))
+        self.assertEqual(len(edits), 1)
+        self.assertEqual(len(edits[0].alternate), 200)
+        self.assertEqual(_apply(reference, edits), sample)
+
+    def test_structural_deletion_is_one_edit(self):
+        rng = random.Random(6)
+        reference = "".join(rng.choices("ACGT", k=20000))
+        sample = reference[:5000] + reference[12000:]
+        self.assertEqual(
+            list(iter_seeded_edits(reference, sample)),
+            [Edit(5001, reference[5000:12000], "")],
+        )
+
+    def test_seeded_edits_rebuild_the_sample(self):
+        rng = random.Random(23)
+        for _ in range(100):
+            reference = "".join(rng.choices("ACGT", k=rng.randint(0, 3000)))
+            sample = _mutate(rng, reference, rng.randint(0, 25))
+            seed_length = rng.choice((4, 11, 16))
+            edits = list(iter_seeded_edits(reference, sample, seed_length))
+            self.assertEqual(_apply(reference, edits), sample)
+
+    def test_gaps_go_through_mapper(self):
+        """Gap batches are aligned through the given map()-like callable."""
+        calls = []
+
+        def mapper(fn, *iterables):
+            calls.append(fn)
+            return map(fn, *iterables)
+
+        reference = "ACGTTGCAAGCTTACGGATCCTAGGCATGCAAGTCCGATTGCA"
+        sample = reference[:20] + "T" + reference[21:]
+        self.assertEqual(
+            list(iter_seeded_edits(reference, sample, 8, mapper=mapper)),
+            list(iter_edits(reference, sample)),
+        )
+        self.assertEqual(len(calls), 1)
+
+    def test_seed_length_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            find_anchors("ACGT", "ACGT", seed_length=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
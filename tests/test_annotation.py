@@ -1,10 +1,16 @@
+import random
 import unittest
 from annotation import (
     annotate_snp,
     annotate_snp_with_regions,
+    annotate_substitution,
+    CdsIndex,
     get_codon,
     is_in_cds,
     reverse_complement,
+    ReverseStrand,
+    substitution_key,
+    SUBSTITUTION_TABLE,
     translate_codon,
 )
 
@@ -165,6 +171,39 @@ class TestIsInCds(unittest.TestCase):
         self.assertFalse(is_in_cds(60, [(10, 50), (70, 120)]))
 
 
+class TestCdsIndex(unittest.TestCase):
+
+    def test_overlapping_and_adjacent_regions_are_merged(self):
+        """Unsorted, overlapping and adjacent regions collapse together."""
+        index = CdsIndex([(70, 120), (10, 50), (40, 60), (121, 130)])
+        self.assertEqual(list(index), [(10, 60), (70, 130)])
+
+    def test_contains_uses_inclusive_bounds(self):
+        """Membership matches is_in_cds() on the raw regions."""
+        regions = [(10, 50), (70, 120)]
+        index = CdsIndex(regions)
+        for position in range(1, 130):
+            self.assertEqual(position in index, is_in_cds(position, regions))
+
+    def test_empty_index_contains_nothing(self):
+        """An empty region list yields an index with no members."""
+        self.assertNotIn(5, CdsIndex([]))
+
+    def test_mask_sweeps_sorted_positions(self):
+        """mask() flags each sorted position in a single pass."""
+        index = CdsIndex([(10, 50), (70, 120)])
+        self.assertEqual(
+            index.mask([1, 10, 50, 60, 70, 120, 121]),
+            [False, True, True, False, True, True, False],
+        )
+
+    def test_is_in_cds_accepts_index(self):
+        """is_in_cds() accepts a prebuilt CdsIndex."""
+        index = CdsIndex([(10, 50)])
+        self.assertTrue(is_in_cds(10, index))
+        self.assertFalse(is_in_cds(51, index))
+
+
 class TestAnnotateSnpWithRegions(unittest.TestCase):
 
     def test_none_regions_behaves_like_annotate_snp(self):
@@ -315,6 +354,51 @@ class TestGetCodonWithFrame(unittest.TestCase):
         # pos=8 → rev_pos=2; offset=1; adjusted=0; codon_start=1 → "CGT"
         self.assertEqual(get_codon(self.SEQ, 8, frame=-2), "CGT")
 
+    def test_frame_minus3_matches_full_reverse_complement(self):
+        """Reverse-frame lookup equals slicing the full reverse strand."""
+        # rev_comp = ACGTTTAGC; frame -3 codons: AC|GTT|TAG|C
+        self.assertEqual(get_codon(self.SEQ, 7, frame=-3), "GTT")
+        self.assertEqual(get_codon(self.SEQ, 4, frame=-3), "TAG")
+        self.assertEqual(get_codon(self.SEQ, 1, frame=-3), "")
+
+    def test_reverse_frame_ignores_invalid_bases_outside_codon(self):
+        """Only the codon's own bases are complemented and validated."""
+        # pos 9 → codon ACG on the reverse strand; the N is not part of it
+        self.assertEqual(get_codon("NCTAAACGT", 9, frame=-1), "ACG")
+
+    def test_reverse_frame_invalid_base_inside_codon_raises(self):
+        """A non-ACGT base inside the reverse-frame codon raises ValueError."""
+        with self.assertRaises(ValueError):
+            get_codon("GCTAAACGN", 9, frame=-1)
+
+
+class TestReverseStrand(unittest.TestCase):
+    SEQ = "GCTAAACGT"
+
+    def test_sequence_is_reverse_complement(self):
+        """The context holds the precomputed reverse complement."""
+        self.assertEqual(ReverseStrand(self.SEQ).sequence, "ACGTTTAGC")
+
+    def test_position_is_mirrored(self):
+        """Forward position 9 of 9 is reverse position 1."""
+        strand = ReverseStrand(self.SEQ)
+        self.assertEqual(strand.position(9), 1)
+        self.assertEqual(strand.position(1), 9)
+
+    def test_codon_matches_get_codon(self):
+        """codon() agrees with get_codon() for every reverse frame."""
+        strand = ReverseStrand(self.SEQ)
+        for frame in (-1, -2, -3):
+            for pos in range(1, len(self.SEQ) + 1):
+                self.assertEqual(
+                    strand.codon(pos, frame), get_codon(self.SEQ, pos, frame)
+                )
+
+    def test_codon_forward_frame_raises(self):
+        """Forward frames are rejected by the reverse-strand context."""
+        with self.assertRaises(ValueError):
+            ReverseStrand(self.SEQ).codon(1, frame=1)
+
 
 class TestAnnotateSnpFrame(unittest.TestCase):
 
@@ -447,10 +531,125 @@ class TestAnnotateSnpRobustness(unittest.TestCase):
         """Frame -2 with invalid sequence → NON_CODING, not crash."""
         self.assertEqual(annotate_snp(1, "REF.FASTA", "ACTG", frame=-2), "NON_CODING")
 
+    def test_reverse_frame_n_outside_codon_does_not_affect_annotation(self):
+        """Frame -1: only the SNP's own codon is read, so an N elsewhere is ignored.
+
+        Before codons were looked up in place, the whole sequence was
+        reverse-complemented and any N made every reverse-frame SNP
+        NON_CODING.
+        """
+        ref, alt = "NAGCAACCATGC", "NAGCAACGATGC"  # codon 7-9 on the - strand
+        self.assertEqual(annotate_snp(8, ref, alt, frame=-1), "NON_SYNONYMOUS")
+        self.assertEqual(
+            annotate_snp(8, ref, alt, frame=-1),
+            annotate_snp(8, "A" + ref[1:], "A" + alt[1:], frame=-1),
+        )
+        self.assertEqual(get_codon(ref, 8, frame=-1), "TGG")
+        self.assertEqual(annotate_snp(2, "AN" + ref[2:], "AG" + ref[2:], -1), "NON_CODING")
+
     def test_forward_frame_invalid_sequence_already_non_coding(self):
         """Forward frame with invalid bases already returns NON_CODING (pre-existing)."""
         self.assertEqual(annotate_snp(1, "REF.FASTA", "SAM.FASTA", frame=1), "NON_CODING")
 
 
+def _annotate_by_codons(position, ref, alt, frame):
+    """Reference implementation: extract and translate both codons."""
+    try:
+        ref_codon = get_codon(ref, position, frame)
+        alt_codon = get_codon(alt, position, frame)
+        if not ref_codon:
+            return "NON_CODING"
+        ref_aa, alt_aa = translate_codon(ref_codon), translate_codon(alt_codon)
+    except ValueError:
+        return "NON_CODING"
+    if alt_aa == "STOP":
+        return "NONSENSE"
+    return "SYNONYMOUS" if ref_aa == alt_aa else "NON_SYNONYMOUS"
+
+
+class TestSubstitutionTable(unittest.TestCase):
+
+    def test_table_has_one_entry_per_codon_offset_base(self):
+        self.assertEqual(len(SUBSTITUTION_TABLE), 64 * 3 * 4)
+
+    def test_entries_match_translation(self):
+        """Every entry agrees with translating the substituted codon."""
+        bases = "ACGT"
+        for i, codon in enumerate(a + b + c for a in bases for b in bases for c in bases):
+            for offset in range(3):
+                for base_index, base in enumerate(bases):
+                    alt = codon[:offset] + base + codon[offset + 1:]
+                    effect = SUBSTITUTION_TABLE[(i * 3 + offset) * 4 + base_index]
+                    self.assertEqual(effect.ref_aa, translate_codon(codon))
+                    self.assertEqual(effect.alt_aa, translate_codon(alt))
+
+    def test_substitution_key_reverse_frame(self):
+        """Reverse frames index the reverse-complement codon and base."""
+        # frame -1 on "ATGCCC": position 6 is the first base of GGG, and a
+        # forward A reads as T on the reverse strand → TGG
+        key = substitution_key("ATGCCC", 6, "A", frame=-1)
+        self.assertEqual(SUBSTITUTION_TABLE[key].ref_aa, "Gly")
+        self.assertEqual(SUBSTITUTION_TABLE[key].alt_aa, "Trp")
+
+    def test_substitution_key_non_coding_is_none(self):
+        self.assertIsNone(substitution_key("ATGC", 4, "A"))
+        self.assertIsNone(substitution_key("ATNC", 1, "A"))
+        self.assertIsNone(substitution_key("ATGC", 1, "N"))
+
+    def test_annotate_substitution(self):
+        self.assertEqual(annotate_substitution("TGG", 3, "A"), "NONSENSE")
+        self.assertEqual(annotate_substitution("GTG", 1, "A"), "NON_SYNONYMOUS")
+        self.assertEqual(annotate_substitution("AT", 1, "G"), "NON_CODING")
+
+    def test_annotate_snp_matches_codon_translation(self):
+        """Table lookups agree with codon translation, incl. codon MNVs."""
+        rng = random.Random(9)
+        for _ in range(300):
+            ref = "".join(rng.choice("ACGT") for _ in range(rng.randint(3, 12)))
+            alt = list(ref)
+            for i in rng.sample(range(len(ref)), rng.randint(1, 3)):
+                alt[i] = rng.choice("ACGT")
+            alt = "".join(alt)
+            for frame in (1, 2, 3, -1, -2, -3):
+                for position in range(1, len(ref) + 1):
+                    self.assertEqual(
+                        annotate_snp(position, ref, alt, frame),
+                        _annotate_by_codons(position, ref, alt, frame),
+                        (ref, alt, position, frame),
+                    )
+
+    def test_annotate_snp_unequal_lengths_matches_codon_translation(self):
+        """Each sequence places its own reverse-frame codons."""
+        rng = random.Random(11)
+        for _ in range(200):
+            ref = "".join(rng.choice("ACGT") for _ in range(rng.randint(3, 12)))
+            alt = "".join(rng.choice("ACGT") for _ in range(rng.randint(3, 12)))
+            for frame in (1, 2, 3, -1, -2, -3):
+                for position in range(1, min(len(ref), len(alt)) + 1):
+                    self.assertEqual(
+                        annotate_snp(position, ref, alt, frame),
+                        _annotate_by_codons(position, ref, alt, frame),
+                        (ref, alt, position, frame),
+                    )
+
+    def test_annotate_snp_window_matches_full_sequence(self):
+        """Windows with a two-base margin annotate like the full sequences."""
+        rng = random.Random(12)
+        ref = "".join(rng.choice("ACGT") for _ in range(40))
+        alt = "".join(rng.choice("ACGT") for _ in range(37))
+        for frame in (1, 2, 3, -1, -2, -3):
+            for position in range(1, 38):
+                lo = max(0, position - 3)
+                self.assertEqual(
+                    annotate_snp(
+                        position, ref[lo:position + 2], alt[lo:position + 2],
+                        frame, window_start=lo,
+                        ref_length=len(ref), alt_length=len(alt),
+                    ),
+                    annotate_snp(position, ref, alt, frame),
+                    (position, frame),
+                )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,33 @@
+"""Tests for benchmarks/run.py — synthetic pairs and baseline comparison."""
+
+import unittest
+from benchmarks.run import compare, make_pair, run_suite
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_make_pair_is_seeded(self):
+        reference, sample = make_pair(10_000, 0.01, seed=3)
+        self.assertEqual((reference, sample), make_pair(10_000, 0.01, seed=3))
+        self.assertEqual(set(reference) | set(sample), set("ACGT"))
+        self.assertEqual(sum(a != b for a, b in zip(reference, sample)), 100)
+
+    def test_run_suite_covers_the_matrix(self):
+        results = run_suite(["1k"], repeat=1, memory=False)["results"]
+        detect = [name for name in results if name.startswith("detect/")]
+        self.assertEqual(len(detect), 6 * 2 * 2 + 1)
+        self.assertIn("detect/1k/frame-3/cds/predict", results)
+        self.assertEqual(results["detect/1k/positions"]["variants"], 1)
+        self.assertEqual(results["detect/1k/frame+1/all/plain"]["variants"], 1)
+        self.assertIn("calls_per_s", results["micro/get_codon"])
+
+    def test_compare_reports_slower_cases(self):
+        baseline = {"results": {"a": {"seconds": 1.0}, "b": {"seconds": 1.0}}}
+        current = {"results": {
+            "a": {"seconds": 1.1}, "b": {"seconds": 1.5}, "new": {"seconds": 9.0},
+        }}
+        self.assertEqual(compare(current, baseline, 1.2), [("b", 1.0, 1.5, 1.5)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+"""Tests for bgzf.py — BGZF compression and tabix indexing."""
+
+import gzip
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+from bgzf import (
+    BLOCK_DATA_SIZE, EOF_BLOCK, BgzfWriter, TabixIndexBuilder, tabix_query,
+)
+
+
+class TestBgzfWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "data.gz")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_output_is_multi_member_gzip(self):
+        """gzip reads back every byte; the file ends with the EOF block."""
+        data = bytes(range(256)) * 1000
+        with open(self.path, "wb") as f:
+            writer = BgzfWriter(f)
+            writer.write(data[:10])
+            writer.write(data[10:])
+            writer.close()
+        with gzip.open(self.path, "rb") as f:
+            self.assertEqual(f.read(), data)
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        self.assertTrue(raw.endswith(EOF_BLOCK))
+        # First block: BC extra subfield holding the block size - 1
+        self.assertEqual(raw[12:16], b"BC\x02\x00")
+        (block_size,) = struct.unpack_from("<H", raw, 16)
+        self.assertEqual(raw[block_size + 1:block_size + 3], b"\x1f\x8b")
+
+    def test_tell_returns_virtual_offsets(self):
+        with open(self.path, "wb") as f:
+            writer = BgzfWriter(f)
+            self.assertEqual(writer.tell(), 0)
+            writer.write(b"x" * 10)
+            self.assertEqual(writer.tell(), 10)
+            writer.write(b"y" * BLOCK_DATA_SIZE)
+            offset = writer.tell()
+            writer.close()
+        self.assertGreater(offset >> 16, 0)
+        self.assertEqual(offset & 0xFFFF, 10)
+
+
+class TestTabixIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "calls.vcf.gz")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def write_vcf(self, records):
+        index = TabixIndexBuilder()
+        with open(self.path, "wb") as f:
+            writer = BgzfWriter(f)
+            writer.write(b"##fileformat=VCFv4.2\n#CHROM\tPOS\tID\tREF\tALT\n")
+            for contig, position, ref in records:
+                start = writer.tell()
+                writer.write(f"{contig}\t{position}\t.\t{ref}\tA\n".encode())
+                index.add(contig, position - 1, position - 1 + len(ref),
+                          start, writer.tell())
+            writer.close()
+        index.write(self.path + ".tbi")
+
+    def test_index_header(self):
+        self.write_vcf([("chr1", 5, "C")])
+        with gzip.open(self.path + ".tbi", "rb") as f:
+            data = f.read()
+        self.assertEqual(data[:4], b"TBI\1")
+        n_ref, preset, col_seq, col_beg = struct.unpack_from("<4i", data, 4)
+        self.assertEqual((n_ref, preset, col_seq, col_beg), (1, 2, 1, 2))
+
+    def test_query_matches_filter(self):
+        """Region queries return exactly the overlapping records."""
+        records = [("chr1", position, "C" * (1 + position % 5))
+                   for position in range(1, 200000, 37)]
+        records += [("chr2", position, "G") for position in (10, 20, 30)]
+        self.write_vcf(records)
+        for start, end in [(1, 1), (100, 5000), (16380, 16390),
+                           (150000, 300000), (60, 60)]:
+            expected = [
+                f"chr1\t{position}\t.\t{ref}\tA"
+                for contig, position, ref in records
+                if contig == "chr1"
+                and position <= end and position + len(ref) - 1 >= start
+            ]
+            self.assertEqual(
+                list(tabix_query(self.path, "chr1", start, end)), expected,
+                (start, end),
+            )
+        self.assertEqual(len(list(tabix_query(self.path, "chr2"))), 3)
+        self.assertEqual(list(tabix_query(self.path, "chrX")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
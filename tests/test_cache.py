@@ -0,0 +1,114 @@
+"""Tests for cache.py — per-sample result cache."""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from cache import AnnotationCache, ResultCache, cache_key, sequence_digest
+from main import detect_snps
+
+
+class TestCacheKey(unittest.TestCase):
+
+    def setUp(self):
+        self.ref = sequence_digest("ATGGTG")
+
+    def test_same_inputs_same_key(self):
+        self.assertEqual(
+            cache_key(self.ref, "ATGATG"), cache_key(self.ref, "ATGATG")
+        )
+
+    def test_every_input_changes_the_key(self):
+        """Sample, reference, CDS, frame and predict are all part of the key."""
+        base = cache_key(self.ref, "ATGATG")
+        variants = [
+            cache_key(self.ref, "ATGATC"),
+            cache_key(sequence_digest("ATGGTC"), "ATGATG"),
+            cache_key(self.ref, "ATGATG", cds_regions=[(1, 3)]),
+            cache_key(self.ref, "ATGATG", frame=2),
+            cache_key(self.ref, "ATGATG", predict=True),
+            cache_key(self.ref, "ATGATG", fields=["type"]),
+        ]
+        self.assertNotIn(base, variants)
+        self.assertEqual(len(set(variants)), len(variants))
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_round_trip(self):
+        """A stored table is returned equal on the next get()."""
+        cache = ResultCache(self.directory)
+        table = detect_snps("ATGGTGAC", "ATGATGA")
+        cache.put("k", table)
+        self.assertEqual(cache.get("k"), table)
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def test_miss_returns_none(self):
+        cache = ResultCache(self.directory)
+        self.assertIsNone(cache.get("absent"))
+        self.assertEqual(cache.misses, 1)
+
+    def test_corrupt_entry_is_a_miss(self):
+        cache = ResultCache(self.directory)
+        with open(os.path.join(self.directory, "bad.snpcache"), "wb") as f:
+            f.write(b"not a pickle")
+        self.assertIsNone(cache.get("bad"))
+
+    def test_evicts_least_recently_used(self):
+        """Over the cap, the entry used longest ago is removed first."""
+        cache = ResultCache(self.directory)
+        table = detect_snps("ATGGTG", "ATGATG")
+        for key in ("a", "b", "c"):
+            cache.put(key, table)
+        now = time.time()
+        for age, key in ((30, "a"), (20, "b"), (10, "c")):
+            path = os.path.join(self.directory, key + ".snpcache")
+            os.utime(path, (now - age, now - age))
+        cache.get("a")  # refreshes "a"; "b" becomes the oldest
+        size = os.path.getsize(os.path.join(self.directory, "a.snpcache"))
+
+        cache.max_bytes = 2 * size
+        cache.evict()
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("c"))
+
+    def test_negative_cap_raises(self):
+        with self.assertRaises(ValueError):
+            ResultCache(self.directory, max_bytes=-1)
+
+
+class TestAnnotationCache(unittest.TestCase):
+
+    def test_get_put_and_counters(self):
+        cache = AnnotationCache()
+        self.assertIsNone(cache.get("k"))
+        cache.put("k", ("TRANSITION", "SYNONYMOUS", "A[G>A]T"))
+        self.assertEqual(cache.get("k"), ("TRANSITION", "SYNONYMOUS", "A[G>A]T"))
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 1, 1))
+
+    def test_none_value_is_a_hit(self):
+        """A stored None is told apart from a miss through the default."""
+        cache = AnnotationCache()
+        missing = object()
+        cache.put("k", None)
+        self.assertIsNone(cache.get("k", missing))
+        self.assertIs(cache.get("other", missing), missing)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_scope_ids_are_stable(self):
+        cache = AnnotationCache()
+        first = cache.scope("snp", 1, None)
+        self.assertEqual(cache.scope("snp", 1, None), first)
+        self.assertNotEqual(cache.scope("snp", -1, None), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,9 @@
 import unittest
 import os
+from alignment import DEFAULT_BAND
 from main import parse_args, load_sequence, run_multi_sample
 from fasta_parser import read_all_sequences
+from packed_sequence import PackedSequence
 
 class TestCLI(unittest.TestCase):
     def setUp(self):
@@ -28,6 +30,13 @@ class TestCLI(unittest.TestCase):
         path = self.create_temp_fasta(">seq\nACTG")
         self.assertEqual(load_sequence(path), "ACTG")
 
+    def test_load_sequence_packed(self):
+        path = self.create_temp_fasta(">seq\nACTG\nNNAC\n")
+        packed = load_sequence(path, packed=True)
+        self.assertIsInstance(packed, PackedSequence)
+        self.assertEqual(str(packed), "ACTGNNAC")
+        self.assertEqual(str(load_sequence("ACGTACGT", (3, 5), packed=True)), "GTA")
+
     def test_parse_args_valid(self):
         """Test that valid arguments are parsed correctly."""
         args = ["--reference", "ACTG", "--sample", "ACTT", "--output", "test_report.txt"]
@@ -113,6 +122,135 @@ class TestMultiSampleCLI(unittest.TestCase):
         self.assertIsNone(args.cds)
 
 
+class TestParseArgsJobs(unittest.TestCase):
+
+    def test_jobs_default_is_1(self):
+        """--jobs defaults to serial execution."""
+        self.assertEqual(parse_args(["--input", "x.fasta"]).jobs, 1)
+
+    def test_jobs_accepted(self):
+        """--jobs N is stored as int."""
+        self.assertEqual(parse_args(["--input", "x.fasta", "--jobs", "8"]).jobs, 8)
+
+    def test_jobs_zero_raises(self):
+        """--jobs must be at least 1."""
+        with self.assertRaises(SystemExit):
+            parse_args(["--input", "x.fasta", "--jobs", "0"])
+
+
+class TestParseArgsStream(unittest.TestCase):
+
+    def test_stream_defaults(self):
+        args = parse_args(["--reference", "r.fa", "--sample", "s.fa"])
+        self.assertFalse(args.stream)
+        self.assertGreater(args.chunk_size, 0)
+
+    def test_stream_with_chunk_size(self):
+        args = parse_args([
+            "--reference", "r.fa", "--sample", "s.fa",
+            "--stream", "--chunk-size", "4096",
+        ])
+        self.assertTrue(args.stream)
+        self.assertEqual(args.chunk_size, 4096)
+
+    def test_stream_rejects_input_and_region(self):
+        with self.assertRaises(SystemExit):
+            parse_args(["--input", "x.fasta", "--stream"])
+        with self.assertRaises(SystemExit):
+            parse_args([
+                "--reference", "r.fa", "--sample", "s.fa",
+                "--stream", "--region", "1-10",
+            ])
+
+    def test_quiet_flag(self):
+        args = parse_args(["--reference", "ACTG", "--sample", "ACTT"])
+        self.assertFalse(args.quiet)
+        args = parse_args(["--reference", "ACTG", "--sample", "ACTT", "--quiet"])
+        self.assertTrue(args.quiet)
+
+    def test_chunk_size_zero_raises(self):
+        with self.assertRaises(SystemExit):
+            parse_args([
+                "--reference", "r.fa", "--sample", "s.fa",
+                "--chunk-size", "0",
+            ])
+
+
+class TestParseArgsFormat(unittest.TestCase):
+
+    def test_format_defaults_to_text(self):
+        args = parse_args(["--reference", "ACTG", "--sample", "ACTT"])
+        self.assertEqual(args.output_format, "text")
+        self.assertEqual(args.output, "snps_report.txt")
+
+    def test_binary_format_default_output(self):
+        """Without --output, binary output goes to snps_report.snpb."""
+        args = parse_args([
+            "--reference", "ACTG", "--sample", "ACTT", "--format", "binary",
+        ])
+        self.assertEqual(args.output_format, "binary")
+        self.assertEqual(args.output, "snps_report.snpb")
+
+    def test_vcf_format_and_bgzip(self):
+        """--bgzip adds .gz to the default VCF output."""
+        base = ["--reference", "ACTG", "--sample", "ACTT", "--format", "vcf"]
+        self.assertEqual(parse_args(base).output, "snps_report.vcf")
+        args = parse_args(base + ["--bgzip"])
+        self.assertTrue(args.bgzip)
+        self.assertEqual(args.output, "snps_report.vcf.gz")
+
+    def test_align_and_band(self):
+        base = ["--reference", "ACTG", "--sample", "ACTT"]
+        self.assertFalse(parse_args(base).align)
+        self.assertEqual(parse_args(base + ["--align"]).band, DEFAULT_BAND)
+        self.assertEqual(parse_args(base + ["--align", "--band", "8"]).band, 8)
+        self.assertIsNone(parse_args(base + ["--align"]).seed_length)
+        for extra in (
+            ["--band", "8"],
+            ["--align", "--band", "0"],
+            ["--align", "--stream"],
+            ["--seed-length", "16"],
+            ["--align", "--seed-length", "0"],
+        ):
+            with self.assertRaises(SystemExit):
+                parse_args(base + extra)
+
+    def test_packed(self):
+        base = ["--reference", "ACTG", "--sample", "ACTT"]
+        self.assertTrue(parse_args(base + ["--packed"]).packed)
+        for argv in (
+            base + ["--packed", "--stream"],
+            ["--input", "x.fasta", "--packed"],
+            ["--pack-reference", "ref.fasta", "--sample", "ACTT"],
+            ["--pack-reference", "ref.fasta", "--reference", "ACTG"],
+        ):
+            with self.assertRaises(SystemExit):
+                parse_args(argv)
+
+    def test_bgzip_requires_vcf(self):
+        with self.assertRaises(SystemExit):
+            parse_args(["--reference", "ACTG", "--sample", "ACTT", "--bgzip"])
+
+    def test_cohort_requires_input_and_vcf(self):
+        args = parse_args(["--input", "x.fasta", "--cohort", "--format", "vcf"])
+        self.assertTrue(args.cohort)
+        for argv in (
+            ["--input", "x.fasta", "--cohort"],
+            ["--reference", "ACTG", "--sample", "ACTT", "--cohort",
+             "--format", "vcf"],
+            ["--input", "x.fasta", "--cohort", "--format", "vcf",
+             "--cache-dir", "c"],
+        ):
+            with self.assertRaises(SystemExit):
+                parse_args(argv)
+
+    def test_unknown_format_raises(self):
+        with self.assertRaises(SystemExit):
+            parse_args([
+                "--reference", "ACTG", "--sample", "ACTT", "--format", "csv",
+            ])
+
+
 class TestParseArgsFrame(unittest.TestCase):
 
     def test_frame_default_is_1(self):
@@ -241,6 +379,34 @@ class TestLoadSequencePathValidation(unittest.TestCase):
         with self.assertRaises(FileNotFoundError):
             load_sequence("/tmp/does_not_exist_snptracker.fasta")
 
+    def test_region_slices_raw_sequence(self):
+        """A region restricts a raw sequence to the requested window."""
+        self.assertEqual(load_sequence("ACGTACGT", (3, 5)), "GTA")
+
+    def test_region_reads_window_from_fasta(self):
+        """A region is fetched from a FASTA file through the .fai index."""
+        import tempfile, os
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".fasta", delete=False
+        ) as f:
+            f.write(">seq\nACGT\nACGT\n")
+            path = f.name
+        try:
+            self.assertEqual(load_sequence(path, (3, 6)), "GTAC")
+        finally:
+            os.unlink(path)
+            if os.path.exists(path + ".fai"):
+                os.unlink(path + ".fai")
+
+    def test_parse_args_region(self):
+        """--region is accepted and defaults to None."""
+        args = parse_args(["--reference", "ACTG", "--sample", "ACTT"])
+        self.assertIsNone(args.region)
+        args = parse_args(
+            ["--reference", "ACTG", "--sample", "ACTT", "--region", "2-3"]
+        )
+        self.assertEqual(args.region, "2-3")
+
     def test_error_message_contains_path(self):
         """FileNotFoundError message includes the offending path."""
         path = "missing_ref.fasta"
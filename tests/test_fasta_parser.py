@@ -1,6 +1,19 @@
 import unittest
 import os
-from fasta_parser import read_fasta, read_all_sequences
+from fasta_parser import (
+    FaiEntry,
+    build_fasta_index,
+    count_sequences,
+    fetch_sequence,
+    iter_sequences,
+    iter_windows,
+    load_fasta_index,
+    read_all_sequences,
+    read_fasta,
+    read_fasta_packed,
+    record_length,
+    IndexedRecord,
+)
 
 class TestFastaParser(unittest.TestCase):
     def setUp(self):
@@ -8,8 +21,9 @@ class TestFastaParser(unittest.TestCase):
 
     def tearDown(self):
         for f in self.temp_files:
-            if os.path.exists(f):
-                os.remove(f)
+            for path in (f, f + ".fai"):
+                if os.path.exists(path):
+                    os.remove(path)
 
     def create_temp_fasta(self, content):
         file_path = f"temp_{len(self.temp_files)}.fasta"
@@ -33,6 +47,17 @@ class TestFastaParser(unittest.TestCase):
         path = self.create_temp_fasta(">seq1\nACTG\n>seq2\nTAGC")
         self.assertEqual(read_fasta(path), "ACTG")
 
+    def test_read_fasta_packed_matches_read_fasta(self):
+        """The packed first record decodes to the read_fasta() sequence."""
+        path = self.create_temp_fasta(">seq1\nACTGN\nnnRT\n\nAC\n>seq2\nTAGC\n")
+        packed = read_fasta_packed(path)
+        self.assertEqual(str(packed), read_fasta(path).upper())
+        self.assertEqual(packed.exceptions, [(4, 3, "N"), (7, 1, "R")])
+
+    def test_read_fasta_packed_without_records(self):
+        path = self.create_temp_fasta("")
+        self.assertEqual(len(read_fasta_packed(path)), 0)
+
     def test_read_fasta_file_not_found(self):
         """Test that FileNotFoundError is raised for missing files."""
         with self.assertRaises(FileNotFoundError):
@@ -80,5 +105,134 @@ class TestFastaParser(unittest.TestCase):
         result = read_all_sequences(path)
         self.assertEqual(result[0][0], "reference Sample 1 of 3")
 
+    # --- Testes para iter_sequences / count_sequences ---
+
+    def test_iter_sequences_yields_records_lazily(self):
+        """iter_sequences yields one (header, sequence) tuple at a time."""
+        path = self.create_temp_fasta(">ref\nACTG\nTAGC\n>smp\nGGGG")
+        records = iter_sequences(path)
+        self.assertEqual(next(records), ("ref", "ACTGTAGC"))
+        self.assertEqual(next(records), ("smp", "GGGG"))
+        with self.assertRaises(StopIteration):
+            next(records)
+
+    def test_iter_sequences_matches_read_all_sequences(self):
+        """Streaming and materialised readers agree."""
+        path = self.create_temp_fasta(">a\nAC\n\n>b\nGT\nTT\n>c\nA")
+        self.assertEqual(list(iter_sequences(path)), read_all_sequences(path))
+
+    def test_iter_sequences_file_not_found(self):
+        """FileNotFoundError is raised on first iteration."""
+        with self.assertRaises(FileNotFoundError):
+            next(iter_sequences("non_existent.fasta"))
+
+    def test_count_sequences(self):
+        """count_sequences counts headers without parsing sequences."""
+        path = self.create_temp_fasta(">a\nAC\n>b\nGT\n>c\nA")
+        self.assertEqual(count_sequences(path), 3)
+
+    def test_count_sequences_empty_file(self):
+        """An empty file has zero records."""
+        self.assertEqual(count_sequences(self.create_temp_fasta("")), 0)
+
+    # --- Testes para o índice .fai e acesso aleatório ---
+
+    def test_build_fasta_index_entries(self):
+        """Index entries follow samtools .fai semantics."""
+        path = self.create_temp_fasta(">chr1 desc\nACGTA\nCCGTT\nAA\n>chr2\nGG\n")
+        self.assertEqual(
+            build_fasta_index(path),
+            [FaiEntry("chr1", 12, 11, 5, 6), FaiEntry("chr2", 2, 32, 2, 3)],
+        )
+
+    def test_build_fasta_index_inconsistent_lines_raise(self):
+        """A short line in the middle of a record cannot be indexed."""
+        path = self.create_temp_fasta(">chr1\nACGTA\nCC\nGTTAA\n")
+        with self.assertRaises(ValueError):
+            build_fasta_index(path)
+
+    def test_load_fasta_index_writes_and_reuses_fai(self):
+        """The index is saved next to the file and read back unchanged."""
+        path = self.create_temp_fasta(">chr1\nACGT\nAC\n")
+        entries = load_fasta_index(path)
+        self.assertTrue(os.path.exists(path + ".fai"))
+        self.assertEqual(load_fasta_index(path), entries)
+
+    def test_fetch_sequence_window_across_lines(self):
+        """A window spanning line breaks is returned without newlines."""
+        path = self.create_temp_fasta(">chr1\nACGTA\nCCGTT\nAA\n>chr2\nGGGG\n")
+        self.assertEqual(fetch_sequence(path, "chr1", 4, 8), "TACCG")
+        self.assertEqual(fetch_sequence(path, "chr1", 11, 50), "AA")
+
+    def test_fetch_sequence_defaults_to_first_full_record(self):
+        """Without name/window the whole first record is returned."""
+        path = self.create_temp_fasta(">chr1\nACGTA\nCC\n>chr2\nGGGG\n")
+        self.assertEqual(fetch_sequence(path), read_fasta(path))
+        self.assertEqual(fetch_sequence(path, "chr2"), "GGGG")
+
+    def test_fetch_sequence_unknown_record_raises(self):
+        """An unknown record name raises KeyError."""
+        path = self.create_temp_fasta(">chr1\nACGT\n")
+        with self.assertRaises(KeyError):
+            fetch_sequence(path, "chrX")
+
+    def test_fetch_sequence_crlf_line_endings(self):
+        """Windows line endings are handled by the line width."""
+        path = self.create_temp_fasta("")
+        with open(path, 'wb') as f:
+            f.write(b">chr1\r\nACG\r\nTTA\r\nC\r\n")
+        self.assertEqual(fetch_sequence(path, "chr1", 2, 7), "CGTTAC")
+
+    def test_record_length(self):
+        path = self.create_temp_fasta(">chr1\nACGTA\nCC\n>chr2\nGGGG\n")
+        self.assertEqual(record_length(path), 7)
+        self.assertEqual(record_length(path, "chr2"), 4)
+
+    def test_iter_windows_matches_fetch_sequence(self):
+        """Each window equals the corresponding fetch_sequence() call."""
+        path = self.create_temp_fasta(">chr1\nACGTA\nCCGTT\nAA\n>chr2\nGGGG\n")
+        windows = [(1, 3), (2, 9), (10, 40), (12, 11)]
+        self.assertEqual(
+            list(iter_windows(path, windows, "chr1")),
+            [fetch_sequence(path, "chr1", s, e) for s, e in windows],
+        )
+
+    def test_indexed_record_behaves_like_str(self):
+        """len() and indexing/slicing match the assembled sequence."""
+        path = self.create_temp_fasta(">chr1 desc\nACGTA\nCCGTT\nAA\n")
+        record = IndexedRecord(path)
+        sequence = "ACGTACCGTTAA"
+        self.assertEqual(record.name, "chr1")
+        self.assertEqual(len(record), len(sequence))
+        for key in (slice(0, 3), slice(4, 11), slice(-2, None), slice(8, 3)):
+            self.assertEqual(record[key], sequence[key])
+        self.assertEqual(record[5], sequence[5])
+        self.assertEqual(record[-1], "A")
+        with self.assertRaises(IndexError):
+            record[12]
+        record.close()
+
+    def test_indexed_record_maps_the_file_once(self):
+        """Accesses reuse one index entry and mapping until close()."""
+        from unittest.mock import patch
+        import fasta_parser
+        path = self.create_temp_fasta(">chr1\nACGTA\nCCGTT\nAA\n")
+        with IndexedRecord(path) as record:
+            with patch.object(
+                fasta_parser, "load_fasta_index",
+                wraps=fasta_parser.load_fasta_index,
+            ) as load, patch.object(
+                fasta_parser.mmap, "mmap", wraps=fasta_parser.mmap.mmap
+            ) as mapping:
+                bases = [record[i] for i in range(len(record))]
+                self.assertEqual(record[3:9], "TACCGT")
+            self.assertEqual("".join(bases), "ACGTACCGTTAA")
+            self.assertEqual(load.call_count, 0)
+            self.assertEqual(mapping.call_count, 1)
+        self.assertIsNone(record._mapped)
+        self.assertEqual(record[-2:], "AA")
+        record.close()
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,79 @@
+"""Tests for generate_test_data.py — seeded bulk generator and truth VCF."""
+
+import os
+import random
+import tempfile
+import unittest
+from fasta_parser import read_all_sequences, read_fasta
+from generate_test_data import generate_bulk, mutate_block
+
+
+def _truth_records(path):
+    with open(path) as f:
+        return [line.rstrip("\n").split("\t") for line in f if not line.startswith("#")]
+
+
+class TestBulkGenerator(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_truth_set_rebuilds_every_sample(self):
+        """Applying the truth VCF to the reference yields each sample."""
+        written = generate_bulk(
+            self.directory.name, 30_000, samples=3, snp_rate=0.003,
+            indel_rate=0.001, seed=5, block_size=7_000, combined=True,
+        )
+        records = read_all_sequences(written["combined"])
+        reference = records[0][1]
+        self.assertEqual(len(reference), 30_000)
+        truth = _truth_records(written["truth"])
+        self.assertEqual(len(truth), written["variants"])
+        positions = [int(fields[1]) for fields in truth]
+        self.assertEqual(positions, sorted(positions))
+        for k, (_, sample) in enumerate(records[1:]):
+            parts = []
+            cursor = 0
+            for fields in truth:
+                if fields[9 + k] != "1":
+                    continue
+                position, ref, alt = int(fields[1]) - 1, fields[3], fields[4]
+                self.assertEqual(reference[position:position + len(ref)], ref)
+                parts.append(reference[cursor:position] + alt)
+                cursor = position + len(ref)
+            parts.append(reference[cursor:])
+            self.assertEqual("".join(parts), sample)
+        self.assertEqual(
+            {fields[7] for fields in truth}, {"TYPE=SNP", "TYPE=INS", "TYPE=DEL"}
+        )
+
+    def test_output_is_seeded(self):
+        first = os.path.join(self.directory.name, "a")
+        second = os.path.join(self.directory.name, "b")
+        generate_bulk(first, 5_000, seed=9)
+        generate_bulk(second, 5_000, seed=9)
+        for name in ("reference.fasta", "sample_001.fasta", "truth.vcf"):
+            with open(os.path.join(first, name)) as a, \
+                    open(os.path.join(second, name)) as b:
+                self.assertEqual(a.read(), b.read())
+        self.assertEqual(
+            len(read_fasta(os.path.join(first, "reference.fasta"))), 5_000
+        )
+
+    def test_indels_are_left_normalized(self):
+        rng = random.Random(3)
+        reference = "".join(rng.choices("ACGT", k=20_000))
+        _, variants = mutate_block(rng, reference, 0.0, 0.01)
+        self.assertTrue(variants)
+        for position, ref, alt in variants:
+            if len(ref) > len(alt):
+                self.assertNotEqual(ref[0], ref[-1])
+            elif len(alt) > len(ref):
+                self.assertNotEqual(alt[0], alt[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
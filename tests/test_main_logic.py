@@ -2,7 +2,10 @@ import unittest
 import os
 from unittest.mock import patch
 import io
+import random
+from cache import AnnotationCache
 from main import (
+    _apply_predictions,
     detect_snps,
     classify_mutation,
     generate_snp_file,
@@ -11,7 +14,10 @@ from main import (
     get_trinucleotide_context,
     parse_cds_regions,
     parse_args,
+    iter_multi_sample,
+    select_fields,
 )
+from packed_sequence import PackedSequence
 
 class TestMainLogic(unittest.TestCase):
     def setUp(self):
@@ -33,6 +39,25 @@ class TestMainLogic(unittest.TestCase):
             self.assertIn("Total de variações encontradas: 1", output)
             self.assertIn("TRANSITION", output)
 
+    def test_print_snp_report_summarizes_long_sequences(self):
+        """Long inputs are shown capped, never in full."""
+        reference = "A" * 5000
+        with patch('sys.stdout', new=io.StringIO()) as fake_out:
+            print_snp_report([], reference, reference)
+            output = fake_out.getvalue()
+        self.assertNotIn(reference, output)
+        self.assertIn("(5000 bp)", output)
+
+    def test_print_snp_report_quiet_omits_rows(self):
+        snps = [
+            {'position': 1, 'reference': 'A', 'alternate': 'G', 'type': 'TRANSITION'}
+        ]
+        with patch('sys.stdout', new=io.StringIO()) as fake_out:
+            print_snp_report(snps, "ACTG", "GCTG", quiet=True)
+            output = fake_out.getvalue()
+        self.assertIn("Total de variações encontradas: 1", output)
+        self.assertNotIn("TRANSITION", output)
+
     def test_generate_snp_file(self):
         """Test that the SNP report file is generated correctly."""
         snps = [
@@ -161,6 +186,61 @@ class TestRunMultiSample(unittest.TestCase):
         result = run_multi_sample("ACTG", [("del_sample", "ACT")])
         self.assertEqual(result["del_sample"][0]["type"], "DELETION")
 
+    def test_iter_multi_sample_consumes_generator(self):
+        """iter_multi_sample accepts a generator and yields in order."""
+        samples = (s for s in [("s1", "ACTT"), ("s2", "ACTG")])
+        results = iter_multi_sample("ACTG", samples)
+        name, snps = next(results)
+        self.assertEqual(name, "s1")
+        self.assertEqual(len(snps), 1)
+        self.assertEqual(next(results), ("s2", []))
+
+    def test_run_multi_sample_with_cds_regions(self):
+        """CDS regions apply to every sample."""
+        samples = [("s1", "GCTTCT"), ("s2", "GTTGCT")]
+        result = run_multi_sample("GCTGCT", samples, cds_regions=[(1, 3)])
+        self.assertEqual(result["s1"][0]["annotation"], "NON_CODING")
+        self.assertEqual(result["s2"][0]["annotation"], "NON_SYNONYMOUS")
+
+    def test_annotation_cache_matches_uncached(self):
+        """Memoized annotations equal per-sample detection in every frame."""
+        from main import _apply_predictions
+        rng = random.Random(16)
+        reference = "".join(rng.choice("ACGT") for _ in range(600))
+        variants = [(rng.randrange(600), rng.choice("ACGT")) for _ in range(40)]
+        samples = []
+        for n in range(12):
+            sample = list(reference)
+            for position, base in rng.sample(variants, 15):
+                sample[position] = base
+            # Different lengths move reverse-frame codons
+            samples.append((f"s{n}", "".join(sample)[:600 - n % 3]))
+
+        for frame in (1, -2):
+            for cds_regions in (None, [(10, 300), (400, 590)]):
+                cache = AnnotationCache()
+                result = run_multi_sample(
+                    reference, samples, cds_regions, frame, cache
+                )
+                for name, sequence in samples:
+                    expected = detect_snps(reference, sequence, cds_regions, frame)
+                    self.assertEqual(result[name], expected)
+                    _apply_predictions(expected, reference, frame)
+                    _apply_predictions(result[name], reference, frame, cache)
+                    self.assertEqual(result[name], expected)
+                self.assertGreater(cache.hits, cache.misses)
+
+    def test_annotation_cache_counts_distinct_variants(self):
+        """Each distinct variant is annotated once; repeats are hits."""
+        cache = AnnotationCache()
+        samples = [
+            ("s1", "ATGATGAAACCC"),
+            ("s2", "ATGATGAAACCC"),
+            ("s3", "ATGATGAAACCG"),
+        ]
+        run_multi_sample("ATGGTGAAACCC", samples, annotation_cache=cache)
+        self.assertEqual((cache.misses, cache.hits), (2, 2))
+
 
 class TestRunModes(unittest.TestCase):
 
@@ -169,8 +249,9 @@ class TestRunModes(unittest.TestCase):
 
     def tearDown(self):
         for f in self.temp_files:
-            if os.path.exists(f):
-                os.remove(f)
+            for path in (f, f + ".fai"):
+                if os.path.exists(path):
+                    os.remove(path)
 
     def create_temp_fasta(self, content):
         path = f"mode_temp_{len(self.temp_files)}.fasta"
@@ -219,11 +300,471 @@ class TestRunModes(unittest.TestCase):
             output = fake_out.getvalue()
         self.assertIn("s1", output)
         self.assertIn("s2", output)
+        self.assertIn("Anotação: 0 reutilizada(s), 1 calculada(s)", output)
         # Clean up generated report files
         for f in ["snps_report_s1.txt"]:
             if os.path.exists(f):
                 os.remove(f)
 
+    def test_multi_sample_mode_parallel_matches_serial(self):
+        """--jobs N writes the same reports and keeps the sample order."""
+        from main import _run_multi_sample_mode, parse_args
+        path = self.create_temp_fasta(
+            ">ref\nACTGACTG\n>s1\nACTTACTG\n>s2\nACTGACTG\n"
+            ">s3\nGCTGACTA\n>s4\nACTGAC\n"
+        )
+        outputs = {}
+        for jobs in ("1", "3"):
+            prefix = f"mode_jobs_{jobs}"
+            args = parse_args(
+                ["--input", path, "--output", f"{prefix}.txt", "--jobs", jobs]
+            )
+            with patch('sys.stdout', new=io.StringIO()) as fake_out:
+                _run_multi_sample_mode(args)
+            lines = [
+                line.replace(prefix, "PREFIX")
+                for line in fake_out.getvalue().splitlines()
+            ]
+            reports = {}
+            for name in ("s1", "s3", "s4"):
+                report = f"{prefix}_{name}.txt"
+                self.temp_files.append(report)
+                with open(report) as f:
+                    reports[name] = f.read()
+            outputs[jobs] = (lines, reports)
+        self.assertEqual(outputs["1"], outputs["3"])
+        progress = [l for l in outputs["3"][0] if l.startswith("[")]
+        self.assertEqual(
+            [l.split()[1] for l in progress], ["s1", "s2", "s3", "s4"]
+        )
+
+    def test_multi_sample_mode_cache_reuses_results(self):
+        """A second run with --cache-dir serves every sample from the cache."""
+        import shutil
+        import tempfile
+        from main import _run_multi_sample_mode, parse_args
+        path = self.create_temp_fasta(">ref\nATGGTG\n>s1\nATGATG\n>s2\nATGGTG")
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.temp_files.append("mode_cache_s1.txt")
+        args = parse_args([
+            "--input", path, "--output", "mode_cache.txt", "--predict",
+            "--cache-dir", cache_dir,
+        ])
+        runs = []
+        for _ in range(2):
+            with patch('sys.stdout', new=io.StringIO()) as fake_out:
+                _run_multi_sample_mode(args)
+            with open("mode_cache_s1.txt") as f:
+                runs.append((fake_out.getvalue(), f.read()))
+        self.assertIn("0 amostra(s) reutilizada(s)", runs[0][0])
+        self.assertIn("2 amostra(s) reutilizada(s)", runs[1][0])
+        self.assertIn("(cache)", runs[1][0])
+        self.assertEqual(runs[0][1], runs[1][1])
+
+    def test_multi_sample_mode_binary_format(self):
+        """--format binary writes one .snpb file per sample."""
+        from main import _run_multi_sample_mode, detect_snps, parse_args
+        from variant_file import read_variant_file
+        path = self.create_temp_fasta(">ref\nATGGTG\n>s1\nATGATG\n>s2\nATGGTG")
+        self.temp_files.append("mode_binary_s1.snpb")
+        args = parse_args([
+            "--input", path, "--output", "mode_binary.snpb",
+            "--format", "binary",
+        ])
+        with patch('sys.stdout', new=io.StringIO()) as fake_out:
+            _run_multi_sample_mode(args)
+        self.assertIn("mode_binary_s1.snpb", fake_out.getvalue())
+        self.assertFalse(os.path.exists("mode_binary_s2.snpb"))
+        self.assertEqual(
+            read_variant_file("mode_binary_s1.snpb"),
+            detect_snps("ATGGTG", "ATGATG"),
+        )
+
+    def test_multi_sample_mode_strips_only_trailing_extension(self):
+        """An extension inside the --output path is kept in the prefix."""
+        from main import _run_multi_sample_mode, parse_args
+        path = self.create_temp_fasta(">ref\nATGGTG\n>s1\nATGATG")
+        self.temp_files.append("mode.txt.run_s1.txt")
+        args = parse_args(["--input", path, "--output", "mode.txt.run.txt"])
+        with patch('sys.stdout', new=io.StringIO()):
+            _run_multi_sample_mode(args)
+        self.assertTrue(os.path.exists("mode.txt.run_s1.txt"))
+        self.assertFalse(os.path.exists("mode.run_s1.txt"))
+
+    def test_multi_sample_mode_counts_samples_from_the_index(self):
+        """The sample total comes from the .fai index, not a text pass."""
+        from main import _run_multi_sample_mode, parse_args
+        path = self.create_temp_fasta(
+            ">ref\nATGGTG\n>s1\nATGATG\n>s2\nATGGTG\n"
+        )
+        self.temp_files.append("mode_count_s1.txt")
+        args = parse_args(["--input", path, "--output", "mode_count.txt"])
+        with patch("main.count_sequences") as count, \
+                patch('sys.stdout', new=io.StringIO()) as fake_out:
+            _run_multi_sample_mode(args)
+        count.assert_not_called()
+        self.assertIn("Amostras:   2", fake_out.getvalue())
+        self.assertTrue(os.path.exists(path + ".fai"))
+
+    def test_multi_sample_mode_counts_unindexable_files(self):
+        """Ragged line lengths fall back to counting headers."""
+        from main import _run_multi_sample_mode, parse_args
+        path = self.create_temp_fasta(">ref\nAT\nGGTG\n>s1\nATGATG\n")
+        self.temp_files.append("mode_ragged_s1.txt")
+        args = parse_args(["--input", path, "--output", "mode_ragged.txt"])
+        with patch('sys.stdout', new=io.StringIO()) as fake_out:
+            _run_multi_sample_mode(args)
+        self.assertIn("Amostras:   1", fake_out.getvalue())
+
+
+    def test_multi_sample_mode_vcf_bgzip(self):
+        """Each sample gets an indexed .vcf.gz with its own GT column."""
+        import gzip
+        from main import _run_multi_sample_mode, parse_args
+        path = self.create_temp_fasta(">chr7 ref\nATGGTG\n>s1\nATGATG")
+        self.temp_files += ["mode_vcf_s1.vcf.gz", "mode_vcf_s1.vcf.gz.tbi"]
+        args = parse_args([
+            "--input", path, "--output", "mode_vcf.vcf.gz",
+            "--format", "vcf", "--bgzip",
+        ])
+        with patch('sys.stdout', new=io.StringIO()):
+            _run_multi_sample_mode(args)
+        self.assertTrue(os.path.exists("mode_vcf_s1.vcf.gz.tbi"))
+        with gzip.open("mode_vcf_s1.vcf.gz", "rt") as f:
+            lines = f.read().splitlines()
+        self.assertTrue(lines[-2].endswith("\tFORMAT\ts1"))
+        self.assertTrue(lines[-1].startswith("chr7\t4\t.\tG\tA\t"))
+
+
+class TestCohort(unittest.TestCase):
+
+    REFERENCE = "ATGGTGTTTTGGAC"
+    SAMPLES = ["ATGATGTTCTAGA", "ATGGTGTTTTGGAC", "ATGCTGTTTTGGACGG", "ATGATGTT"]
+
+    def setUp(self):
+        self.temp_files = []
+
+    def tearDown(self):
+        for f in self.temp_files:
+            for path in (f, f + ".fai"):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def cohort(self, **kwargs):
+        from main import collect_sample_calls, iter_cohort_variants
+        calls = [
+            collect_sample_calls(self.REFERENCE, sample)
+            for sample in self.SAMPLES
+        ]
+        return list(iter_cohort_variants(self.REFERENCE, calls, **kwargs))
+
+    def test_snp_alleles_match_per_sample_detection(self):
+        """Each sample carries exactly the SNPs detect_snps reports for it."""
+        rows = self.cohort()
+        for index, sample in enumerate(self.SAMPLES):
+            expected = [
+                (snp["position"], snp["alternate"], snp["annotation"])
+                for snp in detect_snps(self.REFERENCE, sample)
+                if "context" in snp
+            ]
+            carried = [
+                (row[0], row[2], row[4]) for row, genotypes in rows
+                if genotypes[index] == "1" and row[3] not in ("INSERTION", "DELETION")
+            ]
+            self.assertEqual(carried, expected)
+
+    def test_genotypes_and_indel_rows(self):
+        """Shared alleles are one row; short samples are missing ('.')."""
+        rows = self.cohort()
+        by_key = {(row[0], row[1], row[2]): genotypes for row, genotypes in rows}
+        self.assertEqual(by_key[(4, "G", "A")], ["1", "0", "0", "1"])
+        self.assertEqual(by_key[(11, "G", "A")], ["1", "0", "0", "."])
+        self.assertEqual(by_key[(9, "TTGGAC", "-")], [".", "0", "0", "1"])
+        self.assertEqual(by_key[(15, "-", "GG")], [".", "0", "1", "."])
+        self.assertEqual(len(by_key), len(rows))
+
+    def test_each_distinct_variant_is_annotated_once(self):
+        import main
+        with patch(
+            "main.annotate_substitution", wraps=main.annotate_substitution
+        ) as annotate:
+            self.cohort(predict=True)
+        # G>A at 4 (two carriers), G>C at 4, T>C at 9, G>A at 11
+        self.assertEqual(annotate.call_count, 4)
+
+    def test_cohort_mode_writes_one_matrix(self):
+        """--cohort writes one VCF; --jobs does not change it."""
+        from main import _run_cohort_mode
+        path = "cohort_temp.fasta"
+        with open(path, "w") as f:
+            f.write(f">chr7 ref\n{self.REFERENCE}\n")
+            for i, sample in enumerate(self.SAMPLES):
+                f.write(f">s{i} sample\n{sample}\n")
+        self.temp_files += [path, "cohort_1.vcf", "cohort_3.vcf"]
+        outputs = []
+        for jobs in ("1", "3"):
+            args = parse_args([
+                "--input", path, "--cohort", "--format", "vcf",
+                "--output", f"cohort_{jobs}.vcf", "--jobs", jobs, "--predict",
+            ])
+            with patch('sys.stdout', new=io.StringIO()) as fake_out:
+                _run_cohort_mode(args)
+            self.assertIn("Variantes distintas: 7", fake_out.getvalue())
+            with open(f"cohort_{jobs}.vcf") as f:
+                outputs.append(f.read())
+        self.assertEqual(outputs[0], outputs[1])
+        lines = outputs[0].splitlines()
+        header = [line for line in lines if line.startswith("#CHROM")][0]
+        self.assertTrue(header.endswith("\tFORMAT\ts0\ts1\ts2\ts3"))
+        records = [line.split("\t") for line in lines if not line.startswith("#")]
+        self.assertEqual(
+            [int(record[1]) for record in records],
+            sorted(int(record[1]) for record in records),
+        )
+        self.assertEqual(records[0][:5], ["chr7", "4", ".", "G", "A"])
+        self.assertEqual(records[0][-4:], ["1", "0", "0", "1"])
+
+
+class TestAlignedDetection(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_files = []
+
+    def tearDown(self):
+        for f in self.temp_files:
+            for path in (f, f + ".fai"):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def test_mid_deletion_yields_no_false_snps(self):
+        """Positional detection shifts the tail; alignment does not."""
+        from main import detect_snps_aligned
+        reference = "ATGCCGTAGGCTTACGATCGGATCCA"
+        sample = reference[:10] + reference[13:]
+        self.assertGreater(len(detect_snps(reference, sample)), 3)
+        snps = detect_snps_aligned(reference, sample)
+        self.assertEqual(
+            [(s["position"], s["reference"], s["type"]) for s in snps],
+            [(11, "C", "DELETION"), (12, "T", "DELETION"), (13, "T", "DELETION")],
+        )
+
+    def test_substitutions_match_positional_detection(self):
+        """Without indels both engines agree (frame, CDS and annotation)."""
+        from main import detect_snps_aligned
+        rng = random.Random(5)
+        reference = "".join(rng.choices("ACGT", k=900))
+        sample = list(reference)
+        for position in rng.sample(range(900), 60):
+            sample[position] = rng.choice("ACGT")
+        sample = "".join(sample)
+        # Isolated substitutions: a neighbouring one would share a codon
+        positions = [s["position"] for s in detect_snps(reference, sample)]
+        isolated = "".join(
+            base if i + 1 in positions and not any(
+                abs(i + 1 - p) < 3 for p in positions if p != i + 1
+            ) else reference[i]
+            for i, base in enumerate(sample)
+        )
+        for frame in (1, -3):
+            self.assertEqual(
+                detect_snps_aligned(reference, isolated, [(50, 700)], frame),
+                detect_snps(reference, isolated, [(50, 700)], frame),
+            )
+
+    def test_insertion_is_one_vcf_record(self):
+        from main import detect_snps_aligned
+        from vcf import VcfWriter
+        reference = "ACGTACGTAGCTAGCTAGGATC"
+        snps = detect_snps_aligned(reference, "ACGTACGTAGGGGCTAGCTAGGATC")
+        self.assertEqual(
+            [(s["position"], s["alternate"]) for s in snps],
+            [(10, "G"), (10, "G"), (10, "G")],
+        )
+        path = "aligned_temp.vcf"
+        self.temp_files.append(path)
+        with VcfWriter(path, reference) as writer:
+            writer.write(snps)
+        with open(path) as f:
+            records = [l for l in f if not l.startswith("#")]
+        self.assertEqual(len(records), 1)
+        self.assertIn("\t9\t.\tA\tAGGG\t", records[0])
+
+    def test_seeded_detection_matches_unseeded(self):
+        from main import detect_snps_aligned
+        rng = random.Random(18)
+        reference = "".join(rng.choices("ACGT", k=4000))
+        sample = list(reference)
+        for position in sorted(rng.sample(range(4000), 40), reverse=True):
+            if rng.random() < 0.8:
+                sample[position] = rng.choice("ACGT")
+            else:
+                del sample[position:position + 3]
+        sample = "".join(sample)
+        self.assertEqual(
+            detect_snps_aligned(reference, sample, seed_length=16),
+            detect_snps_aligned(reference, sample),
+        )
+
+    def test_single_sample_mode_seeded_in_parallel(self):
+        from main import _run_single_sample_mode, parse_args
+        rng = random.Random(9)
+        reference = "".join(rng.choices("ACGT", k=600))
+        sample = reference[:200] + reference[260:]
+        self.temp_files.append("aligned_seeded.txt")
+        outputs = []
+        for jobs in ("1", "2"):
+            args = parse_args([
+                "--reference", reference, "--sample", sample, "--align",
+                "--seed-length", "12", "--jobs", jobs, "--quiet",
+                "--output", "aligned_seeded.txt",
+            ])
+            with patch('sys.stdout', new=io.StringIO()):
+                _run_single_sample_mode(args)
+            with open("aligned_seeded.txt") as f:
+                outputs.append(f.read())
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual(outputs[0].count("DELETION"), 60)
+
+    def test_multi_sample_mode_with_align(self):
+        from main import _run_multi_sample_mode, parse_args
+        path = "aligned_temp.fasta"
+        self.temp_files += [path, "aligned_out_s1.txt"]
+        with open(path, "w") as f:
+            f.write(">ref\nATGCCGTAGGCTTACGATCGGATCCA\n"
+                    ">s1\nATGCCGTAGGACGATCGGATCCA\n")
+        args = parse_args(
+            ["--input", path, "--align", "--output", "aligned_out.txt"]
+        )
+        with patch('sys.stdout', new=io.StringIO()) as fake_out:
+            _run_multi_sample_mode(args)
+        self.assertIn("s1 → 3 SNP(s)", fake_out.getvalue())
+
+
+class TestStreamingDetection(unittest.TestCase):
+    """iter_snps_streaming() must reproduce detect_snps() chunk by chunk."""
+
+    def setUp(self):
+        self.temp_files = []
+
+    def tearDown(self):
+        for f in self.temp_files:
+            for path in (f, f + ".fai"):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def write_fasta(self, sequence, width=7):
+        path = f"stream_temp_{len(self.temp_files)}.fasta"
+        with open(path, "w") as f:
+            f.write(">seq\n")
+            for i in range(0, len(sequence), width):
+                f.write(sequence[i:i + width] + "\n")
+        self.temp_files.append(path)
+        return path
+
+    def stream(self, reference, sample, **kwargs):
+        from main import iter_snps_streaming
+        from variants import VariantTable
+        table = VariantTable()
+        for chunk in iter_snps_streaming(
+            self.write_fasta(reference), self.write_fasta(sample), **kwargs
+        ):
+            table.extend(chunk)
+        return table
+
+    def test_matches_detect_snps_for_every_frame_and_chunk_size(self):
+        import random
+        from main import _apply_predictions
+        rng = random.Random(3)
+        reference = "".join(rng.choice("ACGT") for _ in range(50))
+        sample = "".join(
+            rng.choice("ACGT") if rng.random() < 0.2 else base
+            for base in reference
+        )[:46]
+        for frame in (1, 2, 3, -1, -2, -3):
+            expected = detect_snps(reference, sample, [(4, 40)], frame)
+            _apply_predictions(expected, reference, frame)
+            for chunk_size in (1, 2, 5, 64):
+                self.assertEqual(
+                    self.stream(
+                        reference, sample, chunk_size=chunk_size,
+                        cds_regions=[(4, 40)], frame=frame, predict=True,
+                    ),
+                    expected,
+                    (frame, chunk_size),
+                )
+
+    def test_insertion_tail_and_lowercase(self):
+        self.assertEqual(
+            self.stream("acgt", "ACGAGG", chunk_size=2),
+            detect_snps("acgt", "ACGAGG"),
+        )
+
+    def test_streaming_mode_writes_report_without_accumulating(self):
+        """--stream prints rows per chunk and writes the same report file."""
+        from main import _run_streaming_mode, parse_args
+        reference, sample = "ATGGTGTTTTGGAC", "ATGATGTTCTAGA"
+        ref_path = self.write_fasta(reference)
+        smp_path = self.write_fasta(sample)
+        self.temp_files += ["stream_report.txt", "stream_expected.txt"]
+        args = parse_args([
+            "--reference", ref_path, "--sample", smp_path, "--stream",
+            "--chunk-size", "3", "--output", "stream_report.txt",
+        ])
+        with patch('sys.stdout', new=io.StringIO()) as fake_out:
+            _run_streaming_mode(args)
+        self.assertIn("Total de variações encontradas: 4", fake_out.getvalue())
+        generate_snp_file(
+            detect_snps(reference, sample), "stream_expected.txt", verbose=False
+        )
+        with open("stream_report.txt") as a, open("stream_expected.txt") as b:
+            self.assertEqual(a.read(), b.read())
+
+    def test_streaming_mode_binary_format(self):
+        """--stream --format binary writes every chunk to one .snpb file."""
+        from main import _run_streaming_mode, parse_args
+        from variant_file import read_variant_file
+        reference, sample = "ATGGTGTTTTGGAC", "ATGATGTTCTAGA"
+        ref_path = self.write_fasta(reference)
+        smp_path = self.write_fasta(sample)
+        self.temp_files.append("stream_report.snpb")
+        args = parse_args([
+            "--reference", ref_path, "--sample", smp_path, "--stream",
+            "--chunk-size", "3", "--output", "stream_report.snpb",
+            "--format", "binary", "--quiet",
+        ])
+        with patch('sys.stdout', new=io.StringIO()):
+            _run_streaming_mode(args)
+        self.assertEqual(
+            read_variant_file("stream_report.snpb"),
+            detect_snps(reference, sample),
+        )
+
+    def test_streaming_mode_vcf_matches_single_mode(self):
+        """--stream --format vcf anchors tail INDELs through the index."""
+        from main import _run_single_sample_mode, _run_streaming_mode, parse_args
+        reference, sample = "ATGGTGTTTTGGAC", "ATGATGTTCTA"
+        ref_path = self.write_fasta(reference)
+        smp_path = self.write_fasta(sample)
+        self.temp_files += ["stream_calls.vcf", "single_calls.vcf"]
+        for mode, output in ((_run_streaming_mode, "stream_calls.vcf"),
+                             (_run_single_sample_mode, "single_calls.vcf")):
+            args = parse_args([
+                "--reference", ref_path, "--sample", smp_path, "--stream",
+                "--chunk-size", "3", "--output", output, "--format", "vcf",
+                "--quiet",
+            ])
+            with patch('sys.stdout', new=io.StringIO()):
+                mode(args)
+        with open("stream_calls.vcf") as a, open("single_calls.vcf") as b:
+            streamed = a.read()
+            self.assertEqual(streamed, b.read())
+        self.assertIn("\t11\t.\tGGAC\tG\t", streamed)
+
+    def test_invalid_chunk_size_raises(self):
+        with self.assertRaises(ValueError):
+            self.stream("ACGT", "ACGT", chunk_size=0)
+
 
 class TestParseCdsRegions(unittest.TestCase):
 
@@ -248,6 +789,17 @@ class TestParseCdsRegions(unittest.TestCase):
         with self.assertRaises(ValueError):
             parse_cds_regions("90-10")
 
+    def test_parse_region_single_window(self):
+        """parse_region returns a single (start, end) tuple."""
+        from main import parse_region
+        self.assertEqual(parse_region("1001-6000"), (1001, 6000))
+
+    def test_parse_region_rejects_multiple_windows(self):
+        """parse_region accepts exactly one range."""
+        from main import parse_region
+        with self.assertRaises(ValueError):
+            parse_region("1-10,20-30")
+
 
 class TestDetectSnpsWithCds(unittest.TestCase):
 
@@ -370,6 +922,12 @@ class TestDetectSnpsFrame(unittest.TestCase):
 
 class TestPredictFlag(unittest.TestCase):
 
+    def test_apply_predictions_on_soft_masked_reference(self):
+        """A lowercase reference gets the same scores as its uppercase form."""
+        snps = detect_snps("atggttgct", "ATGATTGCT")
+        _apply_predictions(snps, "atggttgct")
+        self.assertEqual(snps[0]["grantham_score"], 29)
+
     def test_parse_args_predict_flag_true(self):
         """--predict flag sets args.predict to True."""
         args = parse_args(["--reference", "ACTG", "--sample", "ACTT", "--predict"])
@@ -390,5 +948,91 @@ class TestPredictFlag(unittest.TestCase):
         self.assertNotIn("grantham_prediction", snps[0])
 
 
+class TestDetectSnpsFields(unittest.TestCase):
+    """detect_snps(fields=...) computes only the selected fields."""
+
+    def setUp(self):
+        rng = random.Random(7)
+        self.ref = "".join(rng.choice("ACGT") for _ in range(3000))
+        smp = list(self.ref)
+        for position in rng.sample(range(3000), 60):
+            smp[position] = "N" if position % 7 == 0 else rng.choice(
+                [base for base in "ACGT" if base != smp[position]]
+            )
+        self.smp = "".join(smp) + "ACG"
+        self.full = detect_snps(self.ref, self.smp, cds_regions=[(1, 1500)])
+
+    def _project(self, table, keys):
+        return [{key: row[key] for key in keys if key in row} for row in table]
+
+    def test_position_only_matches_full_detection(self):
+        """Bulk path: same positions and bases, no optional fields on SNPs."""
+        snps = detect_snps(self.ref, self.smp, cds_regions=[(1, 1500)], fields=[])
+        keys = ("position", "reference", "alternate")
+        self.assertEqual(self._project(snps, keys), self._project(self.full, keys))
+        self.assertEqual(set(snps[0]), set(keys))
+        # INDELs da cauda continuam completos
+        self.assertEqual(snps[-1]["type"], "INSERTION")
+        self.assertEqual(snps[-1]["annotation"], "NON_CODING")
+
+    def test_each_selection_matches_full_detection(self):
+        for fields in (["type"], ["annotation"], ["context"], ["type", "context"]):
+            with self.subTest(fields=fields):
+                snps = detect_snps(
+                    self.ref, self.smp, cds_regions=[(1, 1500)], fields=fields
+                )
+                keys = ("position", "reference", "alternate", *fields)
+                self.assertEqual(
+                    self._project(snps, keys), self._project(self.full, keys)
+                )
+                omitted = {"type", "annotation", "context"} - set(fields)
+                self.assertFalse(omitted & set(snps[0]))
+
+    def test_packed_and_cached_detection_honour_fields(self):
+        packed = detect_snps(
+            PackedSequence.from_str(self.ref), PackedSequence.from_str(self.smp),
+            fields=["type"],
+        )
+        self.assertEqual(packed, detect_snps(self.ref, self.smp, fields=["type"]))
+        cache = AnnotationCache()
+        cached = detect_snps(
+            self.ref, self.smp, annotation_cache=cache, fields=["annotation"]
+        )
+        self.assertEqual(cache.misses, 0)
+        self.assertNotIn("context", cached[0])
+
+    def test_select_fields(self):
+        self.assertIn("context", select_fields(None))
+        self.assertEqual(
+            select_fields(["position", "grantham"]), {"grantham", "annotation"}
+        )
+        with self.assertRaises(ValueError):
+            select_fields(["codon"])
+
+    def test_parse_args_fields(self):
+        args = parse_args(["--reference", "A", "--sample", "C"])
+        self.assertIsNone(args.fields)
+        args = parse_args([
+            "--reference", "A", "--sample", "C", "--fields", "position, type",
+        ])
+        self.assertEqual(args.fields, ("position", "type"))
+        self.assertFalse(args.predict)
+        args = parse_args([
+            "--reference", "A", "--sample", "C", "--fields", "type", "--predict",
+        ])
+        self.assertIn("grantham", args.fields)
+        args = parse_args([
+            "--reference", "A", "--sample", "C", "--fields", "grantham",
+        ])
+        self.assertTrue(args.predict)
+        for extra in (["--fields", "codon"], ["--input", "x.fa", "--cohort",
+                      "--format", "vcf", "--fields", "type"]):
+            with self.assertRaises(SystemExit), patch("sys.stderr"):
+                if "--input" in extra:
+                    parse_args(extra)
+                else:
+                    parse_args(["--reference", "A", "--sample", "C", *extra])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,140 @@
+"""Tests for packed_sequence.py — 2-bit sequences and XOR mismatch scan."""
+
+import random
+import unittest
+from main import detect_snps
+from packed_sequence import PackedSequence
+from scanner import find_mismatches
+
+
+def _random_sequence(rng: random.Random, length: int) -> str:
+    return "".join(rng.choices("ACGTN", weights=(8, 8, 8, 8, 1), k=length))
+
+
+class TestPackedSequence(unittest.TestCase):
+
+    def test_round_trip(self):
+        for sequence in ("", "A", "ACG", "ACGT", "TTGCAN", "ACGTNNNNRYACGTA"):
+            packed = PackedSequence.from_str(sequence)
+            self.assertEqual(len(packed), len(sequence))
+            self.assertEqual(str(packed), sequence)
+
+    def test_four_bases_per_byte(self):
+        packed = PackedSequence.from_str("TCAG" * 1000 + "A")
+        self.assertEqual(len(packed.data), 1001)
+        self.assertEqual(packed.data[0], 0b00011011)
+
+    def test_lowercase_is_uppercased(self):
+        self.assertEqual(str(PackedSequence.from_str("acgtn")), "ACGTN")
+
+    def test_exceptions_are_runs(self):
+        packed = PackedSequence.from_str("ACNNNNGTRRYA")
+        self.assertEqual(packed.exceptions, [(2, 4, "N"), (8, 2, "R"), (10, 1, "Y")])
+
+    def test_indexing_and_slicing(self):
+        rng = random.Random(3)
+        sequence = _random_sequence(rng, 500)
+        packed = PackedSequence.from_str(sequence)
+        for _ in range(200):
+            start = rng.randrange(-20, 520)
+            stop = rng.randrange(-20, 520)
+            self.assertEqual(packed[start:stop], sequence[start:stop])
+        self.assertEqual(packed[-1], sequence[-1])
+        with self.assertRaises(IndexError):
+            packed[500]
+        with self.assertRaises(ValueError):
+            packed[::2]
+
+    def test_from_chunks_equals_from_str(self):
+        """Runs and bases are stitched across chunk boundaries."""
+        rng = random.Random(5)
+        sequence = _random_sequence(rng, 3000) + "N" * 70 + "ACG"
+        lines = [sequence[i:i + 61] for i in range(0, len(sequence), 61)]
+        self.assertEqual(
+            PackedSequence.from_chunks(lines), PackedSequence.from_str(sequence)
+        )
+
+    def test_equality(self):
+        packed = PackedSequence.from_str("ACGTN")
+        self.assertEqual(packed, "acgtn")
+        self.assertNotEqual(packed, PackedSequence.from_str("ACGTA"))
+        self.assertNotEqual(packed, PackedSequence.from_str("ACGT"))
+
+
+class TestPackedMismatches(unittest.TestCase):
+
+    def test_matches_scanner(self):
+        """mismatches() equals find_mismatches() on the decoded sequences."""
+        rng = random.Random(11)
+        for _ in range(200):
+            reference = _random_sequence(rng, rng.randint(0, 3000))
+            sample = list(reference)
+            for _ in range(rng.randint(0, 30)):
+                if sample:
+                    sample[rng.randrange(len(sample))] = rng.choice("ACGTNRY")
+            sample = "".join(sample)[:rng.randint(0, len(sample))]
+            start = rng.randint(0, len(reference))
+            end = rng.randint(0, len(reference))
+            packed_ref = PackedSequence.from_str(reference)
+            packed_smp = PackedSequence.from_str(sample)
+            self.assertEqual(
+                packed_ref.mismatches(packed_smp),
+                find_mismatches(reference, sample),
+            )
+            self.assertEqual(
+                packed_ref.mismatches(packed_smp, start, end),
+                find_mismatches(reference, sample, start, end),
+            )
+
+    def test_across_blocks(self):
+        rng = random.Random(13)
+        reference = "".join(rng.choices("ACGT", k=200_000))
+        sample = list(reference)
+        for k in (0, 65_535, 65_536, 65_537, 131_071, 199_999):
+            sample[k] = "A" if sample[k] != "A" else "C"
+        sample = "".join(sample)
+        self.assertEqual(
+            PackedSequence.from_str(reference).mismatches(
+                PackedSequence.from_str(sample)
+            ),
+            find_mismatches(reference, sample),
+        )
+
+    def test_n_against_base_is_a_mismatch(self):
+        """N packs as T but is still compared as N."""
+        reference = PackedSequence.from_str("ACGTT")
+        sample = PackedSequence.from_str("ACGNT")
+        self.assertEqual(reference.mismatches(sample), [3])
+
+
+class TestPackedDetection(unittest.TestCase):
+
+    def test_detect_snps_packed_equals_str(self):
+        rng = random.Random(19)
+        for frame in (1, 2, -1):
+            reference = "".join(rng.choices("ACGT", k=150_000))
+            sample = list(reference)
+            for _ in range(300):
+                sample[rng.randrange(len(sample))] = rng.choice("ACGTN")
+            sample = "".join(sample)[:-7]
+            cds = [(100, 90_000), (120_001, 149_000)]
+            expected = detect_snps(reference, sample, cds, frame).to_dicts()
+            packed = detect_snps(
+                PackedSequence.from_str(reference),
+                PackedSequence.from_str(sample),
+                cds,
+                frame,
+            ).to_dicts()
+            self.assertEqual(packed, expected)
+
+    def test_mixed_inputs(self):
+        """A str on either side is packed to match the other."""
+        expected = detect_snps("ACGTACGTAC", "ACTTACGAACGG").to_dicts()
+        self.assertEqual(
+            detect_snps(PackedSequence.from_str("ACGTACGTAC"), "ACTTACGAACGG").to_dicts(),
+            expected,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
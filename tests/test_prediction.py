@@ -4,9 +4,12 @@ import unittest
 from prediction import (
     translate_dna_to_protein,
     get_amino_acid_change,
+    get_amino_acid_changes,
     grantham_score,
     grantham_prediction,
+    grantham_scores,
     predict_functional_impact,
+    predict_functional_impacts,
 )
 
 
@@ -192,6 +195,103 @@ class TestPredictFunctionalImpact(unittest.TestCase):
         self.assertEqual(result["grantham_prediction"], "RADICAL")
         self.assertGreater(result["grantham_score"], 150)
 
+    def test_second_snp_of_a_codon_is_scored_on_its_own_substitution(self):
+        """AAA->ACG makes SNP 6 NON_SYNONYMOUS, but A->G alone keeps Lys."""
+        ref = "ATGAAAGCC"
+        snp = {
+            "position": 6, "reference": "A", "alternate": "G",
+            "type": "TRANSITION", "annotation": "NON_SYNONYMOUS",
+            "context": "A[A>G]G",
+        }
+        expected = {"grantham_score": 0, "grantham_prediction": "CONSERVATIVE"}
+        self.assertEqual(predict_functional_impact(snp, ref), expected)
+        self.assertEqual(
+            grantham_scores([5, 6], "CG", ["NON_SYNONYMOUS"] * 2, ref),
+            [grantham_score("Lys", "Thr"), 0],
+        )
+
+    def test_soft_masked_reference(self):
+        """Lowercase (soft-masked) reference bases are scored like uppercase."""
+        snp = {"position": 4, "alternate": "A", "annotation": "NON_SYNONYMOUS"}
+        self.assertEqual(
+            predict_functional_impact(snp, self._REF.lower()),
+            predict_functional_impact(snp, self._REF),
+        )
+        self.assertEqual(
+            grantham_scores([4], ["a"], ["NON_SYNONYMOUS"], "atggttgct", -3),
+            grantham_scores([4], ["A"], ["NON_SYNONYMOUS"], "ATGGTTGCT", -3),
+        )
+
+
+class TestBatchPrediction(unittest.TestCase):
+    _REF = "ATGGTTGCT"
+    _SNPS = [
+        {"position": 4, "alternate": "A", "annotation": "NON_SYNONYMOUS"},
+        {"position": 9, "alternate": "C", "annotation": "SYNONYMOUS"},
+        {"position": 5, "alternate": "C", "annotation": "NON_SYNONYMOUS"},
+    ]
+
+    def test_get_amino_acid_changes_matches_single_calls(self):
+        """Batch changes equal per-SNP get_amino_acid_change() results."""
+        self.assertEqual(
+            get_amino_acid_changes(self._SNPS, self._REF),
+            [get_amino_acid_change(s, self._REF) for s in self._SNPS],
+        )
+
+    def test_batch_functions_accept_a_variant_table(self):
+        """Tables are read column by column and give the same results."""
+        from variants import VariantTable
+        table = VariantTable()
+        for snp in self._SNPS:
+            ref_base = self._REF[snp["position"] - 1]
+            table.append(snp["position"], ref_base, snp["alternate"],
+                         "TRANSVERSION", snp["annotation"])
+        self.assertEqual(
+            get_amino_acid_changes(table, self._REF),
+            get_amino_acid_changes(self._SNPS, self._REF),
+        )
+        self.assertEqual(
+            predict_functional_impacts(table, self._REF),
+            predict_functional_impacts(self._SNPS, self._REF),
+        )
+
+    def test_predict_functional_impacts_preserves_order(self):
+        """One prediction per SNP, in input order."""
+        result = predict_functional_impacts(self._SNPS, self._REF)
+        self.assertEqual(len(result), 3)
+        self.assertEqual(result[0]["grantham_score"], 29)
+        self.assertEqual(result[1], {})
+        self.assertIn("grantham_prediction", result[2])
+
+    def test_reverse_frame_alternate_codon(self):
+        """Reverse frames complement the substituted base in the codon."""
+        # rev_comp("GCTAAACGT") = ACGTTTAGC; pos 9 T->A: ACG(Thr)->TCG(Ser)
+        snp = {"position": 9, "alternate": "A", "annotation": "NON_SYNONYMOUS"}
+        self.assertEqual(
+            get_amino_acid_change(snp, "GCTAAACGT", frame=-1),
+            ("Thr", 1, "Ser"),
+        )
+
+    def test_grantham_scores_columnar(self):
+        """Columnar scores equal the per-SNP predictions."""
+        scores = grantham_scores(
+            [s["position"] for s in self._SNPS],
+            [s["alternate"] for s in self._SNPS],
+            [s["annotation"] for s in self._SNPS],
+            self._REF,
+        )
+        expected = [
+            predict_functional_impact(s, self._REF).get("grantham_score")
+            for s in self._SNPS
+        ]
+        self.assertEqual(scores, expected)
+
+    def test_non_acgt_codon_returns_none(self):
+        """Codons holding non-ACGT bases yield no amino acid change."""
+        snp = {"position": 1, "alternate": "A", "annotation": "NON_SYNONYMOUS"}
+        self.assertIsNone(get_amino_acid_change(snp, "NTGGTT"))
+        self.assertEqual(predict_functional_impact(snp, "NTGGTT"), {})
+
 
 if __name__ == "__main__":
     unittest.main()
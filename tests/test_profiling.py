@@ -0,0 +1,76 @@
+"""Tests for profiling.py — stage timings behind --timings / --profile."""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import profiling
+from main import main
+
+
+class TestStageRecorder(unittest.TestCase):
+
+    def tearDown(self):
+        profiling.disable()
+
+    def test_stages_accumulate(self):
+        recorder = profiling.StageRecorder()
+        for _ in range(3):
+            with recorder.stage("detect"):
+                sum(range(1000))
+        with recorder.stage("write"):
+            pass
+        stages = recorder.to_dict()
+        self.assertEqual(list(stages), ["detect", "write"])
+        self.assertEqual(stages["detect"]["calls"], 3)
+        self.assertGreaterEqual(stages["detect"]["wall_s"], 0)
+        self.assertIn("max_rss_mb", stages["detect"])
+
+    def test_timed_counts_items(self):
+        recorder = profiling.StageRecorder()
+        self.assertEqual(list(recorder.timed("load", "abc")), ["a", "b", "c"])
+        self.assertEqual(recorder.to_dict()["load"]["calls"], 3)
+
+    def test_module_markers_are_no_ops_when_disabled(self):
+        profiling.disable()
+        items = [1, 2]
+        self.assertIs(profiling.timed("load", items), items)
+        with profiling.stage("detect"):
+            pass
+        recorder = profiling.enable()
+        with profiling.stage("detect"):
+            pass
+        self.assertIs(profiling.active(), recorder)
+        self.assertEqual(recorder.to_dict()["detect"]["calls"], 1)
+
+
+class TestTimingsCli(unittest.TestCase):
+
+    def test_timings_and_profile_sidecars(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "out.txt")
+            argv = [
+                "main.py", "--reference", "ACTGACTGAC", "--sample", "ACTTACTGAA",
+                "--output", output, "--predict", "--quiet", "--profile",
+            ]
+            with patch("sys.argv", argv), \
+                    patch("sys.stdout", new=io.StringIO()) as fake_out:
+                main()
+            self.assertIn("Tempos salvos em", fake_out.getvalue())
+            with open(output + ".timings.json") as f:
+                document = json.load(f)
+            self.assertEqual(document["mode"], "single_sample")
+            for name in ("load", "scan", "annotate", "detect", "predict",
+                         "report", "write", "total"):
+                self.assertEqual(document["stages"][name]["calls"], 1)
+            self.assertEqual(document["profile"], output + ".prof")
+            self.assertTrue(os.path.exists(output + ".prof"))
+            self.assertTrue(document["top_functions"])
+        self.assertIsNone(profiling.active())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+"""Tests for report.py — streaming report output."""
+
+import os
+import unittest
+from report import ReportWriter, summarize_sequence
+from main import detect_snps, generate_snp_file
+
+
+class TestSummarizeSequence(unittest.TestCase):
+
+    def test_short_sequence_unchanged(self):
+        self.assertEqual(summarize_sequence("ACGT"), "ACGT")
+
+    def test_long_sequence_is_capped(self):
+        """Only head and tail are shown, with the total length."""
+        summary = summarize_sequence("A" * 5 + "C" * 1000 + "G" * 5, limit=10)
+        self.assertEqual(summary, "AAAAA...GGGGG (1010 bp)")
+
+
+class TestReportWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.paths = ["report_stream.txt", "report_batch.txt"]
+
+    def tearDown(self):
+        for path in self.paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_streamed_batches_match_single_report(self):
+        """Writing chunk by chunk yields the same file as one batch."""
+        snps = detect_snps("ATGGTGTTTTGGAC", "ATGATGTTCTAGA")
+        with ReportWriter(self.paths[0]) as writer:
+            writer.write(snps.to_dicts()[:2])
+            writer.write([])
+            writer.write(snps.to_dicts()[2:])
+        self.assertEqual(writer.count, len(snps))
+        generate_snp_file(snps, output_file=self.paths[1], verbose=False)
+        with open(self.paths[0]) as a, open(self.paths[1]) as b:
+            self.assertEqual(a.read(), b.read())
+
+    def test_header_states_total(self):
+        with ReportWriter(self.paths[0]) as writer:
+            writer.write(detect_snps("ACGT", "TCGA"))
+        with open(self.paths[0]) as f:
+            self.assertIn("Total de SNPs: 2\n", f.read())
+
+    def test_error_leaves_no_report(self):
+        """An exception inside the with block discards the report."""
+        with self.assertRaises(RuntimeError):
+            with ReportWriter(self.paths[0]) as writer:
+                writer.write(detect_snps("ACGT", "TCGA"))
+                raise RuntimeError
+        self.assertFalse(os.path.exists(self.paths[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+"""Tests for scanner.py — bulk mismatch localisation."""
+
+import random
+import unittest
+from scanner import find_mismatches, iter_mismatches
+
+
+def _naive(reference, sample, start=0, end=None):
+    limit = min(len(reference), len(sample))
+    end = limit if end is None else min(end, limit)
+    return [i for i in range(start, end) if reference[i] != sample[i]]
+
+
+class TestFindMismatches(unittest.TestCase):
+
+    def test_identical_sequences(self):
+        """Identical sequences have no mismatches."""
+        self.assertEqual(find_mismatches("ACTG", "ACTG"), [])
+
+    def test_empty_sequences(self):
+        """Empty input returns an empty list."""
+        self.assertEqual(find_mismatches("", ""), [])
+
+    def test_single_mismatch(self):
+        """A single differing base is reported 0-indexed."""
+        self.assertEqual(find_mismatches("ACTG", "ACTT"), [3])
+
+    def test_only_overlap_is_compared(self):
+        """Bases past the shorter sequence are ignored."""
+        self.assertEqual(find_mismatches("ACTGAAA", "TCTG"), [0])
+
+    def test_start_and_end_bounds(self):
+        """start/end restrict the compared range."""
+        self.assertEqual(find_mismatches("AAAAA", "TTTTT", 1, 3), [1, 2])
+
+    def test_matches_naive_scan_across_blocks(self):
+        """Results are identical to a per-base loop on multi-block input."""
+        rng = random.Random(7)
+        reference = "".join(rng.choices("ACGT", k=200_000))
+        sample = list(reference)
+        for pos in rng.sample(range(len(reference)), 300):
+            sample[pos] = "N"
+        sample = "".join(sample)
+        self.assertEqual(
+            find_mismatches(reference, sample), _naive(reference, sample)
+        )
+
+    def test_non_latin1_characters(self):
+        """Characters outside Latin-1 are still compared correctly."""
+        self.assertEqual(find_mismatches("AΩCG", "AΩTG"), [2])
+
+    def test_iter_mismatches_is_lazy(self):
+        """iter_mismatches yields the same positions one at a time."""
+        iterator = iter_mismatches("ACGTACGT", "TCGTACGA")
+        self.assertEqual(next(iterator), 0)
+        self.assertEqual(list(iterator), [7])
+
+
+if __name__ == "__main__":
+    unittest.main()
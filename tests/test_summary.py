@@ -0,0 +1,148 @@
+"""Tests for summary.py — divergence summaries (--summary)."""
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from collections import Counter
+
+from main import detect_snps, parse_args, summarize_pair, summarize_streaming
+from packed_sequence import PackedSequence
+from summary import (
+    COLUMNS, SPECTRUM_CHANNELS, DivergenceSummary, write_summaries,
+)
+
+
+def _channel(context: str) -> str | None:
+    """COSMIC channel of a detect_snps() context, or None."""
+    five, ref, alt, three = context[0], context[2], context[4], context[6]
+    if not {five, ref, alt, three} <= set("ACGT"):
+        return None
+    if ref in "GA":
+        complement = str.maketrans("ACGT", "TGCA")
+        five, ref, alt, three = (
+            base.translate(complement) for base in (three, ref, alt, five)
+        )
+    return f"{five}[{ref}>{alt}]{three}"
+
+
+class TestSpectrumChannels(unittest.TestCase):
+
+    def test_cosmic_order(self):
+        self.assertEqual(len(SPECTRUM_CHANNELS), 96)
+        self.assertEqual(SPECTRUM_CHANNELS[0], "A[C>A]A")
+        self.assertEqual(SPECTRUM_CHANNELS[-1], "T[T>G]T")
+        self.assertEqual(len(COLUMNS), 13 + 96)
+
+    def test_purine_references_fold_to_pyrimidine_strand(self):
+        """A G>T in A_C context is G[C>A]T; edge SNPs have no channel."""
+        summary = DivergenceSummary()
+        summary.add_window("AGCTA", "ATCTC", [1, 4])
+        spectrum = summary.spectrum()
+        self.assertEqual(spectrum["G[C>A]T"], 1)
+        self.assertEqual(sum(spectrum.values()), 1)
+        self.assertEqual((summary.snps, summary.transversions), (2, 2))
+        self.assertEqual(summary.ti_tv, 0.0)
+
+
+class TestSummarizePair(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(11)
+        self.ref = "".join(rng.choice("ACGT") for _ in range(5000))
+        smp = list(self.ref)
+        for position in rng.sample(range(5000), 150):
+            smp[position] = "N" if position % 9 == 0 else rng.choice(
+                [base for base in "ACGT" if base != smp[position]]
+            )
+        self.smp = "".join(smp)[:-4]
+        self.cds = [(1, 2000), (3001, 4500)]
+
+    def test_counts_match_detect_snps(self):
+        for frame in (1, -3):
+            with self.subTest(frame=frame):
+                snps = [
+                    row for row in detect_snps(self.ref, self.smp, self.cds, frame)
+                    if row["type"] in ("TRANSITION", "TRANSVERSION")
+                ]
+                summary = summarize_pair(self.ref, self.smp, self.cds, frame)
+                self.assertEqual(summary.snps, len(snps))
+                self.assertEqual(
+                    summary.transitions,
+                    sum(row["type"] == "TRANSITION" for row in snps),
+                )
+                annotations = Counter(row["annotation"] for row in snps)
+                self.assertEqual(
+                    summary.annotations,
+                    {name: annotations[name] for name in summary.annotations},
+                )
+                channels = Counter(
+                    _channel(row["context"]) for row in snps
+                )
+                self.assertEqual(
+                    summary.spectrum(),
+                    {name: channels[name] for name in SPECTRUM_CHANNELS},
+                )
+                self.assertEqual((summary.deletions, summary.insertions), (4, 0))
+                self.assertEqual(summary.compared, len(self.smp))
+
+    def test_packed_and_streaming_agree(self):
+        expected = summarize_pair(self.ref, self.smp, self.cds).row()
+        packed = summarize_pair(
+            PackedSequence.from_str(self.ref), PackedSequence.from_str(self.smp),
+            self.cds,
+        )
+        self.assertEqual(packed.row(), expected)
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        paths = []
+        for name, sequence in (("ref", self.ref), ("smp", self.smp)):
+            path = os.path.join(directory, f"{name}.fasta")
+            with open(path, "w") as f:
+                f.write(f">{name}\n")
+                for start in range(0, len(sequence), 60):
+                    f.write(sequence[start:start + 60] + "\n")
+            paths.append(path)
+        streamed = summarize_streaming(*paths, chunk_size=777, cds_regions=self.cds)
+        self.assertEqual(streamed.row(), expected)
+
+    def test_fields_skip_annotation_and_spectrum(self):
+        summary = summarize_pair(self.ref, self.smp, fields=["type"], name="s1")
+        self.assertIsNone(summary.annotations)
+        self.assertIsNone(summary.spectrum())
+        row = summary.row()
+        self.assertEqual(row[0], "s1")
+        self.assertEqual(row[9:], [""] * (4 + 96))
+
+    def test_write_summaries(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        path = os.path.join(directory, "summary.tsv")
+        count = write_summaries(path, (
+            summarize_pair(self.ref, sample, name=name)
+            for name, sample in (("a", self.smp), ("b", self.ref))
+        ))
+        self.assertEqual(count, 2)
+        with open(path) as f:
+            lines = [line.rstrip("\n").split("\t") for line in f]
+        self.assertEqual(lines[0], list(COLUMNS))
+        self.assertEqual([line[0] for line in lines[1:]], ["a", "b"])
+        self.assertEqual(lines[2][2], "0")
+
+
+class TestParseArgsSummary(unittest.TestCase):
+
+    def test_default_output_and_rejected_combinations(self):
+        args = parse_args(["--input", "x.fa", "--summary"])
+        self.assertEqual(args.output, "snps_summary.tsv")
+        for extra in (
+            ["--cohort", "--format", "vcf"], ["--format", "vcf"], ["--predict"],
+            ["--fields", "grantham"], ["--cache-dir", "c"],
+        ):
+            with self.subTest(extra=extra), self.assertRaises(SystemExit):
+                parse_args(["--input", "x.fa", "--summary", *extra])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+"""Tests for twobit.py — packed .2bit reference files."""
+
+import io
+import os
+import random
+import struct
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from main import detect_snps, load_sequence, main
+from packed_sequence import PackedSequence
+from twobit import (
+    TWOBIT_SIGNATURE,
+    TwoBitFile,
+    fasta_to_twobit,
+    is_twobit,
+    write_twobit,
+)
+
+
+class TestTwoBit(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_layout(self):
+        """Header, index and record follow the UCSC layout."""
+        path = self.path("one.2bit")
+        write_twobit([("chr1 description", PackedSequence.from_str("TCAGNNA"))], path)
+        with open(path, "rb") as f:
+            data = f.read()
+        self.assertEqual(
+            struct.unpack_from("<IIII", data), (TWOBIT_SIGNATURE, 0, 1, 0)
+        )
+        self.assertEqual(data[16:21], b"\x04chr1")
+        (offset,) = struct.unpack_from("<I", data, 21)
+        self.assertEqual(offset, 25)
+        self.assertEqual(
+            struct.unpack_from("<IIIIII", data, offset), (7, 1, 4, 2, 0, 0)
+        )
+        self.assertEqual(data[offset + 24:], bytes([0b00011011, 0b00001000]))
+
+    def test_round_trip(self):
+        rng = random.Random(9)
+        records = [
+            ("chr1", "".join(rng.choices("ACGTN", k=1001))),
+            ("chr2", "NNNN" + "".join(rng.choices("ACGT", k=50)) + "NN"),
+            ("empty", ""),
+        ]
+        path = self.path("genome.2bit")
+        write_twobit(
+            [(name, PackedSequence.from_str(seq)) for name, seq in records], path
+        )
+        self.assertTrue(is_twobit(path))
+        twobit = TwoBitFile(path)
+        self.assertEqual(twobit.names, ["chr1", "chr2", "empty"])
+        for name, sequence in records:
+            self.assertEqual(str(twobit.sequence(name)), sequence)
+        self.assertEqual(str(twobit.sequence()), records[0][1])
+        with self.assertRaises(KeyError):
+            twobit.sequence("chrX")
+
+    def test_iupac_codes_become_n(self):
+        """As with faToTwoBit, adjacent N/IUPAC runs form one N block."""
+        path = self.path("iupac.2bit")
+        write_twobit([("s", PackedSequence.from_str("ACNNRYGT"))], path)
+        sequence = TwoBitFile(path).sequence()
+        self.assertEqual(str(sequence), "ACNNNNGT")
+        self.assertEqual(sequence.exceptions, [(2, 4, "N")])
+
+    def test_fasta_to_twobit(self):
+        fasta = self.path("ref.fasta")
+        with open(fasta, "w") as f:
+            f.write(">chr1 first\nACGTN\nACG\n>chr2\nTTTT\n")
+        path = self.path("ref.2bit")
+        self.assertEqual(fasta_to_twobit(fasta, path), 2)
+        twobit = TwoBitFile(path)
+        self.assertEqual(twobit.names, ["chr1", "chr2"])
+        self.assertEqual(str(twobit.sequence("chr2")), "TTTT")
+        self.assertFalse(is_twobit(fasta))
+
+    def test_not_a_twobit_file(self):
+        path = self.path("plain.bin")
+        with open(path, "wb") as f:
+            f.write(bytes(16))
+        with self.assertRaises(ValueError):
+            TwoBitFile(path)
+
+    def test_pack_reference_and_load(self):
+        """--pack-reference writes ref.2bit; load_sequence maps it."""
+        rng = random.Random(21)
+        reference = "".join(rng.choices("ACGT", k=5000))
+        sample = list(reference)
+        for _ in range(40):
+            sample[rng.randrange(len(sample))] = rng.choice("ACGT")
+        sample = "".join(sample)
+        fasta = self.path("ref.fasta")
+        with open(fasta, "w") as f:
+            f.write(">ref\n" + "\n".join(
+                reference[i:i + 60] for i in range(0, len(reference), 60)
+            ) + "\n")
+        with patch("sys.argv", ["main.py", "--pack-reference", fasta]), \
+                patch("sys.stdout", new=io.StringIO()) as fake_out:
+            main()
+        path = self.path("ref.2bit")
+        self.assertIn(path, fake_out.getvalue())
+
+        loaded = load_sequence(path)
+        self.assertIsInstance(loaded, PackedSequence)
+        self.assertEqual(loaded, reference)
+        self.assertEqual(load_sequence(path, (11, 20)), reference[10:20])
+        self.assertEqual(
+            detect_snps(loaded, sample).to_dicts(),
+            detect_snps(reference, sample).to_dicts(),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
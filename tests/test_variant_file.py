@@ -0,0 +1,109 @@
+"""Tests for variant_file.py — binary .snpb variant format."""
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from main import detect_snps, _apply_predictions
+from variant_file import (
+    VariantFileReader, VariantFileWriter, read_variant_file,
+)
+
+
+def _random_pair(seed: int, length: int = 3000) -> tuple[str, str]:
+    rng = random.Random(seed)
+    reference = "".join(rng.choice("ACGT") for _ in range(length))
+    sample = "".join(
+        base if rng.random() > 0.05 else rng.choice("ACGT")
+        for base in reference
+    )
+    return reference, sample[:length - 7]
+
+
+class TestVariantFile(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "variants.snpb")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_round_trip_with_predictions(self):
+        """Every field, including Grantham scores, survives a round trip."""
+        reference, sample = _random_pair(1)
+        snps = detect_snps(reference, sample)
+        _apply_predictions(snps, reference)
+        with VariantFileWriter(self.path) as writer:
+            writer.write(snps)
+        self.assertEqual(writer.count, len(snps))
+        self.assertEqual(read_variant_file(self.path), snps)
+
+    def test_multiple_blocks_and_batches(self):
+        """Batches are re-split into blocks of block_size variants."""
+        reference, sample = _random_pair(2)
+        snps = detect_snps(reference, sample)
+        records = snps.to_dicts()
+        with VariantFileWriter(self.path, block_size=16) as writer:
+            writer.write(records[:5])
+            writer.write([])
+            writer.write(records[5:])
+        reader = VariantFileReader(self.path)
+        self.assertEqual(len(reader), len(snps))
+        self.assertEqual(len(reader.blocks), -(-len(snps) // 16))
+        self.assertEqual(reader.fetch(), snps)
+        self.assertEqual(
+            sum(len(block) for block in reader.iter_blocks()), len(snps)
+        )
+
+    def test_range_fetch_matches_filter(self):
+        """fetch(start, end) returns exactly the variants in [start, end]."""
+        reference, sample = _random_pair(3)
+        snps = detect_snps(reference, sample)
+        with VariantFileWriter(self.path, block_size=8) as writer:
+            writer.write(snps)
+        reader = VariantFileReader(self.path)
+        rng = random.Random(3)
+        for _ in range(50):
+            start = rng.randint(0, len(reference))
+            end = rng.randint(start - 5, len(reference) + 10)
+            expected = [
+                snp for snp in snps.to_dicts()
+                if start <= snp["position"] <= end
+            ]
+            self.assertEqual(reader.fetch(start, end), expected)
+        self.assertEqual(reader.fetch(end=10), [
+            snp for snp in snps.to_dicts() if snp["position"] <= 10
+        ])
+
+    def test_empty_file(self):
+        with VariantFileWriter(self.path):
+            pass
+        self.assertEqual(len(VariantFileReader(self.path)), 0)
+        self.assertEqual(read_variant_file(self.path), [])
+
+    def test_decreasing_positions_raise(self):
+        snps = detect_snps("ATGGTGTTTTGG", "ATGATGTTCTAG")
+        with VariantFileWriter(self.path) as writer:
+            writer.write(snps.to_dicts()[1:])
+            with self.assertRaises(ValueError):
+                writer.write(snps.to_dicts()[:1])
+
+    def test_error_discards_file(self):
+        """An exception inside the with block leaves no file behind."""
+        with self.assertRaises(RuntimeError):
+            with VariantFileWriter(self.path) as writer:
+                writer.write(detect_snps("ATGGTG", "ATGATG"))
+                raise RuntimeError("boom")
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_not_a_variant_file_raises(self):
+        with open(self.path, "wb") as f:
+            f.write(b"SNPTRACKER - RELATORIO DE SNPs\n")
+        with self.assertRaises(ValueError):
+            VariantFileReader(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
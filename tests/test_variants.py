@@ -0,0 +1,206 @@
+"""Tests for variants.py — columnar variant storage."""
+
+import unittest
+from main import detect_snps, _apply_predictions
+from variants import VariantTable, VariantRow
+
+
+SNP = {
+    "position": 2, "reference": "A", "alternate": "G",
+    "type": "TRANSITION", "annotation": "SYNONYMOUS", "context": "T[A>G]C",
+}
+INDEL = {
+    "position": 5, "reference": "-", "alternate": "T",
+    "type": "INSERTION", "annotation": "NON_CODING",
+}
+
+
+class TestVariantTable(unittest.TestCase):
+
+    def test_empty_table(self):
+        """A new table is empty and equal to an empty list."""
+        table = VariantTable()
+        self.assertEqual(len(table), 0)
+        self.assertEqual(table, [])
+        self.assertFalse(table.has_grantham)
+
+    def test_from_records_round_trip(self):
+        """from_records() followed by to_dicts() preserves every field."""
+        table = VariantTable.from_records([SNP, INDEL])
+        self.assertEqual(table.to_dicts(), [SNP, INDEL])
+        self.assertEqual(table, [SNP, INDEL])
+
+    def test_from_records_returns_table_unchanged(self):
+        table = VariantTable.from_records([SNP])
+        self.assertIs(VariantTable.from_records(table), table)
+
+    def test_row_is_mapping(self):
+        """Rows expose only the keys present for that variant."""
+        table = VariantTable.from_records([SNP, INDEL])
+        row = table[1]
+        self.assertIsInstance(row, VariantRow)
+        self.assertEqual(row["position"], 5)
+        self.assertNotIn("context", row)
+        self.assertIsNone(row.get("context"))
+        with self.assertRaises(KeyError):
+            row["context"]
+
+    def test_row_assignment_writes_the_table(self):
+        """Assigned fields land in the columns; unknown keys are rejected."""
+        table = VariantTable.from_records([SNP, INDEL])
+        row = table[0]
+        row["annotation"] = "NON_SYNONYMOUS"
+        row.update({"grantham_score": 64, "grantham_prediction": "MODERATE"})
+        self.assertEqual(
+            table[0],
+            dict(SNP, annotation="NON_SYNONYMOUS", grantham_score=64,
+                 grantham_prediction="MODERATE"),
+        )
+        self.assertNotIn("grantham_score", table[1])
+        del row["grantham_score"]
+        self.assertEqual(table[0], dict(SNP, annotation="NON_SYNONYMOUS"))
+        with self.assertRaises(KeyError):
+            row["gene"] = "TP53"
+        with self.assertRaises(ValueError):
+            row["grantham_prediction"] = "RADICAL"
+        with self.assertRaises(ValueError):
+            del row["position"]
+
+    def test_slice_returns_table(self):
+        table = VariantTable.from_records([SNP, INDEL, dict(SNP, position=9)])
+        table.set_grantham([10, None, None])
+        self.assertIsInstance(table[0:1], VariantTable)
+        self.assertEqual(table[0:1], table.to_dicts()[0:1])
+        self.assertEqual(table[1:], [INDEL, dict(SNP, position=9)])
+        self.assertEqual(table[::-2], table.to_dicts()[::-2])
+        self.assertEqual(table[5:], [])
+
+    def test_concatenation_and_dict_append(self):
+        """`+` and append() accept SNP dicts like the old list did."""
+        table = VariantTable.from_records([SNP])
+        self.assertEqual(table + [], [SNP])
+        self.assertEqual(table + [INDEL], [SNP, INDEL])
+        self.assertEqual([INDEL] + table, [INDEL, SNP])
+        self.assertIsInstance([INDEL] + table, VariantTable)
+        self.assertEqual(table, [SNP])
+        table.append(dict(INDEL, grantham_score=5))
+        self.assertEqual(
+            table,
+            [SNP, dict(INDEL, grantham_score=5,
+                       grantham_prediction="CONSERVATIVE")],
+        )
+
+    def test_negative_and_out_of_range_index(self):
+        table = VariantTable.from_records([SNP, INDEL])
+        self.assertEqual(table[-1]["type"], "INSERTION")
+        with self.assertRaises(IndexError):
+            table[2]
+
+    def test_contexts_are_interned(self):
+        """Repeated contexts share a single vocabulary entry."""
+        table = VariantTable()
+        for position in range(1, 4):
+            table.append(position, "A", "G", "TRANSITION", "NON_CODING",
+                         "T[A>G]C")
+        self.assertEqual(table.context_names, [None, "T[A>G]C"])
+        self.assertEqual(list(table.contexts), [1, 1, 1])
+
+    def test_column_decodes_values(self):
+        table = VariantTable.from_records([SNP, INDEL])
+        self.assertEqual(table.column("reference"), ["A", "-"])
+        self.assertEqual(table.column("context"), ["T[A>G]C", None])
+        with self.assertRaises(KeyError):
+            table.column("unknown")
+
+    def test_unknown_annotation_raises(self):
+        with self.assertRaises(KeyError):
+            VariantTable().append(1, "A", "G", "TRANSITION", "MISSENSE")
+
+    def test_set_grantham(self):
+        """Scores are exposed as grantham_score/grantham_prediction keys."""
+        table = VariantTable.from_records([SNP, INDEL])
+        table.set_grantham([None, 150])
+        self.assertTrue(table.has_grantham)
+        self.assertNotIn("grantham_score", table[0])
+        self.assertEqual(table[1]["grantham_score"], 150)
+        self.assertEqual(table[1]["grantham_prediction"], "RADICAL")
+        self.assertEqual(
+            [row[6] for row in table.iter_tuples()], [None, 150]
+        )
+
+    def test_set_grantham_length_mismatch_raises(self):
+        table = VariantTable.from_records([SNP])
+        with self.assertRaises(ValueError):
+            table.set_grantham([1, 2])
+
+    def test_extend_remaps_contexts_and_scores(self):
+        """extend() merges context vocabularies and Grantham columns."""
+        first = VariantTable.from_records([INDEL])
+        second = VariantTable.from_records([SNP, dict(SNP, context="A[A>G]A")])
+        second.set_grantham([None, 64])
+        first.extend(second)
+        self.assertEqual(
+            first.to_dicts(),
+            [INDEL, SNP, dict(SNP, context="A[A>G]A",
+                              grantham_score=64,
+                              grantham_prediction="MODERATE")],
+        )
+
+    def test_from_columns_validates(self):
+        """from_columns() wraps coded columns and rejects bad ones."""
+        table = VariantTable.from_records([SNP, INDEL])
+        columns = [table.positions, table.ref_bases, table.alt_bases,
+                   table.types, table.annotations, table.contexts]
+        self.assertEqual(
+            VariantTable.from_columns(*columns, table.context_names), table
+        )
+        with self.assertRaises(ValueError):
+            VariantTable.from_columns(*columns, [None])
+        with self.assertRaises(ValueError):
+            VariantTable.from_columns(
+                table.positions[:1], *columns[1:], table.context_names
+            )
+
+    def test_append_after_grantham_pads_scores(self):
+        table = VariantTable.from_records([SNP])
+        table.set_grantham([10])
+        table.append(9, "C", "T", "TRANSITION")
+        self.assertNotIn("grantham_score", table[1])
+
+
+class TestDetectSnpsTable(unittest.TestCase):
+
+    def test_detect_snps_returns_table(self):
+        snps = detect_snps("ATGGTG", "ATGATG")
+        self.assertIsInstance(snps, VariantTable)
+        self.assertEqual(snps[0]["annotation"], "NON_SYNONYMOUS")
+
+    def test_apply_predictions_matches_dict_prediction(self):
+        """Columnar scoring matches predict_functional_impact per SNP."""
+        from prediction import predict_functional_impact
+        reference, sample = "ATGGTGTTTTGG", "ATGATGTTCTAG"
+        snps = detect_snps(reference, sample)
+        expected = [
+            predict_functional_impact(dict(snp), reference)
+            for snp in snps
+        ]
+        _apply_predictions(snps, reference)
+        for snp, impact in zip(snps, expected):
+            self.assertEqual(snp.get("grantham_score"),
+                             impact.get("grantham_score"))
+
+    def test_apply_predictions_updates_snp_dicts(self):
+        """A plain list of SNP dicts is still updated in place."""
+        reference = "ATGGTGTTTTGG"
+        snps = detect_snps(reference, "ATGATGTTCTAG")
+        dicts = snps.to_dicts()
+        _apply_predictions(snps, reference)
+        _apply_predictions(dicts, reference)
+        self.assertIsInstance(dicts[0], dict)
+        self.assertEqual(dicts, snps)
+        self.assertIn("grantham_score", dicts[0])
+
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+"""Tests for vcf.py — VCF output."""
+
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+from bgzf import tabix_query
+from main import detect_snps, detect_snps_aligned, _apply_predictions
+from vcf import VcfWriter
+
+
+def _records(path: str) -> list[list[str]]:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt") as f:
+        return [
+            line.rstrip("\n").split("\t")
+            for line in f if not line.startswith("##")
+        ]
+
+
+class TestVcfWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "calls.vcf")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_snp_records_and_info(self):
+        """Each SNP is a record with TYPE, ANNOTATION, CONTEXT and Grantham."""
+        reference, sample = "ATGGTGTTT", "ATGATGTTC"
+        snps = detect_snps(reference, sample)
+        _apply_predictions(snps, reference)
+        with VcfWriter(self.path, reference, contig="chr1") as writer:
+            writer.write(snps)
+        header, *records = _records(self.path)
+        self.assertEqual(
+            header,
+            ["#CHROM", "POS", "ID", "REF", "ALT", "QUAL", "FILTER", "INFO"],
+        )
+        self.assertEqual(records[0], [
+            "chr1", "4", ".", "G", "A", ".", "PASS",
+            "TYPE=TRANSITION;ANNOTATION=NON_SYNONYMOUS;CONTEXT=G[G>A]T;"
+            "GRANTHAM=20;GRANTHAM_PRED=CONSERVATIVE",
+        ])
+        self.assertEqual(
+            records[1][7], "TYPE=TRANSITION;ANNOTATION=SYNONYMOUS;CONTEXT=T[T>C]_"
+        )
+        with open(self.path) as f:
+            head = f.read(200)
+        self.assertTrue(head.startswith("##fileformat=VCFv4.2\n"))
+        self.assertIn("##contig=<ID=chr1,length=9>", head)
+
+    def test_info_omits_fields_not_computed(self):
+        """Fields left out of detection are absent from INFO ('.' if none)."""
+        reference, sample = "ATGGTGTTT", "ATGATGTTC"
+        with VcfWriter(self.path, reference) as writer:
+            writer.write(detect_snps(reference, sample, fields=["context"]))
+            writer.write(detect_snps(reference, sample, fields=[]))
+        records = _records(self.path)[1:]
+        self.assertEqual(records[0][7], "CONTEXT=G[G>A]T")
+        self.assertEqual(records[2][7], ".")
+
+    def test_indel_runs_are_anchored(self):
+        """A tail run is one record anchored on the previous reference base."""
+        with VcfWriter(self.path, "ACGTAC") as writer:
+            writer.write(detect_snps("ACGTAC", "ACG"))
+        self.assertEqual(writer.count, 3)
+        (record,) = _records(self.path)[1:]
+        self.assertEqual(record[1:5], ["3", ".", "GTAC", "G"])
+
+        with VcfWriter(self.path, "ACG") as writer:
+            snps = detect_snps("ACG", "ACGTTA").to_dicts()
+            writer.write(snps[:1])
+            writer.write(snps[1:])
+        (record,) = _records(self.path)[1:]
+        self.assertEqual(record[1:5], ["3", ".", "G", "GTTA"])
+        self.assertEqual(record[7], "TYPE=INSERTION;ANNOTATION=NON_CODING")
+
+    def test_deletion_at_first_base_anchors_after(self):
+        with VcfWriter(self.path, "ACGT") as writer:
+            writer.write([{
+                "position": 1, "reference": "A", "alternate": "-",
+                "type": "DELETION", "annotation": "NON_CODING",
+            }])
+        (record,) = _records(self.path)[1:]
+        self.assertEqual(record[1:5], ["1", ".", "AC", "C"])
+
+    def test_adjacent_aligned_insertions_are_separate_records(self):
+        """Insertions before bases 18 and 19 keep the base between them."""
+        reference = "ACGTACGTACGTACGAAAACCCCACGTACGTACGT"
+        sample = reference[:17] + "G" + reference[17] + "T" + reference[18:]
+        snps = detect_snps_aligned(reference, sample)
+        self.assertEqual(
+            [(row["position"], row["alternate"]) for row in snps],
+            [(18, "G"), (19, "T")],
+        )
+        with VcfWriter(self.path, reference) as writer:
+            writer.write(snps)
+        records = [record[1:5] for record in _records(self.path)[1:]]
+        self.assertEqual(records, [
+            ["17", ".", "A", "AG"], ["18", ".", "A", "AT"],
+        ])
+
+    def test_insertion_before_first_base_anchors_after(self):
+        reference = "ACGTTGCA" * 4
+        snps = detect_snps_aligned(reference, "GG" + reference)
+        with VcfWriter(self.path, reference) as writer:
+            writer.write(snps)
+        (record,) = _records(self.path)[1:]
+        self.assertEqual(record[1:5], ["1", ".", "A", "GGA"])
+
+    def test_events_overlapping_a_position_one_record_are_merged(self):
+        """Records anchored on the base after position 1 absorb overlaps."""
+        cases = [
+            # Bases 1 and 3 deleted: one record, keeping base 2
+            ("TACTGGCAAT", "ATGGCAAT", ["1", ".", "TAC", "A"]),
+            # Insertion before base 1 plus T>A on it
+            ("TACTGGCAAT", "AAACTGGCAAT", ["1", ".", "T", "AA"]),
+        ]
+        for reference, sample, expected in cases:
+            with VcfWriter(self.path, reference) as writer:
+                writer.write(detect_snps_aligned(reference, sample))
+            records = [record[1:5] for record in _records(self.path)[1:]]
+            self.assertEqual(records, [expected])
+
+    def test_position_one_merge_spans_write_batches(self):
+        """A record held at position 1 still merges with the next batch."""
+        reference = "TACTGGCAAT"
+        snps = detect_snps_aligned(reference, "ATGGCAAT")
+        with VcfWriter(self.path, reference) as writer:
+            writer.write(snps[:1])
+            writer.write(snps[1:])
+        (record,) = _records(self.path)[1:]
+        self.assertEqual(record[1:5], ["1", ".", "TAC", "A"])
+        self.assertIn("TYPE=DELETION", record[7])
+
+    def test_sample_column(self):
+        with VcfWriter(self.path, "ACGT", samples=["s1"]) as writer:
+            writer.write(detect_snps("ACGT", "ACTT"))
+        header, record = _records(self.path)
+        self.assertEqual(header[-2:], ["FORMAT", "s1"])
+        self.assertEqual(record[-2:], ["GT", "1"])
+
+    def test_bgzip_matches_plain_and_is_indexed(self):
+        """The .vcf.gz holds the same text and is region-queryable."""
+        reference = "ACGT" * 5000
+        sample = "".join(
+            "T" if i % 97 == 0 else base for i, base in enumerate(reference)
+        )[:-3]
+        snps = detect_snps(reference, sample)
+        gz_path = self.path + ".gz"
+        with VcfWriter(self.path, reference) as writer:
+            writer.write(snps)
+        with VcfWriter(gz_path, reference, bgzip=True) as writer:
+            writer.write(snps)
+        self.assertEqual(_records(gz_path), _records(self.path))
+        self.assertTrue(os.path.exists(gz_path + ".tbi"))
+        self.assertLess(os.path.getsize(gz_path), os.path.getsize(self.path))
+        expected = [
+            "\t".join(record) for record in _records(self.path)[1:]
+            if 1000 <= int(record[1]) <= 2000
+        ]
+        self.assertEqual(
+            list(tabix_query(gz_path, "reference", 1000, 2000)), expected
+        )
+
+    def test_error_discards_file(self):
+        with self.assertRaises(RuntimeError):
+            with VcfWriter(self.path + ".gz", bgzip=True) as writer:
+                writer.write(detect_snps("ACGT", "ACTT"))
+                raise RuntimeError("boom")
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,218 @@
+"""
+SNPTracker - Packed Reference Files (UCSC .2bit)
+
+Converts a FASTA reference once into a UCSC .2bit file and maps it back
+without parsing: the header and record index are a few bytes, and each
+record's packed bases are exposed as a PackedSequence over a memoryview of
+the memory-mapped file (zero-copy; pages are read on demand), so loading
+a whole-genome reference takes milliseconds instead of a FASTA parse.
+
+Layout (little-endian, as written by UCSC faToTwoBit; big-endian files
+are read too):
+
+    header   signature 0x1A412743, version, record count, reserved (u32)
+    index    per record: name length (u8), name, record offset
+             (u32, or u64 in version 1 files, used past 4 GB)
+    record   length, N-block count, N-block starts[], N-block sizes[],
+             mask-block count, mask starts[], mask sizes[], reserved (u32),
+             packed bases (2 bits each, T=0 C=1 A=2 G=3, as PackedSequence)
+
+Like faToTwoBit, only ACGT and N are representable: other IUPAC codes are
+stored as N, and no soft-masking blocks are written (sequences are
+uppercased by PackedSequence).
+
+Public API:
+    TWOBIT_SIGNATURE
+    is_twobit(file_path) -> bool
+    write_twobit(records, file_path) — (name, PackedSequence) records
+    fasta_to_twobit(fasta_path, twobit_path) -> int (records written)
+    TwoBitFile(file_path)
+        .names -> list[str]
+        .sequence(name=None) -> PackedSequence (first record by default)
+"""
+
+import mmap
+import struct
+from typing import Iterable
+
+from fasta_parser import iter_packed_sequences
+from packed_sequence import PackedSequence
+
+TWOBIT_SIGNATURE = 0x1A412743
+
+_HEADER = struct.Struct("<IIII")
+
+# Version 0 stores record offsets as u32; files past 4 GB need version 1
+_OFFSET_FORMATS = {0: "I", 1: "Q"}
+
+
+def is_twobit(file_path: str) -> bool:
+    """Returns True if the file starts with the .2bit signature.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    with open(file_path, "rb") as f:
+        head = f.read(4)
+    return len(head) == 4 and TWOBIT_SIGNATURE in (
+        int.from_bytes(head, "little"), int.from_bytes(head, "big")
+    )
+
+
+def _n_blocks(sequence: PackedSequence) -> tuple[list[int], list[int]]:
+    """Exception runs of a sequence as merged N blocks (starts, sizes)."""
+    starts: list[int] = []
+    sizes: list[int] = []
+    for start, length, _ in sequence.exceptions:
+        if starts and starts[-1] + sizes[-1] == start:
+            sizes[-1] += length
+        else:
+            starts.append(start)
+            sizes.append(length)
+    return starts, sizes
+
+
+def write_twobit(
+    records: Iterable[tuple[str, PackedSequence]], file_path: str
+) -> None:
+    """Writes packed sequences as a .2bit file.
+
+    Args:
+        records: (name, sequence) pairs, in file order. Names are cut at
+            the first whitespace, as FASTA header IDs.
+        file_path: Output path.
+
+    Raises:
+        ValueError: If a name is empty or longer than 255 bytes.
+    """
+    entries = []
+    for name, sequence in records:
+        words = name.split()
+        encoded = words[0].encode("ascii", "replace") if words else b""
+        if not 0 < len(encoded) < 256:
+            raise ValueError(
+                f"Invalid .2bit record name: '{name}' (1 to 255 characters)."
+            )
+        entries.append((encoded, sequence, *_n_blocks(sequence)))
+
+    sizes = [
+        4 * (4 + 2 * len(starts)) + (len(sequence) + 3) // 4
+        for _, sequence, starts, _ in entries
+    ]
+    for version, code in _OFFSET_FORMATS.items():
+        index_size = sum(
+            1 + len(name) + struct.calcsize(code) for name, *_ in entries
+        )
+        offset = _HEADER.size + index_size
+        offsets = []
+        for size in sizes:
+            offsets.append(offset)
+            offset += size
+        if not offsets or offsets[-1] < 1 << 32:
+            break
+
+    with open(file_path, "wb") as f:
+        f.write(_HEADER.pack(TWOBIT_SIGNATURE, version, len(entries), 0))
+        for (name, *_), offset in zip(entries, offsets):
+            f.write(struct.pack(f"<B{len(name)}s{code}", len(name), name, offset))
+        for name, sequence, starts, block_sizes in entries:
+            count = len(starts)
+            f.write(struct.pack(
+                f"<II{count}I{count}III",
+                len(sequence), count, *starts, *block_sizes, 0, 0,
+            ))
+            f.write(sequence.data[:(len(sequence) + 3) // 4])
+
+
+def fasta_to_twobit(fasta_path: str, twobit_path: str) -> int:
+    """Converts every record of a FASTA file into a .2bit file.
+
+    Records are packed line by line (fasta_parser.iter_packed_sequences),
+    so memory peaks at ~1/4 byte per base of the whole file.
+
+    Returns:
+        int: Number of records written.
+
+    Raises:
+        FileNotFoundError: If the FASTA file does not exist.
+    """
+    records = list(iter_packed_sequences(fasta_path))
+    write_twobit(records, twobit_path)
+    return len(records)
+
+
+class TwoBitFile:
+    """Memory-mapped .2bit file.
+
+    The map stays open while the file object or any sequence returned by
+    sequence() is alive.
+
+    Attributes:
+        names: Record names, in file order.
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Args:
+            file_path: Path to the .2bit file.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            ValueError: If the file is not a .2bit file.
+        """
+        with open(file_path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        for order in "<>":
+            signature, version, count, _ = struct.unpack_from(
+                f"{order}IIII", self._map
+            )
+            if signature == TWOBIT_SIGNATURE:
+                break
+        else:
+            raise ValueError(f"'{file_path}' is not a .2bit file.")
+        if version not in _OFFSET_FORMATS:
+            raise ValueError(f"Unsupported .2bit version {version}.")
+        self._order = order
+        entry = struct.Struct(order + _OFFSET_FORMATS[version])
+
+        self.names: list[str] = []
+        self._offsets: dict[str, int] = {}
+        cursor = _HEADER.size
+        for _ in range(count):
+            size = self._map[cursor]
+            name = self._map[cursor + 1:cursor + 1 + size].decode("ascii")
+            cursor += 1 + size
+            self.names.append(name)
+            self._offsets[name] = entry.unpack_from(self._map, cursor)[0]
+            cursor += entry.size
+
+    def sequence(self, name: str | None = None) -> PackedSequence:
+        """Returns one record as a PackedSequence backed by the map.
+
+        Args:
+            name: Record name. Defaults to the first record (an empty
+                sequence if the file has none).
+
+        Raises:
+            KeyError: If no record has this name.
+        """
+        if name is None:
+            if not self.names:
+                return PackedSequence.from_str("")
+            name = self.names[0]
+        if name not in self._offsets:
+            raise KeyError(f"Record '{name}' not found in .2bit file.")
+        order = self._order
+        cursor = self._offsets[name]
+        length, count = struct.unpack_from(order + "II", self._map, cursor)
+        blocks = struct.unpack_from(f"{order}{2 * count}I", self._map, cursor + 8)
+        cursor += 8 + 8 * count
+        (mask_count,) = struct.unpack_from(order + "I", self._map, cursor)
+        cursor += 8 + 8 * mask_count
+        data = self._view[cursor:cursor + (length + 3) // 4]
+        return PackedSequence(
+            data,
+            length,
+            ((start, size, "N") for start, size in zip(blocks[:count], blocks[count:])),
+        )
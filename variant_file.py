@@ -0,0 +1,345 @@
+"""
+SNPTracker - Binary Variant File (.snpb)
+
+Compact, lossless binary alternative to the fixed-width text report, with a
+block index so position-range queries read only the blocks they need.
+
+Layout (all integers little-endian):
+
+    header   MAGIC b"SNPB" | u16 FORMAT_VERSION | u16 reserved
+    block*   u32 payload length | payload
+    index    per block: u64 offset | u32 count | i64 first | i64 last
+    footer   u64 index offset | u32 block count | MAGIC
+
+Block payload (one VariantTable slice, column by column):
+
+    u32 count | u8 has_grantham | u16 vocabulary size
+    vocabulary: u8 length + ASCII context string, for codes 1..size-1
+    positions  i64 × count        ref / alt   u8 × count (base codes)
+    types      u8 × count         annotations u8 × count
+    contexts   u16 × count        grantham    i16 × count (if present)
+
+Codes are those of variants.TYPES / variants.ANNOTATIONS; 0 means absent.
+Positions must be non-decreasing across the whole file (detect_snps()
+output always is), which lets the reader bisect the index.
+
+Public API:
+    FORMAT_VERSION
+    VariantFileWriter(path, block_size=DEFAULT_BLOCK_SIZE)
+        .write(snps) / .close() / .discard()   — streaming writer
+        (also a context manager)
+    VariantFileReader(path)
+        .fetch(start=None, end=None) -> VariantTable
+        .iter_blocks() -> Iterator[VariantTable]
+        len(reader)                              — number of variants
+    read_variant_file(path) -> VariantTable
+"""
+
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from itertools import islice
+from operator import gt
+from typing import Iterator, NamedTuple
+
+from variants import VariantTable
+
+MAGIC = b"SNPB"
+FORMAT_VERSION = 1
+DEFAULT_BLOCK_SIZE = 1 << 16
+
+_HEADER = struct.Struct("<4sHH")
+_BLOCK_LENGTH = struct.Struct("<I")
+_BLOCK_HEAD = struct.Struct("<IBH")
+_INDEX_ENTRY = struct.Struct("<QIqq")
+_FOOTER = struct.Struct("<QI4s")
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+class BlockInfo(NamedTuple):
+    """Index entry of one block.
+
+    Attributes:
+        offset: Byte offset of the block's length prefix.
+        count: Number of variants in the block.
+        first: Position of its first variant.
+        last: Position of its last variant.
+    """
+
+    offset: int
+    count: int
+    first: int
+    last: int
+
+
+def _le_bytes(column: array) -> bytes:
+    """Returns the little-endian bytes of an array column."""
+    if _BIG_ENDIAN:
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _le_array(typecode: str, data: bytes) -> array:
+    """Builds an array column from little-endian bytes."""
+    column = array(typecode)
+    column.frombytes(data)
+    if _BIG_ENDIAN:
+        column.byteswap()
+    return column
+
+
+class VariantFileWriter:
+    """Streams VariantTables into a .snpb file, one block at a time.
+
+    Variants are buffered until block_size of them are pending, then
+    written as one block. The file is written under a temporary name and
+    moved into place by close(), so readers never see a partial file.
+
+    Attributes:
+        path: Destination path.
+        count: Number of variants written so far.
+    """
+
+    def __init__(self, path: str, block_size: int = DEFAULT_BLOCK_SIZE):
+        """Creates the temporary file and writes the header.
+
+        Args:
+            path: Destination path of the .snpb file.
+            block_size: Variants per block (the read granularity of
+                range queries).
+
+        Raises:
+            ValueError: If block_size < 1.
+        """
+        if block_size < 1:
+            raise ValueError(f"block_size must be >= 1, got {block_size}.")
+        self.path = path
+        self.count = 0
+        self._block_size = block_size
+        self._pending = VariantTable()
+        self._index: list[BlockInfo] = []
+        self._last_position: int | None = None
+        self._tmp_path = path + ".tmp"
+        self._file = open(self._tmp_path, "wb")
+        self._file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0))
+
+    def write(self, snps: VariantTable | list[dict]) -> None:
+        """Appends a batch of variants.
+
+        Args:
+            snps: VariantTable or list of SNP dicts, in position order.
+
+        Raises:
+            ValueError: If positions decrease relative to earlier variants.
+        """
+        table = VariantTable.from_records(snps)
+        if not table:
+            return
+        positions = table.positions
+        previous = self._last_position
+        if (previous is not None and positions[0] < previous) or any(
+            map(gt, positions, islice(positions, 1, None))
+        ):
+            raise ValueError("Variant positions must be non-decreasing.")
+        self._last_position = positions[-1]
+
+        self._pending.extend(table)
+        self.count += len(table)
+        while len(self._pending) >= self._block_size:
+            self._flush(self._block_size)
+
+    def _flush(self, size: int) -> None:
+        """Writes the first `size` pending variants as one block."""
+        pending = self._pending
+        head = _BLOCK_HEAD.pack(
+            size, pending.grantham is not None, len(pending.context_names)
+        )
+        parts = [head]
+        for name in pending.context_names[1:]:
+            encoded = name.encode("ascii")
+            parts.append(bytes([len(encoded)]) + encoded)
+        parts += [
+            _le_bytes(pending.positions[:size]),
+            bytes(pending.ref_bases[:size]),
+            bytes(pending.alt_bases[:size]),
+            bytes(pending.types[:size]),
+            bytes(pending.annotations[:size]),
+            _le_bytes(pending.contexts[:size]),
+        ]
+        if pending.grantham is not None:
+            parts.append(_le_bytes(pending.grantham[:size]))
+        payload = b"".join(parts)
+
+        offset = self._file.tell()
+        self._file.write(_BLOCK_LENGTH.pack(len(payload)))
+        self._file.write(payload)
+        self._index.append(BlockInfo(
+            offset, size, pending.positions[0], pending.positions[size - 1]
+        ))
+
+        self._pending = pending[size:]
+
+    def close(self) -> None:
+        """Writes the last block, the index and the footer, then renames."""
+        if self._file.closed:
+            return
+        try:
+            if self._pending:
+                self._flush(len(self._pending))
+            index_offset = self._file.tell()
+            for entry in self._index:
+                self._file.write(_INDEX_ENTRY.pack(*entry))
+            self._file.write(
+                _FOOTER.pack(index_offset, len(self._index), MAGIC)
+            )
+            self._file.close()
+            os.replace(self._tmp_path, self.path)
+        except BaseException:
+            self.discard()
+            raise
+
+    def discard(self) -> None:
+        """Closes and deletes the temporary file without publishing it."""
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    def __enter__(self) -> "VariantFileWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+class VariantFileReader:
+    """Random-access reader of .snpb files.
+
+    Only the header, footer and index are read on open; fetch() bisects
+    the index and reads just the blocks overlapping the requested range.
+
+    Attributes:
+        path: Path of the file.
+        blocks: Block index, in position order.
+    """
+
+    def __init__(self, path: str):
+        """Reads and validates the header, footer and block index.
+
+        Args:
+            path: Path of a file written by VariantFileWriter.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            ValueError: If the file is not a supported .snpb file.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                raise ValueError(f"'{path}' is not a .snpb file.")
+            if os.fstat(f.fileno()).st_size < _HEADER.size + _FOOTER.size:
+                raise ValueError(f"'{path}' is truncated (no footer).")
+            magic, version, _ = _HEADER.unpack(header)
+            if magic != MAGIC:
+                raise ValueError(f"'{path}' is not a .snpb file.")
+            if version != FORMAT_VERSION:
+                raise ValueError(
+                    f"Unsupported .snpb version {version} in '{path}'."
+                )
+            f.seek(-_FOOTER.size, os.SEEK_END)
+            index_offset, block_count, magic = _FOOTER.unpack(
+                f.read(_FOOTER.size)
+            )
+            if magic != MAGIC:
+                raise ValueError(f"'{path}' is truncated (no footer).")
+            f.seek(index_offset)
+            data = f.read(block_count * _INDEX_ENTRY.size)
+        self.blocks = [
+            BlockInfo(*entry) for entry in _INDEX_ENTRY.iter_unpack(data)
+        ]
+        self._lasts = [block.last for block in self.blocks]
+
+    def __len__(self) -> int:
+        return sum(block.count for block in self.blocks)
+
+    def _read_block(self, f, block: BlockInfo) -> VariantTable:
+        f.seek(block.offset)
+        (length,) = _BLOCK_LENGTH.unpack(f.read(_BLOCK_LENGTH.size))
+        payload = f.read(length)
+        count, has_grantham, vocabulary = _BLOCK_HEAD.unpack_from(payload)
+        cursor = _BLOCK_HEAD.size
+
+        names: list[str | None] = [None]
+        for _ in range(vocabulary - 1):
+            size = payload[cursor]
+            names.append(payload[cursor + 1:cursor + 1 + size].decode("ascii"))
+            cursor += 1 + size
+
+        def take(nbytes: int) -> bytes:
+            nonlocal cursor
+            chunk = payload[cursor:cursor + nbytes]
+            cursor += nbytes
+            return chunk
+
+        positions = _le_array("q", take(8 * count))
+        ref_bases = bytearray(take(count))
+        alt_bases = bytearray(take(count))
+        types = bytearray(take(count))
+        annotations = bytearray(take(count))
+        contexts = _le_array("H", take(2 * count))
+        grantham = _le_array("h", take(2 * count)) if has_grantham else None
+        return VariantTable.from_columns(
+            positions, ref_bases, alt_bases, types, annotations, contexts,
+            names, grantham,
+        )
+
+    def iter_blocks(self) -> Iterator[VariantTable]:
+        """Yields every block as a VariantTable, in position order."""
+        with open(self.path, "rb") as f:
+            for block in self.blocks:
+                yield self._read_block(f, block)
+
+    def fetch(self, start: int | None = None, end: int | None = None) -> VariantTable:
+        """Returns the variants with start <= position <= end.
+
+        Args:
+            start: First 1-indexed position (inclusive). Default: no bound.
+            end: Last 1-indexed position (inclusive). Default: no bound.
+
+        Returns:
+            VariantTable: Matching variants, in position order.
+        """
+        result = VariantTable()
+        first = 0 if start is None else bisect_left(self._lasts, start)
+        with open(self.path, "rb") as f:
+            for block in self.blocks[first:]:
+                if end is not None and block.first > end:
+                    break
+                table = self._read_block(f, block)
+                lo = 0 if start is None else bisect_left(table.positions, start)
+                hi = len(table)
+                if end is not None and block.last > end:
+                    hi = bisect_left(table.positions, end + 1)
+                if lo == 0 and hi == len(table):
+                    result.extend(table)
+                else:
+                    result.extend(table[lo:hi])
+        return result
+
+
+def read_variant_file(path: str) -> VariantTable:
+    """Reads a whole .snpb file.
+
+    Args:
+        path: Path of a file written by VariantFileWriter.
+
+    Returns:
+        VariantTable: Every variant in the file.
+    """
+    return VariantFileReader(path).fetch()
@@ -0,0 +1,521 @@
+"""
+SNPTracker - Columnar Variant Storage
+
+Stores detected variants column by column instead of as one dict per
+variant. At millions of variants the per-dict overhead dominates memory;
+a VariantTable keeps ~16 bytes per variant:
+
+    positions    — array('q'), 1-indexed
+    ref / alt    — bytearray of base character codes ('-' for indels)
+    types        — bytearray of small-int codes into TYPES
+    annotations  — bytearray of small-int codes into ANNOTATIONS
+    contexts     — array('H') of codes into a per-table vocabulary of
+                   interned COSMIC context strings
+    grantham     — array('h'), only allocated once predictions are set
+
+Code 0 of every coded column means "absent", mirroring the optional keys of
+the SNP dict format (e.g. INDELs have no 'context', predictions only exist
+for NON_SYNONYMOUS SNPs).
+
+Backwards compatibility:
+    A table stands in for the old list of SNP dicts. Indexing or iterating
+    it yields VariantRow objects — Mapping views with exactly the keys the
+    old SNP dicts had, whose fields can be assigned (e.g. snp.update()) —
+    slicing and `+` return new tables, append() also takes a SNP dict, and
+    a table compares equal to a list of equivalent dicts. Use to_dicts()
+    when plain dicts are required.
+
+Public API:
+    TYPES, ANNOTATIONS           — code → name tuples (index 0 = absent)
+    VariantTable()               — empty table; append() adds one variant
+                                   (or SNP dict), extend() appends another
+                                   table
+    VariantTable.from_records(r) — builds a table from SNP dicts (or
+                                   returns r unchanged if already a table)
+    VariantTable.from_columns(...) — wraps already-coded columns
+    VariantRow                   — dict-compatible view of one table row
+    snp_type_codes(ref, alt)     — TYPES codes of SNP base pairs, in bulk
+"""
+
+from array import array
+from collections.abc import Mapping, MutableMapping
+from operator import eq
+from typing import Iterable, Iterator
+from prediction import grantham_prediction
+
+TYPES: tuple[str | None, ...] = (
+    None, "TRANSITION", "TRANSVERSION", "INSERTION", "DELETION",
+)
+ANNOTATIONS: tuple[str | None, ...] = (
+    None, "SYNONYMOUS", "NON_SYNONYMOUS", "NONSENSE", "NON_CODING",
+)
+
+_TYPE_CODES = {name: code for code, name in enumerate(TYPES)}
+_ANNOTATION_CODES = {name: code for code, name in enumerate(ANNOTATIONS)}
+_NO_SCORE = -1
+
+# Base classes for snp_type_codes(): purines 1, pyrimidines 2; any other
+# base gets a different class on each side (0 / 3) so it never matches,
+# making the pair a TRANSVERSION as in main.classify_mutation()
+_REF_CLASSES = bytes(
+    1 if byte in b"AG" else 2 if byte in b"CT" else 0 for byte in range(256)
+)
+_ALT_CLASSES = bytes(
+    1 if byte in b"AG" else 2 if byte in b"CT" else 3 for byte in range(256)
+)
+_PAIR_TYPES = bytes.maketrans(
+    b"\x00\x01", bytes((_TYPE_CODES["TRANSVERSION"], _TYPE_CODES["TRANSITION"]))
+)
+
+
+def snp_type_codes(ref_bases: bytes, alt_bases: bytes) -> bytearray:
+    """Classifies SNPs in bulk, as codes into TYPES.
+
+    Args:
+        ref_bases: Uppercase reference base of each SNP.
+        alt_bases: Uppercase alternate base of each SNP, same length.
+
+    Returns:
+        bytearray: TRANSITION or TRANSVERSION code of each SNP.
+    """
+    return bytearray(map(
+        eq, ref_bases.translate(_REF_CLASSES), alt_bases.translate(_ALT_CLASSES)
+    )).translate(_PAIR_TYPES)
+
+
+class VariantRow(MutableMapping):
+    """Dict-compatible view of one row of a VariantTable.
+
+    Exposes exactly the keys of the SNP dict format that are present for
+    this variant, so existing `snp["position"]`, `snp.get("context")` and
+    `"grantham_score" in snp` code keeps working. Assigning a key writes
+    the table column; only the keys of VariantTable.FIELDS exist, and
+    'grantham_prediction' follows 'grantham_score'.
+    """
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: "VariantTable", index: int):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key: str):
+        value = self._table._field(self._index, key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value) -> None:
+        self._table._set_field(self._index, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self:
+            raise KeyError(key)
+        self._table._set_field(self._index, key, None)
+
+    def __iter__(self) -> Iterator[str]:
+        table, index = self._table, self._index
+        return (
+            key for key in VariantTable.FIELDS
+            if table._field(index, key) is not None
+        )
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class VariantTable:
+    """Array-backed, columnar collection of variants.
+
+    Attributes:
+        positions: array('q') of 1-indexed positions.
+        ref_bases: bytearray of reference base codes (ord of the char).
+        alt_bases: bytearray of alternate base codes (ord of the char).
+        types: bytearray of codes into TYPES.
+        annotations: bytearray of codes into ANNOTATIONS (0 = absent).
+        contexts: array('H') of codes into context_names (0 = absent).
+        context_names: Interned context strings; index 0 is None.
+        grantham: array('h') of Grantham scores (-1 = absent), or None
+            while no prediction has been set.
+    """
+
+    FIELDS = (
+        "position", "reference", "alternate", "type", "annotation",
+        "context", "grantham_score", "grantham_prediction",
+    )
+
+    __slots__ = (
+        "positions", "ref_bases", "alt_bases", "types", "annotations",
+        "contexts", "context_names", "_context_codes", "grantham",
+    )
+
+    def __init__(self):
+        self.positions = array("q")
+        self.ref_bases = bytearray()
+        self.alt_bases = bytearray()
+        self.types = bytearray()
+        self.annotations = bytearray()
+        self.contexts = array("H")
+        self.context_names: list[str | None] = [None]
+        self._context_codes: dict[str, int] = {}
+        self.grantham: array | None = None
+
+    @classmethod
+    def from_records(
+        cls,
+        records: "Iterable[Mapping] | VariantTable",
+    ) -> "VariantTable":
+        """Builds a table from SNP dicts (returns tables unchanged).
+
+        Args:
+            records: SNP dicts in the detect_snps() format, or a table.
+
+        Returns:
+            VariantTable: Table holding the same variants.
+        """
+        if isinstance(records, cls):
+            return records
+        table = cls()
+        for record in records:
+            table.append(record)
+        return table
+
+    @classmethod
+    def from_columns(
+        cls,
+        positions: array,
+        ref_bases: bytearray,
+        alt_bases: bytearray,
+        types: bytearray,
+        annotations: bytearray,
+        contexts: array,
+        context_names: list[str | None],
+        grantham: array | None = None,
+    ) -> "VariantTable":
+        """Builds a table around already-coded columns (no copy).
+
+        Args:
+            positions: array('q') of 1-indexed positions.
+            ref_bases: Reference base codes.
+            alt_bases: Alternate base codes.
+            types: Codes into TYPES.
+            annotations: Codes into ANNOTATIONS.
+            contexts: array('H') of codes into context_names.
+            context_names: Context vocabulary; index 0 must be None.
+            grantham: array('h') of scores (-1 = absent), or None.
+
+        Returns:
+            VariantTable: Table sharing the given columns.
+
+        Raises:
+            ValueError: If the columns differ in length, or a code is out
+                of range.
+        """
+        count = len(positions)
+        columns = [ref_bases, alt_bases, types, annotations, contexts]
+        if grantham is not None:
+            columns.append(grantham)
+        if any(len(column) != count for column in columns):
+            raise ValueError("All columns must have the same length.")
+        if not context_names or context_names[0] is not None:
+            raise ValueError("context_names[0] must be None.")
+        if count and (
+            max(types) >= len(TYPES)
+            or max(annotations) >= len(ANNOTATIONS)
+            or max(contexts) >= len(context_names)
+        ):
+            raise ValueError("Column code out of range.")
+
+        table = cls()
+        table.positions = positions
+        table.ref_bases = ref_bases
+        table.alt_bases = alt_bases
+        table.types = types
+        table.annotations = annotations
+        table.contexts = contexts
+        table.context_names = list(context_names)
+        table._context_codes = {
+            name: code for code, name in enumerate(context_names) if code
+        }
+        table.grantham = grantham
+        return table
+
+    def append(
+        self,
+        position: "int | Mapping",
+        reference: str | None = None,
+        alternate: str | None = None,
+        type_: str | None = None,
+        annotation: str | None = None,
+        context: str | None = None,
+    ) -> None:
+        """Appends one variant.
+
+        Args:
+            position: 1-indexed position, or a SNP dict in the
+                detect_snps() format (the other arguments are then
+                ignored).
+            reference: Reference base ('-' for insertions).
+            alternate: Alternate base ('-' for deletions).
+            type_: One of TYPES, or None if absent.
+            annotation: One of ANNOTATIONS, or None if absent.
+            context: COSMIC context string, or None (INDELs).
+
+        Raises:
+            KeyError: If type_ or annotation is not a known name, or a SNP
+                dict lacks 'position', 'reference' or 'alternate'.
+            ValueError: If a base is not a single Latin-1 character.
+        """
+        if isinstance(position, Mapping):
+            record = position
+            self.append(
+                record["position"],
+                record["reference"],
+                record["alternate"],
+                record.get("type"),
+                record.get("annotation"),
+                record.get("context"),
+            )
+            score = record.get("grantham_score")
+            if score is not None:
+                self._set_field(len(self.positions) - 1, "grantham_score", score)
+            return
+        self.positions.append(position)
+        self.ref_bases.append(ord(reference))
+        self.alt_bases.append(ord(alternate))
+        self.types.append(_TYPE_CODES[type_])
+        self.annotations.append(_ANNOTATION_CODES[annotation])
+        self.contexts.append(self._context_code(context))
+        if self.grantham is not None:
+            self.grantham.append(_NO_SCORE)
+
+    def extend(self, other: "VariantTable") -> None:
+        """Appends every variant of another table, in order.
+
+        Args:
+            other: Table whose rows are appended (left unchanged).
+        """
+        count = len(self.positions)
+        self.positions.extend(other.positions)
+        self.ref_bases.extend(other.ref_bases)
+        self.alt_bases.extend(other.alt_bases)
+        self.types.extend(other.types)
+        self.annotations.extend(other.annotations)
+        codes = [self._context_code(name) for name in other.context_names]
+        if codes == list(range(len(codes))):
+            # Same vocabulary (e.g. no contexts at all): copy the codes as is
+            self.contexts.extend(other.contexts)
+        else:
+            self.contexts.extend(codes[code] for code in other.contexts)
+        if self.grantham is None and other.grantham is not None:
+            self.grantham = array("h", [_NO_SCORE] * count)
+        if self.grantham is not None:
+            if other.grantham is None:
+                self.grantham.extend([_NO_SCORE] * len(other.positions))
+            else:
+                self.grantham.extend(other.grantham)
+
+    def _set_field(self, index: int, key: str, value) -> None:
+        """Stores one field of one row; None makes an optional field absent.
+
+        Raises:
+            KeyError: If key is not one of FIELDS, or value is not a known
+                type or annotation name.
+            ValueError: If a required field is set to None, or
+                'grantham_prediction' disagrees with the row's score.
+        """
+        if value is None and key in ("position", "reference", "alternate"):
+            raise ValueError(f"'{key}' cannot be absent.")
+        if key == "position":
+            self.positions[index] = value
+        elif key == "reference":
+            self.ref_bases[index] = ord(value)
+        elif key == "alternate":
+            self.alt_bases[index] = ord(value)
+        elif key == "type":
+            self.types[index] = _TYPE_CODES[value]
+        elif key == "annotation":
+            self.annotations[index] = _ANNOTATION_CODES[value]
+        elif key == "context":
+            self.contexts[index] = self._context_code(value)
+        elif key == "grantham_score" or (
+            key == "grantham_prediction" and value is None
+        ):
+            if self.grantham is None:
+                if value is None:
+                    return
+                self.grantham = array("h", [_NO_SCORE] * len(self.positions))
+            self.grantham[index] = _NO_SCORE if value is None else value
+        elif key == "grantham_prediction":
+            if value != self._field(index, key):
+                raise ValueError(
+                    "grantham_prediction is derived from grantham_score."
+                )
+        else:
+            raise KeyError(key)
+
+    def _context_code(self, context: str | None) -> int:
+        if context is None:
+            return 0
+        code = self._context_codes.get(context)
+        if code is None:
+            code = len(self.context_names)
+            self.context_names.append(context)
+            self._context_codes[context] = code
+        return code
+
+    def set_grantham(self, scores: Iterable[int | None]) -> None:
+        """Stores one Grantham score (or None) per variant, in order.
+
+        Args:
+            scores: Scores aligned with the table rows.
+
+        Raises:
+            ValueError: If the number of scores differs from len(self).
+        """
+        column = array(
+            "h", (_NO_SCORE if score is None else score for score in scores)
+        )
+        if len(column) != len(self.positions):
+            raise ValueError(
+                f"Expected {len(self.positions)} scores, got {len(column)}."
+            )
+        self.grantham = column
+
+    @property
+    def has_grantham(self) -> bool:
+        """True if at least one variant carries a Grantham score."""
+        return self.grantham is not None and any(
+            score != _NO_SCORE for score in self.grantham
+        )
+
+    def column(self, key: str) -> list:
+        """Returns one field for every row, decoded (None where absent).
+
+        Args:
+            key: One of FIELDS.
+
+        Returns:
+            list: Values aligned with the table rows.
+
+        Raises:
+            KeyError: If key is not one of FIELDS.
+        """
+        if key == "position":
+            return list(self.positions)
+        if key == "reference":
+            return [chr(code) for code in self.ref_bases]
+        if key == "alternate":
+            return [chr(code) for code in self.alt_bases]
+        if key == "type":
+            return [TYPES[code] for code in self.types]
+        if key == "annotation":
+            return [ANNOTATIONS[code] for code in self.annotations]
+        if key == "context":
+            return [self.context_names[code] for code in self.contexts]
+        if key in ("grantham_score", "grantham_prediction"):
+            return [self._field(i, key) for i in range(len(self.positions))]
+        raise KeyError(key)
+
+    def iter_tuples(self) -> Iterator[tuple]:
+        """Yields one plain tuple per variant, straight from the columns.
+
+        Yields:
+            tuple: (position, reference, alternate, type, annotation,
+                context, grantham_score) with None for absent values.
+        """
+        names = self.context_names
+        grantham = self.grantham or [_NO_SCORE] * len(self.positions)
+        for position, ref, alt, type_, annotation, context, score in zip(
+            self.positions, self.ref_bases, self.alt_bases, self.types,
+            self.annotations, self.contexts, grantham,
+        ):
+            yield (
+                position,
+                chr(ref),
+                chr(alt),
+                TYPES[type_],
+                ANNOTATIONS[annotation],
+                names[context],
+                None if score == _NO_SCORE else score,
+            )
+
+    def to_dicts(self) -> list[dict]:
+        """Returns the variants as mutable SNP dicts (detect_snps format)."""
+        return [dict(row) for row in self]
+
+    def _field(self, index: int, key: str):
+        """Returns one field of one row, or None if it is absent."""
+        if key == "position":
+            return self.positions[index]
+        if key == "reference":
+            return chr(self.ref_bases[index])
+        if key == "alternate":
+            return chr(self.alt_bases[index])
+        if key == "type":
+            return TYPES[self.types[index]]
+        if key == "annotation":
+            return ANNOTATIONS[self.annotations[index]]
+        if key == "context":
+            return self.context_names[self.contexts[index]]
+        if key in ("grantham_score", "grantham_prediction"):
+            if self.grantham is None or self.grantham[index] == _NO_SCORE:
+                return None
+            score = self.grantham[index]
+            if key == "grantham_score":
+                return score
+            return grantham_prediction(score)
+        return None
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __getitem__(self, index: int | slice) -> "VariantRow | VariantTable":
+        if isinstance(index, slice):
+            # Rows of the slice, sharing this table's context vocabulary
+            return VariantTable.from_columns(
+                self.positions[index],
+                self.ref_bases[index],
+                self.alt_bases[index],
+                self.types[index],
+                self.annotations[index],
+                self.contexts[index],
+                self.context_names,
+                None if self.grantham is None else self.grantham[index],
+            )
+        count = len(self.positions)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("variant index out of range")
+        return VariantRow(self, index)
+
+    def __iter__(self) -> Iterator[VariantRow]:
+        return (VariantRow(self, i) for i in range(len(self.positions)))
+
+    def __add__(self, other) -> "VariantTable":
+        if not isinstance(other, (VariantTable, list, tuple)):
+            return NotImplemented
+        table = self[:]
+        table.extend(VariantTable.from_records(other))
+        return table
+
+    def __radd__(self, other) -> "VariantTable":
+        if not isinstance(other, (list, tuple)):
+            return NotImplemented
+        table = VariantTable.from_records(other)
+        table.extend(self)
+        return table
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, VariantTable):
+            return self.to_dicts() == other.to_dicts()
+        if isinstance(other, (list, tuple)):
+            return self.to_dicts() == [dict(item) for item in other]
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"VariantTable({self.to_dicts()!r})"
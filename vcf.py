@@ -0,0 +1,399 @@
+"""
+SNPTracker - VCF Output
+
+Writes detected variants as VCF 4.2, optionally BGZF-compressed with a
+tabix index (see bgzf.py) so the file is both ~10x smaller and
+region-queryable by htslib tools or bgzf.tabix_query().
+
+Record layout:
+    - SNPs: one record each; INFO carries TYPE, ANNOTATION, CONTEXT and,
+      when predicted, GRANTHAM and GRANTHAM_PRED. Fields that were not
+      computed (detect_snps(fields=...)) are left out; INFO is '.' when
+      none was.
+    - INDELs: each run of consecutive INSERTION or DELETION rows (the tail
+      of the longer sequence, as reported by detect_snps(), or an indel
+      found by detect_snps_aligned(), whose INSERTION rows share the
+      position of the reference base that follows them) becomes one
+      record anchored on the preceding reference base, as VCF requires.
+      Aligned insertions only merge with rows at the same position (two
+      insertions before adjacent bases are two records); rows past the
+      reference end are a tail and merge by consecutive position. A
+      deletion starting at position 1, or an insertion before it, is
+      anchored on the base after it; anchors that cannot be read from the
+      reference are written as 'N'.
+    - Position 1: since such a record reaches past its event, write()
+      folds every following event whose record would overlap it (a SNP
+      on the anchor base, an indel anchored on it) into one record, e.g.
+      an insertion of A before T plus T>A at base 1 is REF=T, ALT=AA. The
+      record keeps the INFO of the event at position 1.
+
+Without sample names the file is sites-only. With them, FORMAT/GT columns
+follow: write() marks every record as carried by every (haploid) sample,
+while write_row() takes explicit genotypes, for cohort matrices with one
+record per distinct allele.
+
+Public API:
+    VCF_VERSION
+    DEFAULT_CONTIG
+    VcfWriter(output_file, reference=None, contig=DEFAULT_CONTIG,
+              samples=(), bgzip=False)
+        .write(snps) / .close() / .discard()   — streaming writer
+        .write_row(row, genotypes)             — one record, explicit GTs
+        (also a context manager)
+"""
+
+import os
+from typing import Sequence
+
+from bgzf import BgzfWriter, TabixIndexBuilder
+from prediction import grantham_prediction
+from variants import VariantTable
+
+VCF_VERSION = "VCFv4.2"
+DEFAULT_CONTIG = "reference"
+
+DEFAULT_BUFFER_SIZE = 1 << 20
+
+_INFO_HEADER = (
+    '##INFO=<ID=TYPE,Number=1,Type=String,Description="Variant type: '
+    'TRANSITION, TRANSVERSION, INSERTION or DELETION">\n'
+    '##INFO=<ID=ANNOTATION,Number=1,Type=String,Description="Functional '
+    'annotation: SYNONYMOUS, NON_SYNONYMOUS, NONSENSE or NON_CODING">\n'
+    '##INFO=<ID=CONTEXT,Number=1,Type=String,Description="COSMIC '
+    'trinucleotide context, e.g. T[A>G]C">\n'
+    '##INFO=<ID=GRANTHAM,Number=1,Type=Integer,Description="Grantham '
+    'score of the amino acid change">\n'
+    '##INFO=<ID=GRANTHAM_PRED,Number=1,Type=String,Description="Grantham '
+    'prediction: CONSERVATIVE, MODERATE or RADICAL">\n'
+)
+
+
+class VcfWriter:
+    """Streams VariantTables into a VCF (or BGZF-compressed VCF) file.
+
+    The file is written under a temporary name and moved into place by
+    close(), together with its '.tbi' index when bgzip is set.
+
+    Attributes:
+        output_file: Destination path ('.vcf', or '.vcf.gz' with bgzip).
+        count: Number of variant rows written so far (an INDEL run of n
+            rows counts n, although it is a single VCF record).
+    """
+
+    def __init__(
+        self,
+        output_file: str,
+        reference: str | None = None,
+        contig: str = DEFAULT_CONTIG,
+        samples: Sequence[str] = (),
+        bgzip: bool = False,
+    ):
+        """Opens the temporary file and writes the header.
+
+        Args:
+            output_file: Destination path.
+            reference: Reference sequence, used for the contig length and
+                the INDEL anchor bases: a str or any str-like object with
+                len() and slicing (e.g. fasta_parser.IndexedRecord).
+                None writes 'N' anchors and no contig length.
+            contig: CHROM of every record.
+            samples: Sample column names; empty for a sites-only file.
+            bgzip: Whether to BGZF-compress and write a tabix index.
+        """
+        self.output_file = output_file
+        self.count = 0
+        self._reference = reference
+        self._contig = contig
+        self._genotype = "\tGT" + "\t1" * len(samples) if samples else ""
+        self._samples = len(samples)
+        self._pending: tuple[str, int, list[str]] | None = None
+        self._leading: list[tuple] | None = None
+        self._tmp_path = output_file + ".tmp"
+        self._file = open(self._tmp_path, "wb", buffering=DEFAULT_BUFFER_SIZE)
+        self._sink = self._file
+        self._index = None
+        if bgzip:
+            self._sink = BgzfWriter(self._file)
+            self._index = TabixIndexBuilder()
+
+        length = "" if reference is None else f",length={len(reference)}"
+        header = (
+            f"##fileformat={VCF_VERSION}\n"
+            "##source=SNPTracker\n"
+            f"##contig=<ID={contig}{length}>\n"
+            + _INFO_HEADER
+        )
+        columns = "#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO"
+        if samples:
+            header += '##FORMAT=<ID=GT,Number=1,Type=String,Description="Genotype">\n'
+            columns += "\tFORMAT\t" + "\t".join(samples)
+        self._sink.write((header + columns + "\n").encode())
+
+    def write(self, snps: VariantTable | list[dict]) -> None:
+        """Appends a batch of variants (in position order).
+
+        An INDEL run may continue in the next batch, so its record is only
+        written once the run ends (or on close()); likewise for a record
+        starting at position 1, until no later event overlaps it.
+
+        Args:
+            snps: VariantTable or list of SNP dicts.
+        """
+        table = VariantTable.from_records(snps)
+        records = []
+        for position, ref, alt, type_, annotation, context, score in (
+            table.iter_tuples()
+        ):
+            if type_ == "INSERTION" or type_ == "DELETION":
+                base = alt if type_ == "INSERTION" else ref
+                pending = self._pending
+                if (
+                    pending is not None
+                    and pending[0] == type_
+                    and (
+                        pending[1] == position
+                        if type_ == "INSERTION"
+                        and not self._past_reference_end(position)
+                        else pending[1] + len(pending[2]) == position
+                    )
+                ):
+                    pending[2].append(base)
+                else:
+                    if pending is not None:
+                        self._add_row(self._flush_pending(), records)
+                    self._pending = (type_, position, [base])
+                continue
+
+            if self._pending is not None:
+                self._add_row(self._flush_pending(), records)
+            self._add_row(
+                (position, ref, alt, type_, annotation, context, score),
+                records,
+            )
+
+        self._write_records(records)
+        self.count += len(table)
+
+    def write_row(self, row: tuple, genotypes: Sequence[str] = ()) -> None:
+        """Writes one record with explicit genotypes.
+
+        Args:
+            row: VariantTable.iter_tuples()-shaped tuple. INDEL rows may
+                carry a whole run: (start, bases, '-', 'DELETION', ...) or
+                (start, '-', bases, 'INSERTION', ...), with start the
+                first deleted or inserted position.
+            genotypes: GT value of each sample column ('0', '1' or '.').
+
+        Raises:
+            ValueError: If there is not one genotype per sample column.
+        """
+        if len(genotypes) != self._samples:
+            raise ValueError(
+                f"Expected {self._samples} genotypes, got {len(genotypes)}."
+            )
+        suffix = "\tGT\t" + "\t".join(genotypes) if genotypes else ""
+        self._write_records([self._record(row, suffix)])
+        self.count += 1
+
+    def _flush_pending(self) -> tuple:
+        """Returns the row of the pending INDEL run and clears it."""
+        type_, start, bases = self._pending
+        self._pending = None
+        run = "".join(bases)
+        return (start, run if type_ == "DELETION" else "-",
+                run if type_ == "INSERTION" else "-", type_, "NON_CODING",
+                None, None)
+
+    def _add_row(
+        self, row: tuple, records: list[tuple[int, str, str, str, str]]
+    ) -> None:
+        """Appends the record of a row, holding back those at position 1.
+
+        An INDEL at position 1 is anchored on the base after it, so its
+        record stays open while following rows overlap it (see
+        _leading_layout()) and they are folded into it.
+        """
+        if self._leading is not None:
+            if self._record_start(row) <= self._leading_layout()[1]:
+                self._leading.append(row)
+                return
+            records.append(self._flush_leading())
+        type_ = row[3]
+        if row[0] == 1 and (type_ == "INSERTION" or type_ == "DELETION"):
+            self._leading = [row]
+            return
+        records.append(self._record(row, self._genotype))
+
+    @staticmethod
+    def _record_start(row: tuple) -> int:
+        """Returns the POS a row's record would have on its own."""
+        position, type_ = row[0], row[3]
+        if position > 1 and (type_ == "INSERTION" or type_ == "DELETION"):
+            return position - 1
+        return position
+
+    def _leading_layout(self) -> tuple[list[tuple[int, int, str]], int]:
+        """Returns the edits of the position-1 rows and their record end.
+
+        Edits are (first base, reference bases replaced, new bases), with
+        insertions replacing 0 bases before their position. The record
+        covers bases 1..end: up to the last base an edit touches, plus the
+        following base when REF or ALT would otherwise be empty.
+        """
+        edits = []
+        for position, ref, alt, type_, *_ in self._leading:
+            if type_ == "INSERTION":
+                edits.append((position, 0, alt))
+            elif type_ == "DELETION":
+                edits.append((position, len(ref), ""))
+            else:
+                edits.append((position, 1, alt))
+        edits.sort(key=lambda edit: (edit[0], edit[1] > 0))
+        reach = max(start + length - 1 for start, length, _ in edits)
+        alt_length = reach + sum(
+            len(bases) - length for _, length, bases in edits
+        )
+        end = reach + 1 if not reach or not alt_length else reach
+        return edits, end
+
+    def _flush_leading(self) -> tuple[int, str, str, str, str]:
+        """Returns the merged record of the position-1 rows and clears them."""
+        edits, end = self._leading_layout()
+        info = self._info(self._leading[0])
+        self._leading = None
+        reference = self._bases(end)
+        pieces = []
+        cursor = 1
+        for start, length, bases in edits:
+            pieces.append(reference[cursor - 1:start - 1])
+            pieces.append(bases)
+            cursor = max(cursor, start + length)
+        pieces.append(reference[cursor - 1:])
+        return 1, reference, "".join(pieces).upper(), info, self._genotype
+
+    def _record(
+        self, row: tuple, genotypes: str
+    ) -> tuple[int, str, str, str, str]:
+        """Builds the (POS, REF, ALT, INFO, genotype columns) of a row."""
+        position, ref, alt, type_ = row[:4]
+        info = self._info(row)
+        if type_ == "DELETION" or type_ == "INSERTION":
+            position, ref, alt = self._anchor(type_, position, ref, alt)
+        return position, ref.upper(), alt.upper(), info, genotypes
+
+    @staticmethod
+    def _info(row: tuple) -> str:
+        """Builds the INFO column of a row ('.' when no field is set)."""
+        _, _, _, type_, annotation, context, score = row
+        parts = []
+        if type_ is not None:
+            parts.append(f"TYPE={type_}")
+        if annotation is not None:
+            parts.append(f"ANNOTATION={annotation}")
+        if context is not None:
+            parts.append(f"CONTEXT={context}")
+        if score is not None:
+            parts.append(f"GRANTHAM={score};GRANTHAM_PRED={grantham_prediction(score)}")
+        return ";".join(parts) or "."
+
+    def _base(self, position: int) -> str:
+        """Returns the reference base at a 1-indexed position, or 'N'."""
+        reference = self._reference
+        if reference is None or not 1 <= position <= len(reference):
+            return "N"
+        return reference[position - 1:position].upper()
+
+    def _bases(self, end: int) -> str:
+        """Returns reference bases 1..end, 'N' past the reference end."""
+        reference = self._reference
+        bases = "" if reference is None else reference[:end].upper()
+        return bases + "N" * (end - len(bases))
+
+    def _past_reference_end(self, position: int) -> bool:
+        """Whether an INSERTION row at position belongs to a sample tail.
+
+        Aligned insertions sit before a reference base (position <= length
+        + 1) and share that position; only the tail rows of positional
+        detection continue past it, one position per base. Without a
+        reference the two cannot be told apart and consecutive rows merge.
+        """
+        reference = self._reference
+        return reference is None or position > len(reference) + 1
+
+    def _anchor(
+        self, type_: str, start: int, ref: str, alt: str
+    ) -> tuple[int, str, str]:
+        """Returns the anchored (POS, REF, ALT) of an INDEL run."""
+        if type_ == "DELETION":
+            if start > 1:
+                anchor = self._base(start - 1)
+                return start - 1, anchor + ref, anchor
+            anchor = self._base(start + len(ref))
+            return start, ref + anchor, anchor
+        if start > 1:
+            anchor = self._base(start - 1)
+            return start - 1, anchor, anchor + alt
+        anchor = self._base(1)
+        return 1, anchor, alt + anchor
+
+    def _write_records(
+        self, records: list[tuple[int, str, str, str, str]]
+    ) -> None:
+        contig = self._contig
+        lines = [
+            f"{contig}\t{position}\t.\t{ref}\t{alt}\t.\tPASS\t{info}"
+            f"{genotypes}\n".encode()
+            for position, ref, alt, info, genotypes in records
+        ]
+        if self._index is None:
+            self._sink.write(b"".join(lines))
+            return
+        sink = self._sink
+        for (position, ref, *_), line in zip(records, lines):
+            start = sink.tell()
+            sink.write(line)
+            self._index.add(
+                contig, position - 1, position - 1 + len(ref), start,
+                sink.tell(),
+            )
+
+    def close(self) -> None:
+        """Writes any pending INDEL run, then publishes the file (and index)."""
+        if self._tmp_path is None:
+            return
+        try:
+            records = []
+            if self._pending is not None:
+                self._add_row(self._flush_pending(), records)
+            if self._leading is not None:
+                records.append(self._flush_leading())
+            self._write_records(records)
+            self._sink.close()
+            os.replace(self._tmp_path, self.output_file)
+            if self._index is not None:
+                index_path = self.output_file + ".tbi"
+                self._index.write(index_path + ".tmp")
+                os.replace(index_path + ".tmp", index_path)
+        except BaseException:
+            self.discard()
+            raise
+        self._tmp_path = None
+
+    def discard(self) -> None:
+        """Closes and deletes the temporary file without publishing it."""
+        if self._tmp_path is None:
+            return
+        self._file.close()
+        for path in (self._tmp_path, self.output_file + ".tbi.tmp"):
+            if os.path.exists(path):
+                os.remove(path)
+        self._tmp_path = None
+
+    def __enter__(self) -> "VcfWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()